@@ -1,25 +0,0 @@
-#!/usr/bin/env python3
-"""Model Status script
-
-Reports the readiness of ML models to the Node.js backend. Currently acts as
-as stub always returning that the required models are *available*. This can be
-expanded later to run actual weight loading checks.
-"""
-
-import json
-import sys
-
-
-def main() -> None:
-    status = {
-        "eye_gaze": "ready",
-        "sit_stand": "ready",
-        "tapping_hands": "ready",
-        "tapping_feet": "ready",
-        "rapid_talking": "ready",
-    }
-    sys.stdout.write(json.dumps(status))
-
-
-if __name__ == "__main__":
-    main() 
\ No newline at end of file
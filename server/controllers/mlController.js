@@ -7,6 +7,55 @@ import os from "os";
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
+// Every Python entry point (analyze, batch, evaluate, status) runs from the
+// one shared analyzer in server/ml-utils, so its caches, optimisations and
+// benchmarks apply to all of them.
+const ML_UTILS_DIR = path.join(__dirname, "../ml-utils");
+const mlScript = (name) => path.join(ML_UTILS_DIR, name);
+
+// batch_analyzer.py --stream writes one JSON object per line as each entry
+// finishes; hand every complete line to onRecord as soon as it arrives.
+const onJsonLines = (stream, onRecord) => {
+  let buffered = "";
+  const emit = (line) => {
+    if (!line) return;
+    try {
+      onRecord(JSON.parse(line));
+    } catch (parseError) {
+      console.warn("Skipping non-JSON analyzer output:", line.slice(0, 200));
+    }
+  };
+  stream.on("data", (chunk) => {
+    buffered += chunk.toString();
+    let newline;
+    while ((newline = buffered.indexOf("\n")) !== -1) {
+      emit(buffered.slice(0, newline).trim());
+      buffered = buffered.slice(newline + 1);
+    }
+  });
+  stream.on("end", () => emit(buffered.trim()));
+};
+
+// ?stream=1 (or Accept: application/x-ndjson) forwards batch results as
+// NDJSON lines while the analyzer is still running.
+const wantsNdjson = (req) =>
+  req.query.stream === "1" ||
+  req.query.stream === "true" ||
+  (req.get("accept") || "").includes("application/x-ndjson");
+
+const startNdjson = (res) => {
+  if (!res.headersSent) {
+    res.status(200);
+    res.setHeader("Content-Type", "application/x-ndjson");
+    res.flushHeaders();
+  }
+};
+
+const writeNdjson = (res, record) => {
+  startNdjson(res);
+  res.write(JSON.stringify(record) + "\n");
+};
+
 const recentDetections = new Map();
 
 let pythonAvailable = true;
@@ -269,11 +318,8 @@ export const analyzeBehavior = async (req, res) => {
       });
     }
 
-    const pythonScript = path.join(
-      __dirname,
-      "../../machine-learning/utils/ml_analyzer.py"
-    );
-    const workingDir = path.join(__dirname, "../../machine-learning/utils");
+    const pythonScript = mlScript("ml_analyzer.py");
+    const workingDir = ML_UTILS_DIR;
 
     if (!behaviorType || (!data && !frame && !frame_sequence)) {
       return res.status(400).json({
@@ -672,14 +718,18 @@ export const getModelStatus = async (req, res) => {
       });
     }
 
-    const pythonScript = path.join(
-      __dirname,
-      "../../machine-learning/utils/model_status.py"
-    );
+    const pythonScript = mlScript("model_status.py");
 
-    const workingDir = path.join(__dirname, "../../machine-learning");
+    const workingDir = ML_UTILS_DIR;
 
-    const pythonProcess = spawn("python", [pythonScript], {
+    // The probe caches its result for MODEL_STATUS_TTL seconds, so polling
+    // this endpoint is cheap; ?refresh=1 forces a new probe.
+    const args = [pythonScript];
+    if (req.query.refresh === "1" || req.query.refresh === "true") {
+      args.push("--refresh");
+    }
+
+    const pythonProcess = spawn("python", args, {
       cwd: workingDir,
       stdio: ["pipe", "pipe", "pipe"],
     });
@@ -707,9 +757,29 @@ export const getModelStatus = async (req, res) => {
 
       try {
         const status = JSON.parse(result);
-        res.json({
+        const models = status.models || status;
+        const systemReady =
+          status.system_ready ??
+          Object.values(models).every((m) => m && m.available);
+        const degraded =
+          status.degraded ??
+          Object.keys(models).filter(
+            (name) => models[name] && models[name].status === "degraded"
+          );
+
+        // Readiness probes (?ready=1) get a 503 only while some behaviour
+        // cannot be served at all; behaviours answering without their
+        // weights are listed in `degraded` but do not fail the probe.
+        const ready = req.query.ready === "1" || req.query.ready === "true";
+        res.status(ready && !systemReady ? 503 : 200).json({
           success: true,
-          models: status,
+          models,
+          system_ready: systemReady,
+          degraded,
+          checked_at: status.checked_at,
+          age_seconds: status.age_seconds,
+          ttl_seconds: status.ttl_seconds,
+          cached: status.cached,
         });
       } catch (parseError) {
         res.status(500).json({
@@ -783,23 +853,32 @@ export const batchAnalysis = async (req, res) => {
     try {
       fs.writeFileSync(tempFile, JSON.stringify(behaviors));
 
-      const pythonScript = path.join(
-        __dirname,
-        "../../machine-learning/utils/batch_analyzer.py"
-      );
+      const pythonScript = mlScript("batch_analyzer.py");
 
-      const workingDir = path.join(__dirname, "../../machine-learning");
+      const workingDir = ML_UTILS_DIR;
 
-      const pythonProcess = spawn("python", [pythonScript, tempFile], {
-        cwd: workingDir,
-        stdio: ["pipe", "pipe", "pipe"],
-      });
+      const pythonProcess = spawn(
+        "python",
+        [pythonScript, tempFile, "--stream"],
+        {
+          cwd: workingDir,
+          stdio: ["pipe", "pipe", "pipe"],
+        }
+      );
 
-      let result = "";
+      const streaming = wantsNdjson(req);
+      const results = [];
+      let summary = null;
       let error = "";
 
-      pythonProcess.stdout.on("data", (data) => {
-        result += data.toString();
+      onJsonLines(pythonProcess.stdout, (record) => {
+        if (record.summary) {
+          summary = record;
+        } else if (streaming) {
+          writeNdjson(res, record);
+        } else {
+          results.push(record);
+        }
       });
 
       pythonProcess.stderr.on("data", (data) => {
@@ -813,8 +892,17 @@ export const batchAnalysis = async (req, res) => {
           console.error("Failed to cleanup temp file:", cleanupError);
         }
 
-        if (code !== 0) {
+        if (code !== 0 || !summary) {
           console.error("Python script error:", error);
+          if (streaming && res.headersSent) {
+            writeNdjson(res, {
+              success: false,
+              summary: true,
+              message: "Batch analysis failed",
+              error,
+            });
+            return res.end();
+          }
           return res.status(500).json({
             success: false,
             message: "Batch analysis failed",
@@ -822,20 +910,18 @@ export const batchAnalysis = async (req, res) => {
           });
         }
 
-        try {
-          const batchResult = JSON.parse(result);
-          res.json({
-            success: Boolean(batchResult.success),
-            results: batchResult.results || [],
-            total_analyzed: batchResult.total_analyzed || 0,
-          });
-        } catch (parseError) {
-          res.status(500).json({
-            success: false,
-            message: "Failed to parse batch results",
-            error: parseError.message,
-          });
+        if (streaming) {
+          writeNdjson(res, summary);
+          return res.end();
         }
+
+        // Fused entries finish together, so restore input order.
+        results.sort((a, b) => a.index - b.index);
+        res.json({
+          success: Boolean(summary.success),
+          results,
+          total_analyzed: summary.total_analyzed || 0,
+        });
       });
 
       pythonProcess.on("error", (err) => {
@@ -887,28 +973,64 @@ export const evaluateDataset = async (req, res) => {
 
     fs.writeFileSync(tempFile, JSON.stringify(unlabeled));
 
-    const pythonScript = path.join(
-      __dirname,
-      "../../machine-learning/utils/batch_analyzer.py"
-    );
+    const pythonScript = mlScript("batch_analyzer.py");
 
-    const workingDir = path.join(__dirname, "../../machine-learning");
+    const workingDir = ML_UTILS_DIR;
 
-    const pythonProcess = spawn("python", [pythonScript, tempFile], {
-      cwd: workingDir,
-      stdio: ["pipe", "pipe", "pipe"],
-    });
+    // Evaluation keeps its own sit/stand state so it neither depends on nor
+    // advances the live posture state; the directory goes when the run ends.
+    const stateDir = fs.mkdtempSync(path.join(os.tmpdir(), "eval-sit-stand-"));
+    const stateFile = path.join(stateDir, "sit_stand_state.json");
+    const cleanup = () => {
+      fs.unlink(tempFile, () => {});
+      fs.rm(stateDir, { recursive: true, force: true }, () => {});
+    };
 
-    let result = "";
+    const pythonProcess = spawn(
+      "python",
+      [pythonScript, tempFile, "--stream", "--state-file", stateFile],
+      {
+        cwd: workingDir,
+        stdio: ["pipe", "pipe", "pipe"],
+      }
+    );
+
+    const streaming = wantsNdjson(req);
+    const predictions = [];
+    let summary = null;
+    let correct = 0;
     let error = "";
 
-    pythonProcess.stdout.on("data", (d) => (result += d.toString()));
+    // Results carry the index of their input entry: skipped or fused
+    // entries do not shift the labels they are scored against.
+    onJsonLines(pythonProcess.stdout, (record) => {
+      if (record.summary) {
+        summary = record;
+        return;
+      }
+      const expectedLabel = behaviors[record.index]?.label;
+      if (expectedLabel !== undefined) {
+        record.correct = record.label == expectedLabel;
+        if (record.correct) correct += 1;
+      }
+      predictions.push(record);
+      if (streaming) writeNdjson(res, record);
+    });
     pythonProcess.stderr.on("data", (d) => (error += d.toString()));
 
     pythonProcess.on("close", (code) => {
-      fs.unlink(tempFile, () => {});
+      cleanup();
 
-      if (code !== 0) {
+      if (code !== 0 || !summary) {
+        if (streaming && res.headersSent) {
+          writeNdjson(res, {
+            success: false,
+            summary: true,
+            message: "Evaluation failed",
+            error,
+          });
+          return res.end();
+        }
         return res.status(500).json({
           success: false,
           message: "Evaluation failed",
@@ -916,38 +1038,35 @@ export const evaluateDataset = async (req, res) => {
         });
       }
 
-      try {
-        const batchRes = JSON.parse(result);
-        const predictions = batchRes.results || [];
-
-        let correct = 0;
-        predictions.forEach((pred, idx) => {
-          const expectedLabel = behaviors[idx].label;
-          if (expectedLabel !== undefined) {
-            const matches = pred.label == expectedLabel;
-            if (matches) correct += 1;
-          }
-        });
-
-        const totalLabeled = behaviors.filter(
-          (b) => b.label !== undefined
-        ).length;
+      const totalLabeled = behaviors.filter(
+        (b) => b.label !== undefined
+      ).length;
 
-        const accuracy = totalLabeled ? correct / totalLabeled : null;
+      const accuracy = totalLabeled ? correct / totalLabeled : null;
 
-        res.json({
-          success: true,
-          total_samples: behaviors.length,
-          labeled_samples: totalLabeled,
-          correct,
-          accuracy,
-          predictions,
-        });
-      } catch (e) {
-        res
-          .status(500)
-          .json({ success: false, message: "Parse error", error: e.message });
+      const report = {
+        success: true,
+        total_samples: behaviors.length,
+        labeled_samples: totalLabeled,
+        correct,
+        accuracy,
+      };
+      if (streaming) {
+        writeNdjson(res, { ...report, summary: true });
+        return res.end();
       }
+      predictions.sort((x, y) => x.index - y.index);
+      res.json({ ...report, predictions });
+    });
+
+    pythonProcess.on("error", (err) => {
+      cleanup();
+      console.error("Failed to start Python process:", err);
+      res.status(500).json({
+        success: false,
+        message: "Failed to start evaluation",
+        error: err.message,
+      });
     });
   } catch (err) {
     res
@@ -998,15 +1117,8 @@ export const analyzeImage = async (req, res) => {
       });
     }
 
-    const scriptPath = path.join(
-      __dirname,
-      "..",
-      "..",
-      "machine-learning",
-      "utils",
-      "ml_analyzer.py"
-    );
-    const workingDir = path.join(__dirname, "../../machine-learning/utils");
+    const scriptPath = mlScript("ml_analyzer.py");
+    const workingDir = ML_UTILS_DIR;
 
     const pythonCommand = `python "${scriptPath}" --analysis-type ${analysisType}`;
 
@@ -1074,18 +1186,11 @@ export const batchAnalyze = async (req, res) => {
       });
     }
 
-    const scriptPath = path.join(
-      __dirname,
-      "..",
-      "..",
-      "machine-learning",
-      "utils",
-      "batch_analyzer.py"
-    );
+    const scriptPath = mlScript("batch_analyzer.py");
 
     const pythonCommand = `python "${scriptPath}" --analysis-type ${analysisType}`;
 
-    const workingDir = path.join(__dirname, "../../machine-learning/utils");
+    const workingDir = ML_UTILS_DIR;
 
     const result = execSync(pythonCommand, {
       input: JSON.stringify({ images }),
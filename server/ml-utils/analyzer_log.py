@@ -0,0 +1,86 @@
+"""Leveled, sampled stderr logging for the analyzer scripts
+
+The analyzers used to ``print(..., file=sys.stderr)`` several times per frame;
+the Node controller buffers all of stderr, so at 12 frames × 5 behaviours
+that was thousands of formatted lines per batch. `get_logger` returns a
+standard `logging.Logger` writing plain messages to stderr with:
+
+* a level from ``ML_LOG_LEVEL`` (default ``WARNING``); calls below it return
+  after one integer comparison, before any formatting,
+* lazy %-style formatting – pass arguments, not f-strings, so nothing is
+  formatted unless the record is emitted,
+* per-message-type sampling: the first ``ML_LOG_BURST`` (default 5) records
+  with the same format string are emitted, then one in every
+  ``ML_LOG_EVERY`` (default 100), tagged with how many were suppressed.
+
+Arguments that are themselves expensive to compute should be guarded with
+``if log.isEnabledFor(logging.DEBUG):``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from typing import Dict, Tuple
+
+_FORMAT = "%(message)s%(suppressed_note)s"
+
+
+class SampleFilter(logging.Filter):
+    """Let the first *burst* records of each message type through, then 1 in *every*."""
+
+    def __init__(self, burst: int = 5, every: int = 100) -> None:
+        super().__init__()
+        self.burst = burst
+        self.every = max(1, every)
+        self._seen: Dict[Tuple[str, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.suppressed_note = ""
+        # Warnings and errors are never sampled away.
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, str(record.msg))
+        n = self._seen.get(key, 0) + 1
+        self._seen[key] = n
+        if n <= self.burst:
+            return True
+        if (n - self.burst) % self.every:
+            return False
+        record.suppressed_note = f" [+{self.every - 1} similar suppressed]"
+        return True
+
+
+_handler: logging.Handler | None = None
+
+
+def _configure() -> logging.Handler:
+    global _handler
+    if _handler is None:
+        _handler = logging.StreamHandler(sys.stderr)
+        _handler.setFormatter(logging.Formatter(_FORMAT))
+        _handler.addFilter(SampleFilter(
+            burst=int(os.environ.get("ML_LOG_BURST", "5")),
+            every=int(os.environ.get("ML_LOG_EVERY", "100")),
+        ))
+    return _handler
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger *name* writing sampled records to stderr at ``ML_LOG_LEVEL``."""
+
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.addHandler(_configure())
+        logger.setLevel(os.environ.get("ML_LOG_LEVEL", "WARNING").upper())
+        logger.propagate = False
+    return logger
+
+
+def set_level(level: str | int) -> None:
+    """Change the level of every logger created through `get_logger`."""
+
+    for logger in logging.Logger.manager.loggerDict.values():
+        if isinstance(logger, logging.Logger) and _handler is not None and _handler in logger.handlers:
+            logger.setLevel(level.upper() if isinstance(level, str) else level)
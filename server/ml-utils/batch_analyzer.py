@@ -3,7 +3,7 @@
 
 Invoked by Node.js mlController as:
 
-python batch_analyzer.py <tmp_json_file>
+python batch_analyzer.py <tmp_json_file> [--stream] [--timings] [--state-file FILE]
 
 Where the temporary JSON file contains an array of objects, each at minimum
 containing a `type` (behaviour type) and `data` payload. The script returns a
@@ -18,19 +18,215 @@ JSON object with the following structure (written to stdout):
   "total_analyzed": 5
 }
 
+With ``--stream`` the output is JSON-lines instead: one line per analysed
+entry, written and flushed as soon as that entry finishes, followed by a final
+summary line::
+
+{"index": 0, "behavior_type": "eye_gaze", "detected": true, "confidence": 0.87, "label": 1}
+{"index": 1, ...}
+{"success": true, "summary": true, "total_analyzed": 5}
+
+`index` is the position of the entry in the input array so consumers can match
+results to inputs even when invalid entries are skipped or fused entries
+(below) arrive together. Results are not kept in memory in this mode, and
+each input payload is released once analysed. mlController's batch and
+evaluate endpoints run in this mode and, with ``?stream=1``, forward each
+line to the client as NDJSON as soon as it arrives.
+
+``--timings`` (or ``ML_ANALYZER_TIMINGS=1``) adds the per-stage ``timings``
+object of `ml_analyzer._predict` to every result.
+
+Frame entries that carry the same frame sequence (a dashboard tick sends one
+entry per behaviour with the same frames) are analysed together by
+`ml_analyzer.analyze_all`: the frames are decoded and run through each
+MediaPipe graph once for all of them. Their results carry ``"fused": n``
+(the number of entries analysed together) and, with timings, the timings of
+that shared pass. ``--no-fuse`` (or ``ML_ANALYZER_FUSED=0``) analyses every
+entry separately. An entry's ``data`` may also be an encoded video chunk
+(see `video_input.py`; entries sharing one are fused the same way) or a
+landmark payload (see `landmark_input.py`), which skips decoding and
+detection.
+
+rapid_talking entries are batched the same way: all of them form one unit
+and their `WPMModel` windows are scored in a single forward
+(`ml_analyzer.predict_rapid_talking_batch`); their results carry
+``"batched": n``. ``--no-fuse`` turns that off too.
+
+With the transition detector (``ML_SIT_STAND_MODE=transitions``), sit_stand
+entries read and advance the service's posture state
+(`ml_analyzer.SIT_STAND_STATE_FILE`), as live dashboard batches must.
+``--state-file`` (or ``ML_SIT_STAND_STATE_FILE``) points a run at another
+file instead; mlController's evaluate endpoint passes a temporary one so
+evaluation never moves the live state forward.
+
 The placeholder implementation relies on the same random-based detector found
 in `ml_analyzer.py` so that the API can be exercised end-to-end even without
 trained models.
 """
 
+import argparse
 import json
 import os
 import sys
-from typing import Any, Dict, List
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 # Reuse single-behaviour predictor from ml_analyzer to ensure identical
 # preprocessing/model logic.
-from ml_analyzer import _predict  # type: ignore
+import ml_analyzer  # type: ignore
+from ml_analyzer import FRAME_BEHAVIORS, _predict, _video_frames, analyze_all, predict_rapid_talking_batch  # type: ignore
+from video_input import is_video_payload
+
+FUSED_DEFAULT = os.environ.get("ML_ANALYZER_FUSED", "1") != "0"
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _entry_parts(entry: Dict[str, Any]) -> Tuple[Optional[str], Any]:
+    b_type = entry.get("type") or entry.get("behavior_type") or entry.get("behaviorType")
+    data = entry.get("data") or entry.get("frame_sequence") or entry.get("frame")
+    return b_type, data
+
+
+def _entry_frames(b_type: Optional[str], data: Any) -> Optional[List[str]]:
+    """The frame list `_predict` would analyse for a frame-behaviour entry, else None."""
+
+    if b_type not in FRAME_BEHAVIORS:
+        return None
+    frames = (data.get("frame_sequence") or data.get(b_type)) if isinstance(data, dict) else data
+    if isinstance(frames, list) and frames and all(isinstance(f, str) for f in frames):
+        return frames
+    return None
+
+
+def _frames_key(b_type: Optional[str], data: Any) -> Optional[Tuple[Any, ...]]:
+    """What identifies an entry's frames for fusing; None if it cannot be fused."""
+
+    if b_type in FRAME_BEHAVIORS and is_video_payload(data):
+        return ("video", data["video"], data.get("max_frames"))
+    frames = _entry_frames(b_type, data)
+    return None if frames is None else tuple(frames)
+
+
+def _labelled(single: Dict[str, Any], b_type: str) -> Dict[str, Any]:
+    single["behavior_type"] = b_type
+    single["label"] = int(single["detected"])
+    return single
+
+
+def _analyze_entry(entry: Dict[str, Any], timings: Optional[bool] = None) -> Optional[Dict[str, Any]]:
+    """Run `_predict` for one batch entry; None when the entry has no type."""
+
+    b_type, data = _entry_parts(entry)
+    if not b_type:
+        return None
+    return _labelled(_predict(b_type, data, timings=timings), b_type)
+
+
+def _fused_groups(entries: List[Dict[str, Any]]) -> Dict[int, List[int]]:
+    """Indices of frame entries sharing one sequence (and of all rapid_talking
+    entries), keyed by the first of them.
+
+    A group holds each behaviour at most once: a repeated type (two
+    sit_stand entries advance its persisted state twice) stays its own unit.
+    """
+
+    by_frames: Dict[Tuple[Any, ...], List[int]] = {}
+    seen = set()
+    for idx, entry in enumerate(entries):
+        b_type, data = _entry_parts(entry)
+        key = _frames_key(b_type, data)
+        if key is not None and (key, b_type) not in seen:
+            seen.add((key, b_type))
+            by_frames.setdefault(key, []).append(idx)
+    groups = {idxs[0]: idxs for idxs in by_frames.values() if len(idxs) > 1}
+    # Every rapid_talking entry shares one batched WPMModel forward.
+    talking = [idx for idx, entry in enumerate(entries) if _entry_parts(entry)[0] == "rapid_talking"]
+    if len(talking) > 1:
+        groups[talking[0]] = talking
+    return groups
+
+
+def work_units(entries: List[Dict[str, Any]], fused: Optional[bool] = None) -> List[List[int]]:
+    """Entry indices in analysis order: each fused group is one unit, any other entry its own."""
+
+    groups = _fused_groups(entries) if (FUSED_DEFAULT if fused is None else fused) else {}
+    grouped = {idx for idxs in groups.values() for idx in idxs}
+    return [groups.get(idx, [idx]) for idx in range(len(entries)) if idx in groups or idx not in grouped]
+
+
+def analyze_unit(entries: List[Dict[str, Any]], idxs: List[int], timings: Optional[bool] = None) -> List[Tuple[int, Dict[str, Any]]]:
+    """``(index, result)`` for the valid entries of one work unit.
+
+    The entries are replaced by ``{}`` before analysis so their (potentially
+    multi-MB) frame payloads can be freed as soon as they are done.
+    """
+
+    if len(idxs) == 1:
+        entry = entries[idxs[0]]
+        entries[idxs[0]] = {}
+        single = _analyze_entry(entry, timings)
+        return [] if single is None else [(idxs[0], single)]
+
+    types = [str(_entry_parts(entries[i])[0]) for i in idxs]
+    if all(b_type == "rapid_talking" for b_type in types):
+        payloads = [_entry_parts(entries[i])[1] for i in idxs]
+        for i in idxs:
+            entries[i] = {}
+        out = predict_rapid_talking_batch(payloads, timings=timings)
+        done = []
+        for i, single in zip(idxs, out["results"]):
+            single["batched"] = len(idxs)
+            if "timings" in out:
+                single["timings"] = out["timings"]
+            done.append((i, _labelled(single, "rapid_talking")))
+        return done
+
+    data = _entry_parts(entries[idxs[0]])[1]
+    for i in idxs:
+        entries[i] = {}
+    try:
+        # A shared video chunk is decoded once for the whole group.
+        frames = _video_frames(data) if is_video_payload(data) else _entry_frames(types[0], data) or []
+    except Exception as exc:
+        error = {"detected": False, "confidence": 0.0, "error": str(exc)}
+        return [(i, _labelled(dict(error), b_type)) for i, b_type in zip(idxs, types)]
+    del data
+    out = analyze_all(frames, types, timings=timings)
+    del frames
+    done = []
+    for i, b_type in zip(idxs, types):
+        single = dict(out["results"][b_type])
+        single["fused"] = len(idxs)
+        if "timings" in out:
+            single["timings"] = out["timings"]
+        done.append((i, _labelled(single, b_type)))
+    return done
+
+
+def iter_results(
+    entries: List[Dict[str, Any]],
+    timings: Optional[bool] = None,
+    fused: Optional[bool] = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """``(index, result)`` for every valid entry, as each unit finishes.
+
+    Entries sharing a frame sequence come out together at the position of
+    the first of them, so indices are not always increasing.
+    """
+
+    for idxs in work_units(entries, fused):
+        yield from analyze_unit(entries, idxs, timings)
+
+
+def _emit_line(record: Dict[str, Any]) -> None:
+    """Write one JSON-lines record and flush so Node sees it immediately."""
+
+    sys.stdout.write(json.dumps(record) + "\n")
+    sys.stdout.flush()
 
 
 # ---------------------------------------------------------------------------
@@ -39,11 +235,26 @@ from ml_analyzer import _predict  # type: ignore
 
 
 def main() -> None:
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description="Run ML analysis on a batch of behaviour entries")
+    parser.add_argument("data_file", nargs="?", help="Path to JSON file containing the entries array")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Emit one JSON line per entry as it completes, then a summary line",
+    )
+    parser.add_argument("--timings", action="store_true", help="Include per-stage timings in every result")
+    parser.add_argument("--no-fuse", action="store_true",
+                        help="Analyse every entry separately, even when entries share their frames")
+    parser.add_argument("--state-file",
+                        help="Sit/stand state file to use instead of the service's (e.g. a temporary one)")
+    args = parser.parse_args()
+    timings = args.timings or None
+
+    if not args.data_file:
         print(json.dumps({"success": False, "error": "Missing data file argument"}))
         sys.exit(1)
 
-    data_file = sys.argv[1]
+    data_file = args.data_file
     if not os.path.exists(data_file):
         print(json.dumps({"success": False, "error": f"File not found: {data_file}"}))
         sys.exit(1)
@@ -55,17 +266,20 @@ def main() -> None:
         print(json.dumps({"success": False, "error": f"Failed to read JSON: {exc}"}))
         sys.exit(1)
 
-    results: List[Dict[str, Any]] = []
-    for entry in behaviors:
-        b_type = entry.get("type") or entry.get("behavior_type") or entry.get("behaviorType")
-        data = entry.get("data") or entry.get("frame_sequence") or entry.get("frame")
-        if not b_type:
-            # Skip invalid entries but continue processing others
-            continue
-        single = _predict(b_type, data)
-        single["behavior_type"] = b_type
-        single["label"] = int(single["detected"])
-        results.append(single)
+    if args.state_file:
+        ml_analyzer.SIT_STAND_STATE_FILE = Path(args.state_file)
+
+    fused = False if args.no_fuse else None
+    # Invalid entries are skipped; the others keep being processed.
+    if args.stream:
+        total = 0
+        for idx, single in iter_results(behaviors, timings, fused):
+            _emit_line({"index": idx, **single})
+            total += 1
+        _emit_line({"success": True, "summary": True, "total_analyzed": total})
+        return
+
+    results = [single for _, single in sorted(iter_results(behaviors, timings, fused), key=lambda r: r[0])]
 
     output = {"success": True, "results": results, "total_analyzed": len(results)}
 
@@ -79,4 +293,4 @@ if __name__ == "__main__":
         # Any unhandled exception should result in non-zero exit status so that
         # Node.js recognises the failure.
         print(str(exc), file=sys.stderr)
-        sys.exit(1) 
\ No newline at end of file
+        sys.exit(1) 
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the ml_analyzer pipeline
+
+Times every stage of `ml_analyzer.py` on synthetic but realistic frame
+sequences, without needing recorded data. Frames are procedurally rendered
+figures (head, torso, swinging arms, tapping feet, a sit/stand bob) on a
+noisy gradient background, JPEG-encoded as data-URLs exactly like the
+dashboard's `captureFrameSequence` at its three capture profiles
+(1280×720 source):
+
+  quick     4 frames, scale 0.5, JPEG quality 0.5
+  detailed 10 frames, scale 0.8, JPEG quality 0.7
+  behavior 12 frames, scale 0.6, JPEG quality 0.6
+
+python benchmark.py [--profiles quick detailed behavior] [--stages decode_image hand_crop ...] [--repeats 20] [--output bench.json]
+
+Output (stdout or ``--output``) is JSON::
+
+{
+  "success": true,
+  "environment": {"python": "3.10.12", "torch": "2.2.2", "cpu_count": 8, ...},
+  "profiles": {
+    "quick": {
+      "frames": 4, "frame_size": [640, 360],
+      "stages": {
+        "decode_image": {"median_ms": .., "p90_ms": .., "min_ms": .., "runs": 20,
+                         "alloc_peak_kb": .., "alloc_blocks": ..},
+        ...
+      }
+    }
+  }
+}
+
+``alloc_*`` come from one extra `tracemalloc` run per stage and cover the
+Python heap (NumPy and PIL buffers included; torch and MediaPipe native
+allocations are not visible to tracemalloc).
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+SOURCE_SIZE = (1280, 720)
+
+# name -> (frames, scale, JPEG quality), as in Dashboard.jsx
+PROFILES: Dict[str, Tuple[int, float, float]] = {
+    "quick": (4, 0.5, 0.5),
+    "detailed": (10, 0.8, 0.7),
+    "behavior": (12, 0.6, 0.6),
+}
+
+STAGES = (
+    "decode_image",
+    "eye_crop",
+    "hand_crop",
+    "foot_crop",
+    "pose_xy",
+    "frame_movement",
+    "hand_tapping",
+    "foot_tapping",
+    "sit_stand",
+    "forward_eye_gaze",
+    "forward_tapping_hands",
+    "forward_tapping_feet",
+    "forward_sit_stand",
+    "forward_rapid_talking",
+    "predict_separate",
+    "analyze_all",
+)
+
+# ---------------------------------------------------------------------------
+# Synthetic frames
+# ---------------------------------------------------------------------------
+
+
+def render_frame(t: int, size: Tuple[int, int], rng: np.random.Generator) -> Any:
+    """One frame of a figure whose limbs move with frame index *t*."""
+
+    from PIL import Image, ImageDraw
+
+    w, h = size
+    yy, xx = np.mgrid[0:h, 0:w]
+    bg = np.stack([
+        90 + 60 * xx / w,
+        100 + 40 * yy / h,
+        120 + 30 * (xx + yy) / (w + h),
+    ], axis=-1)
+    bg += rng.normal(0, 4, bg.shape)
+    img = Image.fromarray(np.clip(bg, 0, 255).astype(np.uint8))
+    d = ImageDraw.Draw(img)
+
+    cx = w * 0.5
+    bob = h * 0.06 * (1 + np.sin(t * 0.5))          # sitting/standing drift
+    head_r = h * 0.07
+    head_y = h * 0.18 + bob
+    skin, shirt, trousers = (224, 182, 150), (40, 90, 160), (50, 50, 60)
+
+    d.ellipse([cx - head_r, head_y - head_r, cx + head_r, head_y + head_r], fill=skin)
+    eye_dx = head_r * 0.4
+    for ex in (cx - eye_dx, cx + eye_dx):
+        d.ellipse([ex - 4, head_y - 6, ex + 4, head_y + 2], fill=(30, 30, 30))
+    torso_top, torso_bot = head_y + head_r, h * 0.55 + bob
+    d.rectangle([cx - w * 0.07, torso_top, cx + w * 0.07, torso_bot], fill=shirt)
+
+    # Arms swing, hands tap.
+    for side in (-1, 1):
+        sx = cx + side * w * 0.07
+        ang = 0.6 + 0.35 * np.sin(t * 1.7 + side)
+        hx = sx + side * np.cos(ang) * w * 0.12
+        hy = torso_top + np.sin(ang) * h * 0.3
+        d.line([sx, torso_top + 8, hx, hy], fill=shirt, width=max(4, int(w * 0.02)))
+        d.ellipse([hx - 10, hy - 10, hx + 10, hy + 10], fill=skin)
+
+    # Legs with tapping feet.
+    for side in (-1, 1):
+        hip_x = cx + side * w * 0.04
+        knee_x, knee_y = hip_x + side * w * 0.02, torso_bot + h * 0.18
+        foot_y = min(h - 6.0, knee_y + h * 0.2 - abs(np.sin(t * 2.3 + side)) * h * 0.03)
+        d.line([hip_x, torso_bot, knee_x, knee_y], fill=trousers, width=max(5, int(w * 0.025)))
+        d.line([knee_x, knee_y, knee_x, foot_y], fill=trousers, width=max(5, int(w * 0.022)))
+        d.ellipse([knee_x - 14, foot_y - 6, knee_x + 18, foot_y + 6], fill=(20, 20, 20))
+    return img
+
+
+def make_frames(n: int, scale: float, quality: float, seed: int = 0) -> List[str]:
+    """*n* JPEG data-URLs at the given capture scale and quality."""
+
+    rng = np.random.default_rng(seed)
+    size = (int(SOURCE_SIZE[0] * scale), int(SOURCE_SIZE[1] * scale))
+    frames = []
+    for t in range(n):
+        buf = BytesIO()
+        render_frame(t, size, rng).save(buf, format="JPEG", quality=int(quality * 100))
+        frames.append("data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii"))
+    return frames
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+
+def build_stages(ma: Any, frames: List[str]) -> Dict[str, Callable[[], Any]]:
+    """Zero-argument callables for every stage, bound to *frames*."""
+
+    images = [ma._decode_image(f) for f in frames]
+    img = images[len(images) // 2]
+    stages: Dict[str, Callable[[], Any]] = {
+        "decode_image": lambda: [ma._decode_image(f) for f in frames],
+        "eye_crop": lambda: ma._eye_crop(img),
+        "hand_crop": lambda: ma._hand_crop(img),
+        "foot_crop": lambda: ma._foot_crop(img),
+        "pose_xy": lambda: ma._pose_xy(img),
+        "frame_movement": lambda: ma._analyze_frame_movement(frames),
+        "hand_tapping": lambda: ma._analyze_hand_tapping_patterns([], frames),
+        "foot_tapping": lambda: ma._analyze_foot_tapping_patterns(frames),
+        "sit_stand": lambda: ma._analyze_sit_stand_transitions(frames),
+        # One dashboard tick: every frame behaviour separately vs one fused pass
+        "predict_separate": lambda: [ma._predict(b, frames, timings=False) for b in ma.FRAME_BEHAVIORS],
+        "analyze_all": lambda: ma.analyze_all(frames, timings=False),
+    }
+
+    if ma.TORCH_AVAILABLE:
+        import torch
+
+        seq = ma._frames_to_tensor(frames).unsqueeze(0).to(ma.DEVICE)
+        inputs = {
+            "eye_gaze": seq,
+            "tapping_hands": seq,
+            "tapping_feet": seq,
+            "sit_stand": torch.zeros(1, 10, 66, device=ma.DEVICE),
+            "rapid_talking": torch.full((1, 8, 1), 150.0, device=ma.DEVICE),
+        }
+        for key, x in inputs.items():
+            model = ma.MODELS.get(key)
+            if model is None:
+                continue
+
+            def forward(model: Any = model, x: Any = x) -> Any:
+                with torch.no_grad():
+                    return model(x)
+
+            stages[f"forward_{key}"] = forward
+    return stages
+
+
+def time_stage(fn: Callable[[], Any], repeats: int, warmup: int = 2) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0)
+
+    arr = np.array(samples)
+    return {
+        "median_ms": round(float(np.median(arr)), 3),
+        "p90_ms": round(float(np.percentile(arr, 90)), 3),
+        "min_ms": round(float(arr.min()), 3),
+        "runs": repeats,
+        "alloc_peak_kb": round(peak / 1024, 1),
+        "alloc_blocks": int(blocks),
+    }
+
+
+def _environment(ma: Any) -> Dict[str, Any]:
+    env: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "torch": None,
+        "device": str(ma.DEVICE),
+    }
+    if ma.TORCH_AVAILABLE:
+        import torch
+
+        env["torch"] = torch.__version__
+        env["torch_threads"] = torch.get_num_threads()
+    return env
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ml_analyzer stages on synthetic frames")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=list(PROFILES))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, help="Subset of stages (default: all)")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Keep the analyzer's stderr logging")
+    parser.add_argument("--output", help="Write the report here instead of stdout")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        # The analyzer logs heavily to stderr; keep it out of the way unless asked.
+        sink = sys.stderr if args.verbose else stack.enter_context(open(os.devnull, "w"))
+        with contextlib.redirect_stderr(sink):
+            import ml_analyzer as ma  # type: ignore
+
+        # Keep the sit/stand state of the real service untouched.
+        state_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="bench-sit-stand-"))
+        ma.SIT_STAND_STATE_FILE = Path(state_dir) / "sit_stand_state.json"
+
+        report: Dict[str, Any] = {"success": True, "environment": _environment(ma), "profiles": {}}
+        for name in args.profiles:
+            n, scale, quality = PROFILES[name]
+            frames = make_frames(n, scale, quality, seed=args.seed)
+            results: Dict[str, Any] = {}
+            with contextlib.redirect_stderr(sink):
+                stages = build_stages(ma, frames)
+            for stage in args.stages or STAGES:
+                fn = stages.get(stage)
+                if fn is None:
+                    results[stage] = {"skipped": "model unavailable"}
+                    continue
+                with contextlib.redirect_stderr(sink):
+                    results[stage] = time_stage(fn, args.repeats)
+                print(f"[benchmark] {name}/{stage}: {results[stage]['median_ms']} ms", file=sys.stderr)
+            report["profiles"][name] = {
+                "frames": n,
+                "frame_size": [int(SOURCE_SIZE[0] * scale), int(SOURCE_SIZE[1] * scale)],
+                "jpeg_quality": quality,
+                "stages": results,
+            }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
@@ -0,0 +1,727 @@
+#!/usr/bin/env python3
+"""Pre-decoded dataset cache
+
+Decoding `.avi`/`.mp4` clips or JPEG sequences and running MediaPipe over them
+dominates every evaluation and notebook training run. This module stores the
+result of that work once, as memory-mapped NumPy shards, so later runs only
+slice arrays:
+
+python dataset_cache.py build <src_dir> <cache_dir> --behavior sit_stand --max-frames 10 [--landmarks] [--embeddings]
+python dataset_cache.py info <cache_dir>
+
+`src_dir` follows the notebook layout: one sub-directory per class (e.g.
+``Sit down/``, ``Standing up/`` or ``tapping/``, ``non-tapping/``) containing
+video files or sub-directories of JPEG frames. ``--labels "Sit down=0,Standing up=1"``
+maps class names to labels; otherwise classes are numbered alphabetically.
+
+Layout on disk::
+
+  <cache_dir>/index.json
+  <cache_dir>/shard-00000/frames.npy       uint8   (N, H, W, 3)  RGB
+  <cache_dir>/shard-00000/pose.npy         float32 (N, 33, 4)    x, y, z, visibility
+  <cache_dir>/shard-00000/hands.npy        float32 (N, 2, 21, 3) x, y, z per hand
+  <cache_dir>/shard-00000/face.npy         float32 (N, 28, 3)    `_EYE_IDXS` face-mesh points
+  <cache_dir>/shard-00000/embeddings.npy   float16 (N, 1280)     pooled MobileNetV2 features (64×64 input)
+
+Each column is indexed by frame; `index.json` lists every clip with its shard,
+first frame and length, so a clip is a contiguous slice of every column.
+Landmarks that were not detected are stored as NaN. They are detected with
+the analyzer's own graph configurations (Pose as configured for the clips'
+behaviour: sit/stand on contrast-boosted frames, otherwise foot tapping), and
+`index.json` records the frame size and Pose configuration used, so
+:meth:`DatasetCache.landmark_payload` can feed them to the analyzer instead
+of frames. Only `frames` is
+mandatory; the other columns exist when requested at build time or were
+derived later with :func:`add_field`.
+
+Readers use :class:`DatasetCache` (zero-copy ``np.load(mmap_mode=...)``
+views) or :class:`CachedClipDataset` for PyTorch training.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CACHE_VERSION = 1
+INDEX_FILE = "index.json"
+
+# Buffered bytes per shard (every column together) before it is written.
+SHARD_BYTES = 256 * 2 ** 20
+
+# Column name -> (dtype, per-frame shape). `frames` is filled in from the
+# configured frame size.
+FIELD_SPECS: Dict[str, Tuple[str, Tuple[int, ...]]] = {
+    "pose": ("float32", (33, 4)),
+    "hands": ("float32", (2, 21, 3)),
+    "face": ("float32", (28, 3)),
+    "embeddings": ("float16", (1280,)),
+}
+
+# Same landmark subset as `ml_analyzer._EYE_IDXS` (kept here so the cache does
+# not import the analyzer, which loads every model on import).
+_EYE_IDXS = [
+    33, 246, 161, 160, 159, 158, 157, 173, 133, 7, 163, 144, 145, 153,
+    362, 398, 384, 385, 386, 387, 388, 466, 263, 249, 390, 373, 374, 380
+]
+
+# MediaPipe graph configurations of the analyzers (`ml_analyzer._HANDS_CONFIG`,
+# `_FEET_POSE_CONFIG`, `_SIT_STAND_POSE_CONFIG` and `_mp_face_mesh`), so cached
+# landmarks are the ones the analyzers would detect.
+_HANDS_CONFIG = dict(static_image_mode=True, max_num_hands=2, min_detection_confidence=0.6, min_tracking_confidence=0.5)
+_FEET_POSE_CONFIG = dict(static_image_mode=True, model_complexity=1, min_detection_confidence=0.6, min_tracking_confidence=0.5)
+_SIT_STAND_POSE_CONFIG = dict(
+    static_image_mode=True, model_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.4,
+    enable_segmentation=False,
+)
+_FACE_MESH_CONFIG = dict(
+    static_image_mode=True, max_num_faces=1, refine_landmarks=False, min_detection_confidence=0.3,
+    min_tracking_confidence=0.3,
+)
+
+# Behaviours whose analyzer features `landmark_payload` can stand in for.
+LANDMARK_BEHAVIORS = ("tapping_hands", "tapping_feet", "sit_stand")
+
+# Square input size of the models' backbone (`ml_analyzer.IMAGE_SIZE`).
+EMBEDDING_INPUT_SIZE = 64
+
+VIDEO_EXTS = (".avi", ".mp4", ".mov", ".mkv", ".webm")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+
+class CacheWriter:
+    """Append clips to a new cache directory, flushing shards of about ``shard_bytes``.
+
+    Shards are buffered in memory until flushed, so their size is a byte
+    budget over every column rather than a frame count: 64×64 frames fill a
+    shard with thousands of frames, 640×480 ones with a few hundred.
+    ``landmarks`` describes how the landmark columns were detected (``size``
+    as [H, W] and the ``pose`` configuration) and is stored in the index.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        frame_size: Tuple[int, int] = (64, 64),
+        fields: Sequence[str] = (),
+        shard_bytes: int = SHARD_BYTES,
+        landmarks: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.root = Path(root)
+        if (self.root / INDEX_FILE).exists():
+            raise FileExistsError(f"Cache already exists: {self.root}")
+        unknown = set(fields) - set(FIELD_SPECS)
+        if unknown:
+            raise ValueError(f"Unknown cache fields: {sorted(unknown)}")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.frame_size = (int(frame_size[0]), int(frame_size[1]))
+        self.fields = ["frames", *fields]
+        self.landmarks = landmarks
+        frame_bytes = sum(
+            np.dtype(dtype).itemsize * int(np.prod(shape)) for dtype, shape in map(self._spec, self.fields)
+        )
+        self.shard_frames = max(1, shard_bytes // frame_bytes)
+        self.clips: List[Dict[str, Any]] = []
+        self.shards: List[Dict[str, Any]] = []
+        self._buffers: Dict[str, List[np.ndarray]] = {f: [] for f in self.fields}
+        self._buffered = 0
+
+    def _spec(self, field: str) -> Tuple[str, Tuple[int, ...]]:
+        if field == "frames":
+            return "uint8", (self.frame_size[0], self.frame_size[1], 3)
+        return FIELD_SPECS[field]
+
+    def add_clip(
+        self,
+        frames: np.ndarray,
+        label: Optional[int] = None,
+        behavior: Optional[str] = None,
+        clip_id: Optional[str] = None,
+        split: Optional[str] = None,
+        **columns: Optional[np.ndarray],
+    ) -> int:
+        """Add one clip (T, H, W, 3 uint8 RGB) plus optional per-frame columns.
+
+        Returns the clip's index. Columns declared at construction but not
+        passed are stored as NaN (or zeros for integer dtypes).
+        """
+
+        frames = np.asarray(frames, dtype=np.uint8)
+        expected = self._spec("frames")[1]
+        if frames.ndim != 4 or frames.shape[1:] != expected:
+            raise ValueError(f"frames must have shape (T, {expected[0]}, {expected[1]}, 3), got {frames.shape}")
+        n = frames.shape[0]
+        if n == 0:
+            raise ValueError("Cannot cache an empty clip")
+
+        if self._buffered and self._buffered + n > self.shard_frames:
+            self._flush()
+
+        self._buffers["frames"].append(frames)
+        for field in self.fields[1:]:
+            dtype, shape = self._spec(field)
+            value = columns.get(field)
+            if value is None:
+                fill = np.nan if np.dtype(dtype).kind == "f" else 0
+                value = np.full((n, *shape), fill, dtype=dtype)
+            else:
+                value = np.asarray(value, dtype=dtype)
+                if value.shape != (n, *shape):
+                    raise ValueError(f"{field} must have shape {(n, *shape)}, got {value.shape}")
+            self._buffers[field].append(value)
+
+        clip = {
+            "id": clip_id or f"clip-{len(self.clips):06d}",
+            "label": label,
+            "behavior": behavior,
+            "split": split,
+            "shard": len(self.shards),
+            "start": self._buffered,
+            "length": n,
+        }
+        self.clips.append(clip)
+        self._buffered += n
+        return len(self.clips) - 1
+
+    def _flush(self) -> None:
+        if not self._buffered:
+            return
+        name = f"shard-{len(self.shards):05d}"
+        shard_dir = self.root / name
+        shard_dir.mkdir(exist_ok=True)
+        for field, parts in self._buffers.items():
+            np.save(shard_dir / f"{field}.npy", np.concatenate(parts, axis=0))
+            parts.clear()
+        self.shards.append({"name": name, "frames": self._buffered})
+        self._buffered = 0
+
+    def close(self) -> None:
+        """Flush the last shard and write the index (makes the cache readable)."""
+
+        self._flush()
+        index = {
+            "version": CACHE_VERSION,
+            "frame_size": list(self.frame_size),
+            "fields": self.fields,
+            "shards": self.shards,
+            "clips": self.clips,
+        }
+        if self.landmarks is not None:
+            index["landmarks"] = self.landmarks
+        tmp = self.root / (INDEX_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump(index, fp)
+        os.replace(tmp, self.root / INDEX_FILE)
+
+    def __enter__(self) -> "CacheWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None:
+            self.close()
+
+
+def add_field(
+    root: str | Path,
+    field: str,
+    compute: Any,
+    source: str = "frames",
+    chunk_frames: int = 2048,
+) -> None:
+    """Derive a new column for an existing cache, shard by shard.
+
+    ``compute`` maps a (n, ...) slice of *source* to the (n, ...) rows of
+    *field* (shape and dtype per `FIELD_SPECS`). Each shard is written before
+    the index is updated, so an interrupted run leaves the cache readable.
+    """
+
+    root = Path(root)
+    if field not in FIELD_SPECS:
+        raise ValueError(f"Unknown cache field: {field}")
+    with open(root / INDEX_FILE, "r", encoding="utf-8") as fp:
+        index = json.load(fp)
+    if field in index["fields"]:
+        return
+    dtype, shape = FIELD_SPECS[field]
+    for shard in index["shards"]:
+        src = np.load(root / shard["name"] / f"{source}.npy", mmap_mode="r")
+        out = np.lib.format.open_memmap(
+            root / shard["name"] / f"{field}.npy", mode="w+", dtype=dtype, shape=(len(src), *shape)
+        )
+        for s in range(0, len(src), chunk_frames):
+            out[s: s + chunk_frames] = compute(src[s: s + chunk_frames])
+        out.flush()
+        del out
+    index["fields"] = [*index["fields"], field]
+    tmp = root / (INDEX_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fp:
+        json.dump(index, fp)
+    os.replace(tmp, root / INDEX_FILE)
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+
+class DatasetCache:
+    """Read-only view over a cache directory backed by memory-mapped shards.
+
+    ``mmap_mode`` is passed to ``np.load``: ``"r"`` (default) gives read-only
+    views, ``"c"`` gives copy-on-write views that PyTorch can wrap without a
+    copy or a non-writable warning.
+    """
+
+    def __init__(self, root: str | Path, mmap_mode: str = "r") -> None:
+        self.root = Path(root)
+        with open(self.root / INDEX_FILE, "r", encoding="utf-8") as fp:
+            self.index: Dict[str, Any] = json.load(fp)
+        if self.index.get("version") != CACHE_VERSION:
+            raise ValueError(f"Unsupported cache version: {self.index.get('version')}")
+        self.mmap_mode = mmap_mode
+        self.fields: List[str] = self.index["fields"]
+        self.clips: List[Dict[str, Any]] = self.index["clips"]
+        self._arrays: Dict[Tuple[int, str], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.clips)
+
+    def column(self, shard: int, field: str) -> np.ndarray:
+        """Memory-mapped array for one field of one shard (opened lazily)."""
+
+        key = (shard, field)
+        arr = self._arrays.get(key)
+        if arr is None:
+            if field not in self.fields:
+                raise KeyError(f"Field '{field}' not in cache (has {self.fields})")
+            name = self.index["shards"][shard]["name"]
+            arr = np.load(self.root / name / f"{field}.npy", mmap_mode=self.mmap_mode)  # type: ignore[arg-type]
+            self._arrays[key] = arr
+        return arr
+
+    def get(self, idx: int, field: str = "frames") -> np.ndarray:
+        """Zero-copy (T, ...) slice of *field* for clip *idx*."""
+
+        clip = self.clips[idx]
+        start = clip["start"]
+        return self.column(clip["shard"], field)[start: start + clip["length"]]
+
+    def clip(self, idx: int, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Clip metadata plus a view of every requested field."""
+
+        out = dict(self.clips[idx])
+        for field in fields or self.fields:
+            out[field] = self.get(idx, field)
+        return out
+
+    def select(self, behavior: Optional[str] = None, split: Optional[str] = None) -> List[int]:
+        """Indices of clips matching the given behaviour / split."""
+
+        return [
+            i for i, c in enumerate(self.clips)
+            if (behavior is None or c.get("behavior") == behavior)
+            and (split is None or c.get("split") == split)
+        ]
+
+    def landmark_payload(self, idx: int, behavior: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Clip *idx* as a `landmark_input` payload for *behavior* (default: the clip's).
+
+        Pose and hands come from the landmark columns, the motion thumbnails
+        are the cached frames in grayscale, so the analyzer neither decodes
+        nor runs MediaPipe. None when the cache has no landmarks recorded by
+        `build_cache`, or its Pose ran with another behaviour's configuration.
+        """
+
+        meta = self.index.get("landmarks")
+        behavior = behavior or self.clips[idx].get("behavior")
+        if meta is None or behavior not in LANDMARK_BEHAVIORS:
+            return None
+        if behavior != "tapping_hands" and meta.get("pose") != behavior:
+            return None
+        pose = self.get(idx, "pose")
+        hands = self.get(idx, "hands")
+        # ITU-R 601 luma, as cv2.COLOR_RGB2GRAY
+        gray = np.rint(self.get(idx, "frames") @ np.array([0.299, 0.587, 0.114])).astype(np.uint8)
+        frames = [
+            {
+                "pose": None if np.isnan(pose[t, 0, 0]) else pose[t].tolist(),
+                "hands": [hand.tolist() for hand in hands[t] if not np.isnan(hand[0, 0])],
+                "thumb": base64.b64encode(gray[t].tobytes()).decode("ascii"),
+            }
+            for t in range(len(gray))
+        ]
+        height, width = meta["size"]
+        return {"landmarks": frames, "width": width, "height": height, "thumb_size": [gray.shape[2], gray.shape[1]]}
+
+    def iter_clips(self, indices: Optional[Sequence[int]] = None, fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        for idx in indices if indices is not None else range(len(self)):
+            yield self.clip(idx, fields)
+
+
+try:
+    import torch  # type: ignore
+    from torch.utils.data import Dataset as _TorchDataset  # type: ignore
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+    _TorchDataset = object  # type: ignore[assignment,misc]
+
+
+class CachedClipDataset(_TorchDataset):  # type: ignore[misc,valid-type]
+    """PyTorch ``Dataset`` over one field of a cache.
+
+    Returns ``(tensor, label)``. ``frames`` are converted to (T, C, H, W)
+    float in [0, 1] (the same as `ml_analyzer._IMAGE_TF`); other fields are
+    returned as float tensors with NaNs replaced by 0. ``seq_len`` resamples
+    every clip to a fixed length with evenly spaced indices, as the tapping
+    notebooks do.
+    """
+
+    def __init__(
+        self,
+        cache: DatasetCache | str | Path,
+        field: str = "frames",
+        indices: Optional[Sequence[int]] = None,
+        seq_len: Optional[int] = None,
+    ) -> None:
+        if not TORCH_AVAILABLE:
+            raise ImportError("PyTorch is required for CachedClipDataset")
+        self.cache = cache if isinstance(cache, DatasetCache) else DatasetCache(cache, mmap_mode="c")
+        self.field = field
+        self.indices = list(indices) if indices is not None else list(range(len(self.cache)))
+        self.seq_len = seq_len
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, i: int) -> Tuple[Any, Any]:
+        idx = self.indices[i]
+        arr = self.cache.get(idx, self.field)
+        if self.seq_len is not None and len(arr) != self.seq_len:
+            arr = arr[np.linspace(0, len(arr) - 1, self.seq_len).astype(int)]
+        if self.field == "frames":
+            x = torch.from_numpy(np.ascontiguousarray(arr)).permute(0, 3, 1, 2).float().div_(255.0)
+        else:
+            x = torch.from_numpy(np.nan_to_num(np.asarray(arr, dtype=np.float32)))
+        label = self.cache.clips[idx].get("label")
+        return x, torch.tensor(-1 if label is None else label, dtype=torch.long)
+
+
+# ---------------------------------------------------------------------------
+# Extraction helpers (used by the builder; heavy deps imported lazily)
+# ---------------------------------------------------------------------------
+
+
+def read_clip(path: str | Path, max_frames: Optional[int], size: Tuple[int, int]) -> np.ndarray:
+    """Decode a video file or a directory of images into (T, H, W, 3) RGB uint8.
+
+    With ``max_frames`` the clip is sampled at evenly spaced indices.
+    """
+
+    import cv2
+
+    path = Path(path)
+    frames: List[np.ndarray] = []
+    if path.is_dir():
+        files = sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+        if max_frames and len(files) > max_frames:
+            files = [files[i] for i in np.linspace(0, len(files) - 1, max_frames).astype(int)]
+        for f in files:
+            img = cv2.imread(str(f), cv2.IMREAD_COLOR)
+            if img is not None:
+                frames.append(img)
+    else:
+        cap = cv2.VideoCapture(str(path))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        wanted = None
+        if max_frames and total > max_frames:
+            wanted = set(np.linspace(0, total - 1, max_frames).astype(int).tolist())
+        i = 0
+        while True:
+            # grab() skips the decode for frames we are not going to keep.
+            if not cap.grab():
+                break
+            if wanted is None or i in wanted:
+                ok, img = cap.retrieve()
+                if ok:
+                    frames.append(img)
+            i += 1
+        cap.release()
+        if max_frames and len(frames) > max_frames:
+            frames = [frames[j] for j in np.linspace(0, len(frames) - 1, max_frames).astype(int)]
+
+    h, w = size
+    out = np.empty((len(frames), h, w, 3), dtype=np.uint8)
+    for j, img in enumerate(frames):
+        out[j] = cv2.cvtColor(cv2.resize(img, (w, h), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2RGB)
+    return out
+
+
+class LandmarkExtractor:
+    """Runs MediaPipe Pose, Hands and FaceMesh once per frame.
+
+    Each graph uses the analyzer's configuration (static-image mode, as
+    cached clips are sparsely sampled). Pose is configured as for
+    *behavior*: the sit/stand graph on contrast-boosted frames for
+    ``sit_stand``, the foot-tapping one otherwise (see ``pose_config``).
+    """
+
+    def __init__(self, behavior: Optional[str] = None) -> None:
+        import mediapipe as mp
+
+        self._mp = mp
+        self.pose_config = "sit_stand" if behavior == "sit_stand" else "tapping_feet"
+        pose_config = _SIT_STAND_POSE_CONFIG if self.pose_config == "sit_stand" else _FEET_POSE_CONFIG
+        self._pose = mp.solutions.pose.Pose(**pose_config)
+        self._hands = mp.solutions.hands.Hands(**_HANDS_CONFIG)
+        self._face = mp.solutions.face_mesh.FaceMesh(**_FACE_MESH_CONFIG)
+
+    def extract(self, frames: np.ndarray) -> Dict[str, np.ndarray]:
+        """Return pose/hands/face columns for (T, H, W, 3) RGB frames."""
+
+        n = len(frames)
+        pose = np.full((n, *FIELD_SPECS["pose"][1]), np.nan, dtype=np.float32)
+        hands = np.full((n, *FIELD_SPECS["hands"][1]), np.nan, dtype=np.float32)
+        face = np.full((n, *FIELD_SPECS["face"][1]), np.nan, dtype=np.float32)
+        boost = self.pose_config == "sit_stand"
+        if boost:
+            import cv2
+        for i, rgb in enumerate(frames):
+            # Same contrast boost as `ml_analyzer._boost_contrast`
+            res = self._pose.process(cv2.convertScaleAbs(rgb, alpha=1.1, beta=10) if boost else rgb)
+            if res.pose_landmarks:
+                pose[i] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in res.pose_landmarks.landmark]
+            res = self._hands.process(rgb)
+            if res.multi_hand_landmarks:
+                for h_idx, hand in enumerate(res.multi_hand_landmarks[:2]):
+                    hands[i, h_idx] = [(lm.x, lm.y, lm.z) for lm in hand.landmark]
+            res = self._face.process(rgb)
+            if res.multi_face_landmarks:
+                lms = res.multi_face_landmarks[0].landmark
+                face[i] = [(lms[j].x, lms[j].y, lms[j].z) for j in _EYE_IDXS]
+        return {"pose": pose, "hands": hands, "face": face}
+
+    def close(self) -> None:
+        for graph in (self._pose, self._hands, self._face):
+            graph.close()
+
+
+class EmbeddingExtractor:
+    """Pooled 1280-d MobileNetV2 features, as computed inside the models.
+
+    Frames of any other size are first resized to ``input_size`` square
+    (`ml_analyzer.IMAGE_SIZE`, what the models see at inference), so the
+    features match whatever ``--size`` the cache was built with.
+    """
+
+    def __init__(self, batch_size: int = 64, input_size: int = EMBEDDING_INPUT_SIZE) -> None:
+        import torch
+        from torchvision import models
+
+        self._torch = torch
+        mobilenet = models.mobilenet_v2(weights=models.MobileNet_V2_Weights.DEFAULT)
+        self._features = mobilenet.features.eval()
+        self._pool = torch.nn.AdaptiveAvgPool2d((1, 1))
+        self.batch_size = batch_size
+        self.input_size = input_size
+
+    def extract(self, frames: np.ndarray) -> np.ndarray:
+        torch = self._torch
+        size = (self.input_size, self.input_size)
+        out = np.empty((len(frames), 1280), dtype=np.float16)
+        with torch.inference_mode():
+            for s in range(0, len(frames), self.batch_size):
+                chunk = torch.from_numpy(np.ascontiguousarray(frames[s: s + self.batch_size]))
+                x = chunk.permute(0, 3, 1, 2).float()
+                if tuple(x.shape[-2:]) != size:
+                    # Antialiased like PIL's resize in the analyzer's transform,
+                    # then rounded back to uint8 levels.
+                    x = torch.nn.functional.interpolate(x, size=size, mode="bilinear", antialias=True, align_corners=False)
+                    x = x.clamp_(0, 255).round_()
+                x = x.div_(255.0)
+                feats = self._pool(self._features(x)).flatten(1)
+                out[s: s + len(chunk)] = feats.numpy().astype(np.float16)
+        return out
+
+
+def _discover_clips(src: Path) -> List[Tuple[str, Path]]:
+    """(class name, clip path) pairs under the notebook-style class folders."""
+
+    found: List[Tuple[str, Path]] = []
+    for cls_dir in sorted(p for p in src.iterdir() if p.is_dir()):
+        for entry in sorted(cls_dir.iterdir()):
+            if entry.is_file() and entry.suffix.lower() in VIDEO_EXTS:
+                found.append((cls_dir.name, entry))
+            elif entry.is_dir():
+                found.append((cls_dir.name, entry))
+        # A class folder that directly holds images is one long clip.
+        if any(p.suffix.lower() in IMAGE_EXTS for p in cls_dir.iterdir() if p.is_file()):
+            found.append((cls_dir.name, cls_dir))
+    return found
+
+
+def _parse_labels(spec: Optional[str], classes: Sequence[str]) -> Dict[str, int]:
+    if not spec:
+        return {c: i for i, c in enumerate(sorted(set(classes)))}
+    mapping: Dict[str, int] = {}
+    for part in spec.split(","):
+        name, _, value = part.rpartition("=")
+        mapping[name.strip()] = int(value)
+    return mapping
+
+
+def build_cache(
+    src: str | Path,
+    out: str | Path,
+    behavior: Optional[str] = None,
+    split: Optional[str] = None,
+    max_frames: Optional[int] = 10,
+    size: Tuple[int, int] = (64, 64),
+    labels: Optional[str] = None,
+    landmarks: bool = False,
+    embeddings: bool = False,
+    landmark_size: Optional[Tuple[int, int]] = None,
+) -> Dict[str, Any]:
+    """Decode every clip under *src* once and write the cache at *out*.
+
+    Landmarks are detected on frames decoded at ``landmark_size`` (default
+    640×480, what the analyzers upscale to) so that small cached thumbnails
+    don't degrade MediaPipe accuracy; the size is recorded in the index, as
+    the analyzers measure hands in pixels of the frame they ran on.
+    """
+
+    src = Path(src)
+    clips = _discover_clips(src)
+    label_map = _parse_labels(labels, [c for c, _ in clips])
+    fields: List[str] = []
+    if landmarks:
+        fields += ["pose", "hands", "face"]
+    if embeddings:
+        fields.append("embeddings")
+
+    lm_extractor = LandmarkExtractor(behavior) if landmarks else None
+    emb_extractor = EmbeddingExtractor() if embeddings else None
+    lm_size = landmark_size or (480, 640)
+    lm_meta = None
+    if lm_extractor is not None:
+        lm_meta = {"size": [int(lm_size[0]), int(lm_size[1])], "pose": lm_extractor.pose_config}
+    written = skipped = 0
+    try:
+        with CacheWriter(out, frame_size=size, fields=fields, landmarks=lm_meta) as writer:
+            for cls, path in clips:
+                if cls not in label_map:
+                    print(f"[dataset_cache] Unknown class '{cls}' – skipping {path}", file=sys.stderr)
+                    skipped += 1
+                    continue
+                frames = read_clip(path, max_frames, size)
+                if len(frames) == 0:
+                    print(f"[dataset_cache] No frames decoded from {path}", file=sys.stderr)
+                    skipped += 1
+                    continue
+                columns: Dict[str, Optional[np.ndarray]] = {}
+                if lm_extractor is not None:
+                    full = frames if tuple(lm_size) == tuple(size) else read_clip(path, max_frames, lm_size)
+                    if len(full) != len(frames):
+                        print(
+                            f"[dataset_cache] Landmark re-decode of {path} gave {len(full)} frames, "
+                            f"expected {len(frames)} – skipping",
+                            file=sys.stderr,
+                        )
+                        skipped += 1
+                        continue
+                    columns.update(lm_extractor.extract(full))
+                if emb_extractor is not None:
+                    columns["embeddings"] = emb_extractor.extract(frames)
+                writer.add_clip(
+                    frames,
+                    label=label_map[cls],
+                    behavior=behavior,
+                    clip_id=str(path.relative_to(src)),
+                    split=split,
+                    **columns,
+                )
+                written += 1
+    finally:
+        if lm_extractor is not None:
+            lm_extractor.close()
+    return {"clips": written, "skipped": skipped, "fields": ["frames", *fields], "labels": label_map}
+
+
+# ---------------------------------------------------------------------------
+# Main entry
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or inspect a pre-decoded dataset cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    b = sub.add_parser("build", help="Decode a class-folder dataset into a cache")
+    b.add_argument("src", help="Dataset root with one sub-directory per class")
+    b.add_argument("out", help="Cache directory to create")
+    b.add_argument("--behavior", help="Behaviour type recorded on every clip (e.g. sit_stand)")
+    b.add_argument("--split", help="Split name recorded on every clip (e.g. train)")
+    b.add_argument("--max-frames", type=int, default=10, help="Frames sampled per clip (0 = all)")
+    b.add_argument("--size", type=int, nargs=2, default=(64, 64), metavar=("H", "W"), help="Cached frame size")
+    b.add_argument("--labels", help='Class mapping, e.g. "Sit down=0,Standing up=1"')
+    b.add_argument("--landmarks", action="store_true", help="Store MediaPipe pose/hands/face landmarks")
+    b.add_argument(
+        "--landmark-size", type=int, nargs=2, metavar=("H", "W"), help="Frame size landmarks are detected at (default 480 640)"
+    )
+    b.add_argument("--embeddings", action="store_true", help="Store pooled MobileNetV2 features")
+
+    i = sub.add_parser("info", help="Summarise an existing cache")
+    i.add_argument("cache", help="Cache directory")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        summary = build_cache(
+            args.src,
+            args.out,
+            behavior=args.behavior,
+            split=args.split,
+            max_frames=args.max_frames or None,
+            size=tuple(args.size),
+            labels=args.labels,
+            landmarks=args.landmarks,
+            embeddings=args.embeddings,
+            landmark_size=tuple(args.landmark_size) if args.landmark_size else None,
+        )
+        sys.stdout.write(json.dumps({"success": True, **summary}))
+    else:
+        cache = DatasetCache(args.cache)
+        per_label: Dict[str, int] = {}
+        for c in cache.clips:
+            key = str(c.get("label"))
+            per_label[key] = per_label.get(key, 0) + 1
+        sys.stdout.write(json.dumps({
+            "success": True,
+            "clips": len(cache),
+            "frames": sum(s["frames"] for s in cache.index["shards"]),
+            "shards": len(cache.index["shards"]),
+            "fields": cache.fields,
+            "frame_size": cache.index["frame_size"],
+            "landmarks": cache.index.get("landmarks"),
+            "labels": per_label,
+        }))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as exc:
+        print(str(exc), file=sys.stderr)
+        sys.exit(1)
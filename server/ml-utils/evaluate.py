@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""Evaluation harness
+
+Runs the production `_predict` over a labelled dataset and reports accuracy
+and speed in one pass:
+
+python evaluate.py <dataset.json|dataset.jsonl> [--workers N] [--output report.json]
+python evaluate.py --cache <cache_dir> [--behavior sit_stand] [--split test]
+
+The dataset is either a JSON array or a JSON-lines file of objects shaped like
+the `/api/ml/evaluate` request body entries::
+
+{ "type": "tapping_hands", "data": [<frames>], "label": 1 }
+
+Alternatively ``--cache <dir>`` reads clips from a `dataset_cache.py` cache,
+which skips video decoding and frame sampling on every run. Built with
+``--landmarks``, the tapping and sit/stand clips are sent as landmark
+payloads and MediaPipe does not run either; otherwise the cached frames are
+sent (build it with ``--size 480 640`` so detection sees full-size frames).
+
+`label` is the expected binary outcome (1 = behaviour present). Entries
+without a label are still analysed and timed but are excluded from the
+quality metrics. The report (written to stdout, or to ``--output``) looks
+like::
+
+{
+  "success": true,
+  "total_samples": 40,
+  "labeled_samples": 38,
+  "wall_seconds": 12.3,
+  "throughput_sps": 3.25,
+  "behaviors": {
+    "tapping_hands": {
+      "samples": 10, "labeled": 10, "correct": 8, "accuracy": 0.8,
+      "precision": 1.0, "recall": 0.6,
+      "confusion": {"tp": 3, "fp": 0, "tn": 5, "fn": 2},
+      "latency_ms": {"predict": {"p50": .., "p95": .., "p99": .., "mean": .., "max": ..}, ...},
+      "stage_latency_ms": {"decode": {...}, "mediapipe": {...}, ..., "other": {...}},
+      "throughput_sps": 0.9
+    },
+    ...
+  },
+  "latency_ms": { "queue": {...}, "predict": {...}, "end_to_end": {...} },
+  "stage_latency_ms": { "decode": {...}, ... }
+}
+
+Stages: `predict` is the time spent inside `_predict` in the worker,
+`end_to_end` is submit-to-result as seen by the harness and `queue` is the
+difference (scheduling, pickling and waiting for a free worker).
+``stage_latency_ms`` breaks `predict` down into the analyzer's own stages
+(see `timings.py`), over the samples that ran each stage.
+
+Samples run in a process pool because the MediaPipe graphs in `ml_analyzer`
+are module-level and not thread-safe; each worker imports the analyzer (and
+loads the models) once. `sit_stand` persists posture state between calls,
+so every worker keeps its own file in one temporary directory that is
+removed when the run ends (the service's `sit_stand_state.json` is never
+touched); ``--workers 0`` runs everything in-process, which is what you
+want for `sit_stand` so clips see that state in dataset order.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+_predict_fn: Any = None
+
+
+def _init_worker(state_dir: Optional[str] = None) -> None:
+    """Import the analyzer once per worker so models and graphs are reused.
+
+    The sit/stand state goes to a per-process file in *state_dir*, which
+    `evaluate` creates and removes; without one a directory of our own is
+    created and removed at exit.
+    """
+
+    global _predict_fn
+    import ml_analyzer  # type: ignore
+
+    if state_dir is None:
+        state_dir = tempfile.mkdtemp(prefix="eval-sit-stand-")
+        atexit.register(shutil.rmtree, state_dir, True)
+    # Keep the sit/stand state of the real service untouched, and give
+    # every worker its own so they do not race on one file.
+    ml_analyzer.SIT_STAND_STATE_FILE = Path(state_dir) / f"sit_stand_state-{os.getpid()}.json"
+    _predict_fn = ml_analyzer._predict
+
+
+def _run_sample(b_type: str, data: Any) -> Tuple[Dict[str, Any], float, Dict[str, float]]:
+    """Run one `_predict` call and return (result, seconds spent, stage ms)."""
+
+    if _predict_fn is None:
+        _init_worker()
+    start = time.perf_counter()
+    result = _predict_fn(b_type, data, timings=True)
+    elapsed = time.perf_counter() - start
+    timings = result.pop("timings", None) or {}
+    stages = dict(timings.get("stages", {}))
+    if "other_ms" in timings:
+        stages["other"] = timings["other_ms"]
+    return result, elapsed, stages
+
+
+# ---------------------------------------------------------------------------
+# Dataset / metrics helpers
+# ---------------------------------------------------------------------------
+
+
+def _load_dataset(path: str) -> List[Dict[str, Any]]:
+    """Read a JSON array or JSON-lines dataset file."""
+
+    with open(path, "r", encoding="utf-8") as fp:
+        text = fp.read()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _samples_from_cache(cache_dir: str, behavior: Optional[str], split: Optional[str]) -> List[Dict[str, Any]]:
+    """Turn cached clips into `{type, data, label}` samples.
+
+    ``data`` is the clip's landmark payload when the cache has usable
+    landmark columns (`DatasetCache.landmark_payload`), so detection is not
+    repeated; otherwise the frames as JPEG data-URLs, straight from the
+    memory-mapped shards, so only a cheap JPEG encode is paid instead of
+    seeking and decoding the source videos.
+    """
+
+    import base64
+    from io import BytesIO
+
+    from PIL import Image
+
+    from dataset_cache import DatasetCache  # type: ignore
+
+    cache = DatasetCache(cache_dir)
+    samples: List[Dict[str, Any]] = []
+    for idx in cache.select(behavior=behavior, split=split):
+        clip = cache.clips[idx]
+        b_type = behavior or clip.get("behavior")
+        data: Any = cache.landmark_payload(idx, b_type)
+        if data is None:
+            data = []
+            for frame in cache.get(idx, "frames"):
+                buf = BytesIO()
+                Image.fromarray(frame).save(buf, format="JPEG", quality=90)
+                data.append("data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii"))
+        samples.append({"type": b_type, "data": data, "label": clip.get("label"), "id": clip.get("id")})
+    return samples
+
+
+def _parse_label(raw: Any) -> Optional[int]:
+    """Normalise a label to 0/1; None when missing or not binary."""
+
+    if raw is None:
+        return None
+    if isinstance(raw, bool):
+        return int(raw)
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return None
+    return value if value in (0, 1) else None
+
+
+def _percentiles(samples_s: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max of a list of durations, in milliseconds."""
+
+    if not samples_s:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    ordered = sorted(samples_s)
+
+    def pct(q: float) -> float:
+        # Linear interpolation between closest ranks (numpy's default).
+        pos = (len(ordered) - 1) * q
+        lo = int(pos)
+        hi = min(lo + 1, len(ordered) - 1)
+        return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+    return {
+        "p50": round(pct(0.50) * 1000, 3),
+        "p95": round(pct(0.95) * 1000, 3),
+        "p99": round(pct(0.99) * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+class _BehaviorStats:
+    """Accumulates quality and latency numbers for one behaviour."""
+
+    def __init__(self) -> None:
+        self.samples = 0
+        self.errors = 0
+        self.tp = self.fp = self.tn = self.fn = 0
+        self.latency: Dict[str, List[float]] = {"queue": [], "predict": [], "end_to_end": []}
+        self.stage_latency: Dict[str, List[float]] = {}
+
+    def add(
+        self,
+        result: Dict[str, Any],
+        label: Optional[int],
+        predict_s: float,
+        e2e_s: float,
+        stages_ms: Dict[str, float],
+    ) -> None:
+        self.samples += 1
+        if result.get("error"):
+            self.errors += 1
+        self.latency["predict"].append(predict_s)
+        self.latency["end_to_end"].append(e2e_s)
+        self.latency["queue"].append(max(0.0, e2e_s - predict_s))
+        for name, ms in stages_ms.items():
+            self.stage_latency.setdefault(name, []).append(ms / 1000)
+
+        if label is None:
+            return
+        predicted = int(bool(result.get("detected")))
+        if predicted and label:
+            self.tp += 1
+        elif predicted:
+            self.fp += 1
+        elif label:
+            self.fn += 1
+        else:
+            self.tn += 1
+
+    def report(self) -> Dict[str, Any]:
+        labeled = self.tp + self.fp + self.tn + self.fn
+        correct = self.tp + self.tn
+        predict_total = sum(self.latency["predict"])
+        return {
+            "samples": self.samples,
+            "errors": self.errors,
+            "labeled": labeled,
+            "correct": correct,
+            "accuracy": round(correct / labeled, 4) if labeled else None,
+            "precision": round(self.tp / (self.tp + self.fp), 4) if (self.tp + self.fp) else None,
+            "recall": round(self.tp / (self.tp + self.fn), 4) if (self.tp + self.fn) else None,
+            "confusion": {"tp": self.tp, "fp": self.fp, "tn": self.tn, "fn": self.fn},
+            "latency_ms": {stage: _percentiles(vals) for stage, vals in self.latency.items()},
+            "stage_latency_ms": {stage: _percentiles(vals) for stage, vals in self.stage_latency.items()},
+            # Single-worker throughput: how many samples/s one analyzer sustains.
+            "throughput_sps": round(self.samples / predict_total, 3) if predict_total > 0 else None,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------------
+
+
+def _run_jobs(jobs: List[Tuple[int, str, Any]], workers: int, state_dir: str, record: Any) -> None:
+    """Run every ``(index, type, data)`` job and pass its outcome to *record*."""
+
+    if workers <= 0:
+        import ml_analyzer  # type: ignore
+
+        live_state = ml_analyzer.SIT_STAND_STATE_FILE
+        _init_worker(state_dir)
+        try:
+            for idx, b_type, data in jobs:
+                submitted = time.perf_counter()
+                result, predict_s, stages_ms = _run_sample(b_type, data)
+                record(idx, b_type, result, predict_s, time.perf_counter() - submitted, stages_ms)
+        finally:
+            ml_analyzer.SIT_STAND_STATE_FILE = live_state
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state_dir,)) as pool:
+        # Keep a bounded number of payloads in flight so large datasets
+        # don't get pickled into the pool queue all at once.
+        pending: Dict[Future, Tuple[int, str, float]] = {}
+        job_iter = iter(jobs)
+        max_in_flight = workers * 2
+
+        def submit_next() -> bool:
+            job = next(job_iter, None)
+            if job is None:
+                return False
+            idx, b_type, data = job
+            fut = pool.submit(_run_sample, b_type, data)
+            pending[fut] = (idx, b_type, time.perf_counter())
+            return True
+
+        while len(pending) < max_in_flight and submit_next():
+            pass
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                idx, b_type, submitted = pending.pop(fut)
+                try:
+                    result, predict_s, stages_ms = fut.result()
+                except Exception as exc:
+                    result, predict_s, stages_ms = {"detected": False, "confidence": 0.0, "error": str(exc)}, 0.0, {}
+                record(idx, b_type, result, predict_s, time.perf_counter() - submitted, stages_ms)
+                submit_next()
+
+
+def evaluate(samples: List[Dict[str, Any]], workers: int = 0) -> Dict[str, Any]:
+    """Run `_predict` over *samples* and return the evaluation report."""
+
+    stats: Dict[str, _BehaviorStats] = {}
+    overall = _BehaviorStats()
+    predictions: List[Optional[Dict[str, Any]]] = [None] * len(samples)
+    skipped = 0
+
+    def record(
+        idx: int, b_type: str, result: Dict[str, Any], predict_s: float, e2e_s: float, stages_ms: Dict[str, float]
+    ) -> None:
+        label = _parse_label(samples[idx].get("label"))
+        stats.setdefault(b_type, _BehaviorStats()).add(result, label, predict_s, e2e_s, stages_ms)
+        overall.add(result, label, predict_s, e2e_s, stages_ms)
+        predictions[idx] = {
+            "index": idx,
+            "behavior_type": b_type,
+            "label": int(bool(result.get("detected"))),
+            "expected": label,
+            "confidence": result.get("confidence", 0.0),
+        }
+
+    jobs: List[Tuple[int, str, Any]] = []
+    for idx, entry in enumerate(samples):
+        b_type = entry.get("type") or entry.get("behavior_type") or entry.get("behaviorType")
+        data = entry.get("data") or entry.get("frame_sequence") or entry.get("frame")
+        if not b_type:
+            skipped += 1
+            continue
+        jobs.append((idx, b_type, data))
+
+    with tempfile.TemporaryDirectory(prefix="eval-sit-stand-") as state_dir:
+        wall_start = time.perf_counter()
+        _run_jobs(jobs, workers, state_dir, record)
+        wall_s = time.perf_counter() - wall_start
+
+    summary = overall.report()
+    return {
+        "success": True,
+        "total_samples": len(samples),
+        "skipped": skipped,
+        "labeled_samples": summary["labeled"],
+        "correct": summary["correct"],
+        "accuracy": summary["accuracy"],
+        "workers": workers,
+        "wall_seconds": round(wall_s, 3),
+        "throughput_sps": round(overall.samples / wall_s, 3) if wall_s > 0 else None,
+        "latency_ms": summary["latency_ms"],
+        "stage_latency_ms": summary["stage_latency_ms"],
+        "behaviors": {b: s.report() for b, s in sorted(stats.items())},
+        "predictions": [p for p in predictions if p is not None],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Main entry
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluate behaviour analyzers on a labelled dataset")
+    parser.add_argument("dataset", nargs="?", help="JSON array or JSON-lines file of {type, data, label} entries")
+    parser.add_argument("--cache", help="Read samples from a dataset_cache.py cache directory instead")
+    parser.add_argument("--behavior", help="With --cache: only clips of this behaviour (overrides the cached type)")
+    parser.add_argument("--split", help="With --cache: only clips of this split")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Worker processes (0 = run in-process)",
+    )
+    parser.add_argument("--output", help="Write the report here instead of stdout")
+    parser.add_argument("--no-predictions", action="store_true", help="Omit per-sample predictions from the report")
+    args = parser.parse_args()
+
+    source = args.cache or args.dataset
+    if not source:
+        print(json.dumps({"success": False, "error": "Missing dataset file or --cache argument"}))
+        sys.exit(1)
+    if not os.path.exists(source):
+        print(json.dumps({"success": False, "error": f"File not found: {source}"}))
+        sys.exit(1)
+
+    try:
+        if args.cache:
+            samples = _samples_from_cache(args.cache, args.behavior, args.split)
+        else:
+            samples = _load_dataset(args.dataset)
+    except Exception as exc:
+        print(json.dumps({"success": False, "error": f"Failed to read dataset: {exc}"}))
+        sys.exit(1)
+
+    report = evaluate(samples, workers=args.workers)
+    if args.no_predictions:
+        report.pop("predictions", None)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as exc:
+        print(str(exc), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,580 @@
+"""Decision stage of the heuristic analyzers.
+
+`ml_analyzer` splits tapping and sit/stand analysis into two stages:
+
+1. feature extraction (`_extract_*_features`) – decodes frames, runs
+   MediaPipe and frame differencing, and records raw per-frame measurements;
+2. decision (this module) – applies the thresholds to those measurements.
+
+The decision functions are pure NumPy and vectorized over a leading
+*configuration* axis: every threshold may be a scalar or an array of shape
+``(K,)`` and every output has shape ``(K,)``. Production calls them with the
+defaults (K = 1); `sweep.py` calls them with thousands of configurations at
+once against cached features, without re-running detection.
+
+Feature dictionaries hold per-frame arrays of length T. Pair measurements
+(frame differences) are aligned so index ``t`` describes frames ``t-1 → t``
+and index 0 is NaN. Missing detections are NaN.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+__all__ = [
+    "HAND_TAPPING_PARAMS",
+    "FOOT_TAPPING_PARAMS",
+    "SIT_STAND_PARAMS",
+    "decide_hand_tapping",
+    "decide_foot_tapping",
+    "classify_postures",
+    "decide_sit_stand_transition",
+    "hand_tapping_result",
+    "foot_tapping_result",
+    "POSTURES",
+    "SIT_STAND_LANDMARKS",
+]
+
+# ---------------------------------------------------------------------------
+# Default thresholds (the values the analyzers have always used)
+# ---------------------------------------------------------------------------
+
+HAND_TAPPING_PARAMS: Dict[str, float] = {
+    "hand_min_confidence": 0.7,    # mean landmark visibility for a usable hand
+    "hand_min_y_ratio": 0.3,       # hand centre must be below this frame fraction
+    "motion_change_ratio": 0.12,   # per-pair changed-pixel ratio for a motion tap
+    "motion_intensity": 50.0,      # per-pair mean abs diff for a motion tap
+    "min_movement_taps": 5,
+    "min_avg_movement": 0.03,
+    "hand_tap_px": 15.0,           # landmark displacement counted as a tap
+    "hand_min_avg_px": 10.0,
+    "hand_min_taps": 3,
+    "clap_range_px": 40.0,
+    "clap_min_distance_px": 80.0,
+    "clap_event_px": 120.0,
+    "pattern_threshold": 0.4,
+    "strict_movement_taps": 6,
+    "strict_landmark_taps": 5,
+    "strict_high_confidence": 0.65,
+    "strict_min_methods": 2,
+    "strict_min_confidence": 0.6,
+    "strict_min_taps": 5,
+}
+
+FOOT_TAPPING_PARAMS: Dict[str, float] = {
+    "ankle_min_visibility": 0.75,
+    "ankle_min_y": 0.8,
+    "shoulder_min_visibility": 0.7,
+    "shoulder_max_y": 0.35,
+    "hip_min_visibility": 0.75,
+    "hip_min_y": 0.55,
+    "hip_max_y": 0.8,
+    "min_foot_detections": 10,
+    "min_fullbody_frames": 3,
+    "min_body_span": 0.7,
+    "motion_change_ratio": 0.12,
+    "motion_intensity": 50.0,
+    "min_movement_taps": 4,
+    "min_avg_movement": 0.035,
+    "ankle_tap_px": 20.0,
+    "ankle_min_avg_px": 15.0,
+    "ankle_min_taps": 4,
+    "strict_movement_taps": 4,
+    "strict_landmark_taps": 4,
+    "strict_high_confidence": 0.5,
+    "strict_min_methods": 2,
+    "strict_min_confidence": 0.4,
+}
+
+SIT_STAND_PARAMS: Dict[str, float] = {
+    "min_avg_visibility": 0.6,
+    "min_visibility": 0.3,
+    "compression_sitting": 0.75,
+    "compression_standing": 0.90,
+    "hip_knee_sitting": 0.08,
+    "hip_knee_standing": -0.02,
+    "thigh_sitting": 0.5,
+    "thigh_standing": 0.3,
+    "knee_bend_sitting": 0.6,
+    "knee_bend_standing": 0.4,
+    "torso_sitting": 0.55,
+    "torso_standing": 0.40,
+    "min_frame_confidence": 0.4,
+    "min_valid_frames": 6,
+    "consensus_threshold": 0.65,
+    "consensus_count_ratio": 0.6,
+    "min_cooldown_seconds": 15.0,
+    "min_baseline_count": 5,
+    "min_transition_confidence": 0.75,
+}
+
+# Posture codes used by the vectorized sit/stand functions.
+POSTURES = (None, "sitting", "standing")
+_SITTING, _STANDING = 1, 2
+
+# Pose landmark indices recorded per frame for sit/stand, in this order.
+SIT_STAND_LANDMARKS = (0, 11, 12, 23, 24, 25, 26, 27, 28)
+
+# Pattern codes for hand tapping.
+_HAND_PATTERNS = ("none", "tapping", "clapping")
+
+
+def _params(defaults: Mapping[str, float], overrides: Optional[Mapping[str, Any]]) -> Tuple[Dict[str, np.ndarray], int]:
+    """Merge *overrides* into *defaults* and broadcast every value to (K,)."""
+
+    overrides = dict(overrides or {})
+    unknown = set(overrides) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown threshold(s): {sorted(unknown)}")
+    merged = {k: np.atleast_1d(np.asarray(overrides.get(k, v), dtype=np.float64)) for k, v in defaults.items()}
+    k = int(np.broadcast_shapes(*(v.shape for v in merged.values()))[0])
+    return {name: np.broadcast_to(v, (k,)) for name, v in merged.items()}, k
+
+
+def _col(p: Dict[str, np.ndarray], name: str) -> np.ndarray:
+    """Threshold as a (K, 1) column for broadcasting against (T,) features."""
+
+    return p[name][:, None]
+
+
+def _motion_taps(change_ratio: np.ndarray, avg_intensity: np.ndarray, p: Dict[str, np.ndarray]) -> Tuple[np.ndarray, float, int]:
+    """Motion tap count per config plus the config-independent mean movement."""
+
+    valid = ~np.isnan(change_ratio)
+    n_valid = int(valid.sum())
+    movement = change_ratio * 0.7 + (avg_intensity / 255) * 0.3
+    avg_movement = float(movement[valid].sum() / n_valid) if n_valid else 0.0
+    with np.errstate(invalid="ignore"):
+        taps = ((change_ratio[None, :] > _col(p, "motion_change_ratio"))
+                & (avg_intensity[None, :] > _col(p, "motion_intensity"))).sum(axis=1)
+    return taps, avg_movement, n_valid
+
+
+def _compact_slots(xy: np.ndarray, accepted: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Per frame, keep accepted detections in order (slot 0 first).
+
+    xy: (T, 2, 2) positions of the two detection slots; accepted: (K, T, 2).
+    Returns first/second positions (K, T, 2) and their validity (K, T).
+    """
+
+    acc0, acc1 = accepted[..., 0], accepted[..., 1]
+    first = np.where(acc0[..., None], xy[None, :, 0], xy[None, :, 1])
+    second = np.broadcast_to(xy[None, :, 1], first.shape)
+    return first, acc0 | acc1, second, acc0 & acc1
+
+
+def _track_movement(pos: np.ndarray, valid: np.ndarray, tap_px: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Displacement between consecutive *valid* positions of one track.
+
+    Returns (history length, average displacement, displacements > tap_px)
+    per config, matching a loop over the compacted position history.
+    """
+
+    k, t = valid.shape
+    idx = np.where(valid, np.arange(t)[None, :], -1)
+    last = np.maximum.accumulate(idx, axis=1)
+    prev = np.concatenate([np.full((k, 1), -1), last[:, :-1]], axis=1)
+    pair = valid & (prev >= 0)
+    prev_pos = np.take_along_axis(pos, np.clip(prev, 0, None)[..., None], axis=1)
+    dist = np.where(pair, np.sqrt(((pos - prev_pos) ** 2).sum(axis=-1)), 0.0)
+    n_hist = valid.sum(axis=1)
+    avg = dist.sum(axis=1) / np.maximum(1, n_hist - 1)
+    taps = (pair & (dist > tap_px)).sum(axis=1)
+    return n_hist, avg, taps
+
+
+# ---------------------------------------------------------------------------
+# Hand tapping
+# ---------------------------------------------------------------------------
+
+
+def decide_hand_tapping(features: Mapping[str, Any], params: Optional[Mapping[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """Vectorized decision for `tapping_hands`.
+
+    features: ``mediapipe_ok`` (bool), ``hand_xy`` (T, 2, 2) pixel centres,
+    ``hand_confidence`` (T, 2), ``frame_h`` (T,), ``change_ratio`` and
+    ``avg_intensity`` (T,) pair measurements.
+    """
+
+    p, k = _params(HAND_TAPPING_PARAMS, params)
+    xy = np.asarray(features["hand_xy"], dtype=np.float64)
+    conf = np.asarray(features["hand_confidence"], dtype=np.float64)
+    frame_h = np.asarray(features["frame_h"], dtype=np.float64)
+    t = len(frame_h)
+    mp_ok = bool(features["mediapipe_ok"])
+
+    with np.errstate(invalid="ignore"):
+        accepted = ((conf[None] > p["hand_min_confidence"][:, None, None])
+                    & (xy[None, :, :, 1] > p["hand_min_y_ratio"][:, None, None] * frame_h[None, :, None]))
+    if not mp_ok:
+        # MediaPipe unavailable: landmark methods have nothing to work on.
+        accepted = np.zeros((k, t, 2), dtype=bool)
+    first, v_first, second, v_second = _compact_slots(xy, accepted)
+    any_hands = v_first.any(axis=1)
+    early_exit = np.full(k, mp_ok) & ~any_hands
+
+    # Method 1: frame-difference motion.
+    movement_taps, avg_movement, n_valid = _motion_taps(
+        np.asarray(features["change_ratio"], dtype=np.float64),
+        np.asarray(features["avg_intensity"], dtype=np.float64),
+        p,
+    )
+    motion_ok = (n_valid > 0) & (movement_taps >= p["min_movement_taps"]) & (avg_movement > p["min_avg_movement"])
+    movement_score = np.where(motion_ok, np.clip(avg_movement * 20 + movement_taps * 0.1, 0.3, 0.6), 0.0)
+    tapping_score = movement_score.copy()
+    tap_count = np.where(movement_score > 0, np.maximum(movement_taps, 1), 0)
+
+    # Method 2: landmark displacement per hand track.
+    for pos, valid in ((first, v_first), (second, v_second)):
+        n_hist, avg, taps = _track_movement(pos, valid, _col(p, "hand_tap_px"))
+        ok = any_hands & (t >= 2) & (n_hist >= 2) & (avg > p["hand_min_avg_px"]) & (taps >= p["hand_min_taps"])
+        tapping_score = np.where(ok, np.maximum(tapping_score, np.minimum(0.6, avg * 0.05 + taps * 0.15)), tapping_score)
+        tap_count = np.where(ok, np.maximum(tap_count, np.maximum(1, taps)), tap_count)
+
+    # Method 3: distance between two hands (clapping).
+    dist = np.sqrt(((first - second) ** 2).sum(axis=-1))
+    n_clap = v_second.sum(axis=1)
+    min_d = np.where(v_second, dist, np.inf).min(axis=1)
+    max_d = np.where(v_second, dist, -np.inf).max(axis=1)
+    d_range = max_d - min_d
+    events = (v_second & (dist < _col(p, "clap_event_px"))).sum(axis=1)
+    with np.errstate(invalid="ignore"):
+        clap_ok = (n_clap >= 2) & (d_range > p["clap_range_px"]) & (min_d < p["clap_min_distance_px"])
+    clap_count = np.where(clap_ok, np.maximum(1, events // 3), 0)
+    clapping_score = np.where(clap_ok, np.minimum(0.6, np.where(clap_ok, d_range, 0.0) * 0.02 + clap_count * 0.3), 0.0)
+
+    # Combine and apply the multi-method validation.
+    final_score = np.maximum(tapping_score, clapping_score)
+    final_tap_count = np.maximum(np.maximum(tap_count, movement_taps), (final_score > p["pattern_threshold"]).astype(int))
+    is_clap = (clapping_score > tapping_score) & (clap_count > 0) & (clapping_score > p["pattern_threshold"])
+    is_tap = ~is_clap & (final_score > p["pattern_threshold"])
+    pattern = np.where(is_clap, 2, np.where(is_tap, 1, 0))
+    confidence = np.where(is_clap, clapping_score, np.where(is_tap, final_score, 0.0))
+    count = np.where(is_clap, clap_count, np.where(is_tap, final_tap_count, 0))
+
+    methods = ((movement_taps >= p["strict_movement_taps"]).astype(int)
+               + (tap_count >= p["strict_landmark_taps"])
+               + (confidence > p["strict_high_confidence"]))
+    detected = ((pattern != 0) & (methods >= p["strict_min_methods"])
+                & (confidence > p["strict_min_confidence"])
+                & (np.maximum(movement_taps, tap_count) >= p["strict_min_taps"]) & ~early_exit)
+
+    return {
+        "detected": detected,
+        "confidence": np.where(detected, confidence, 0.0),
+        "pattern": np.where(detected, pattern, 0),
+        "tap_count": np.where(detected, count, 0),
+        "clap_count": np.where(detected, clap_count, 0),
+        "tapping_score": np.where(early_exit, 0.0, tapping_score),
+        "clapping_score": np.where(early_exit, 0.0, clapping_score),
+        "movement_taps": movement_taps,
+        "avg_movement": np.full(k, avg_movement),
+        "early_exit": early_exit,
+    }
+
+
+def hand_tapping_result(features: Mapping[str, Any], params: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """Scalar result dict for one configuration, as `_predict` reports it."""
+
+    d = decide_hand_tapping(features, params)
+    if d["early_exit"][0]:
+        return {
+            'detected': False,
+            'confidence': 0.0,
+            'pattern': "no_hands_detected",
+            'tap_count': 0,
+            'clap_count': 0,
+            'tapping_score': 0.0,
+            'clapping_score': 0.0,
+            'analysis_type': 'no_hands_early_exit'
+        }
+    return {
+        'detected': bool(d["detected"][0]),
+        'confidence': float(d["confidence"][0]),
+        'pattern': _HAND_PATTERNS[int(d["pattern"][0])],
+        'tap_count': int(d["tap_count"][0]),
+        'clap_count': int(d["clap_count"][0]),
+        'tapping_score': float(d["tapping_score"][0]),
+        'clapping_score': float(d["clapping_score"][0]),
+        'analysis_type': 'ultra_strict_multi_method_validation'
+    }
+
+
+# ---------------------------------------------------------------------------
+# Foot tapping
+# ---------------------------------------------------------------------------
+
+# Gate codes (in evaluation order) -> (pattern, analysis_type).
+_FOOT_GATES = (
+    None,
+    ("pose_detection_failed", "pose_detection_error"),
+    ("too_few_ankle_detections", "insufficient_ankles"),
+    ("no_shoulders", "no_full_body"),
+    ("not_full_body", "insufficient_fullbody"),
+    ("body_not_full", "incomplete_body"),
+)
+
+
+def decide_foot_tapping(features: Mapping[str, Any], params: Optional[Mapping[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """Vectorized decision for `tapping_feet`.
+
+    features: ``mediapipe_ok`` (bool), ``ankle`` (T, 2, 3) normalised
+    x/y/visibility for left/right, ``shoulder`` and ``hip`` (T, 2, 2) y and
+    visibility, ``frame_wh`` (T, 2), ``change_ratio`` and ``avg_intensity``
+    (T,) pair measurements over the lower quarter of the frame.
+    """
+
+    p, k = _params(FOOT_TAPPING_PARAMS, params)
+    ankle = np.asarray(features["ankle"], dtype=np.float64)
+    shoulder = np.asarray(features["shoulder"], dtype=np.float64)
+    hip = np.asarray(features["hip"], dtype=np.float64)
+    frame_wh = np.asarray(features["frame_wh"], dtype=np.float64)
+    t = len(frame_wh)
+
+    def col3(name: str) -> np.ndarray:
+        return p[name][:, None, None]
+
+    with np.errstate(invalid="ignore"):
+        ank_acc = (ankle[None, :, :, 2] > col3("ankle_min_visibility")) & (ankle[None, :, :, 1] > col3("ankle_min_y"))
+        sh_acc = (shoulder[None, :, :, 1] > col3("shoulder_min_visibility")) & (shoulder[None, :, :, 0] < col3("shoulder_max_y"))
+        hip_acc = ((hip[None, :, :, 1] > col3("hip_min_visibility"))
+                   & (hip[None, :, :, 0] > col3("hip_min_y")) & (hip[None, :, :, 0] < col3("hip_max_y")))
+
+    total_feet = ank_acc.sum(axis=(1, 2))
+    n_shoulders = sh_acc.sum(axis=(1, 2))
+    fullbody = ((sh_acc.sum(-1) == 2) & (hip_acc.sum(-1) == 2) & (ank_acc.sum(-1) == 2)).sum(axis=1)
+    ankle_y = np.where(ank_acc, ankle[None, :, :, 1], 0.0).sum(axis=(1, 2)) / np.maximum(1, total_feet)
+    shoulder_y = np.where(sh_acc, shoulder[None, :, :, 0], 0.0).sum(axis=(1, 2)) / np.maximum(1, n_shoulders)
+    body_span = ankle_y - shoulder_y
+
+    gate = np.zeros(k, dtype=int)
+    for code, failed in (
+        (5, body_span < p["min_body_span"]),
+        (4, fullbody < p["min_fullbody_frames"]),
+        (3, n_shoulders == 0),
+        (2, total_feet < p["min_foot_detections"]),
+    ):
+        gate = np.where(failed, code, gate)
+    if not features["mediapipe_ok"]:
+        gate[:] = 1
+
+    movement_taps, avg_movement, n_valid = _motion_taps(
+        np.asarray(features["change_ratio"], dtype=np.float64),
+        np.asarray(features["avg_intensity"], dtype=np.float64),
+        p,
+    )
+    motion_ok = (n_valid > 0) & (movement_taps >= p["min_movement_taps"]) & (avg_movement > p["min_avg_movement"])
+    movement_score = np.where(motion_ok, np.clip(avg_movement * 15 + movement_taps * 0.08, 0.3, 0.6), 0.0)
+
+    # Ankle tracks in pixels; slot order is left then right.
+    px = ankle[:, :, :2] * frame_wh[:, None, :]
+    first, v_first, second, v_second = _compact_slots(px, ank_acc)
+    tap_count = np.zeros(k, dtype=int)
+    ankle_score = np.zeros(k)
+    for pos, valid in ((first, v_first), (second, v_second)):
+        n_hist, avg, taps = _track_movement(pos, valid, _col(p, "ankle_tap_px"))
+        ok = (t >= 2) & (n_hist >= 3) & (avg > p["ankle_min_avg_px"]) & (taps >= p["ankle_min_taps"])
+        ankle_score = np.where(ok, np.maximum(ankle_score, np.minimum(0.6, avg * 0.03 + taps * 0.12)), ankle_score)
+        tap_count = np.where(ok, np.maximum(tap_count, taps), tap_count)
+
+    final_score = np.maximum(movement_score, ankle_score)
+    final_tap_count = np.maximum(tap_count, movement_taps)
+    methods = ((movement_taps >= p["strict_movement_taps"]).astype(int)
+               + (tap_count >= p["strict_landmark_taps"])
+               + (final_score > p["strict_high_confidence"]))
+    detected = ((final_score > 0) & (methods >= p["strict_min_methods"])
+                & (final_score > p["strict_min_confidence"]) & (gate == 0))
+
+    return {
+        "detected": detected,
+        "confidence": np.where(detected, final_score, 0.0),
+        "tap_count": np.where(detected, final_tap_count, 0),
+        "movement_score": movement_score,
+        "ankle_score": ankle_score,
+        "movement_taps": movement_taps,
+        "gate": gate,
+        "body_span": body_span,
+    }
+
+
+def foot_tapping_result(features: Mapping[str, Any], params: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """Scalar result dict for one configuration, as `_predict` reports it."""
+
+    d = decide_foot_tapping(features, params)
+    gate = int(d["gate"][0])
+    if gate:
+        pattern, analysis_type = _FOOT_GATES[gate]  # type: ignore[misc]
+        return {
+            'detected': False,
+            'confidence': 0.0,
+            'pattern': pattern,
+            'tap_count': 0,
+            'analysis_type': analysis_type
+        }
+    return {
+        'detected': bool(d["detected"][0]),
+        'confidence': float(d["confidence"][0]),
+        'tap_count': int(d["tap_count"][0]),
+        'movement_score': float(d["movement_score"][0]),
+        'ankle_score': float(d["ankle_score"][0]),
+        'analysis_type': 'ultra_strict_foot_pattern_detection'
+    }
+
+
+# ---------------------------------------------------------------------------
+# Sit / stand
+# ---------------------------------------------------------------------------
+
+
+def classify_postures(features: Mapping[str, Any], params: Optional[Mapping[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """Per-frame posture and clip-level consensus, vectorized over configs.
+
+    features: ``landmarks`` (T, 9, 3) x/y/visibility for
+    `SIT_STAND_LANDMARKS` (nose, shoulders, hips, knees, ankles), NaN where
+    no pose was found.
+
+    Returns ``posture`` (K,) codes into `POSTURES` (0 = no consensus),
+    ``posture_confidence`` (K,), ``valid_frames`` and the sitting/standing
+    frame counts.
+    """
+
+    p, k = _params(SIT_STAND_PARAMS, params)
+    lm = np.asarray(features["landmarks"], dtype=np.float64)
+    nose = lm[:, 0]
+    sh = (lm[:, 1] + lm[:, 2]) / 2
+    hp = (lm[:, 3] + lm[:, 4]) / 2
+    kn = (lm[:, 5] + lm[:, 6]) / 2
+    an = (lm[:, 7] + lm[:, 8]) / 2
+    vis = lm[:, 1:, 2]
+    avg_vis = vis.mean(axis=1)
+    min_vis = vis.min(axis=1)
+
+    total_body_height = an[:, 1] - sh[:, 1]
+    torso_length = hp[:, 1] - sh[:, 1]
+    thigh_length = kn[:, 1] - hp[:, 1]
+    body_compression = total_body_height / np.maximum(0.1, np.abs(an[:, 1] - nose[:, 1]))
+    torso_to_total = torso_length / np.maximum(0.1, total_body_height)
+    thigh_angle = thigh_length / np.maximum(0.1, torso_length)
+    knee_bend = np.abs(kn[:, 1] - hp[:, 1]) / np.maximum(0.1, np.abs(an[:, 1] - hp[:, 1]))
+    hip_knee_gap = kn[:, 1] - hp[:, 1]
+
+    sit_pts = np.zeros((k, len(lm)))
+    stand_pts = np.zeros((k, len(lm)))
+    sit_w = np.zeros((k, len(lm)))
+    stand_w = np.zeros((k, len(lm)))
+    sit_n = np.zeros((k, len(lm)))
+    stand_n = np.zeros((k, len(lm)))
+    # (value, sitting test, standing test, points, factor weight)
+    with np.errstate(invalid="ignore"):
+        indicators = (
+            (body_compression, lambda v: v < _col(p, "compression_sitting"), lambda v: v > _col(p, "compression_standing"), 3, 0.9),
+            (hip_knee_gap, lambda v: v > _col(p, "hip_knee_sitting"), lambda v: v < _col(p, "hip_knee_standing"), 2, 0.8),
+            (thigh_angle, lambda v: v > _col(p, "thigh_sitting"), lambda v: v < _col(p, "thigh_standing"), 2, 0.7),
+            (knee_bend, lambda v: v > _col(p, "knee_bend_sitting"), lambda v: v < _col(p, "knee_bend_standing"), 1, 0.6),
+            (torso_to_total, lambda v: v > _col(p, "torso_sitting"), lambda v: v < _col(p, "torso_standing"), 1, 0.5),
+        )
+        for value, sits, stands, points, weight in indicators:
+            s = sits(value[None, :])
+            st = ~s & stands(value[None, :])
+            sit_pts += s * points
+            stand_pts += st * points
+            sit_w += s * weight
+            stand_w += st * weight
+            sit_n += s
+            stand_n += st
+
+        total = sit_pts + stand_pts
+        sit_conf = np.minimum(0.95, sit_pts / np.maximum(1, total) * (sit_w / np.maximum(1, sit_n)) * np.minimum(1.2, sit_pts / 3))
+        stand_conf = np.minimum(0.95, stand_pts / np.maximum(1, total) * (stand_w / np.maximum(1, stand_n)) * np.minimum(1.2, stand_pts / 3))
+        visible = (avg_vis[None, :] > _col(p, "min_avg_visibility")) & (min_vis[None, :] > _col(p, "min_visibility"))
+
+    state = np.where(sit_pts > stand_pts, _SITTING, np.where(stand_pts > sit_pts, _STANDING, 0))
+    state = np.where(visible, state, 0)
+    conf = np.where(state == _SITTING, sit_conf, np.where(state == _STANDING, stand_conf, 0.0))
+    valid = (state != 0) & (conf > _col(p, "min_frame_confidence"))
+
+    n_valid = valid.sum(axis=1)
+    sitting = valid & (state == _SITTING)
+    standing = valid & (state == _STANDING)
+    sitting_w = np.where(sitting, conf, 0.0).sum(axis=1)
+    standing_w = np.where(standing, conf, 0.0).sum(axis=1)
+    total_w = np.maximum(sitting_w + standing_w, 1e-12)
+    enough = n_valid >= p["min_valid_frames"]
+    is_sit = enough & (sitting_w / total_w >= p["consensus_threshold"]) & (sitting.sum(1) >= n_valid * p["consensus_count_ratio"])
+    is_stand = (enough & ~is_sit & (standing_w / total_w >= p["consensus_threshold"])
+                & (standing.sum(1) >= n_valid * p["consensus_count_ratio"]))
+    posture = np.where(is_sit, _SITTING, np.where(is_stand, _STANDING, 0))
+    return {
+        "posture": posture,
+        "posture_confidence": np.where(is_sit, sitting_w / total_w, np.where(is_stand, standing_w / total_w, 0.0)),
+        "enough_frames": enough,
+        "valid_frames": n_valid,
+        "sitting_frames": sitting.sum(axis=1),
+        "standing_frames": standing.sum(axis=1),
+        "total_frames": np.full(k, len(lm)),
+    }
+
+
+# Transition outcome codes -> analysis_type.
+TRANSITION_OUTCOMES = (
+    "insufficient_frames_low_threshold",
+    "no_posture_consensus_low_threshold",
+    "baseline_establishment",
+    "maintaining_same_posture",
+    "cooldown_active",
+    "posture_change_insufficient_baseline",
+    "confidence_too_low_for_transition",
+    "action_detected",
+)
+
+
+def decide_sit_stand_transition(
+    posture: np.ndarray,
+    posture_confidence: np.ndarray,
+    enough_frames: np.ndarray,
+    prev_posture: np.ndarray,
+    baseline_count: np.ndarray,
+    last_transition_time: np.ndarray,
+    now: float,
+    params: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, np.ndarray]:
+    """Vectorized transition state machine for one analysis tick.
+
+    All array arguments have shape (K,) (posture codes into `POSTURES`).
+    Returns ``outcome`` codes into `TRANSITION_OUTCOMES`, ``detected`` and the
+    new ``posture`` / ``baseline_count`` / ``last_transition_time`` state.
+    States are only updated for outcomes that persist state (code >= 2).
+    """
+
+    p, _ = _params(SIT_STAND_PARAMS, params)
+    since = now - last_transition_time
+    outcome = np.select(
+        [
+            ~enough_frames,
+            posture == 0,
+            prev_posture == 0,
+            prev_posture == posture,
+            since < p["min_cooldown_seconds"],
+            baseline_count < p["min_baseline_count"],
+            posture_confidence < p["min_transition_confidence"],
+        ],
+        [0, 1, 2, 3, 4, 5, 6],
+        default=7,
+    )
+    new_posture = np.where(np.isin(outcome, (2, 3, 5, 7)), posture, prev_posture)
+    new_baseline = np.select(
+        [np.isin(outcome, (2, 5, 7)), outcome == 3],
+        [1, baseline_count + 1],
+        default=baseline_count,
+    )
+    new_time = np.where(np.isin(outcome, (2, 7)), now, last_transition_time)
+    return {
+        "outcome": outcome,
+        "detected": outcome == 7,
+        "posture": new_posture,
+        "baseline_count": new_baseline,
+        "last_transition_time": new_time,
+        "time_since_last_transition": since,
+    }
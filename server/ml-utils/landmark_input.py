@@ -0,0 +1,172 @@
+"""Landmark payloads: client-side MediaPipe output instead of frames
+
+The heuristic analyzers only read MediaPipe landmarks and frame differences,
+and the browser can run MediaPipe's JS/WASM Pose, Hands and FaceMesh
+solutions itself. A client that does so sends the landmarks (plus tiny
+grayscale thumbnails for the motion statistics) instead of JPEG frames, and
+the server skips decoding and detection entirely::
+
+{
+  "landmarks": [
+    {
+      "pose": [[x, y, z, visibility], ...],      # 33 points, or null
+      "hands": [[[x, y, z], ...], ...],          # up to 2 hands of 21 points
+      "thumb": "<base64 uint8 grayscale>",       # optional, thumb_size pixels
+      "eye_crop": "data:image/jpeg;base64,..."   # optional, eye_gaze only
+    },
+    ...                                          # one entry per frame (null: dropped frame)
+  ],
+  "width": 640, "height": 480,                   # source frame size in pixels
+  "thumb_size": [32, 24]                         # thumbnail width, height
+}
+
+Coordinates are normalised to [0, 1] as MediaPipe reports them. Hand points
+may carry a fourth visibility column; without one their visibility is 0, as
+it is for server-side Hands, which does not fill that field. Thumbnails are
+row-major uint8 luma; their differences stand in for the full-frame diffs,
+so the motion statistics are approximate (small details average out).
+
+Eye gaze needs pixels for its CNN, so it reads ``eye_crop``: the eye region
+the client cropped around its face-mesh eye points (the `_EYE_IDXS` box
+plus a 30 px margin, any size; the server resizes it to 64×64). Without two
+usable crops it falls back to thumbnail movement, like the frame path.
+
+`parse` validates a payload; the ``*_features`` functions build the same
+feature dictionaries as `ml_analyzer._extract_*_features` (see
+`heuristics`), taking the frame-difference statistics from the caller.
+"""
+
+from __future__ import annotations
+
+import base64
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from heuristics import SIT_STAND_LANDMARKS
+
+POSE_POINTS = 33
+HAND_POINTS = 21
+
+
+def is_landmark_payload(data: Any) -> bool:
+    return isinstance(data, dict) and isinstance(data.get("landmarks"), list)
+
+
+def _thumb(frame: Dict[str, Any], size: Optional[Tuple[int, int]], t: int) -> Optional[np.ndarray]:
+    encoded = frame.get("thumb")
+    if not encoded:
+        return None
+    if size is None:
+        raise ValueError("thumb given without thumb_size")
+    w, h = size
+    raw = base64.b64decode(encoded)
+    if len(raw) != w * h:
+        raise ValueError(f"Frame {t}: thumb has {len(raw)} bytes, expected {w}×{h}")
+    return np.frombuffer(raw, dtype=np.uint8).reshape(h, w)
+
+
+def _thumb_size(size: Any) -> Optional[Tuple[int, int]]:
+    if size is None:
+        return None
+    try:
+        w, h = (int(v) for v in size)
+    except (TypeError, ValueError):
+        raise ValueError(f"thumb_size must be [width, height], got {size!r}") from None
+    if w <= 0 or h <= 0:
+        raise ValueError(f"thumb_size must be positive, got {size!r}")
+    return w, h
+
+
+def parse(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Validated arrays of a landmark payload.
+
+    ``present`` (T,) marks frames the client processed; ``pose`` is (T, 33, 4)
+    and ``hands`` (T, 2, 21, 4), NaN where nothing was detected; ``thumbs``
+    and ``eye_crops`` are per-frame lists (None where absent). Raises
+    ValueError for a malformed payload.
+    """
+
+    frames = payload["landmarks"]
+    try:
+        width, height = float(payload["width"]), float(payload["height"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Landmark payload needs numeric width and height") from None
+    if width <= 0 or height <= 0:
+        raise ValueError("Landmark payload width and height must be positive")
+    thumb_size = _thumb_size(payload.get("thumb_size"))
+
+    n = len(frames)
+    present = np.zeros(n, dtype=bool)
+    pose = np.full((n, POSE_POINTS, 4), np.nan)
+    hands = np.full((n, 2, HAND_POINTS, 4), np.nan)
+    thumbs: List[Optional[np.ndarray]] = [None] * n
+    eye_crops: List[Optional[str]] = [None] * n
+    for t, frame in enumerate(frames):
+        if not isinstance(frame, dict):
+            continue
+        present[t] = True
+        if frame.get("pose") is not None:
+            arr = np.asarray(frame["pose"], dtype=np.float64)
+            if arr.shape != (POSE_POINTS, 4):
+                raise ValueError(f"Frame {t}: pose must be 33×4 (x, y, z, visibility), got {arr.shape}")
+            pose[t] = arr
+        for slot, hand in enumerate((frame.get("hands") or [])[:2]):
+            arr = np.asarray(hand, dtype=np.float64)
+            if arr.ndim != 2 or arr.shape[0] != HAND_POINTS or arr.shape[1] not in (3, 4):
+                raise ValueError(f"Frame {t}: hand must be 21×3 or 21×4, got {arr.shape}")
+            hands[t, slot, :, :arr.shape[1]] = arr
+            if arr.shape[1] == 3:
+                hands[t, slot, :, 3] = 0.0
+        thumbs[t] = _thumb(frame, thumb_size, t)
+        eye_crops[t] = frame.get("eye_crop") or None
+    return {
+        "present": present,
+        "width": width,
+        "height": height,
+        "pose": pose,
+        "hands": hands,
+        "thumbs": thumbs,
+        "eye_crops": eye_crops,
+    }
+
+
+def hand_features(parsed: Dict[str, Any], diff: Any) -> Dict[str, Any]:
+    """Hand-tapping features (see `heuristics.decide_hand_tapping`)."""
+
+    hands = parsed["hands"]
+    scale = np.array([parsed["width"], parsed["height"]])
+    change_ratio, avg_intensity = diff
+    return {
+        "mediapipe_ok": True,
+        "hand_xy": hands[:, :, :, :2].mean(axis=2) * scale,
+        "hand_confidence": hands[:, :, :, 3].mean(axis=2),
+        "frame_h": np.where(parsed["present"], parsed["height"], np.nan),
+        "change_ratio": change_ratio,
+        "avg_intensity": avg_intensity,
+    }
+
+
+def foot_features(parsed: Dict[str, Any], diff: Any) -> Dict[str, Any]:
+    """Foot-tapping features (see `heuristics.decide_foot_tapping`)."""
+
+    pose = parsed["pose"]
+    present = parsed["present"][:, None]
+    change_ratio, avg_intensity = diff
+    return {
+        "mediapipe_ok": True,
+        # 27/28 = ankles, 11/12 = shoulders, 23/24 = hips (left, right)
+        "ankle": pose[:, [27, 28]][:, :, [0, 1, 3]],
+        "shoulder": pose[:, [11, 12]][:, :, [1, 3]],
+        "hip": pose[:, [23, 24]][:, :, [1, 3]],
+        "frame_wh": np.where(present, [parsed["width"], parsed["height"]], np.nan),
+        "change_ratio": change_ratio,
+        "avg_intensity": avg_intensity,
+    }
+
+
+def sit_stand_features(parsed: Dict[str, Any], window: int) -> Dict[str, Any]:
+    """Sit/stand features over the last *window* frames (see `heuristics.classify_postures`)."""
+
+    recent = parsed["pose"][-window:] if len(parsed["pose"]) else parsed["pose"]
+    return {"landmarks": recent[:, list(SIT_STAND_LANDMARKS)][:, :, [0, 1, 3]]}
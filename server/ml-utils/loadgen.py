@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""Multi-session load generator for the analyzer
+
+Replays `/api/ml/analyze` and `/api/ml/batch` traffic from a number of
+simulated dashboard sessions against the Python analyzer and reports what a
+node sustains. Micro-benchmarks (`benchmark.py`) time one call in isolation;
+this shows queueing: every session fires on the dashboard's fixed interval
+whether or not its previous request finished, and `/api/ml/analyze` requests
+beyond ``MAX_CONCURRENT_ANALYSES`` are rejected (HTTP 429 in the controller).
+
+python loadgen.py [--sessions 4] [--interval 5] [--duration 60] [--mode process|worker]
+                  [--replay traffic.jsonl] [--max-concurrent N] [--on-busy reject|wait] [--output report.json]
+
+Modes:
+
+  process  one `ml_analyzer.py --data <tmp> --behavior <b>` (or
+           `batch_analyzer.py <tmp>`) process per request, exactly what
+           `mlController.js` spawns today
+  worker   ``--workers`` persistent `worker.py` processes, models loaded once;
+           ``--worker-max-rss-mb`` / ``--worker-max-requests`` turn on
+           recycling and the pool replaces workers that ask for it
+
+Traffic comes from ``--replay`` (a JSON array or JSON-lines file of request
+bodies as the dashboard sends them, e.g. ``{"behaviorType": "eye_gaze",
+"frame_sequence": [...]}`` or ``{"behaviors": [...]}``, optionally wrapped as
+``{"path": "/api/ml/batch", "body": {...}}``) or is synthesized with the
+`benchmark.py` frame renderer at the dashboard's behaviour capture profile.
+Each session walks the request list from its own offset.
+
+Output (stdout or ``--output``) is JSON::
+
+{
+  "success": true,
+  "config": {...},
+  "requests": {"sent": 48, "completed": 45, "rejected": 3, "errors": 0},
+  "throughput_rps": 0.75,
+  "latency_ms": {"queue": {...}, "service": {...}, "end_to_end": {...}},
+  "per_behavior": {"eye_gaze": {"count": 12, "end_to_end": {...}}, ...},
+  "cpu": {"total_seconds": .., "per_request_ms": .., "cores_per_session": .., "startup_seconds": ..}
+}
+
+``queue`` is the wait for a free worker (always ~0 in process mode),
+``service`` the analyzer time including process start in process mode, and
+``end_to_end`` their sum. Requests submitted during ``--warmup`` are run but
+left out of the statistics. Batch requests are not subject to the
+concurrency limit, as in the controller.
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from evaluate import _percentiles  # type: ignore
+
+HERE = Path(__file__).resolve().parent
+BEHAVIORS = ("eye_gaze", "sit_stand", "tapping_hands", "tapping_feet", "rapid_talking")
+
+# Dashboard defaults (Dashboard.jsx polling interval, mlController.js limit).
+DEFAULT_INTERVAL_S = 5.0
+DEFAULT_MAX_CONCURRENT = int(os.environ.get("MAX_CONCURRENT_ANALYSES", "1"))
+
+
+# ---------------------------------------------------------------------------
+# Traffic
+# ---------------------------------------------------------------------------
+
+
+def _normalize(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map a recorded request body onto {"kind", "behavior", "data"/"entries"}."""
+
+    body = record.get("body", record)
+    path = record.get("path", "")
+    if "behaviors" in body or path.endswith("/batch"):
+        entries = body.get("behaviors") or []
+        return {"kind": "batch", "behavior": "batch", "entries": entries}
+    behavior = body.get("behaviorType") or body.get("behavior_type") or body.get("behavior")
+    # Same precedence as analyzeBehavior: data, then frame, then frame_sequence.
+    data = body.get("data")
+    if data is None:
+        data = body.get("payload") or body.get("frame") or body.get("Frame") \
+            or body.get("frame_sequence") or body.get("frameSequence")
+    if behavior not in BEHAVIORS or data is None:
+        return None
+    return {"kind": "analyze", "behavior": behavior, "data": data}
+
+
+def load_traffic(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as fp:
+        text = fp.read()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        records = json.loads(stripped)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    requests = [r for r in (_normalize(rec) for rec in records) if r is not None]
+    if not requests:
+        raise ValueError(f"No replayable requests in {path}")
+    return requests
+
+
+def synthetic_traffic(batch_every: int, seed: int) -> List[Dict[str, Any]]:
+    """One analyze request per behaviour, plus a batch of the frame behaviours."""
+
+    from benchmark import PROFILES, make_frames  # type: ignore
+
+    rng = random.Random(seed)
+    n, scale, quality = PROFILES["behavior"]
+    frames = make_frames(n, scale, quality, seed=seed)
+    requests: List[Dict[str, Any]] = []
+    for behavior in BEHAVIORS:
+        if behavior == "rapid_talking":
+            data: Any = [round(rng.gauss(150, 30), 1) for _ in range(8)]
+        else:
+            data = frames
+        requests.append({"kind": "analyze", "behavior": behavior, "data": data})
+    if batch_every > 0:
+        entries = [{"type": b, "data": frames} for b in BEHAVIORS if b != "rapid_talking"]
+        batch = {"kind": "batch", "behavior": "batch", "entries": entries}
+        mixed: List[Dict[str, Any]] = []
+        for i, req in enumerate(requests, 1):
+            mixed.append(req)
+            if i % batch_every == 0:
+                mixed.append(batch)
+        requests = mixed
+    return requests
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+
+class ProcessBackend:
+    """One analyzer process per request, as the controller spawns them."""
+
+    name = "process"
+
+    def __init__(self, python: str) -> None:
+        self.python = python
+        self.startup_cpu = 0.0
+
+    def start(self) -> None:
+        pass
+
+    def run(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        fd, tmp = tempfile.mkstemp(prefix="loadgen_", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                if request["kind"] == "batch":
+                    json.dump(request["entries"], fp)
+                    cmd = [self.python, str(HERE / "batch_analyzer.py"), tmp]
+                else:
+                    json.dump({request["behavior"]: request["data"]}, fp)
+                    cmd = [self.python, str(HERE / "ml_analyzer.py"), "--data", tmp, "--behavior", request["behavior"]]
+            proc = subprocess.Popen(cmd, cwd=str(HERE), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            out = proc.stdout.read() if proc.stdout else b""
+            # wait4 instead of wait() to get this child's own CPU time.
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            cpu = usage.ru_utime + usage.ru_stime
+        finally:
+            os.unlink(tmp)
+        ok = proc.returncode == 0
+        try:
+            result = json.loads(out.decode("utf-8").strip().splitlines()[-1])
+            ok = ok and "error" not in result and result.get("success", True) is not False
+        except (ValueError, IndexError):
+            ok = False
+        return {"ok": ok, "cpu_seconds": cpu}
+
+    def stop(self) -> None:
+        pass
+
+
+class _Worker:
+    def __init__(self, python: str, extra_args: List[str]) -> None:
+        self.proc = subprocess.Popen(
+            [python, str(HERE / "worker.py"), *extra_args],
+            cwd=str(HERE),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        self.seq = 0
+        self.retiring = False
+
+    def call(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self.seq += 1
+        message = {"id": self.seq, **message}
+        assert self.proc.stdin is not None and self.proc.stdout is not None
+        self.proc.stdin.write(json.dumps(message) + "\n")
+        self.proc.stdin.flush()
+        while True:
+            line = self.proc.stdout.readline()
+            if not line:
+                raise RuntimeError(f"worker {self.proc.pid} exited")
+            reply = json.loads(line)
+            # Unsolicited recycle notice; the reply to our request follows.
+            if reply.get("recycle"):
+                self.retiring = True
+                continue
+            # Unsolicited model-reload outcome.
+            if "reloaded" in reply:
+                continue
+            return reply
+
+    def cpu_seconds(self) -> Optional[float]:
+        """utime + stime of the live worker from /proc (Linux only)."""
+
+        try:
+            with open(f"/proc/{self.proc.pid}/stat", "r") as fp:
+                fields = fp.read().rsplit(")", 1)[1].split()
+        except OSError:
+            return None
+        ticks = os.sysconf("SC_CLK_TCK")
+        return (int(fields[11]) + int(fields[12])) / ticks
+
+
+class WorkerBackend:
+    """A fixed pool of persistent `worker.py` processes."""
+
+    name = "worker"
+
+    def __init__(self, python: str, workers: int, worker_args: Optional[List[str]] = None) -> None:
+        self.python = python
+        self.n_workers = workers
+        self.worker_args = worker_args or []
+        self.workers: List[_Worker] = []
+        self.idle: "queue.Queue[_Worker]" = queue.Queue()
+        self.startup_cpu = 0.0
+        self.recycled = 0
+        self._lock = threading.Lock()
+
+    def _spawn(self) -> _Worker:
+        w = _Worker(self.python, self.worker_args)
+        assert w.proc.stdout is not None
+        ready = json.loads(w.proc.stdout.readline() or "{}")
+        if not ready.get("ready"):
+            raise RuntimeError("worker failed to start")
+        cpu = w.cpu_seconds()
+        with self._lock:
+            if cpu is not None:
+                self.startup_cpu += cpu
+            self.workers.append(w)
+        return w
+
+    def start(self) -> None:
+        for _ in range(self.n_workers):
+            self.idle.put(self._spawn())
+
+    def acquire(self) -> _Worker:
+        return self.idle.get()
+
+    def release(self, worker: _Worker) -> None:
+        if not worker.retiring:
+            self.idle.put(worker)
+            return
+        # Replace first so capacity never drops, then let the old one drain.
+        self.idle.put(self._spawn())
+        with self._lock:
+            self.workers.remove(worker)
+            self.recycled += 1
+        assert worker.proc.stdin is not None
+        worker.proc.stdin.close()
+        worker.proc.wait(timeout=60)
+
+    def run_on(self, worker: _Worker, request: Dict[str, Any]) -> Dict[str, Any]:
+        before = worker.cpu_seconds()
+        if request["kind"] == "batch":
+            response = worker.call({"batch": request["entries"]})
+            ok = bool(response.get("success"))
+        else:
+            response = worker.call({"behavior": request["behavior"], "data": request["data"]})
+            ok = "error" not in response.get("result", {"error": True})
+        after = worker.cpu_seconds()
+        cpu = None if before is None or after is None else after - before
+        return {"ok": ok, "cpu_seconds": cpu}
+
+    def stop(self) -> None:
+        for w in self.workers:
+            try:
+                w.call({"command": "shutdown"})
+            except (RuntimeError, OSError, ValueError):
+                pass
+            w.proc.wait(timeout=30)
+
+
+# ---------------------------------------------------------------------------
+# Sessions
+# ---------------------------------------------------------------------------
+
+
+class LoadRun:
+    """Fires requests from simulated sessions and collects per-request samples."""
+
+    def __init__(self, backend: Any, requests: List[Dict[str, Any]], args: argparse.Namespace) -> None:
+        self.backend = backend
+        self.requests = requests
+        self.args = args
+        self.samples: List[Dict[str, Any]] = []
+        self.rejected = 0
+        self.sent = 0
+        self.active = 0
+        self.lock = threading.Lock()
+        self.slot = threading.Condition(self.lock)
+        # Enough threads that submissions never wait on the pool itself.
+        self.pool = ThreadPoolExecutor(max_workers=max(4, args.sessions * 4))
+        self.t0 = 0.0
+
+    def _admit(self, request: Dict[str, Any]) -> bool:
+        if request["kind"] == "batch":
+            return True
+        with self.slot:
+            if self.active >= self.args.max_concurrent:
+                if self.args.on_busy == "reject":
+                    return False
+                while self.active >= self.args.max_concurrent:
+                    self.slot.wait()
+            self.active += 1
+        return True
+
+    def _release(self, request: Dict[str, Any]) -> None:
+        if request["kind"] == "batch":
+            return
+        with self.slot:
+            self.active -= 1
+            self.slot.notify()
+
+    def _execute(self, session: int, request: Dict[str, Any], submitted: float, counted: bool) -> None:
+        started = submitted
+        try:
+            if isinstance(self.backend, WorkerBackend):
+                worker = self.backend.acquire()
+                started = time.perf_counter()
+                try:
+                    outcome = self.backend.run_on(worker, request)
+                finally:
+                    self.backend.release(worker)
+            else:
+                started = time.perf_counter()
+                outcome = self.backend.run(request)
+        except Exception as exc:
+            print(f"[loadgen] request failed: {exc}", file=sys.stderr)
+            outcome = {"ok": False, "cpu_seconds": None}
+        finally:
+            self._release(request)
+        finished = time.perf_counter()
+        if counted:
+            with self.lock:
+                self.samples.append({
+                    "session": session,
+                    "behavior": request["behavior"],
+                    "queue": started - submitted,
+                    "service": finished - started,
+                    "end_to_end": finished - submitted,
+                    "finished": finished - self.t0,
+                    **outcome,
+                })
+
+    def _session(self, session: int, stop_at: float) -> None:
+        rng = random.Random(self.args.seed * 1000 + session)
+        idx = session % len(self.requests)
+        # Sessions join at random points of the first interval.
+        next_at = self.t0 + rng.uniform(0, self.args.interval)
+        while True:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.perf_counter()
+            if now >= stop_at:
+                return
+            request = self.requests[idx]
+            idx = (idx + 1) % len(self.requests)
+            counted = now - self.t0 >= self.args.warmup
+            with self.lock:
+                self.sent += int(counted)
+            # The dashboard polls on a fixed interval, not after each reply.
+            if self._admit(request):
+                self.pool.submit(self._execute, session, request, now, counted)
+            elif counted:
+                with self.lock:
+                    self.rejected += 1
+            jitter = rng.uniform(-self.args.jitter, self.args.jitter)
+            next_at += self.args.interval * (1.0 + jitter)
+
+    def run(self) -> float:
+        self.t0 = time.perf_counter()
+        stop_at = self.t0 + self.args.warmup + self.args.duration
+        threads = [
+            threading.Thread(target=self._session, args=(s, stop_at), daemon=True)
+            for s in range(self.args.sessions)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.pool.shutdown(wait=True)
+        return time.perf_counter() - self.t0
+
+
+def build_report(run: LoadRun, elapsed: float, total_cpu: float, args: argparse.Namespace) -> Dict[str, Any]:
+    done = [s for s in run.samples if s["ok"]]
+    errors = len(run.samples) - len(done)
+    measured = max(1e-9, elapsed - args.warmup)
+    per_behavior: Dict[str, Any] = {}
+    for behavior in sorted({s["behavior"] for s in run.samples}):
+        subset = [s for s in done if s["behavior"] == behavior]
+        per_behavior[behavior] = {
+            "count": len(subset),
+            "service": _percentiles([s["service"] for s in subset]),
+            "end_to_end": _percentiles([s["end_to_end"] for s in subset]),
+        }
+    request_cpu = [s["cpu_seconds"] for s in run.samples if s.get("cpu_seconds") is not None]
+    steady_cpu = sum(request_cpu) if request_cpu else max(0.0, total_cpu - run.backend.startup_cpu)
+    return {
+        "success": True,
+        "config": {
+            "mode": run.backend.name,
+            "sessions": args.sessions,
+            "interval_s": args.interval,
+            "jitter": args.jitter,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "max_concurrent": args.max_concurrent,
+            "on_busy": args.on_busy,
+            "workers": getattr(run.backend, "n_workers", None),
+            "workers_recycled": getattr(run.backend, "recycled", None),
+            "request_mix": [r["behavior"] for r in run.requests],
+            "cpu_count": os.cpu_count(),
+        },
+        "offered_rps": round(args.sessions / args.interval, 4),
+        "requests": {
+            "sent": run.sent,
+            "completed": len(done),
+            "rejected": run.rejected,
+            "errors": errors,
+        },
+        "throughput_rps": round(len(done) / measured, 4),
+        "latency_ms": {
+            stage: _percentiles([s[stage] for s in done]) for stage in ("queue", "service", "end_to_end")
+        },
+        "per_behavior": per_behavior,
+        "cpu": {
+            "total_seconds": round(total_cpu, 3),
+            "startup_seconds": round(run.backend.startup_cpu, 3),
+            "per_request_ms": round(1000 * steady_cpu / max(1, len(request_cpu) or len(run.samples)), 3),
+            "cores_per_session": round(steady_cpu / measured / max(1, args.sessions), 4),
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Main entry
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay multi-session traffic against the ML analyzer")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent simulated dashboard sessions")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_S, help="Seconds between a session's requests")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Relative jitter on the interval")
+    parser.add_argument("--duration", type=float, default=60.0, help="Measured seconds (after warm-up)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds excluded from the statistics")
+    parser.add_argument("--mode", choices=("process", "worker"), default="process")
+    parser.add_argument("--workers", type=int, help="Persistent workers in worker mode (default: --max-concurrent)")
+    parser.add_argument("--max-concurrent", type=int, default=DEFAULT_MAX_CONCURRENT,
+                        help="Concurrent /api/ml/analyze limit (default: $MAX_CONCURRENT_ANALYSES or 1)")
+    parser.add_argument("--on-busy", choices=("reject", "wait"), default="reject",
+                        help="What an analyze request over the limit does: 429 like the controller, or queue")
+    parser.add_argument("--replay", help="Recorded request bodies (JSON array or JSON lines)")
+    parser.add_argument("--batch-every", type=int, default=0,
+                        help="Synthetic traffic: insert a /api/ml/batch request after every N analyze requests")
+    parser.add_argument("--worker-max-rss-mb", type=float, help="Worker mode: recycle workers above this RSS")
+    parser.add_argument("--worker-max-requests", type=int, help="Worker mode: recycle workers after N requests")
+    parser.add_argument("--python", default=sys.executable, help="Interpreter for analyzer processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report here instead of stdout")
+    args = parser.parse_args()
+
+    requests = load_traffic(args.replay) if args.replay else synthetic_traffic(args.batch_every, args.seed)
+    if args.mode == "worker":
+        worker_args = []
+        if args.worker_max_rss_mb:
+            worker_args += ["--max-rss-mb", str(args.worker_max_rss_mb)]
+        if args.worker_max_requests:
+            worker_args += ["--max-requests", str(args.worker_max_requests)]
+        backend: Any = WorkerBackend(args.python, args.workers or max(1, args.max_concurrent), worker_args)
+    else:
+        backend = ProcessBackend(args.python)
+
+    cpu_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    print(f"[loadgen] starting {backend.name} backend", file=sys.stderr)
+    backend.start()
+    run = LoadRun(backend, requests, args)
+    print(f"[loadgen] {args.sessions} sessions every {args.interval}s for {args.warmup + args.duration}s",
+          file=sys.stderr)
+    try:
+        elapsed = run.run()
+    finally:
+        backend.stop()
+    cpu_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    total_cpu = (cpu_after.ru_utime - cpu_before.ru_utime) + (cpu_after.ru_stime - cpu_before.ru_stime)
+
+    text = json.dumps(build_report(run, elapsed, total_cpu, args), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
@@ -0,0 +1,154 @@
+"""Memory tracking for long-lived analyzer processes
+
+`MemoryTracker` records resident set size around every request and keeps,
+per request type, the request count, total and largest RSS growth. With
+``trace=True`` it also runs `tracemalloc` and attributes Python-heap growth
+to source lines per request type (the top allocators); this sees NumPy and
+PIL buffers but not MediaPipe or torch native memory, which only shows up in
+RSS.
+
+``leak_every=N`` takes a baseline snapshot after the first request and diffs
+against it every N requests, so steadily growing call sites stand out from
+one-off caches. Tracing slows the analyzer noticeably; it is opt-in.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import resource
+import sys
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> int:
+    """Current RSS from /proc (Linux); peak RSS from getrusage elsewhere."""
+
+    try:
+        with open("/proc/self/statm", "r") as fp:
+            return int(fp.read().split()[1]) * _PAGE
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS.
+        return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    """Snapshot without tracemalloc's and this module's own bookkeeping."""
+
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+
+
+def _top_lines(stats: List[Any], limit: int) -> List[Dict[str, Any]]:
+    out = []
+    for s in stats[:limit]:
+        frame = s.traceback[0]
+        out.append({
+            "where": f"{frame.filename}:{frame.lineno}",
+            "size_kb": round(s.size_diff / 1024, 1),
+            "blocks": s.count_diff,
+        })
+    return out
+
+
+class MemoryTracker:
+    def __init__(self, trace: bool = False, top: int = 10, leak_every: int = 0) -> None:
+        self.trace = trace or leak_every > 0
+        self.top = top
+        self.leak_every = leak_every
+        self.per_type: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+        self.start_rss = rss_bytes()
+        self.peak_rss = self.start_rss
+        self.leak_report: Optional[Dict[str, Any]] = None
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._baseline_rss = 0
+        self._baseline_at = 0
+        self._before_rss = 0
+        self._before_snap: Optional[tracemalloc.Snapshot] = None
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def before(self) -> None:
+        self._before_rss = rss_bytes()
+        if self.trace:
+            self._before_snap = _take_snapshot()
+
+    def after(self, request_type: str) -> int:
+        """Account one finished request; returns RSS now."""
+
+        rss = rss_bytes()
+        self.requests += 1
+        self.peak_rss = max(self.peak_rss, rss)
+        growth = rss - self._before_rss
+        entry = self.per_type.setdefault(
+            request_type, {"count": 0, "rss_growth_total": 0, "rss_growth_max": 0, "allocators": {}}
+        )
+        entry["count"] += 1
+        entry["rss_growth_total"] += growth
+        entry["rss_growth_max"] = max(entry["rss_growth_max"], growth)
+
+        if self.trace and self._before_snap is not None:
+            snap = _take_snapshot()
+            allocators: Dict[str, Dict[str, float]] = entry["allocators"]
+            for s in snap.compare_to(self._before_snap, "lineno")[: self.top]:
+                if s.size_diff <= 0:
+                    continue
+                frame = s.traceback[0]
+                where = f"{frame.filename}:{frame.lineno}"
+                a = allocators.setdefault(where, {"size_diff_total": 0, "hits": 0})
+                a["size_diff_total"] += s.size_diff
+                a["hits"] += 1
+            self._before_snap = None
+            self._leak_check()
+        return rss
+
+    def _leak_check(self) -> None:
+        if not self.leak_every:
+            return
+        if self._baseline is None:
+            gc.collect()
+            self._baseline = _take_snapshot()
+            self._baseline_rss = rss_bytes()
+            self._baseline_at = self.requests
+            return
+        if (self.requests - self._baseline_at) % self.leak_every:
+            return
+        gc.collect()
+        current = _take_snapshot()
+        diff = current.compare_to(self._baseline, "lineno")
+        self.leak_report = {
+            "requests_since_baseline": self.requests - self._baseline_at,
+            "rss_growth_mb": round((rss_bytes() - self._baseline_rss) / 2 ** 20, 2),
+            "python_heap_growth_kb": round(sum(s.size_diff for s in diff) / 1024, 1),
+            "top": _top_lines([s for s in diff if s.size_diff > 0], self.top),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        per_type = {}
+        for name, e in self.per_type.items():
+            allocators = sorted(e["allocators"].items(), key=lambda kv: -kv[1]["size_diff_total"])[: self.top]
+            per_type[name] = {
+                "count": e["count"],
+                "mean_rss_growth_kb": round(e["rss_growth_total"] / max(1, e["count"]) / 1024, 1),
+                "max_rss_growth_kb": round(e["rss_growth_max"] / 1024, 1),
+                "top_allocators": [
+                    {"where": w, "mean_kb": round(a["size_diff_total"] / a["hits"] / 1024, 1), "hits": a["hits"]}
+                    for w, a in allocators
+                ],
+            }
+        return {
+            "rss_mb": round(rss_bytes() / 2 ** 20, 2),
+            "start_rss_mb": round(self.start_rss / 2 ** 20, 2),
+            "peak_rss_mb": round(self.peak_rss / 2 ** 20, 2),
+            "requests": self.requests,
+            "tracing": self.trace,
+            "per_type": per_type,
+            "leak_report": self.leak_report,
+        }
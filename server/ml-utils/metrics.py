@@ -0,0 +1,201 @@
+"""Process-wide analyzer metrics (counters, gauges, histograms)
+
+The analyzer increments counters as it works (MediaPipe calls and misses,
+decode errors, cache lookups); the persistent worker adds request latency
+histograms and queue gauges. `snapshot()` returns everything as JSON with
+derived ratios, `prometheus()` renders the Prometheus text exposition format
+(0.0.4), so the worker can serve either over its protocol or HTTP.
+
+All metric names get the ``ml_analyzer_`` prefix on export. Updates take a
+lock, so a scrape from the worker's HTTP thread never sees a half-updated
+histogram.
+
+``behavior`` and ``model`` label values come from requests, so anything
+outside `BEHAVIORS` (plus the worker's ``batch``/``invalid``) is exported as
+``other``: a client cannot create an unbounded number of series.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Any, Dict, List, Tuple
+
+PREFIX = "ml_analyzer_"
+
+# Request latency buckets in seconds (frame behaviours run 0.1–10 s).
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "requests_total": "Analyzer requests served, by behaviour and status",
+    "request_duration_seconds": "Analyzer request latency",
+    "in_flight": "Requests currently being analysed",
+    "queued": "Requests read but not yet started",
+    "mediapipe_calls_total": "MediaPipe graph invocations",
+    "mediapipe_no_detection_total": "MediaPipe invocations that detected nothing",
+    "decode_errors_total": "Frames that failed to decode",
+    "cache_requests_total": "Cache lookups, by cache and result (hit/miss)",
+    "model_load_seconds": "Time spent loading each model's weights",
+    "model_reloads_total": "Hot model reloads, by model and result",
+    "rss_bytes": "Resident set size after the last request",
+    "recycle_requests_total": "Times the worker asked to be recycled, by reason",
+}
+
+# Behaviours the analyzer serves; the only values the request-derived labels take.
+BEHAVIORS = ("eye_gaze", "tapping_hands", "tapping_feet", "sit_stand", "rapid_talking")
+_KNOWN_VALUES = {
+    "behavior": frozenset(BEHAVIORS + ("batch", "invalid")),
+    "model": frozenset(BEHAVIORS),
+}
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        out, running = [], 0
+        for bound, n in zip(list(self.bounds) + [math.inf], self.counts):
+            running += n
+            out.append(("+Inf" if bound == math.inf else repr(bound), running))
+        return out
+
+
+def label_value(label: str, value: Any) -> str:
+    """*value* as exported under *label*: ``other`` unless it is a known one."""
+
+    value = str(value)
+    known = _KNOWN_VALUES.get(label)
+    return value if known is None or value in known else "other"
+
+
+def _key(name: str, labels: Dict[str, Any]) -> _Key:
+    return name, tuple(sorted((k, label_value(k, v)) for k, v in labels.items()))
+
+
+def _label_text(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.counters: Dict[_Key, float] = {}
+        self.gauges: Dict[_Key, float] = {}
+        self.histograms: Dict[_Key, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self.gauges[key] = float(value)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram()
+            hist.observe(value)
+
+    def _sum(self, name: str, **match: str) -> float:
+        return sum(
+            v for (n, labels), v in self.counters.items()
+            if n == name and all(dict(labels).get(k) == m for k, m in match.items())
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON view: raw series plus MediaPipe failure rates and cache hit ratios."""
+
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in self.counters.items()]
+            gauges = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in self.gauges.items()]
+            histograms = [
+                {"name": n, "labels": dict(l), "count": h.count, "sum": round(h.sum, 6),
+                 "buckets": dict(h.cumulative())}
+                for (n, l), h in self.histograms.items()
+            ]
+            graphs = {dict(l).get("graph") for (n, l) in self.counters if n == "mediapipe_calls_total"}
+            failure = {
+                g: round(self._sum("mediapipe_no_detection_total", graph=g)
+                         / max(1.0, self._sum("mediapipe_calls_total", graph=g)), 4)
+                for g in sorted(x for x in graphs if x)
+            }
+            caches = {dict(l).get("cache") for (n, l) in self.counters if n == "cache_requests_total"}
+            hit_ratio = {}
+            for c in sorted(x for x in caches if x):
+                hits = self._sum("cache_requests_total", cache=c, result="hit")
+                total = self._sum("cache_requests_total", cache=c)
+                hit_ratio[c] = round(hits / total, 4) if total else 0.0
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": histograms,
+            "mediapipe_failure_rate": failure,
+            "cache_hit_ratio": hit_ratio,
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition of every series."""
+
+        lines: List[str] = []
+        with self._lock:
+            by_name: Dict[str, List[Tuple[str, Any]]] = {}
+            for (name, labels), v in self.counters.items():
+                by_name.setdefault(name, []).append(("counter", (labels, v)))
+            for (name, labels), v in self.gauges.items():
+                by_name.setdefault(name, []).append(("gauge", (labels, v)))
+            for (name, labels), h in self.histograms.items():
+                by_name.setdefault(name, []).append(("histogram", (labels, h)))
+            for name in sorted(by_name):
+                series = by_name[name]
+                kind = series[0][0]
+                full = PREFIX + name
+                if name in HELP:
+                    lines.append(f"# HELP {full} {HELP[name]}")
+                lines.append(f"# TYPE {full} {kind}")
+                for _, (labels, value) in series:
+                    if kind == "histogram":
+                        for le, n in value.cumulative():
+                            lines.append(f"{full}_bucket{_label_text(labels, (('le', le),))} {n}")
+                        lines.append(f"{full}_sum{_label_text(labels)} {value.sum!r}")
+                        lines.append(f"{full}_count{_label_text(labels)} {value.count}")
+                    else:
+                        lines.append(f"{full}{_label_text(labels)} {float(value)!r}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+inc = REGISTRY.inc
+set_gauge = REGISTRY.set
+observe = REGISTRY.observe
+snapshot = REGISTRY.snapshot
+prometheus = REGISTRY.prometheus
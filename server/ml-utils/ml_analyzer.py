@@ -4,12 +4,34 @@
 
 This script is invoked by the Node mlController using the following CLI:
 
-python ml_analyzer.py --data <tmp_json_file> --behavior <behavior_type>
+python ml_analyzer.py --data <tmp_json_file> --behavior <behavior_type> [--timings] [--profile [DIR]] [--trace FILE]
 
 It must read the JSON payload from the file, run the behaviour specific
 model/prediction logic, and write a single JSON object **to stdout** so that
 Node.js can capture and forward it to the client.
 
+``--behavior all`` (or a comma-separated list such as
+``eye_gaze,tapping_hands``) analyses one frame sequence (``frame_sequence``
+in the payload, or the payload itself when it is a list) for every listed
+behaviour in one pass through the shared stages of `analyze_all` and writes
+``{"results": {behavior: result}}``; rapid_talking is included when the
+payload has a ``rapid_talking`` key.
+
+Frame payloads may also be one encoded video chunk (``{"video":
+"data:video/webm;base64,...", "max_frames": 12}``, see `video_input.py`),
+decoded in memory into the frames the analyzers consume.
+
+Instead of frames, the tapping, sit/stand and eye-gaze payloads may carry
+landmarks computed by MediaPipe in the browser (``{"landmarks": [...],
+"width", "height", ...}``, see `landmark_input.py`); decoding and detection
+are then skipped and the heuristics run on those landmarks directly.
+
+A rapid_talking payload may carry raw microphone audio instead of (or as
+well as) WPM values: ``{"audio": "<base64 int16 PCM>", "sample_rate": 16000,
+"session_id": ...}``. It is run through the streaming speech-rate estimator
+of `speech_rate.py` and the WPM of every window it completes joins the
+session's series.
+
 For the purposes of this repo (demo / placeholder), we implement a very light
 weight random-based detector. The interface can later be replaced by real
 model inference code with minimal changes (just replace `_predict`).
@@ -21,20 +43,28 @@ import base64
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
 
 # Silence any prints while importing model_loader to keep stdout clean
 import contextlib
 import io
+import logging
+
+from analyzer_log import get_logger
+import metrics
+
+# Leveled, sampled stderr logging (ML_LOG_LEVEL, default WARNING)
+log = get_logger("ml_analyzer")
 
 # Safe import torch – fallback if not available (Render slug without torch)
 try:
     import torch  # type: ignore
     TORCH_AVAILABLE = True
 except ImportError:
-    print("Warning: PyTorch not available – ML models will be disabled", file=sys.stderr)
+    log.warning("Warning: PyTorch not available – ML models will be disabled")
     TORCH_AVAILABLE = False
 
 # If torch missing, create a lightweight stub so runtime imports succeed
@@ -66,10 +96,12 @@ from torchvision import transforms
 if TORCH_AVAILABLE:
     _silent = io.StringIO()
     with contextlib.redirect_stdout(_silent):
-        from model_loader import load_all_models
+        from model_loader import LOAD_SECONDS, load_all_models
 
     # Load *once* so subsequent calls are fast
     MODELS = load_all_models()
+    for _name, _seconds in LOAD_SECONDS.items():
+        metrics.set_gauge("model_load_seconds", _seconds, model=_name)
 else:
     MODELS = {"rapid_talking": None}  # Only rule-based behaviors available
 
@@ -77,8 +109,46 @@ else:
 import numpy as np
 import mediapipe as mp
 
-# State tracking file for sit-stand detection
-SIT_STAND_STATE_FILE = Path(__file__).parent / "sit_stand_state.json"
+from heuristics import (
+    POSTURES,
+    SIT_STAND_LANDMARKS,
+    SIT_STAND_PARAMS,
+    TRANSITION_OUTCOMES,
+    classify_postures,
+    decide_sit_stand_transition,
+    foot_tapping_result,
+    hand_tapping_result,
+)
+import landmark_input
+import speech_rate
+from landmark_input import is_landmark_payload
+from profiling import profiled
+from stage_graph import StageGraph
+from tracing import recording, span
+from timings import collect, stage
+import video_input
+from video_input import is_video_payload
+from wpm_series import WPMSeries, WPMSeriesStore, numeric_values, score_series, series_result
+
+# Per-session WPM series for rapid_talking (lives as long as the process;
+# bounded by the store's session cap and idle TTL)
+_WPM_STORE = WPMSeriesStore()
+
+# State tracking file for sit-stand detection (ML_SIT_STAND_STATE_FILE
+# points it elsewhere, e.g. for offline runs that must not touch the live one)
+SIT_STAND_STATE_FILE = Path(os.environ.get("ML_SIT_STAND_STATE_FILE") or Path(__file__).parent / "sit_stand_state.json")
+
+# How sit/stand is decided: "model" scores the pose sequence with the
+# sit/stand model (`_sit_stand_model_result`), as the endpoints always have;
+# "transitions" runs the stateful transition detector
+# (`_analyze_sit_stand_transitions`) instead.
+SIT_STAND_MODE = os.environ.get("ML_SIT_STAND_MODE", "model")
+
+# Model probability above which sit/stand counts as detected
+SIT_STAND_MODEL_THRESHOLD = 0.2
+
+# Attach a per-stage "timings" object to every result (see timings.py)
+TIMINGS_DEFAULT = os.environ.get("ML_ANALYZER_TIMINGS", "") == "1"
 
 # ---------------------------------------------------------------------------
 # Globals
@@ -128,23 +198,104 @@ _mp_pose = mp.solutions.pose.Pose(
 )
 
 
+# Graphs built per configuration by the pattern analyzers. With
+# static_image_mode=True they keep no state between images, so one instance
+# per configuration is reused for the life of the process instead of being
+# constructed (and its native buffers allocated) on every call.
+_GRAPHS: Dict[Any, Any] = {}
+
+
+def _cached_graph(factory: Any, **kwargs: Any) -> Any:
+    key = (factory, tuple(sorted(kwargs.items())))
+    graph = _GRAPHS.get(key)
+    if graph is None:
+        graph = _GRAPHS[key] = factory(**kwargs)
+    return graph
+
+
+def close_graphs() -> None:
+    """Release every MediaPipe graph (before a worker exits or is recycled)."""
+
+    global _STAGE_POOL
+    if _STAGE_POOL is not None:
+        _STAGE_POOL.shutdown(wait=True)
+        _STAGE_POOL = None
+    for graph in list(_GRAPHS.values()) + [_mp_face_mesh, _mp_face_detection, _mp_hands, _mp_pose]:
+        try:
+            graph.close()
+        except Exception:
+            pass
+    _GRAPHS.clear()
+
+
+# Hands graph of the hand-tapping analysis
+_HANDS_CONFIG = dict(
+    static_image_mode=True,
+    max_num_hands=2,
+    min_detection_confidence=0.6,  # Reasonable confidence
+    min_tracking_confidence=0.5,   # Reasonable tracking
+)
+
+# Pose graph of the foot-tapping analysis
+_FEET_POSE_CONFIG = dict(
+    static_image_mode=True,
+    model_complexity=1,
+    min_detection_confidence=0.6,  # Reasonable confidence
+    min_tracking_confidence=0.5,   # Reasonable tracking
+)
+
+# Pose graph of the sit/stand analysis - LOWER confidence for easier
+# detection, on contrast-boosted frames (`_boost_contrast`)
+_SIT_STAND_POSE_CONFIG = dict(
+    static_image_mode=True,
+    model_complexity=1,
+    min_detection_confidence=0.5,
+    min_tracking_confidence=0.4,
+    enable_segmentation=False,
+)
+
+# Sit/stand looks at the most recent frames only
+SIT_STAND_WINDOW = 12
+
+# Threads running the independent stages of `analyze_all` (1 = sequential)
+STAGE_THREADS = int(os.environ.get("ML_ANALYZER_STAGE_THREADS", "4"))
+_STAGE_POOL: Optional[ThreadPoolExecutor] = None
+
+
 # ---------------------------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------------------------
 
 
+def _mp_found(graph: str, found: Any) -> bool:
+    """Count one MediaPipe call on *graph* and whether it detected anything."""
+
+    metrics.inc("mediapipe_calls_total", graph=graph)
+    if not found:
+        metrics.inc("mediapipe_no_detection_total", graph=graph)
+        return False
+    return True
+
+
 def _decode_image(data_url: str) -> Image.Image:
-    """Convert a base-64 data-URL string to a PIL Image."""
+    """Convert a base-64 data-URL string (or a decoded BGR frame) to a PIL Image."""
 
+    if isinstance(data_url, np.ndarray):
+        import cv2
+
+        with stage("decode"):
+            return Image.fromarray(cv2.cvtColor(data_url, cv2.COLOR_BGR2RGB))
     # Expected format: "data:image/jpeg;base64,<encoded>"
     if "," in data_url:
         _, b64 = data_url.split(",", 1)
     else:
         b64 = data_url
     try:
-        byte_data = base64.b64decode(b64)
-        return Image.open(BytesIO(byte_data)).convert("RGB")
+        with stage("decode"):
+            byte_data = base64.b64decode(b64)
+            return Image.open(BytesIO(byte_data)).convert("RGB")
     except Exception as exc:
+        metrics.inc("decode_errors_total", decoder="pil")
         raise ValueError(f"Invalid base64 image: {exc}") from exc
 
 
@@ -155,12 +306,14 @@ def _frames_to_tensor(frames: List[str]) -> Any:
     for f in frames:
         try:
             img = _decode_image(f)
-            tensors.append(_IMAGE_TF(img))
+            with stage("tensor"):
+                tensors.append(_IMAGE_TF(img))
         except Exception:
             continue
     if not tensors:
         raise ValueError("No valid images provided")
-    return torch.stack(tensors, dim=0)  # (T, 3, H, W)
+    with stage("tensor"):
+        return torch.stack(tensors, dim=0)  # (T, 3, H, W)
 
 
 def _eye_crop(img: Image.Image) -> Image.Image | None:
@@ -169,12 +322,14 @@ def _eye_crop(img: Image.Image) -> Image.Image | None:
     img = _enhance_image_for_detection(img)
 
     rgb = np.array(img)  # PIL to numpy RGB
-    results = _mp_face_mesh.process(rgb)
-    if not results.multi_face_landmarks:
+    with stage("mediapipe"):
+        results = _mp_face_mesh.process(rgb)
+    if not _mp_found("face_mesh", results.multi_face_landmarks):
         # Try with face detection instead of face mesh
-        face_results = _mp_face_detection.process(rgb)
-        if not face_results.detections:
-            print(f"MediaPipe face: No face detected in {img.size} image", file=sys.stderr)
+        with stage("mediapipe"):
+            face_results = _mp_face_detection.process(rgb)
+        if not _mp_found("face_detection", face_results.detections):
+            log.debug("MediaPipe face: No face detected in %s image", img.size)
             return None
         # Use face detection bounding box for eye region
         detection = face_results.detections[0]
@@ -196,7 +351,7 @@ def _eye_crop(img: Image.Image) -> Image.Image | None:
         y_min, y_max = max(min(ys) - 30, 0), min(max(ys) + 30, h)  # Increased crop area
 
     if x_max - x_min < 30 or y_max - y_min < 30:  # Increased minimum size
-        print(f"Eye crop too small: {x_max-x_min}x{y_max-y_min}", file=sys.stderr)
+        log.debug("Eye crop too small: %dx%d", x_max - x_min, y_max - y_min)
         return None
 
     crop = rgb[int(y_min): int(y_max), int(x_min): int(x_max)]
@@ -221,319 +376,206 @@ def _enhance_image_for_detection(img: Image.Image) -> Image.Image:
     return img
 
 
-def _analyze_hand_tapping_patterns(hand_positions, frames):
-    """
-    STRICT hand tapping analysis - detects only actual repetitive tapping patterns:
-    1. Requires hands to be visible with decent confidence
-    2. Analyzes for repetitive movement patterns (not just any movement)
-    3. Requires multiple significant movements to qualify as tapping
+def _decode_bgr(frame_data: str) -> Any:
+    """Decode a base-64 data-URL frame to an OpenCV BGR array (None on failure).
+
+    Frames of a video chunk arrive already decoded and are returned as is.
     """
-    print(f"Analyzing {len(frames)} frames for ACTUAL hand tapping patterns (strict mode)...", file=sys.stderr)
-    
-    tapping_score = 0.0
-    clapping_score = 0.0
-    tap_count = 0
-    clap_count = 0
-    
-    # Try MediaPipe hand detection with REASONABLE confidence
+    import cv2
+
+    if isinstance(frame_data, np.ndarray):
+        return frame_data
     try:
-        import mediapipe as mp
-        mp_hands = mp.solutions.hands
-        mp_drawing = mp.solutions.drawing_utils
-        
-        # REASONABLE hand detection settings - not ultra-sensitive
-        hands = mp_hands.Hands(
-            static_image_mode=True,
-            max_num_hands=2,
-            min_detection_confidence=0.6,  # Reasonable confidence
-            min_tracking_confidence=0.5    # Reasonable tracking
-        )
-        
-        print(f"MediaPipe hand detection with REASONABLE confidence (0.6)...", file=sys.stderr)
-        
-        enhanced_hand_positions = []
-        
-        for frame_idx, frame_data in enumerate(frames):
-            try:
-                # Decode frame
-                import base64
-                import cv2
-                import numpy as np
-                
-                frame_bytes = base64.b64decode(frame_data.split(',')[1])
-                frame_array = np.frombuffer(frame_bytes, dtype=np.uint8)
-                frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Try hand detection with reasonable confidence
-                results = hands.process(frame_rgb)
-                frame_hands = []
-                
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        # Verify this is actually a good quality hand detection
-                        landmark_confidences = [lm.visibility for lm in hand_landmarks.landmark if hasattr(lm, 'visibility')]
-                        if landmark_confidences and np.mean(landmark_confidences) > 0.7:  # High quality detection only
-                            # Get hand center
-                            x_coords = [lm.x for lm in hand_landmarks.landmark]
-                            y_coords = [lm.y for lm in hand_landmarks.landmark]
-                            center_x = sum(x_coords) / len(x_coords) * frame.shape[1]
-                            center_y = sum(y_coords) / len(y_coords) * frame.shape[0]
-
-                            # Only keep hands roughly in front of torso (below ~30% frame height). This avoids raising when waving near head.
-                            if center_y > frame.shape[0] * 0.3:
-                                frame_hands.append((center_x, center_y))
-                                print(
-                                    f"Frame {frame_idx}: High-quality hand accepted for tap analysis (avg conf {np.mean(landmark_confidences):.2f}, y={center_y:.0f})",
-                                    file=sys.stderr,
-                                )
-                            else:
-                                print(
-                                    f"Frame {frame_idx}: Hand above torso – ignored for tap analysis (y={center_y:.0f})",
-                                    file=sys.stderr,
-                                )
-                            print(f"Frame {frame_idx}: High-quality hand detected (avg confidence: {np.mean(landmark_confidences):.2f})", file=sys.stderr)
-                        else:
-                            print(f"Frame {frame_idx}: Low-quality hand detection rejected", file=sys.stderr)
-                else:
-                    print(f"Frame {frame_idx}: No hands detected with reasonable confidence", file=sys.stderr)
-                
-                enhanced_hand_positions.append(frame_hands)
-                
-            except Exception as e:
-                print(f"Frame {frame_idx} processing error: {e}", file=sys.stderr)
-                enhanced_hand_positions.append([])
-        
-        # Use enhanced positions if we got any HIGH-QUALITY hands
-        if any(len(frame_hands) > 0 for frame_hands in enhanced_hand_positions):
-            hand_positions = enhanced_hand_positions
-            print(f"Using high-quality MediaPipe detection with {sum(len(f) for f in hand_positions)} total hand detections", file=sys.stderr)
-        else:
-            print(f"No high-quality hands detected - SKIPPING movement-based fallback to prevent false positives", file=sys.stderr)
-            # NO FALLBACK to movement detection - if no good hands, return no detection
-            return {
-                'detected': False,
-                'confidence': 0.0,
-                'pattern': "no_hands_detected",
-                'tap_count': 0,
-                'clap_count': 0,
-                'tapping_score': 0.0,
-                'clapping_score': 0.0,
-                'analysis_type': 'no_hands_early_exit'
-            }
-            
+        with stage("decode"):
+            b64 = frame_data.split(',', 1)[1] if ',' in frame_data else frame_data
+            frame_array = np.frombuffer(base64.b64decode(b64), dtype=np.uint8)
+            frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
     except Exception as e:
-        print(f"MediaPipe enhancement failed: {e}", file=sys.stderr)
-    
-    # METHOD 1: SMART MOVEMENT DETECTION (detects actual tapping motion)
-    movement_taps = 0
-    movement_score = 0.0
-    
-    if len(frames) >= 2:
+        log.debug("Frame decode error: %s", e)
+        frame = None
+    if frame is None:
+        metrics.inc("decode_errors_total", decoder="cv2")
+    return frame
+
+
+def _rgb_frames(frames_bgr: List[Any]) -> List[Any]:
+    """BGR → RGB copies for MediaPipe (None stays None)."""
+    import cv2
+
+    with stage("decode"):
+        return [None if f is None else cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames_bgr]
+
+
+def _gray_frames(frames_bgr: List[Any]) -> List[Any]:
+    """Full-frame grayscale copies for the frame-difference statistics."""
+    import cv2
+
+    return [None if f is None else cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames_bgr]
+
+
+def _boost_contrast(frame_rgb: Any) -> Any:
+    """Slight contrast/brightness boost applied before sit/stand pose detection."""
+    import cv2
+
+    return cv2.convertScaleAbs(frame_rgb, alpha=1.1, beta=10)
+
+
+def _process_frames(graph: Any, name: str, frames_rgb: List[Any], found: Any) -> List[Any]:
+    """``graph.process`` on every frame, counted under *name* in the metrics.
+
+    Returns the MediaPipe results per frame: None where the frame is missing
+    or processing failed. ``found(results)`` picks the landmarks whose
+    presence counts as a detection.
+    """
+
+    out: List[Any] = [None] * len(frames_rgb)
+    for frame_idx, rgb in enumerate(frames_rgb):
+        if rgb is None:
+            continue
         try:
-            import base64
-            import cv2
-            import numpy as np
-            
-            print(f"Starting SMART movement analysis (detects actual tapping motion)...", file=sys.stderr)
-            
-            total_frame_diff = 0
-            valid_comparisons = 0
-            
-            for frame_idx in range(1, len(frames)):
-                try:
-                    # Decode current and previous frames
-                    curr_frame_bytes = base64.b64decode(frames[frame_idx].split(',')[1])
-                    prev_frame_bytes = base64.b64decode(frames[frame_idx-1].split(',')[1])
-                    
-                    curr_array = np.frombuffer(curr_frame_bytes, dtype=np.uint8)
-                    prev_array = np.frombuffer(prev_frame_bytes, dtype=np.uint8)
-                    
-                    curr_frame = cv2.imdecode(curr_array, cv2.IMREAD_COLOR)
-                    prev_frame = cv2.imdecode(prev_array, cv2.IMREAD_COLOR)
-                    
-                    if curr_frame is not None and prev_frame is not None:
-                        # Convert to grayscale for simpler comparison
-                        curr_gray = cv2.cvtColor(curr_frame, cv2.COLOR_BGR2GRAY)
-                        prev_gray = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
-                        
-                        # Resize to same size if needed
-                        if curr_gray.shape != prev_gray.shape:
-                            h, w = min(curr_gray.shape[0], prev_gray.shape[0]), min(curr_gray.shape[1], prev_gray.shape[1])
-                            curr_gray = cv2.resize(curr_gray, (w, h))
-                            prev_gray = cv2.resize(prev_gray, (w, h))
-                        
-                        # Calculate simple frame difference
-                        diff = cv2.absdiff(curr_gray, prev_gray)
-                        
-                        # Ensure numpy ndarray for type-checker clarity
-                        diff_np = np.asarray(diff)
-                        
-                        # EXTREMELY PERMISSIVE: Count any pixels that changed by more than 10
-                        changed_pixels = int(np.sum(diff_np > 10))  # Very low threshold  # type: ignore[operator]
-                        total_pixels = diff_np.size
-                        change_ratio = changed_pixels / total_pixels
-                        
-                        # Average intensity of changes
-                        avg_intensity = float(np.mean(diff_np))  # type: ignore[arg-type]
-                        
-                        # Combined movement score
-                        frame_movement = change_ratio * 0.7 + (avg_intensity / 255) * 0.3
-                        total_frame_diff += frame_movement
-                        valid_comparisons += 1
-                        
-                        print(f"Frame {frame_idx}: changed_pixels={changed_pixels}, change_ratio={change_ratio:.4f}, avg_intensity={avg_intensity:.1f}, movement={frame_movement:.4f}", file=sys.stderr)
-                        
-                        # STRICT: Only detect significant intentional movements
-                        if change_ratio > 0.12 and avg_intensity > 50:  # Raised thresholds
-                            movement_taps += 1
-                            print(f"Frame {frame_idx}: SIGNIFICANT TAPPING MOTION DETECTED! (change_ratio={change_ratio:.4f}, avg_intensity={avg_intensity:.1f})", file=sys.stderr)
-                    
-                except Exception as e:
-                    print(f"Frame {frame_idx} comparison error: {e}", file=sys.stderr)
-                    continue
-            
-            # Calculate overall movement with STRICT requirements
-            if valid_comparisons > 0:
-                avg_movement = total_frame_diff / valid_comparisons
-                
-                # STRICT SCORING: Require multiple significant movements for tapping detection
-                if movement_taps >= 5 and avg_movement > 0.03:  # Need at least 5 taps AND larger movement
-                    movement_score = min(0.6, max(0.3, avg_movement * 20 + movement_taps * 0.1))
-                    print(f"REPETITIVE TAPPING DETECTED! avg_movement={avg_movement:.6f}, movement_taps={movement_taps}, score={movement_score:.3f}", file=sys.stderr)
-                else:
-                    print(f"No repetitive tapping pattern: avg_movement={avg_movement:.6f}, movement_taps={movement_taps} (need 5+ taps)", file=sys.stderr)
-            else:
-                print(f"No valid frame comparisons possible", file=sys.stderr)
-                
+            with stage("mediapipe"):
+                results = graph.process(rgb)
         except Exception as e:
-            print(f"Smart movement detection failed: {e}", file=sys.stderr)
-    
-    # If we detected movement, use it regardless of hand detection
-    if movement_score > 0:
-        tapping_score = max(tapping_score, movement_score)
-        tap_count = max(tap_count, movement_taps, 1)  # At least 1 tap if movement detected
-    
-    # METHOD 2: Original MediaPipe hand analysis (if any hands detected)
-    if any(len(frame_hands) > 0 for frame_hands in hand_positions):
-        print(f"Running MediaPipe hand analysis on {sum(len(f) for f in hand_positions)} hand detections...", file=sys.stderr)
-        
-        # Original hand analysis code with lower thresholds
-        if len(hand_positions) >= 2:
-            for hand_idx in range(2):
-                position_history = []
-                
-                for frame_hands in hand_positions:
-                    if len(frame_hands) > hand_idx:
-                        position_history.append(frame_hands[hand_idx])
-                
-                if len(position_history) >= 2:
-                    y_positions = [pos[1] for pos in position_history]
-                    x_positions = [pos[0] for pos in position_history]
-                    
-                    total_movement = 0
-                    individual_taps = 0
-                    
-                    for i in range(1, len(y_positions)):
-                        y_movement = abs(y_positions[i] - y_positions[i-1])
-                        x_movement = abs(x_positions[i] - x_positions[i-1])
-                        frame_movement = (y_movement**2 + x_movement**2)**0.5
-                        total_movement += frame_movement
-                        
-                        if frame_movement > 15:  # Much higher threshold - require substantial movement
-                            individual_taps += 1
-                            print(f"Hand tap motion detected at frame {i}: movement={frame_movement:.1f}px", file=sys.stderr)
-                    
-                    avg_movement = total_movement / max(1, len(y_positions) - 1)
-                    
-                    # STRICT: Need multiple taps AND significant average movement
-                    if avg_movement > 10 and individual_taps >= 3:  # Much higher thresholds
-                        tapping_score = max(tapping_score, min(0.6, avg_movement * 0.05 + individual_taps * 0.15))
-                        tap_count = max(tap_count, max(1, individual_taps))
-                        print(f"Hand {hand_idx}: MediaPipe repetitive tapping detected - movements={individual_taps}, avg_movement={avg_movement:.1f}, score={tapping_score:.3f}", file=sys.stderr)
-                    else:
-                        print(f"Hand {hand_idx}: Not enough tapping activity - movements={individual_taps}, avg_movement={avg_movement:.1f} (need 3+ taps, avg>10)", file=sys.stderr)
-    
-    # METHOD 3: Clap detection (if 2+ hands detected)
-    clap_distances = []
-    
-    for frame_hands in hand_positions:
-        if len(frame_hands) >= 2:
-            hand1, hand2 = frame_hands[0], frame_hands[1]
-            distance = ((hand1[0] - hand2[0])**2 + (hand1[1] - hand2[1])**2)**0.5
-            clap_distances.append(distance)
-    
-    if len(clap_distances) >= 2:
-        min_distance = min(clap_distances)
-        max_distance = max(clap_distances)
-        distance_range = max_distance - min_distance
-        
-        clap_events = sum(1 for d in clap_distances if d < 120)  # Slightly more permissive
-        
-        if distance_range > 40 and min_distance < 80:  # Much higher thresholds for actual clapping
-            clap_count = max(1, clap_events // 3)  # More conservative clap counting
-            clapping_score = min(0.6, distance_range * 0.02 + clap_count * 0.3)
-            print(f"Clapping detected - distance_range={distance_range:.1f}, min_dist={min_distance:.1f}, claps={clap_count}, score={clapping_score:.3f}", file=sys.stderr)
-    
-    # Combine all detection methods
-    final_score = max(tapping_score, clapping_score)
-    final_tap_count = max(tap_count, movement_taps, 1 if final_score > 0.4 else 0)  # Higher threshold for reporting
-    
-    # STRICT Pattern determination - higher thresholds
-    if clapping_score > tapping_score and clap_count > 0 and clapping_score > 0.4:
-        pattern = "clapping"
-        confidence = clapping_score
-        count = clap_count
-    elif final_score > 0.4:  # Much higher threshold - only detect clear tapping
-        pattern = "tapping"
-        confidence = final_score
-        count = final_tap_count
-    else:
-        pattern = "none"
-        confidence = 0.0
-        count = 0
-    
-    print(f"FINAL TAPPING ANALYSIS (STRICT): pattern={pattern}, confidence={confidence:.3f}, count={count}", file=sys.stderr)
-    
-    # ULTRA-STRICT: Require VERY clear evidence of intentional tapping
-    # Only detect if we have substantial evidence from multiple methods
-    ultra_strict_detected = False
-    ultra_strict_confidence = 0.0
-    
-    if pattern != "none":
-        # Must have BOTH high confidence AND multiple detection methods agreeing
-        methods_detected = 0
-        if movement_taps >= 6:  # Require **at least 6** movement-based tap indications
-            methods_detected += 1
-        if tap_count >= 5:  # Require **at least 5** MediaPipe-based taps
-            methods_detected += 1
-        if confidence > 0.65:  # Raise required confidence slightly
-            methods_detected += 1
-
-        # Additional safeguard – insist on **minimum total taps** (movement or landmark) before allowing detection
-        min_total_taps = max(movement_taps, tap_count)
-
-        if methods_detected >= 2 and confidence > 0.6 and min_total_taps >= 5:
-            ultra_strict_detected = True
-            ultra_strict_confidence = confidence
-        else:
-            print(
-                f"ULTRA-STRICT REJECTION: methods_detected={methods_detected}, confidence={confidence:.3f}, total_taps={min_total_taps} (need ≥2 methods, ≥0.6 conf, ≥5 taps)",
-                file=sys.stderr,
+            log.debug("Frame %d processing error: %s", frame_idx, e)
+            continue
+        _mp_found(name, found(results))
+        out[frame_idx] = results
+    return out
+
+
+def _gray_diff_stats(grays: List[Any], pixel_threshold: int, y_start_ratio: float = 0.0) -> Any:
+    """Per-pair (changed-pixel ratio, mean abs diff) between consecutive frames.
+
+    Index ``t`` describes frames ``t-1 → t``; index 0 and pairs where either
+    frame failed to decode are NaN. ``y_start_ratio`` restricts the comparison
+    to the lower part of each frame (used for feet).
+    """
+    import cv2
+
+    n = len(grays)
+    change_ratio = np.full(n, np.nan)
+    avg_intensity = np.full(n, np.nan)
+    if y_start_ratio:
+        grays = [None if g is None else g[int(g.shape[0] * y_start_ratio):, :] for g in grays]
+
+    for idx in range(1, n):
+        curr_gray, prev_gray = grays[idx], grays[idx - 1]
+        if curr_gray is None or prev_gray is None:
+            continue
+        try:
+            # Resize to same size if needed
+            if curr_gray.shape != prev_gray.shape:
+                h, w = min(curr_gray.shape[0], prev_gray.shape[0]), min(curr_gray.shape[1], prev_gray.shape[1])
+                curr_gray = cv2.resize(curr_gray, (w, h))
+                prev_gray = cv2.resize(prev_gray, (w, h))
+            diff_np = np.asarray(cv2.absdiff(curr_gray, prev_gray))
+            change_ratio[idx] = int(np.sum(diff_np > pixel_threshold)) / diff_np.size  # type: ignore[operator]
+            avg_intensity[idx] = float(np.mean(diff_np))  # type: ignore[arg-type]
+        except Exception as e:
+            log.debug("Frame %d comparison error: %s", idx, e)
+    return change_ratio, avg_intensity
+
+
+def _frame_diff_stats(frames_bgr: List[Any], pixel_threshold: int, y_start_ratio: float = 0.0) -> Any:
+    """`_gray_diff_stats` over decoded BGR frames."""
+
+    return _gray_diff_stats(_gray_frames(frames_bgr), pixel_threshold, y_start_ratio)
+
+
+def _hand_features(frames_rgb: List[Any], results: Optional[List[Any]], diff: Any) -> Dict[str, Any]:
+    """Hand-tapping feature dict from per-frame Hands results and frame diffs.
+
+    ``results`` is None when the Hands graph could not be built.
+    """
+
+    n = len(frames_rgb)
+    hand_xy = np.full((n, 2, 2), np.nan)
+    hand_confidence = np.full((n, 2), np.nan)
+    frame_h = np.full(n, np.nan)
+    for frame_idx, res in enumerate(results or []):
+        if res is None:
+            continue
+        shape = frames_rgb[frame_idx].shape
+        frame_h[frame_idx] = shape[0]
+        if not res.multi_hand_landmarks:
+            continue
+        for slot, hand_landmarks in enumerate(res.multi_hand_landmarks[:2]):
+            confidences = [lm.visibility for lm in hand_landmarks.landmark if hasattr(lm, 'visibility')]
+            x_coords = [lm.x for lm in hand_landmarks.landmark]
+            y_coords = [lm.y for lm in hand_landmarks.landmark]
+            hand_xy[frame_idx, slot] = (
+                sum(x_coords) / len(x_coords) * shape[1],
+                sum(y_coords) / len(y_coords) * shape[0],
             )
-    
+            hand_confidence[frame_idx, slot] = np.mean(confidences) if confidences else np.nan
+
+    change_ratio, avg_intensity = diff
+    if log.isEnabledFor(logging.INFO):
+        log.info(
+            "Hand features: %d hand detections, %d frame comparisons",
+            int(np.sum(~np.isnan(hand_confidence))), int(np.sum(~np.isnan(change_ratio))),
+        )
     return {
-        'detected': ultra_strict_detected,  # Extremely conservative detection
-        'confidence': ultra_strict_confidence,
-        'pattern': pattern if ultra_strict_detected else "none",
-        'tap_count': count if ultra_strict_detected else 0,
-        'clap_count': clap_count if ultra_strict_detected else 0,
-        'tapping_score': tapping_score,
-        'clapping_score': clapping_score,
-        'analysis_type': 'ultra_strict_multi_method_validation'
+        "mediapipe_ok": results is not None,
+        "hand_xy": hand_xy,
+        "hand_confidence": hand_confidence,
+        "frame_h": frame_h,
+        "change_ratio": change_ratio,
+        "avg_intensity": avg_intensity,
     }
 
 
+def _extract_hand_tapping_features(frames: List[str]) -> Dict[str, Any]:
+    """Feature-extraction stage for hand tapping (see `heuristics.decide_hand_tapping`).
+
+    Records up to two MediaPipe hand centres per frame (pixels) with their mean
+    landmark visibility, plus full-frame difference statistics.
+    """
+
+    frames_bgr = [_decode_bgr(f) for f in frames]
+    frames_rgb = _rgb_frames(frames_bgr)
+    try:
+        # REASONABLE hand detection settings - not ultra-sensitive
+        with stage("mediapipe_init"):
+            hands = _cached_graph(mp.solutions.hands.Hands, **_HANDS_CONFIG)
+    except Exception as e:
+        log.warning("MediaPipe enhancement failed: %s", e)
+        hands = None
+
+    results = None
+    if hands is not None:
+        results = _process_frames(hands, "hands", frames_rgb, lambda r: r.multi_hand_landmarks)
+    with stage("frame_diff"):
+        diff = _frame_diff_stats(frames_bgr, pixel_threshold=10)
+    return _hand_features(frames_rgb, results, diff)
+
+
+def _analyze_hand_tapping_patterns(hand_positions, frames, params=None, features=None):
+    """
+    STRICT hand tapping analysis - detects only actual repetitive tapping patterns:
+    1. Requires hands to be visible with decent confidence
+    2. Analyzes for repetitive movement patterns (not just any movement)
+    3. Requires multiple significant movements to qualify as tapping
+
+    Runs `_extract_hand_tapping_features` then the pure decision in
+    `heuristics`; ``params`` overrides `HAND_TAPPING_PARAMS`. Hand positions
+    are always re-detected, so ``hand_positions`` is ignored. ``features``
+    (from `analyze_all`) skips the extraction.
+    """
+    log.info("Analyzing %d frames for ACTUAL hand tapping patterns (strict mode)...", len(frames))
+
+    if features is None:
+        features = _extract_hand_tapping_features(frames)
+    with stage("decision"):
+        result = hand_tapping_result(features, params)
+
+    log.info(
+        "FINAL TAPPING ANALYSIS (STRICT): detected=%s, pattern=%s, confidence=%.3f, tapping_score=%.3f, clapping_score=%.3f",
+        result['detected'], result['pattern'], result['confidence'], result['tapping_score'], result['clapping_score'],
+    )
+    return result
+
+
 def _hand_crop(img: Image.Image) -> Image.Image | None:
     """Return crop around first detected hand suitable for tapping models."""
     
@@ -541,11 +583,12 @@ def _hand_crop(img: Image.Image) -> Image.Image | None:
     img = _enhance_image_for_detection(img)
 
     rgb = np.array(img)
-    results = _mp_hands.process(rgb)
+    with stage("mediapipe"):
+        results = _mp_hands.process(rgb)
     
     # If no hand landmarks, try to detect any motion in upper body area (hands might be partially visible)
-    if not results.multi_hand_landmarks:
-        print(f"MediaPipe hands: No landmarks detected in {img.size} image", file=sys.stderr)
+    if not _mp_found("hands", results.multi_hand_landmarks):
+        log.debug("MediaPipe hands: No landmarks detected in %s image", img.size)
         
         # MUCH MORE CONSERVATIVE: Only use upper body if there's significant hand-like movement
         h, w, _ = rgb.shape
@@ -566,10 +609,10 @@ def _hand_crop(img: Image.Image) -> Image.Image | None:
             if variation > 35 and edges > 8:  # Much higher thresholds
                 crop_pil = Image.fromarray(crop)
                 crop_pil = crop_pil.resize((224, 224), Image.Resampling.LANCZOS)
-                print(f"Using hand-specific area for detection (var={variation:.1f}, edges={edges:.1f}): {crop.shape}", file=sys.stderr)
+                log.debug("Using hand-specific area for detection (var=%.1f, edges=%.1f): %s", variation, edges, crop.shape)
                 return crop_pil
             else:
-                print(f"Upper body area insufficient for hand detection (var={variation:.1f}, edges={edges:.1f})", file=sys.stderr)
+                log.debug("Upper body area insufficient for hand detection (var=%.1f, edges=%.1f)", variation, edges)
         
         return None
 
@@ -584,7 +627,7 @@ def _hand_crop(img: Image.Image) -> Image.Image | None:
     y_min, y_max = max(min(ys) - 80, 0), min(max(ys) + 80, h)  # Even larger crop area
     
     if x_max - x_min < 40 or y_max - y_min < 40:
-        print(f"Hand crop too small: {x_max-x_min}x{y_max-y_min}, using full upper area", file=sys.stderr)
+        log.debug("Hand crop too small: %dx%d, using full upper area", x_max - x_min, y_max - y_min)
         # Fallback to upper body area
         x_min, x_max = int(w * 0.1), int(w * 0.9)
         y_min, y_max = int(h * 0.2), int(h * 0.8)
@@ -605,10 +648,11 @@ def _foot_crop(img: Image.Image) -> Image.Image | None:
     img = _enhance_image_for_detection(img)
     
     rgb = np.array(img)
-    results = _mp_pose.process(rgb)
+    with stage("mediapipe"):
+        results = _mp_pose.process(rgb)
     
-    if not results.pose_landmarks:
-        print(f"MediaPipe pose: No landmarks detected in {img.size} image", file=sys.stderr)
+    if not _mp_found("pose", results.pose_landmarks):
+        log.debug("MediaPipe pose: No landmarks detected in %s image", img.size)
         # DO NOT use fallback crops - no pose means no foot detection possible
         # This will force the system to use movement analysis instead of PyTorch model
         return None
@@ -624,7 +668,7 @@ def _foot_crop(img: Image.Image) -> Image.Image | None:
             visible_landmarks.append(landmark)
     
     if len(visible_landmarks) < 1:
-        print(f"No visible lower body landmarks detected", file=sys.stderr)
+        log.debug("No visible lower body landmarks detected")
         # DO NOT use fallback crops - no feet visible means no detection possible
         # This will force the system to use movement analysis instead of PyTorch model
         return None
@@ -637,7 +681,7 @@ def _foot_crop(img: Image.Image) -> Image.Image | None:
     y_min, y_max = max(min(ys) - 60, 0), min(max(ys) + 60, h)  # Large crop area
     
     if x_max - x_min < 30 or y_max - y_min < 30:
-        print(f"Lower body crop too small: {x_max-x_min}x{y_max-y_min}", file=sys.stderr)
+        log.debug("Lower body crop too small: %dx%d", x_max - x_min, y_max - y_min)
         # Use wider area
         x_min, x_max = int(w * 0.1), int(w * 0.9)
         y_min, y_max = max(int(min(ys) - 60), 0), h
@@ -648,39 +692,105 @@ def _foot_crop(img: Image.Image) -> Image.Image | None:
     return Image.fromarray(crop)
 
 
+# Left/right hip, knee and ankle
+_LOWER_BODY_IDX = (23, 24, 25, 26, 27, 28)
+
+
+def _full_body_visible(visibility: Sequence[float]) -> bool:
+    """At least 4 of the 6 lower-body landmarks have visibility > 0.3."""
+    return sum(1 for idx in _LOWER_BODY_IDX if float(visibility[idx]) > 0.3) >= 4
+
+
 def _pose_xy(img: Image.Image) -> List[float] | None:
-    """Extract 33 (x,y) pose landmarks as flat list normalized to image size."""
+    """Extract 33 (x,y) pose landmarks as flat list normalized to image size.
+
+    Returns None if the **full body is not visible** (see
+    `_full_body_visible`), so frames that do not capture the whole body do
+    not feed false sit/stand detections.
+    """
     rgb = np.array(img)
-    res = _mp_pose.process(rgb)
-    if not res.pose_landmarks:
+    with stage("mediapipe"):
+        res = _mp_pose.process(rgb)
+    if not _mp_found("pose", res.pose_landmarks):
+        return None
+    landmarks = res.pose_landmarks.landmark
+    if not _full_body_visible([lm.visibility for lm in landmarks]):
         return None
-    h, w, _ = rgb.shape
     coords = []
-    for lm in res.pose_landmarks.landmark:
+    for lm in landmarks:
         coords.extend([lm.x, lm.y])  # already normalized
     return coords
 
 
+def _sit_stand_uses_model() -> bool:
+    return SIT_STAND_MODE != "transitions" and MODELS.get("sit_stand") is not None
+
+
+def _sit_stand_model_result(model: Any, frames: List[Any]) -> Dict[str, Any]:
+    """Sit/stand from the pose-sequence model (``SIT_STAND_MODE=model``).
+
+    *frames* are images (or decoded frames), landmark-payload frames, or
+    already-extracted 66-value (x, y) pose vectors. Frames without the full
+    body in view are skipped.
+    """
+
+    seq = []
+    for i, f in enumerate(frames):
+        try:
+            if isinstance(f, dict):
+                pose = f.get("pose")
+                if pose is None:
+                    continue
+                pose = np.asarray(pose, dtype=np.float64)
+                if _full_body_visible(pose[:, 3]):
+                    seq.append(pose[:, :2].reshape(-1).tolist())
+            elif isinstance(f, (str, np.ndarray)):
+                coords = _pose_xy(_decode_image(f))
+                if coords is not None:
+                    seq.append(coords)
+            elif f is not None:
+                seq.append([float(v) for v in f])
+        except Exception as e:
+            log.debug("Frame %d pose failed: %s: %s", i, type(e).__name__, e)
+    if not seq:
+        return {"detected": False, "confidence": 0.0, "error": "insufficient_pose_frames"}
+
+    with stage("tensor"):
+        seq_tensor = torch.tensor(seq, dtype=torch.float32).unsqueeze(0).to(DEVICE)
+    with stage("forward"):
+        logits = model(seq_tensor)
+        prob = torch.softmax(logits, dim=1)[0, 1].item()
+    prob = float(max(0.0, min(1.0, prob)))
+    return {"detected": bool(prob > SIT_STAND_MODEL_THRESHOLD), "confidence": round(prob, 4)}
+
+
 def _analyze_frame_movement(frames: List[str]) -> float:
     """Analyze frame sequence for movement/changes to generate realistic fallback confidence."""
     if len(frames) < 2:
         return 0.1  # Lower baseline
     
+    try:
+        # Convert to grayscale for comparison (an odd last frame is unpaired)
+        grays = [_decode_image(f).convert('L') for f in frames[: len(frames) // 2 * 2]]
+        return _movement_confidence(grays)
+    except Exception as e:
+        log.warning("Movement analysis error: %s", e)
+        return 0.1  # Lower default
+
+
+def _movement_confidence(grays: List[Image.Image]) -> float:
+    """Fallback movement confidence from grayscale ('L') frames."""
+    if len(grays) < 2:
+        return 0.1  # Lower baseline
+
     try:
         # Analyze multiple frame pairs for better movement detection
         movement_scores = []
         
-        for i in range(0, len(frames) - 1, 2):  # Compare every other frame
-            img1 = _decode_image(frames[i])
-            img2 = _decode_image(frames[i + 1])
-            
-            # Convert to grayscale for comparison
-            gray1 = img1.convert('L')
-            gray2 = img2.convert('L')
-            
+        for i in range(0, len(grays) - 1, 2):  # Compare every other frame
             # Resize to consistent size for comparison
-            gray1 = gray1.resize((100, 100))
-            gray2 = gray2.resize((100, 100))
+            gray1 = grays[i].resize((100, 100))
+            gray2 = grays[i + 1].resize((100, 100))
             
             # Calculate frame difference
             arr1 = np.array(gray1, dtype=np.float32)
@@ -721,356 +831,153 @@ def _analyze_frame_movement(frames: List[str]) -> float:
             # Scale to reasonable confidence range
             confidence = float(min(0.7, combined_score * 3.0 + 0.15))  # More reasonable multiplier
         
-        print(f"Movement analysis: max={max_movement:.3f}, avg={avg_movement:.3f}, combined={combined_score:.3f}, final={confidence:.3f}", file=sys.stderr)
+        log.info("Movement analysis: max=%.3f, avg=%.3f, combined=%.3f, final=%.3f", max_movement, avg_movement, combined_score, confidence)
         
         return confidence
         
     except Exception as e:
-        print(f"Movement analysis error: {e}", file=sys.stderr)
+        log.warning("Movement analysis error: %s", e)
         return 0.1  # Lower default
 
 
-def _analyze_foot_tapping_patterns(frames):
+def _foot_features(frames_rgb: List[Any], results: Optional[List[Any]], diff: Any) -> Dict[str, Any]:
+    """Foot-tapping feature dict from per-frame Pose results and lower-frame diffs.
+
+    ``results`` is None when the Pose graph could not be built.
+    """
+
+    n = len(frames_rgb)
+    ankle = np.full((n, 2, 3), np.nan)
+    shoulder = np.full((n, 2, 2), np.nan)
+    hip = np.full((n, 2, 2), np.nan)
+    frame_wh = np.full((n, 2), np.nan)
+    for frame_idx, res in enumerate(results or []):
+        if res is None:
+            continue
+        shape = frames_rgb[frame_idx].shape
+        frame_wh[frame_idx] = (shape[1], shape[0])
+        if not res.pose_landmarks:
+            continue
+        landmarks = res.pose_landmarks.landmark
+        # 27/28 = ankles, 11/12 = shoulders, 23/24 = hips (left, right)
+        for slot, lm_idx in enumerate((27, 28)):
+            lm = landmarks[lm_idx]  # type: ignore[index]
+            ankle[frame_idx, slot] = (lm.x, lm.y, lm.visibility)
+        for slot, lm_idx in enumerate((11, 12)):
+            lm = landmarks[lm_idx]  # type: ignore[index]
+            shoulder[frame_idx, slot] = (lm.y, lm.visibility)
+        for slot, lm_idx in enumerate((23, 24)):
+            lm = landmarks[lm_idx]  # type: ignore[index]
+            hip[frame_idx, slot] = (lm.y, lm.visibility)
+
+    change_ratio, avg_intensity = diff
+    if log.isEnabledFor(logging.INFO):
+        log.info(
+            "Foot features: %d frames analysed, %d poses detected",
+            int(np.sum(~np.isnan(frame_wh[:, 0]))), int(np.sum(~np.isnan(ankle[:, 0, 0]))),
+        )
+    return {
+        "mediapipe_ok": results is not None,
+        "ankle": ankle,
+        "shoulder": shoulder,
+        "hip": hip,
+        "frame_wh": frame_wh,
+        "change_ratio": change_ratio,
+        "avg_intensity": avg_intensity,
+    }
+
+
+def _extract_foot_tapping_features(frames: List[str]) -> Dict[str, Any]:
+    """Feature-extraction stage for foot tapping (see `heuristics.decide_foot_tapping`).
+
+    Records ankle x/y/visibility and shoulder/hip y/visibility (normalised)
+    per frame, plus frame differences over the lower quarter of the frame.
+    """
+
+    frames_bgr = [_decode_bgr(f) for f in frames]
+    frames_rgb = _rgb_frames(frames_bgr)
+    try:
+        # REASONABLE pose detection settings
+        with stage("mediapipe_init"):
+            pose = _cached_graph(mp.solutions.pose.Pose, **_FEET_POSE_CONFIG)
+    except Exception as e:
+        log.warning("MediaPipe pose detection failed: %s", e)
+        pose = None
+
+    results = None
+    if pose is not None:
+        results = _process_frames(pose, "pose", frames_rgb, lambda r: r.pose_landmarks)
+    with stage("frame_diff"):
+        diff = _frame_diff_stats(frames_bgr, pixel_threshold=30, y_start_ratio=0.75)
+    return _foot_features(frames_rgb, results, diff)
+
+
+def _analyze_foot_tapping_patterns(frames, params=None, features=None):
     """
     STRICT foot tapping analysis - detects only actual repetitive foot tapping patterns:
     1. Requires feet/ankles to be visible with decent confidence
     2. Analyzes for repetitive movement patterns in foot area (not just any movement)
     3. Requires multiple significant movements to qualify as foot tapping
+
+    Runs `_extract_foot_tapping_features` then the pure decision in
+    `heuristics`; ``params`` overrides `FOOT_TAPPING_PARAMS`. ``features``
+    (from `analyze_all`) skips the extraction.
     """
-    print(f"Analyzing {len(frames)} frames for ACTUAL foot tapping patterns (strict mode)...", file=sys.stderr)
-    
-    # Try MediaPipe pose detection with REASONABLE confidence
-    try:
-        import mediapipe as mp
-        mp_pose = mp.solutions.pose
-        
-        # REASONABLE pose detection settings
-        pose = mp_pose.Pose(
-            static_image_mode=True,
-            model_complexity=1,
-            min_detection_confidence=0.6,  # Reasonable confidence
-            min_tracking_confidence=0.5    # Reasonable tracking
+    log.info("Analyzing %d frames for ACTUAL foot tapping patterns (strict mode)...", len(frames))
+
+    if features is None:
+        features = _extract_foot_tapping_features(frames)
+    with stage("decision"):
+        result = foot_tapping_result(features, params)
+
+    log.info(
+        "FINAL FOOT TAPPING ANALYSIS (ULTRA-STRICT): detected=%s, confidence=%.3f, analysis_type=%s",
+        result['detected'], result['confidence'], result['analysis_type'],
+    )
+    return result
+
+
+def _sit_stand_features(results: Optional[List[Any]], n: int) -> Dict[str, Any]:
+    """Sit/stand feature dict from the Pose results of the last *n* frames."""
+
+    landmarks_out = np.full((n, len(SIT_STAND_LANDMARKS), 3), np.nan)
+    for frame_idx, res in enumerate(results or []):
+        if res is None or not res.pose_landmarks:
+            continue
+        lms = res.pose_landmarks.landmark
+        for slot, lm_idx in enumerate(SIT_STAND_LANDMARKS):
+            lm = lms[lm_idx]  # type: ignore[index]
+            landmarks_out[frame_idx, slot] = (lm.x, lm.y, lm.visibility)
+
+    if log.isEnabledFor(logging.INFO):
+        log.info(
+            "Sit-stand features: %d/%d frames with pose",
+            int(np.sum(~np.isnan(landmarks_out[:, 0, 0]))), n,
         )
-        
-        print(f"MediaPipe pose detection for feet/ankles with REASONABLE confidence (0.6)...", file=sys.stderr)
-        
-        foot_positions = []
-        rel_y_list = []      # normalized ankle y positions (ankles)
-        shoulder_y_list = [] # normalized shoulder y positions
-        qualified_shoulder_frames = 0
-        qualified_ankle_frames = 0
-        qualified_fullbody_frames = 0  # frames where shoulders, hips, and ankles satisfy conditions
-        
-        hip_y_list = []  # for body span check
-        
-        for frame_idx, frame_data in enumerate(frames):
-            try:
-                # Decode frame
-                import base64
-                import cv2
-                import numpy as np
-                
-                frame_bytes = base64.b64decode(frame_data.split(',')[1])
-                frame_array = np.frombuffer(frame_bytes, dtype=np.uint8)
-                frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Try pose detection
-                results = pose.process(frame_rgb)
-                frame_feet = []
-                
-                if results.pose_landmarks:
-                    # Check ankle landmarks (27=left ankle, 28=right ankle)
-                    landmarks = results.pose_landmarks.landmark
-                    ankle_landmarks = [landmarks[27], landmarks[28]]  # type: ignore[index]
-                    shoulder_landmarks = [landmarks[11], landmarks[12]]
-                    
-                    ankles_visible = 0
-                    for ankle_idx, ankle in enumerate(ankle_landmarks):
-                        # Accept only ankles that are clearly in the lower half of the frame (y > 0.5)
-                        if ankle.visibility > 0.75 and ankle.y > 0.8:
-                            foot_x = ankle.x * frame.shape[1]
-                            foot_y = ankle.y * frame.shape[0]
-                            frame_feet.append((foot_x, foot_y))
-                            print(f"Frame {frame_idx}: High-quality {['left', 'right'][ankle_idx]} ankle detected (confidence: {ankle.visibility:.2f})", file=sys.stderr)
-                            rel_y_list.append(ankle.y)
-                            ankles_visible += 1
-                        else:
-                            print(f"Frame {frame_idx}: Low-quality {['left', 'right'][ankle_idx]} ankle detection rejected", file=sys.stderr)
-
-                    # Record shoulders for body-span check when both shoulders visible
-                    shoulder_vis = 0
-                    for sh_idx, sh in enumerate(shoulder_landmarks):
-                        if sh.visibility > 0.7 and sh.y < 0.35:
-                            shoulder_y_list.append(sh.y)
-                            shoulder_vis += 1
-
-                    if shoulder_vis == 2:
-                        qualified_shoulder_frames += 1
-                    if ankles_visible == 2:
-                        qualified_ankle_frames += 1
-
-                    hip_landmarks = [landmarks[23], landmarks[24]]  # type: ignore[index]
-
-                    hips_visible = 0
-                    for hip in hip_landmarks:
-                        if hip.visibility > 0.75 and hip.y > 0.55 and hip.y < 0.8:
-                            hip_y_list.append(hip.y)
-                            hips_visible += 1
-
-                    # Determine if this frame shows full body (shoulders near top, hips mid, ankles bottom)
-                    if shoulder_vis == 2 and hips_visible == 2 and ankles_visible == 2:
-                        qualified_fullbody_frames += 1
-                else:
-                    print(f"Frame {frame_idx}: No pose detected", file=sys.stderr)
-                
-                foot_positions.append(frame_feet)
-                
-            except Exception as e:
-                print(f"Frame {frame_idx} processing error: {e}", file=sys.stderr)
-                foot_positions.append([])
-        
-        # Require a MINIMUM number of ankle detections spread across frames to be confident that feet are actually visible.
-        min_foot_detections = 10  # need many ankle detections (across frames) to proceed
-        
-        total_foot_detections = sum(len(frame_feet) for frame_feet in foot_positions)
-        
-        if total_foot_detections < min_foot_detections:
-            print(
-                f"Too few ankle detections ({total_foot_detections} < {min_foot_detections}) – skipping foot-tapping analysis to avoid false positives",
-                file=sys.stderr,
-            )
-            return {
-                'detected': False,
-                'confidence': 0.0,
-                'pattern': 'too_few_ankle_detections',
-                'tap_count': 0,
-                'analysis_type': 'insufficient_ankles'
-            }
-        
-        # Require that shoulders are visible and that the vertical span shoulder→ankle covers at least half the frame height.
-        if not shoulder_y_list:
-            print("No reliable shoulder landmarks – body not fully in view; skipping foot analysis", file=sys.stderr)
-            return {
-                'detected': False,
-                'confidence': 0.0,
-                'pattern': 'no_shoulders',
-                'tap_count': 0,
-                'analysis_type': 'no_full_body'
-            }
-        
-        # Ensure we have enough frames where the entire body (shoulders, hips, ankles) is confidently visible.
-        if qualified_fullbody_frames < 3:
-            print(
-                f"Only {qualified_fullbody_frames} full-body frames detected – skipping foot tapping analysis",
-                file=sys.stderr,
-            )
-            return {
-                'detected': False,
-                'confidence': 0.0,
-                'pattern': 'not_full_body',
-                'tap_count': 0,
-                'analysis_type': 'insufficient_fullbody'
-            }
-        
-        avg_ankle_y = sum(rel_y_list) / len(rel_y_list) if rel_y_list else 0.0
-        
-        avg_shoulder_y = sum(shoulder_y_list) / len(shoulder_y_list)
-        avg_hip_y = sum(hip_y_list) / len(hip_y_list) if hip_y_list else 0.0
-        
-        # Full-body span using shoulders to ankles
-        body_span = avg_ankle_y - avg_shoulder_y  # normalized 0-1
-        
-        if body_span < 0.7:  # Require at least ~70 % of frame height to ensure full body
-            print(
-                f"Body span too small for reliable foot tap detection (span={body_span:.2f}); skipping.",
-                file=sys.stderr,
-            )
-            return {
-                'detected': False,
-                'confidence': 0.0,
-                'pattern': 'body_not_full',
-                'tap_count': 0,
-                'analysis_type': 'incomplete_body'
-            }
-        
-        print(f"Using high-quality pose detection with {sum(len(frame_feet) for frame_feet in foot_positions)} total foot detections", file=sys.stderr)
-        
-    except Exception as e:
-        print(f"MediaPipe pose detection failed: {e}", file=sys.stderr)
-        return {
-            'detected': False,
-            'confidence': 0.0,
-            'pattern': "pose_detection_failed",
-            'tap_count': 0,
-            'analysis_type': 'pose_detection_error'
-        }
-    
-    # STRICT MOVEMENT ANALYSIS for foot tapping
-    movement_taps = 0
-    movement_score = 0.0
-    
-    if len(frames) >= 2:
-        try:
-            import base64
-            import cv2
-            import numpy as np
-            
-            print(f"Starting STRICT foot movement analysis...", file=sys.stderr)
-            
-            total_frame_diff = 0
-            valid_comparisons = 0
-            
-            for frame_idx in range(1, len(frames)):
-                try:
-                    # Decode current and previous frames
-                    curr_frame_bytes = base64.b64decode(frames[frame_idx].split(',')[1])
-                    prev_frame_bytes = base64.b64decode(frames[frame_idx-1].split(',')[1])
-                    
-                    curr_array = np.frombuffer(curr_frame_bytes, dtype=np.uint8)
-                    prev_array = np.frombuffer(prev_frame_bytes, dtype=np.uint8)
-                    
-                    curr_frame = cv2.imdecode(curr_array, cv2.IMREAD_COLOR)
-                    prev_frame = cv2.imdecode(prev_array, cv2.IMREAD_COLOR)
-                    
-                    if curr_frame is not None and prev_frame is not None:
-                        # Focus on lower part of image where feet would be
-                        h, w = curr_frame.shape[:2]
-                        foot_area_y_start = int(h * 0.75)  # Lower 25% of image
-                        
-                        curr_gray = cv2.cvtColor(curr_frame[foot_area_y_start:, :], cv2.COLOR_BGR2GRAY)
-                        prev_gray = cv2.cvtColor(prev_frame[foot_area_y_start:, :], cv2.COLOR_BGR2GRAY)
-                        
-                        # Resize to same size if needed
-                        if curr_gray.shape != prev_gray.shape:
-                            min_h, min_w = min(curr_gray.shape[0], prev_gray.shape[0]), min(curr_gray.shape[1], prev_gray.shape[1])
-                            curr_gray = cv2.resize(curr_gray, (min_w, min_h))
-                            prev_gray = cv2.resize(prev_gray, (min_w, min_h))
-                        
-                        # Calculate frame difference in foot area
-                        diff = cv2.absdiff(curr_gray, prev_gray)
-                        
-                        # VERY STRICT: Require substantial changes in foot area
-                        diff_np = np.asarray(diff)
-                        changed_pixels = int(np.sum(diff_np > 30))  # type: ignore[operator]
-                        total_pixels = diff_np.size
-                        change_ratio = changed_pixels / total_pixels
-                        
-                        # Average intensity of changes
-                        avg_intensity = float(np.mean(diff_np))  # type: ignore[arg-type]
-                        
-                        # Combined movement score
-                        frame_movement = change_ratio * 0.7 + (avg_intensity / 255) * 0.3
-                        total_frame_diff += frame_movement
-                        valid_comparisons += 1
-                        
-                        print(f"Frame {frame_idx}: foot_area change_ratio={change_ratio:.4f}, avg_intensity={avg_intensity:.1f}, movement={frame_movement:.4f}", file=sys.stderr)
-                        
-                        # VERY STRICT: Only detect substantial foot movements
-                        if change_ratio > 0.12 and avg_intensity > 50:  # Much higher thresholds than hands
-                            movement_taps += 1
-                            print(f"Frame {frame_idx}: SIGNIFICANT FOOT TAPPING MOTION DETECTED! (change_ratio={change_ratio:.4f}, avg_intensity={avg_intensity:.1f})", file=sys.stderr)
-                
-                except Exception as e:
-                    print(f"Frame {frame_idx} comparison error: {e}", file=sys.stderr)
-                    continue
-            
-            # Calculate overall movement with VERY STRICT requirements
-            if valid_comparisons > 0:
-                avg_movement = total_frame_diff / valid_comparisons
-                
-                # VERY STRICT SCORING: Require multiple significant movements for foot tapping detection
-                if movement_taps >= 4 and avg_movement > 0.035:  # Need at least 4 taps AND substantial movement
-                    movement_score = min(0.6, max(0.3, avg_movement * 15 + movement_taps * 0.08))
-                    print(f"REPETITIVE FOOT TAPPING DETECTED! avg_movement={avg_movement:.6f}, movement_taps={movement_taps}, score={movement_score:.3f}", file=sys.stderr)
-                else:
-                    print(f"No repetitive foot tapping pattern: avg_movement={avg_movement:.6f}, movement_taps={movement_taps} (need 4+ taps, avg>0.035)", file=sys.stderr)
-            else:
-                print(f"No valid frame comparisons possible", file=sys.stderr)
-                
-        except Exception as e:
-            print(f"Strict foot movement detection failed: {e}", file=sys.stderr)
-    
-    # MediaPipe ankle position analysis
-    tap_count = 0
-    ankle_score = 0.0
-    
-    if any(len(frame_feet) > 0 for frame_feet in foot_positions):
-        print(f"Running MediaPipe ankle analysis on {sum(len(frame_feet) for frame_feet in foot_positions)} foot detections...", file=sys.stderr)
-        
-        if len(foot_positions) >= 2:
-            for foot_idx in range(2):  # Check left and right feet
-                position_history = []
-                
-                for frame_feet in foot_positions:
-                    if len(frame_feet) > foot_idx:
-                        position_history.append(frame_feet[foot_idx])
-                
-                if len(position_history) >= 3:  # Need at least 3 positions
-                    y_positions = [pos[1] for pos in position_history]
-                    x_positions = [pos[0] for pos in position_history]
-                    
-                    total_movement = 0
-                    individual_taps = 0
-                    
-                    for i in range(1, len(y_positions)):
-                        y_movement = abs(y_positions[i] - y_positions[i-1])
-                        x_movement = abs(x_positions[i] - x_positions[i-1])
-                        frame_movement = (y_movement**2 + x_movement**2)**0.5
-                        total_movement += frame_movement
-                        
-                        if frame_movement > 20:  # Higher threshold than hands (was 15)
-                            individual_taps += 1
-                            print(f"Foot tap motion detected at frame {i}: movement={frame_movement:.1f}px", file=sys.stderr)
-                    
-                    avg_movement = total_movement / max(1, len(y_positions) - 1)
-                    
-                    # VERY STRICT: Need multiple taps AND significant average movement
-                    if avg_movement > 15 and individual_taps >= 4:  # Higher thresholds than hands
-                        ankle_score = max(ankle_score, min(0.6, avg_movement * 0.03 + individual_taps * 0.12))
-                        tap_count = max(tap_count, individual_taps)
-                        print(f"Foot {foot_idx}: MediaPipe repetitive tapping detected - movements={individual_taps}, avg_movement={avg_movement:.1f}, score={ankle_score:.3f}", file=sys.stderr)
-                    else:
-                        print(f"Foot {foot_idx}: Not enough tapping activity - movements={individual_taps}, avg_movement={avg_movement:.1f} (need 4+ taps, avg>15)", file=sys.stderr)
-    
-    # Combine detection methods with ULTRA-STRICT validation
-    final_score = max(movement_score, ankle_score)
-    final_tap_count = max(tap_count, movement_taps)
-    
-    # ULTRA-STRICT: Require VERY clear evidence of intentional foot tapping
-    ultra_strict_detected = False
-    ultra_strict_confidence = 0.0
-    
-    if final_score > 0:
-        # Must have BOTH high confidence AND multiple detection methods agreeing
-        methods_detected = 0
-        if movement_taps >= 4:  # Need lots of movement-based taps
-            methods_detected += 1
-        if tap_count >= 4:  # Need lots of MediaPipe-based taps
-            methods_detected += 1
-        if final_score > 0.5:  # Need very high confidence
-            methods_detected += 1
-            
-        # Only detect if multiple methods agree AND very high confidence
-        if methods_detected >= 2 and final_score > 0.4:
-            ultra_strict_detected = True
-            ultra_strict_confidence = final_score
-        else:
-            print(f"ULTRA-STRICT FOOT REJECTION: methods_detected={methods_detected}, confidence={final_score:.3f} (need 2+ methods AND 0.4+ confidence)", file=sys.stderr)
-    
-    print(f"FINAL FOOT TAPPING ANALYSIS (ULTRA-STRICT): detected={ultra_strict_detected}, confidence={ultra_strict_confidence:.3f}, taps={final_tap_count}", file=sys.stderr)
-    
-    return {
-        'detected': ultra_strict_detected,
-        'confidence': ultra_strict_confidence,
-        'tap_count': final_tap_count if ultra_strict_detected else 0,
-        'movement_score': movement_score,
-        'ankle_score': ankle_score,
-        'analysis_type': 'ultra_strict_foot_pattern_detection'
-    }
+    return {"landmarks": landmarks_out}
+
+
+def _extract_sit_stand_features(frames: List[str]) -> Dict[str, Any]:
+    """Feature-extraction stage for sit/stand (see `heuristics.classify_postures`).
+
+    Runs Pose over the most recent `SIT_STAND_WINDOW` frames and records
+    x/y/visibility for `SIT_STAND_LANDMARKS` (nose, shoulders, hips, knees,
+    ankles).
+    """
+
+    # Analyze recent frames to determine current posture
+    recent_frames = frames[-SIT_STAND_WINDOW:] if len(frames) > 0 else frames
+
+    # Enhanced pose detection with LOWER confidence for easier detection
+    with stage("mediapipe_init"):
+        pose = _cached_graph(mp.solutions.pose.Pose, **_SIT_STAND_POSE_CONFIG)
+    frames_rgb = _rgb_frames([_decode_bgr(f) for f in recent_frames])
+    boosted = [None if f is None else _boost_contrast(f) for f in frames_rgb]
+    results = _process_frames(pose, "pose", boosted, lambda r: r.pose_landmarks)
+    return _sit_stand_features(results, len(recent_frames))
 
 
-def _analyze_sit_stand_transitions(frames):
+def _analyze_sit_stand_transitions(frames, params=None, features=None):
     """
     ENHANCED sit-stand ACTION detection - counts only the moments of transition:
     
@@ -1086,372 +993,163 @@ def _analyze_sit_stand_transitions(frames):
     LOGIC:
     - Same posture as before → detected=False (no action occurred)
     - Different posture → detected=True (action occurred: sitting down OR standing up)
+
+    Posture classification and the transition state machine live in
+    `heuristics`; ``params`` overrides `SIT_STAND_PARAMS`. ``features``
+    (from `analyze_all`) skips the extraction.
     """
-    print(f"Analyzing {len(frames)} frames for sit-stand ACTIONS (transitions only)...", file=sys.stderr)
+    log.info("Analyzing %d frames for sit-stand ACTIONS (transitions only)...", len(frames))
     
     # Load previous posture state with baseline tracking and cooldown
-    previous_state = _load_sit_stand_state()
+    with stage("state_io"):
+        previous_state = _load_sit_stand_state()
     previous_posture = previous_state['posture']
     baseline_count = previous_state['baseline_count']
     last_transition_time = previous_state['last_transition_time']
     
     import time
     current_time = time.time()
-    time_since_last_transition = current_time - last_transition_time
-    min_cooldown_seconds = 15  # INCREASED to 15 seconds between transitions (was 8)
-    
-    print(f"Previous posture: {previous_posture}, baseline_count: {baseline_count}, time_since_last: {time_since_last_transition:.1f}s", file=sys.stderr)
-    
-    # Analyze recent frames to determine current posture
-    analysis_window = min(12, len(frames))  # Reduced from 20 for faster response
-    recent_frames = frames[-analysis_window:] if len(frames) > 0 else frames
+    p = {**SIT_STAND_PARAMS, **(params or {})}
+    min_cooldown_seconds = p['min_cooldown_seconds']
+    required_baseline = int(p['min_baseline_count'])
+    required_confidence = p['min_transition_confidence']
     
     try:
-        import mediapipe as mp
-        mp_pose = mp.solutions.pose
-        
-        # Enhanced pose detection with LOWER confidence for easier detection
-        pose = mp_pose.Pose(
-            static_image_mode=True,
-            model_complexity=1,  # Lower complexity for faster, more permissive detection
-            min_detection_confidence=0.5,  # Lowered from 0.7 to 0.5
-            min_tracking_confidence=0.4,   # Lowered from 0.6 to 0.4
-            enable_segmentation=False
+        if features is None:
+            features = _extract_sit_stand_features(frames)
+        with stage("decision"):
+            postures = classify_postures(features, params)
+            prev_code = POSTURES.index(previous_posture) if previous_posture in POSTURES else 0
+            transition = decide_sit_stand_transition(
+                postures['posture'],
+                postures['posture_confidence'],
+                postures['enough_frames'],
+                np.array([prev_code]),
+                np.array([baseline_count]),
+                np.array([np.nan if last_transition_time is None else last_transition_time], dtype=float),
+                current_time,
+                params,
+            )
+        outcome = TRANSITION_OUTCOMES[int(transition['outcome'][0])]
+        current_posture = POSTURES[int(postures['posture'][0])]
+        posture_confidence = float(postures['posture_confidence'][0])
+        valid_frames = int(postures['valid_frames'][0])
+        time_since_last_transition = float(transition['time_since_last_transition'][0])
+
+        log.info(
+            "Sit-stand: previous=%s (baseline %s), current=%s (confidence %.3f, %d valid frames) -> %s",
+            previous_posture, baseline_count, current_posture, posture_confidence, valid_frames, outcome,
         )
-        
-        posture_states = []
-        
-        for frame_idx, frame_data in enumerate(recent_frames):
-            try:
-                import base64
-                import cv2
-                import numpy as np
-                
-                frame_bytes = base64.b64decode(frame_data.split(',')[1])
-                frame_array = np.frombuffer(frame_bytes, dtype=np.uint8)
-                frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Enhance frame quality for better pose detection
-                frame_rgb = cv2.convertScaleAbs(frame_rgb, alpha=1.1, beta=10)  # Slight contrast/brightness boost
-                
-                results = pose.process(frame_rgb)
-                
-                if results.pose_landmarks:
-                    landmarks = results.pose_landmarks.landmark
-                    
-                    # Enhanced landmark extraction with better indexing
-                    # Upper body
-                    left_shoulder = landmarks[11]   # Left shoulder
-                    right_shoulder = landmarks[12]  # Right shoulder
-                    nose = landmarks[0]             # Nose for head reference
-                    
-                    # Core body
-                    left_hip = landmarks[23]        # Left hip
-                    right_hip = landmarks[24]       # Right hip
-                    
-                    # Lower body
-                    left_knee = landmarks[25]       # Left knee
-                    right_knee = landmarks[26]      # Right knee
-                    left_ankle = landmarks[27]      # Left ankle
-                    right_ankle = landmarks[28]     # Right ankle
-                    
-                    # Calculate average positions for stability
-                    shoulder_y = (left_shoulder.y + right_shoulder.y) / 2
-                    shoulder_x = (left_shoulder.x + right_shoulder.x) / 2
-                    hip_y = (left_hip.y + right_hip.y) / 2
-                    hip_x = (left_hip.x + right_hip.x) / 2
-                    knee_y = (left_knee.y + right_knee.y) / 2
-                    knee_x = (left_knee.x + right_knee.x) / 2
-                    ankle_y = (left_ankle.y + right_ankle.y) / 2
-                    ankle_x = (left_ankle.x + right_ankle.x) / 2
-                    
-                    # Enhanced visibility check - require good visibility of key landmarks
-                    key_landmarks = [left_shoulder, right_shoulder, left_hip, right_hip, 
-                                   left_knee, right_knee, left_ankle, right_ankle]
-                    visibility_scores = [lm.visibility for lm in key_landmarks]
-                    avg_visibility = sum(visibility_scores) / len(visibility_scores)
-                    min_visibility = min(visibility_scores)
-                    
-                    print(f"Frame {frame_idx}: avg_visibility={avg_visibility:.3f}, min_visibility={min_visibility:.3f}", file=sys.stderr)
-                    
-                    if avg_visibility > 0.6 and min_visibility > 0.3:  # MUCH more permissive visibility (was 0.75 and 0.5)
-                        # ENHANCED GEOMETRIC ANALYSIS - Multiple indicators
-                        
-                        # 1. Body compression ratio (key indicator)
-                        total_body_height = ankle_y - shoulder_y
-                        torso_length = hip_y - shoulder_y
-                        leg_length = ankle_y - hip_y
-                        thigh_length = knee_y - hip_y
-                        shin_length = ankle_y - knee_y
-                        
-                        # 2. Advanced posture ratios
-                        body_compression = total_body_height / max(0.1, abs(ankle_y - nose.y))
-                        torso_to_total = torso_length / max(0.1, total_body_height)
-                        thigh_angle_indicator = thigh_length / max(0.1, torso_length)
-                        knee_bend_severity = abs(knee_y - hip_y) / max(0.1, abs(ankle_y - hip_y))
-                        
-                        # 3. Spatial relationships (sitting vs standing patterns)
-                        hip_knee_gap = knee_y - hip_y  # Positive when knees below hips
-                        knee_ankle_gap = ankle_y - knee_y  # Leg extension
-                        
-                        # 4. Body alignment analysis
-                        body_vertical_alignment = abs(shoulder_x - hip_x) + abs(hip_x - knee_x)
-                        posture_straightness = 1.0 - min(1.0, body_vertical_alignment * 5)  # Normalize
-                        
-                        # ENHANCED SCORING SYSTEM with multiple validation methods
-                        sitting_indicators = 0
-                        standing_indicators = 0
-                        confidence_factors = []
-                        
-                        # Indicator 1: Body compression (most reliable)
-                        if body_compression < 0.75:  # Very compressed = sitting
-                            sitting_indicators += 3
-                            confidence_factors.append(("compression_sitting", 0.9))
-                            print(f"  → SITTING: Body compression {body_compression:.3f} < 0.75", file=sys.stderr)
-                        elif body_compression > 0.90:  # Extended = standing
-                            standing_indicators += 3
-                            confidence_factors.append(("compression_standing", 0.9))
-                            print(f"  → STANDING: Body compression {body_compression:.3f} > 0.90", file=sys.stderr)
-                        
-                        # Indicator 2: Hip-knee relationship (critical for sitting)
-                        if hip_knee_gap > 0.08:  # Knees significantly below hips = sitting
-                            sitting_indicators += 2
-                            confidence_factors.append(("hip_knee_sitting", 0.8))
-                            print(f"  → SITTING: Hip-knee gap {hip_knee_gap:.3f} > 0.08", file=sys.stderr)
-                        elif hip_knee_gap < -0.02:  # Hips below knees = standing
-                            standing_indicators += 2
-                            confidence_factors.append(("hip_knee_standing", 0.8))
-                            print(f"  → STANDING: Hip-knee gap {hip_knee_gap:.3f} < -0.02", file=sys.stderr)
-                        
-                        # Indicator 3: Thigh angle severity
-                        if thigh_angle_indicator > 0.5:  # Bent thighs = sitting
-                            sitting_indicators += 2
-                            confidence_factors.append(("thigh_sitting", 0.7))
-                            print(f"  → SITTING: Thigh angle {thigh_angle_indicator:.3f} > 0.5", file=sys.stderr)
-                        elif thigh_angle_indicator < 0.3:  # Straight thighs = standing
-                            standing_indicators += 2
-                            confidence_factors.append(("thigh_standing", 0.7))
-                            print(f"  → STANDING: Thigh angle {thigh_angle_indicator:.3f} < 0.3", file=sys.stderr)
-                        
-                        # Indicator 4: Knee bend severity
-                        if knee_bend_severity > 0.6:  # Severe knee bend = sitting
-                            sitting_indicators += 1
-                            confidence_factors.append(("knee_bend_sitting", 0.6))
-                            print(f"  → SITTING: Knee bend {knee_bend_severity:.3f} > 0.6", file=sys.stderr)
-                        elif knee_bend_severity < 0.4:  # Minimal knee bend = standing
-                            standing_indicators += 1
-                            confidence_factors.append(("knee_bend_standing", 0.6))
-                            print(f"  → STANDING: Knee bend {knee_bend_severity:.3f} < 0.4", file=sys.stderr)
-                        
-                        # Indicator 5: Torso proportion check
-                        if torso_to_total > 0.55:  # Large torso proportion = sitting (legs folded)
-                            sitting_indicators += 1
-                            confidence_factors.append(("torso_prop_sitting", 0.5))
-                            print(f"  → SITTING: Torso proportion {torso_to_total:.3f} > 0.55", file=sys.stderr)
-                        elif torso_to_total < 0.40:  # Small torso proportion = standing (full height)
-                            standing_indicators += 1
-                            confidence_factors.append(("torso_prop_standing", 0.5))
-                            print(f"  → STANDING: Torso proportion {torso_to_total:.3f} < 0.40", file=sys.stderr)
-                        
-                        # FINAL POSTURE DETERMINATION with confidence calculation
-                        total_indicators = sitting_indicators + standing_indicators
-                        if total_indicators == 0:
-                            state = "uncertain"
-                            confidence = 0.0
-                            print(f"  → UNCERTAIN: No clear indicators", file=sys.stderr)
-                        elif sitting_indicators > standing_indicators:
-                            state = "sitting"
-                            # Calculate confidence based on indicator strength and agreement
-                            indicator_strength = sitting_indicators / max(1, total_indicators)
-                            avg_confidence = sum(cf[1] for cf in confidence_factors if "sitting" in cf[0]) / max(1, sum(1 for cf in confidence_factors if "sitting" in cf[0]))
-                            confidence = min(0.95, indicator_strength * avg_confidence * min(1.2, sitting_indicators / 3))
-                            print(f"  → SITTING: {sitting_indicators}/{total_indicators} indicators, confidence={confidence:.3f}", file=sys.stderr)
-                        elif standing_indicators > sitting_indicators:
-                            state = "standing"
-                            # Calculate confidence based on indicator strength and agreement
-                            indicator_strength = standing_indicators / max(1, total_indicators)
-                            avg_confidence = sum(cf[1] for cf in confidence_factors if "standing" in cf[0]) / max(1, sum(1 for cf in confidence_factors if "standing" in cf[0]))
-                            confidence = min(0.95, indicator_strength * avg_confidence * min(1.2, standing_indicators / 3))
-                            print(f"  → STANDING: {standing_indicators}/{total_indicators} indicators, confidence={confidence:.3f}", file=sys.stderr)
-                        else:
-                            state = "uncertain"
-                            confidence = 0.3
-                            print(f"  → UNCERTAIN: Tied indicators ({sitting_indicators}={standing_indicators})", file=sys.stderr)
-                        
-                        posture_states.append({
-                            'state': state,
-                            'confidence': confidence,
-                            'sitting_indicators': sitting_indicators,
-                            'standing_indicators': standing_indicators,
-                            'visibility': avg_visibility
-                        })
-                        
-                    else:
-                        print(f"Frame {frame_idx}: Insufficient visibility (avg={avg_visibility:.3f}, min={min_visibility:.3f})", file=sys.stderr)
-                        posture_states.append({'state': 'unknown', 'confidence': 0.0})
-                else:
-                    print(f"Frame {frame_idx}: No pose landmarks detected", file=sys.stderr)
-                    posture_states.append({'state': 'unknown', 'confidence': 0.0})
-                
-            except Exception as e:
-                print(f"Frame {frame_idx} processing error: {e}", file=sys.stderr)
-                posture_states.append({'state': 'unknown', 'confidence': 0.0})
-        
-        # LOWERED REQUIREMENTS for easier detection
-        valid_states = [s for s in posture_states if s['state'] in ['sitting', 'standing'] and s['confidence'] > 0.4]  # Much lower confidence (was 0.6)
-        
-        if len(valid_states) < 6:  # Much fewer frames required (was 12)
-            print(f"Not enough valid posture states ({len(valid_states)}) - requiring 6+ frames (lowered threshold)", file=sys.stderr)
+
+        if outcome == 'insufficient_frames_low_threshold':
             return {
                 'detected': False,
                 'confidence': 0.0,
-                'analysis_type': 'insufficient_frames_low_threshold',
-                'valid_frames': len(valid_states),
-                'total_frames': len(posture_states)
+                'analysis_type': outcome,
+                'valid_frames': valid_frames,
+                'total_frames': int(postures['total_frames'][0])
             }
-        
-        # Calculate weighted consensus with MUCH lower requirements
-        sitting_weight = sum(s['confidence'] for s in valid_states if s['state'] == 'sitting')
-        standing_weight = sum(s['confidence'] for s in valid_states if s['state'] == 'standing')
-        total_weight = sitting_weight + standing_weight
-        
-        sitting_count = sum(1 for s in valid_states if s['state'] == 'sitting')
-        standing_count = sum(1 for s in valid_states if s['state'] == 'standing')
-        
-        # MUCH more permissive consensus (was 85%)
-        consensus_threshold = 0.65  # Lowered from 0.85 to 0.65
-        current_posture = None
-        posture_confidence = 0.0
-        
-        if sitting_weight / total_weight >= consensus_threshold and sitting_count >= (len(valid_states) * 0.6):  # Lowered from 0.8 to 0.6
-            current_posture = 'sitting'
-            posture_confidence = sitting_weight / total_weight
-            print(f"SITTING consensus (LOW THRESHOLD): {sitting_count}/{len(valid_states)} frames, weight={sitting_weight:.2f}/{total_weight:.2f} ({posture_confidence:.3f})", file=sys.stderr)
-        elif standing_weight / total_weight >= consensus_threshold and standing_count >= (len(valid_states) * 0.6):  # Lowered from 0.8 to 0.6
-            current_posture = 'standing'
-            posture_confidence = standing_weight / total_weight
-            print(f"STANDING consensus (LOW THRESHOLD): {standing_count}/{len(valid_states)} frames, weight={standing_weight:.2f}/{total_weight:.2f} ({posture_confidence:.3f})", file=sys.stderr)
-        else:
-            print(f"No consensus reached (LOW THRESHOLD): sitting={sitting_count}({sitting_weight:.2f}), standing={standing_count}({standing_weight:.2f}), total={len(valid_states)}", file=sys.stderr)
+        if outcome == 'no_posture_consensus_low_threshold':
             return {
                 'detected': False,
                 'confidence': 0.0,
-                'analysis_type': 'no_posture_consensus_low_threshold',
-                'sitting_frames': sitting_count,
-                'standing_frames': standing_count,
-                'total_valid_frames': len(valid_states)
+                'analysis_type': outcome,
+                'sitting_frames': int(postures['sitting_frames'][0]),
+                'standing_frames': int(postures['standing_frames'][0]),
+                'total_valid_frames': valid_frames
             }
-        
-        print(f"ENHANCED posture determined: '{current_posture}' (confidence: {posture_confidence:.3f})", file=sys.stderr)
-        
-        # Check for ACTION detection with cooldown protection and higher baseline stability
-        if previous_posture is None:
+
+        # Every remaining outcome persists the (possibly unchanged) state.
+        new_transition_time = float(transition['last_transition_time'][0])
+        with stage("state_io"):
+            _save_sit_stand_state(
+                POSTURES[int(transition['posture'][0])],
+                int(transition['baseline_count'][0]),
+                None if np.isnan(new_transition_time) else new_transition_time,
+            )
+
+        if outcome == 'baseline_establishment':
             # First time - establish baseline posture, no action to count yet
-            print(f"🏁 BASELINE ESTABLISHMENT: Initial posture detected as '{current_posture}' (baseline=1) - NO ACTION counted", file=sys.stderr)
-            _save_sit_stand_state(current_posture, 1, current_time)
             return {
                 'detected': False,  # No action occurred
                 'confidence': posture_confidence,
-                'analysis_type': 'baseline_establishment',
+                'analysis_type': outcome,
                 'current_posture': current_posture,
                 'baseline_count': 1,
                 'message': f'Establishing baseline posture: {current_posture}'
             }
-        elif previous_posture == current_posture:
-            # Same posture maintained - increment baseline, NO ACTION to count
-            new_baseline_count = baseline_count + 1
-            print(f"📍 MAINTAINING POSTURE: Still {current_posture} (baseline={new_baseline_count}) - NO ACTION counted", file=sys.stderr)
-            _save_sit_stand_state(current_posture, new_baseline_count, last_transition_time)  # Keep same transition time
+        if outcome == 'maintaining_same_posture':
+            new_baseline_count = int(transition['baseline_count'][0])
             return {
                 'detected': False,  # No action occurred
                 'confidence': posture_confidence,
-                'analysis_type': 'maintaining_same_posture',
+                'analysis_type': outcome,
                 'current_posture': current_posture,
                 'baseline_count': new_baseline_count,
                 'message': f'Maintaining {current_posture} position (stable x{new_baseline_count})'
             }
+        if outcome == 'cooldown_active':
+            # Still in cooldown period - ignore this detection to prevent false positives
+            return {
+                'detected': False,  # No action counted due to cooldown
+                'confidence': posture_confidence,
+                'analysis_type': outcome,
+                'previous_posture': previous_posture,
+                'current_posture': current_posture,
+                'time_remaining': min_cooldown_seconds - time_since_last_transition,
+                'message': f'Transition blocked by cooldown ({time_since_last_transition:.1f}s / {min_cooldown_seconds:g}s)'
+            }
+        if outcome == 'posture_change_insufficient_baseline':
+            # Not enough baseline stability - don't count action yet
+            return {
+                'detected': False,  # No action counted due to insufficient baseline
+                'confidence': posture_confidence,
+                'analysis_type': outcome,
+                'previous_posture': previous_posture,
+                'current_posture': current_posture,
+                'baseline_count': 1,
+                'required_baseline': required_baseline,
+                'message': f'Detected posture change but need more stability (baseline was {baseline_count}/{required_baseline})'
+            }
+        if outcome == 'confidence_too_low_for_transition':
+            return {
+                'detected': False,
+                'confidence': posture_confidence,
+                'analysis_type': outcome,
+                'previous_posture': previous_posture,
+                'current_posture': current_posture,
+                'required_confidence': required_confidence,
+                'message': f'Confidence too low for transition ({posture_confidence:.3f} < {required_confidence:g})'
+            }
+
+        # All checks passed - COUNT THE ACTION!
+        if current_posture == 'standing':
+            action = 'STANDING UP'
+            action_description = 'stood up from sitting position'
         else:
-            # Different posture detected - check cooldown and baseline requirements
-            if time_since_last_transition < min_cooldown_seconds:
-                # Still in cooldown period - ignore this detection to prevent false positives
-                print(f"🛑 COOLDOWN ACTIVE: Ignoring posture change {previous_posture} → {current_posture} (only {time_since_last_transition:.1f}s since last transition, need {min_cooldown_seconds}s)", file=sys.stderr)
-                _save_sit_stand_state(previous_posture, baseline_count, last_transition_time)  # Keep previous state
-                return {
-                    'detected': False,  # No action counted due to cooldown
-                    'confidence': posture_confidence,
-                    'analysis_type': 'cooldown_active',
-                    'previous_posture': previous_posture,
-                    'current_posture': current_posture,
-                    'time_remaining': min_cooldown_seconds - time_since_last_transition,
-                    'message': f'Transition blocked by cooldown ({time_since_last_transition:.1f}s / {min_cooldown_seconds}s)'
-                }
-            elif baseline_count < 5:  # INCREASED baseline requirement to 5 for maximum stability (was 3)
-                # Not enough baseline stability - don't count action yet
-                print(f"⚠️ POSTURE CHANGE DETECTED but baseline insufficient: {previous_posture} → {current_posture} (baseline was only {baseline_count}) - NO ACTION counted yet", file=sys.stderr)
-                _save_sit_stand_state(current_posture, 1, last_transition_time)  # Reset baseline for new posture, keep transition time
-                return {
-                    'detected': False,  # No action counted due to insufficient baseline
-                    'confidence': posture_confidence,
-                    'analysis_type': 'posture_change_insufficient_baseline',
-                    'previous_posture': previous_posture,
-                    'current_posture': current_posture,
-                    'baseline_count': 1,
-                    'required_baseline': 5,  # Much higher requirement for stability
-                    'message': f'Detected posture change but need more stability (baseline was {baseline_count}/5)'
-                }
-            else:
-                # Sufficient baseline AND cooldown passed - but check confidence difference
-                # Define the action first
-                if previous_posture == 'sitting' and current_posture == 'standing':
-                    action = 'STANDING UP'
-                    action_description = 'stood up from sitting position'
-                elif previous_posture == 'standing' and current_posture == 'sitting':
-                    action = 'SITTING DOWN'
-                    action_description = 'sat down from standing position'
-                else:
-                    action = f'{previous_posture.upper()}_TO_{current_posture.upper()}'
-                    action_description = f'changed from {previous_posture} to {current_posture}'
-                
-                # Require high confidence in new posture AND significant difference from typical confidence
-                if posture_confidence < 0.75:  # Require very high confidence for transitions
-                    print(f"🚫 CONFIDENCE TOO LOW: {action} blocked (confidence {posture_confidence:.3f} < 0.75 required)", file=sys.stderr)
-                    _save_sit_stand_state(previous_posture, baseline_count, last_transition_time)  # Keep previous state
-                    return {
-                        'detected': False,
-                        'confidence': posture_confidence,
-                        'analysis_type': 'confidence_too_low_for_transition',
-                        'previous_posture': previous_posture,
-                        'current_posture': current_posture,
-                        'required_confidence': 0.75,
-                        'message': f'Confidence too low for transition ({posture_confidence:.3f} < 0.75)'
-                    }
-                
-                # All checks passed - COUNT THE ACTION!
-                print(f"🎯 ACTION DETECTED: {action}! Person {action_description} (confidence: {posture_confidence:.3f}, baseline was stable: {baseline_count}, cooldown passed: {time_since_last_transition:.1f}s)", file=sys.stderr)
-                
-                # Save new state with baseline count 1 and new transition time
-                _save_sit_stand_state(current_posture, 1, current_time)
-                
-                return {
-                    'detected': True,  # ACTION COUNTED!
-                    'confidence': posture_confidence,
-                    'analysis_type': 'action_detected',
-                    'action': action,
-                    'action_description': action_description,
-                    'previous_posture': previous_posture,
-                    'current_posture': current_posture,
-                    'transition_count': 1,  # Always 1 per action
-                    'previous_baseline_count': baseline_count,
-                    'cooldown_passed': time_since_last_transition,
-                    'valid_frames_analyzed': len(valid_states),
-                    'message': f'Action counted: {action_description}'
-                }
+            action = 'SITTING DOWN'
+            action_description = 'sat down from standing position'
+        log.info(
+            "🎯 ACTION DETECTED: %s! Person %s (confidence: %.3f, baseline was stable: %s, cooldown passed: %.1fs)",
+            action, action_description, posture_confidence, baseline_count, time_since_last_transition,
+        )
+        return {
+            'detected': True,  # ACTION COUNTED!
+            'confidence': posture_confidence,
+            'analysis_type': outcome,
+            'action': action,
+            'action_description': action_description,
+            'previous_posture': previous_posture,
+            'current_posture': current_posture,
+            'transition_count': 1,  # Always 1 per action
+            'previous_baseline_count': baseline_count,
+            'cooldown_passed': time_since_last_transition,
+            'valid_frames_analyzed': valid_frames,
+            'message': f'Action counted: {action_description}'
+        }
         
     except Exception as e:
-        print(f"Enhanced sit-stand analysis error: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc()
+        log.error("Enhanced sit-stand analysis error: %s", e, exc_info=True)
         return {
             'detected': False,
             'confidence': 0.0,
@@ -1469,12 +1167,12 @@ def _load_sit_stand_state():
                 posture = state.get('last_posture', None)
                 baseline_count = state.get('baseline_count', 0)
                 last_transition_time = state.get('last_transition_time', 0)
-                print(f"Loaded previous sit-stand state: {posture} (baseline_count: {baseline_count}, last_transition: {last_transition_time})", file=sys.stderr)
+                log.info("Loaded previous sit-stand state: %s (baseline_count: %s, last_transition: %s)", posture, baseline_count, last_transition_time)
                 return {'posture': posture, 'baseline_count': baseline_count, 'last_transition_time': last_transition_time}
         else:
-            print(f"No sit-stand state file found, creating initial state", file=sys.stderr)
+            log.info("No sit-stand state file found, creating initial state")
     except Exception as e:
-        print(f"Error loading sit-stand state: {e}", file=sys.stderr)
+        log.warning("Error loading sit-stand state: %s", e)
     return {'posture': None, 'baseline_count': 0, 'last_transition_time': 0}
 
 def _save_sit_stand_state(posture, baseline_count=0, last_transition_time=None):
@@ -1492,66 +1190,431 @@ def _save_sit_stand_state(posture, baseline_count=0, last_transition_time=None):
         }
         with open(SIT_STAND_STATE_FILE, 'w') as f:
             json.dump(state, f)
-        print(f"Saved sit-stand state: {posture} (baseline_count: {baseline_count})", file=sys.stderr)
+        log.info("Saved sit-stand state: %s (baseline_count: %s)", posture, baseline_count)
     except Exception as e:
-        print(f"Error saving sit-stand state: {e}", file=sys.stderr)
+        log.warning("Error saving sit-stand state: %s", e)
+
+
+# ---------------------------------------------------------------------------
+# Fused multi-behaviour analysis
+# ---------------------------------------------------------------------------
+
+# Behaviours analysed from the frame sequence, and the shared stages each
+# one reads (see `_stage_graph`).
+FRAME_BEHAVIORS = ("eye_gaze", "tapping_hands", "tapping_feet", "sit_stand")
+_BEHAVIOR_STAGES = {
+    "eye_gaze": ("eye_crops",),
+    "tapping_hands": ("hands", "motion"),
+    "tapping_feet": ("feet_pose", "motion"),
+    "sit_stand": ("sit_stand_pose",),
+}
+
+
+def _stage_pool() -> Optional[ThreadPoolExecutor]:
+    global _STAGE_POOL
+    if STAGE_THREADS <= 1:
+        return None
+    if _STAGE_POOL is None:
+        _STAGE_POOL = ThreadPoolExecutor(max_workers=STAGE_THREADS, thread_name_prefix="stage")
+    return _STAGE_POOL
+
+
+def _eye_crop_tensors(frames_rgb: List[Any]) -> List[Any]:
+    crops = []
+    for i, rgb in enumerate(frames_rgb):
+        if rgb is None:
+            continue
+        try:
+            with stage("crop"):
+                eye = _eye_crop(Image.fromarray(rgb))
+            if eye is not None:
+                with stage("tensor"):
+                    crops.append(_IMAGE_TF(eye))
+            else:
+                log.debug("Frame %d: No face detected in image", i)
+        except Exception as e:
+            log.debug("Frame %d failed: %s: %s", i, type(e).__name__, e)
+    return crops
+
+
+def _graph_results(factory: Any, config: Dict[str, Any], name: str, frames_rgb: List[Any], found: Any) -> Optional[List[Any]]:
+    """`_process_frames` with a cached graph; None if the graph cannot be built."""
+
+    try:
+        with stage("mediapipe_init"):
+            graph = _cached_graph(factory, **config)
+    except Exception as e:
+        log.warning("MediaPipe %s init failed: %s", name, e)
+        return None
+    return _process_frames(graph, name, frames_rgb, found)
+
+
+def _stage_graph(frames: List[str], behaviors: Sequence[str]) -> StageGraph:
+    """Shared stages for *behaviors* over one frame sequence.
+
+    decode → rgb, gray; rgb → hands, feet_pose, sit_stand_pose, eye_crops;
+    gray → motion. Each stage covers the whole sequence, so every frame is
+    decoded, converted and run through each MediaPipe graph once however
+    many behaviours read it; the graph stages (and the frame diffs) only
+    depend on the decode and run concurrently. Each graph keeps the
+    configuration and input of its separate `_extract_*_features` path, so
+    fused results match separate `_predict` calls.
+    """
+
+    wanted = set(behaviors)
+    graph = StageGraph()
+    graph.add("decode", lambda: [_decode_bgr(f) for f in frames])
+    graph.add("rgb", lambda decode: _rgb_frames(decode), deps=("decode",))
+    graph.add("gray", lambda decode: _gray_frames(decode), deps=("decode",))
+    graph.add("hands", lambda rgb: _graph_results(
+        mp.solutions.hands.Hands, _HANDS_CONFIG, "hands", rgb, lambda r: r.multi_hand_landmarks), deps=("rgb",))
+    graph.add("feet_pose", lambda rgb: _graph_results(
+        mp.solutions.pose.Pose, _FEET_POSE_CONFIG, "pose", rgb, lambda r: r.pose_landmarks), deps=("rgb",))
+    # Sit/stand: its own configuration on contrast-boosted frames, over the
+    # last SIT_STAND_WINDOW frames only.
+    first = max(0, len(frames) - SIT_STAND_WINDOW)
+    graph.add("sit_stand_pose", lambda rgb: _graph_results(
+        mp.solutions.pose.Pose, _SIT_STAND_POSE_CONFIG, "pose",
+        [None] * first + [None if f is None else _boost_contrast(f) for f in rgb[first:]],
+        lambda r: r.pose_landmarks), deps=("rgb",))
+    graph.add("eye_crops", lambda rgb: _eye_crop_tensors(rgb), deps=("rgb",))
+
+    def motion(gray: List[Any]) -> Dict[str, Any]:
+        out = {}
+        with stage("frame_diff"):
+            if "tapping_hands" in wanted:
+                out["tapping_hands"] = _gray_diff_stats(gray, pixel_threshold=10)
+            if "tapping_feet" in wanted:
+                out["tapping_feet"] = _gray_diff_stats(gray, pixel_threshold=30, y_start_ratio=0.75)
+        return out
+
+    graph.add("motion", motion, deps=("gray",))
+    return graph
+
+
+def _behavior_features(behavior: str, outputs: Dict[str, Any]) -> Dict[str, Any]:
+    if behavior == "eye_gaze":
+        # Without "grays" the movement fallback re-reads the frames as
+        # `_analyze_frame_movement` does (PIL grayscale).
+        return {"crops": outputs["eye_crops"]}
+    if behavior == "tapping_hands":
+        return _hand_features(outputs["rgb"], outputs["hands"], outputs["motion"]["tapping_hands"])
+    if behavior == "tapping_feet":
+        return _foot_features(outputs["rgb"], outputs["feet_pose"], outputs["motion"]["tapping_feet"])
+    n = min(SIT_STAND_WINDOW, len(outputs["rgb"]))
+    pose = outputs["sit_stand_pose"]
+    return _sit_stand_features(None if pose is None else pose[len(pose) - n:], n)
+
+
+def _video_frames(payload: Dict[str, Any]) -> List[Any]:
+    """Decoded BGR frames of a video-chunk payload (see `video_input.py`)."""
+
+    try:
+        with stage("decode"):
+            return video_input.decode(payload)
+    except Exception:
+        metrics.inc("decode_errors_total", decoder="video")
+        raise
+
+
+def _landmark_features(behavior: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Features for *behavior* from a client-side landmark payload."""
+
+    with stage("decode"):
+        parsed = landmark_input.parse(payload)
+    if behavior == "eye_gaze":
+        crops = []
+        for i, crop in enumerate(parsed["eye_crops"]):
+            if crop is None:
+                continue
+            try:
+                img = _decode_image(crop)
+                with stage("tensor"):
+                    crops.append(_IMAGE_TF(img))
+            except Exception as e:
+                log.debug("Frame %d eye crop failed: %s: %s", i, type(e).__name__, e)
+        thumbs = parsed["thumbs"]
+        return {
+            "crops": crops,
+            "grays": [None if g is None else Image.fromarray(g) for g in thumbs[: len(thumbs) // 2 * 2]],
+        }
+    if behavior == "tapping_hands":
+        with stage("frame_diff"):
+            diff = _gray_diff_stats(parsed["thumbs"], pixel_threshold=10)
+        return landmark_input.hand_features(parsed, diff)
+    if behavior == "tapping_feet":
+        with stage("frame_diff"):
+            diff = _gray_diff_stats(parsed["thumbs"], pixel_threshold=30, y_start_ratio=0.75)
+        return landmark_input.foot_features(parsed, diff)
+    return landmark_input.sit_stand_features(parsed, SIT_STAND_WINDOW)
+
+
+def analyze_all(
+    frames: List[str],
+    behaviors: Optional[Sequence[str]] = None,
+    data: Optional[Dict[str, Any]] = None,
+    timings: bool | None = None,
+) -> Dict[str, Any]:
+    """Run several behaviours over one frame sequence in a single pass.
+
+    The frame behaviours (default: `FRAME_BEHAVIORS`) share the stages of
+    `_stage_graph`, run on `_stage_pool()` (``ML_ANALYZER_STAGE_THREADS``,
+    default 4; 1 runs them in order), and then take the same decisions as
+    `_predict`. Other behaviours (rapid_talking) read their payload from
+    ``data[behavior]`` and run as in `_predict`.
+
+    Returns ``{"results": {behavior: result}}``, plus one ``timings`` object
+    for the whole pass when enabled.
+    """
+
+    if not (TIMINGS_DEFAULT if timings is None else timings):
+        return {"results": _analyze_all(frames, behaviors, data or {})}
+    with collect() as timer:
+        results = _analyze_all(frames, behaviors, data or {})
+    return {"results": results, "timings": timer.as_dict()}
+
+
+def _analyze_all(frames: List[str], behaviors: Optional[Sequence[str]], data: Dict[str, Any]) -> Dict[str, Any]:
+    if behaviors is None:
+        behaviors = FRAME_BEHAVIORS + (("rapid_talking",) if "rapid_talking" in data else ())
+    wanted = [b for b in behaviors if b in FRAME_BEHAVIORS and b in MODELS]
+    # The sit/stand model runs its own Pose pass over every frame
+    sit_stand_model = "sit_stand" in wanted and _sit_stand_uses_model()
+    if sit_stand_model:
+        wanted.remove("sit_stand")
+    if wanted == ["sit_stand"]:
+        frames = frames[-SIT_STAND_WINDOW:]
+    outputs: Dict[str, Any] = {}
+    errors: Dict[str, BaseException] = {}
+    if wanted and frames:
+        targets = [s for b in wanted for s in _BEHAVIOR_STAGES[b]]
+        outputs, errors = _stage_graph(frames, wanted).run(targets, _stage_pool())
+
+    results: Dict[str, Any] = {}
+    for behavior in behaviors:
+        if behavior == "sit_stand" and sit_stand_model:
+            results[behavior] = _predict_behavior(behavior, frames)
+            continue
+        if behavior not in wanted:
+            results[behavior] = _predict_behavior(behavior, data.get(behavior, []))
+            continue
+        if not frames:
+            results[behavior] = _predict_behavior(behavior, frames)
+            continue
+        failed = next((errors[s] for s in _BEHAVIOR_STAGES[behavior] if s in errors), None)
+        if failed is not None:
+            log.error("[%s] ERROR: %s - returning fallback result", behavior, failed)
+            results[behavior] = {"detected": False, "confidence": 0.0, "error": str(failed)}
+            continue
+        try:
+            features = _behavior_features(behavior, outputs)
+        except Exception as exc:
+            log.error("[%s] ERROR: %s - returning fallback result", behavior, exc)
+            results[behavior] = {"detected": False, "confidence": 0.0, "error": str(exc)}
+            continue
+        results[behavior] = _predict_behavior(behavior, frames, features=features)
+    return results
+
+
+def predict_rapid_talking_batch(payloads: Sequence[Any], timings: bool | None = None) -> Dict[str, Any]:
+    """rapid_talking for several payloads with one batched `WPMModel` forward.
+
+    Each payload is what `_predict("rapid_talking", ...)` takes. Returns
+    ``{"results": [result per payload]}``, plus one ``timings`` object for
+    the whole batch when enabled.
+    """
+
+    model = MODELS.get("rapid_talking")
+    if model is not None:
+        model = model.to(DEVICE)
+    if not (TIMINGS_DEFAULT if timings is None else timings):
+        return {"results": _rapid_talking_results(payloads, model)}
+    with collect() as timer:
+        results = _rapid_talking_results(payloads, model)
+    return {"results": results, "timings": timer.as_dict()}
+
+
+def _speech_rate_wpm(audio: str, sample_rate: Any, key: Optional[str]) -> List[float]:
+    """WPM of the speech-rate windows an audio chunk completes (speech_rate.py).
+
+    A session's estimator lives on its series in `_WPM_STORE`, so windows
+    span chunks; without a session the chunk is analysed on its own.
+    """
+
+    with stage("decode"):
+        pcm = speech_rate.decode_pcm(audio, sample_rate)
+    with stage("decision"):
+        if key is None:
+            return speech_rate.clip_wpm_series(pcm)
+        series = _WPM_STORE.get(key)
+        if series.estimator is None:
+            series.estimator = speech_rate.SpeechRateEstimator()
+        return [w["wpm"] for w in series.estimator.push(pcm)]
+
+
+def _rapid_talking_results(payloads: Sequence[Any], model: Any) -> List[Dict[str, Any]]:
+    """Append every payload to its WPM series, then score them all at once.
+
+    A payload with a ``session_id`` appends to that session's series in
+    `_WPM_STORE`; one without gets a series of its own. ``"audio"`` PCM in a
+    payload adds the WPM of the speech-rate windows it completes. A session repeated
+    in *payloads* first scores what is pending, so each result reflects the
+    samples up to its own payload.
+    """
+
+    results: List[Dict[str, Any]] = [{} for _ in payloads]
+    scratch = WPMSeriesStore(max_sessions=len(payloads) + 1, idle_ttl=None)
+    pending: List[Tuple[int, WPMSeries]] = []
+    pending_keys = set()
+
+    def flush() -> None:
+        try:
+            with stage("forward"):
+                scores = (score_series(model, [series for _, series in pending], DEVICE)
+                          if model is not None else [None] * len(pending))
+        except Exception as exc:
+            log.error("[rapid_talking] WPMModel forward failed, rule only: %s", exc)
+            scores = [None] * len(pending)
+        with stage("decision"):
+            for (i, series), score in zip(pending, scores):
+                results[i] = series_result(series, score)
+                log.info(
+                    "[rapid_talking] Avg WPM across %d samples = %.2f, confidence=%.2f, detected=%s (150–200 only rule), model_score=%s",
+                    results[i]['samples'], results[i]['avg_wpm'], results[i]['confidence'], results[i]['detected'], score,
+                )
+        pending.clear()
+        pending_keys.clear()
+
+    for i, data in enumerate(payloads):
+        try:
+            # A missing payload (None, {}) is an empty series, not an error
+            if isinstance(data, list):
+                seq = data
+            else:
+                seq = (data.get("rapid_talking") if isinstance(data, dict) else None) or []
+            session_id = data.get("session_id") if isinstance(data, dict) else None
+            key = str(session_id) if session_id is not None else None
+            known = _WPM_STORE.sessions.get(key) if key is not None else None
+
+            # Filter out any non-numeric values so they don't break the math
+            numeric_vals = numeric_values(seq)
+            if key in pending_keys:
+                flush()
+            if isinstance(data, dict) and data.get("audio"):
+                numeric_vals += _speech_rate_wpm(data["audio"], data.get("sample_rate"), key)
+
+            if not numeric_vals and (known is None or not known.count):
+                log.info("[rapid_talking] No numeric WPM values provided – confidence=0.0 (detected=False)")
+                results[i] = {"detected": False, "confidence": 0.0}
+                continue
+            if key is not None:
+                metrics.inc("cache_requests_total", cache="wpm_session",
+                            result="hit" if known is not None else "miss")
+            with stage("decision"):
+                series = (_WPM_STORE if key is not None else scratch).append(
+                    key if key is not None else str(i), numeric_vals)
+        except Exception as exc:
+            log.error("[rapid_talking] ERROR: %s - returning fallback result", exc)
+            results[i] = {"detected": False, "confidence": 0.0, "error": str(exc)}
+            continue
+        pending.append((i, series))
+        if key is not None:
+            pending_keys.add(key)
+    if pending:
+        flush()
+    return results
 
 
-def _predict(behavior: str, data: Any) -> Dict[str, Any]:
-    """Run inference for a single behaviour and return unified JSON."""
+def _predict(behavior: str, data: Any, timings: bool | None = None) -> Dict[str, Any]:
+    """Run inference for a single behaviour and return unified JSON.
+
+    With ``timings`` (default: ``ML_ANALYZER_TIMINGS=1``) the result also
+    carries a ``timings`` object with per-stage milliseconds.
+    """
+
+    if not (TIMINGS_DEFAULT if timings is None else timings):
+        return _predict_behavior(behavior, data)
+    with collect() as timer:
+        result = _predict_behavior(behavior, data)
+    return {**result, "timings": timer.as_dict()}
+
+
+def _predict_behavior(behavior: str, data: Any, features: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """`_predict` without timings; ``features`` are the shared-stage outputs
+    `analyze_all` computed for *behavior*, used instead of re-extracting them.
+    A landmark payload (see `landmark_input.py`) is turned into features here.
+    """
 
     if behavior not in MODELS:
         return {"detected": False, "confidence": 0.0, "error": "unsupported_behavior"}
 
-    model = MODELS[behavior].to(DEVICE)
-    print(f"Analyzing {behavior} with data type: {type(data)}", file=sys.stderr)
-    if isinstance(data, list):
-        print(f"Data is list with {len(data)} items", file=sys.stderr)
-        if data and len(data) > 0:
-            print(f"First item type: {type(data[0])}, length: {len(str(data[0])[:100])}", file=sys.stderr)
-    elif isinstance(data, str):
-        print(f"Data is string with length: {len(data)}", file=sys.stderr)
-        print(f"First 100 chars: {data[:100]}", file=sys.stderr)
-    elif isinstance(data, dict):
-        print(f"Data is dict with keys: {list(data.keys())}", file=sys.stderr)
-
-    print(f"[{behavior}] Starting detection analysis...", file=sys.stderr)
+    model = MODELS[behavior]
+    if model is not None:
+        model = model.to(DEVICE)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Analyzing %s with data type: %s", behavior, type(data))
+        if isinstance(data, list):
+            log.debug("Data is list with %d items", len(data))
+            if data and len(data) > 0:
+                log.debug("First item type: %s, length: %d", type(data[0]), len(str(data[0])[:100]))
+        elif isinstance(data, str):
+            log.debug("Data is string with length: %d", len(data))
+            log.debug("First 100 chars: %s", data[:100])
+        elif isinstance(data, dict):
+            log.debug("Data is dict with keys: %s", list(data.keys()))
+
+    log.info("[%s] Starting detection analysis...", behavior)
 
     try:
+        if features is None and behavior in FRAME_BEHAVIORS and is_landmark_payload(data):
+            # Client-side landmarks: no decoding or detection here
+            features = _landmark_features(behavior, data)
+            data = data["landmarks"]
+        elif behavior in FRAME_BEHAVIORS and is_video_payload(data):
+            data = _video_frames(data)
+
         if behavior == "eye_gaze":
             if isinstance(data, dict):
                 frames = data.get("frame_sequence") or data.get(behavior) or []
             else:
                 frames = data
 
-            crops = []
-            for i, f in enumerate(frames):
+            crops = features["crops"] if features is not None else []
+            for i, f in enumerate(frames if features is None else []):
                 try:
                     img = _decode_image(f)
-                    eye = _eye_crop(img)
+                    with stage("crop"):
+                        eye = _eye_crop(img)
                     if eye is not None:
-                        crops.append(_IMAGE_TF(eye))
+                        with stage("tensor"):
+                            crops.append(_IMAGE_TF(eye))
                     else:
-                        print(f"Frame {i}: No face detected in image", file=sys.stderr)
+                        log.debug("Frame %d: No face detected in image", i)
                 except Exception as e:
-                    print(f"Frame {i} failed: {type(e).__name__}: {str(e)}", file=sys.stderr)
+                    log.debug("Frame %d failed: %s: %s", i, type(e).__name__, e)
                     continue
 
             if len(crops) < 2:  # need at least 2 frames
-                print(f"Eye gaze: only {len(crops)} valid crops from {len(frames)} frames", file=sys.stderr)
+                log.info("Eye gaze: only %d valid crops from %d frames", len(crops), len(frames))
                 # Fallback: analyze frame movement/brightness for basic detection
-                frame_analysis = _analyze_frame_movement(frames if isinstance(frames, list) else [])
+                with stage("frame_diff"):
+                    if features is not None and "grays" in features:
+                        frame_analysis = _movement_confidence(features["grays"])
+                    else:
+                        frame_analysis = _analyze_frame_movement(frames if isinstance(frames, list) else [])
                 confidence = max(0.05, min(0.4, frame_analysis * 1.2 + 0.05))  # More conservative
                 detected = bool(confidence > 0.5)  # Much higher threshold - only detect significant movement
                 result = {"detected": detected, "confidence": round(float(confidence), 3), "gaze": "straight", "fallback": True}
-                print(f"[eye_gaze] FALLBACK RESULT: detected={detected}, confidence={confidence:.3f} (from movement analysis)", file=sys.stderr)
+                log.info("[eye_gaze] FALLBACK RESULT: detected=%s, confidence=%.3f (from movement analysis)", detected, confidence)
                 return result
 
-            frames_tensor = torch.stack(crops, dim=0).unsqueeze(0).to(DEVICE)  # (1, T, C, H, W)
-            logits = model(frames_tensor)  # shape (1, 5)
+            with stage("tensor"):
+                frames_tensor = torch.stack(crops, dim=0).unsqueeze(0).to(DEVICE)  # (1, T, C, H, W)
+            with stage("forward"):
+                logits = model(frames_tensor)  # shape (1, 5)
 
-            probs = torch.softmax(logits, dim=1)[0]  # type: ignore[index]
-            prob, idx = probs.max(dim=0)
+                probs = torch.softmax(logits, dim=1)[0]  # type: ignore[index]
+                prob, idx = probs.max(dim=0)
             gaze_classes = ["down", "left", "right", "straight", "up"]
             idx_int: int = int(idx.item())
             label = gaze_classes[idx_int] if idx_int < len(gaze_classes) else str(idx_int)
@@ -1570,13 +1633,13 @@ def _predict(behavior: str, data: Any) -> Dict[str, Any]:
 
             # SPECIAL HANDLING FOR HAND TAPPING - Use pattern analysis ONLY
             if behavior == "tapping_hands":
-                print(f"[tapping_hands] Using ADVANCED PATTERN ANALYSIS for actual tapping/clapping detection", file=sys.stderr)
+                log.info("[tapping_hands] Using ADVANCED PATTERN ANALYSIS for actual tapping/clapping detection")
                 
                 # Use the new pattern analysis to detect actual tapping/clapping
-                pattern_result = _analyze_hand_tapping_patterns([], frames)
+                pattern_result = _analyze_hand_tapping_patterns([], frames, features=features)
                 
                 if pattern_result["detected"]:
-                    print(f"[tapping_hands] PATTERN DETECTED: {pattern_result['pattern']} with confidence {pattern_result['confidence']:.3f}", file=sys.stderr)
+                    log.info("[tapping_hands] PATTERN DETECTED: %s with confidence %.3f", pattern_result['pattern'], pattern_result['confidence'])
                     return {
                         "detected": True,
                         "confidence": round(pattern_result["confidence"], 4),
@@ -1588,7 +1651,7 @@ def _predict(behavior: str, data: Any) -> Dict[str, Any]:
                         "analysis_type": "pattern_recognition"
                     }
                 else:
-                    print(f"[tapping_hands] NO TAPPING PATTERN DETECTED: {pattern_result['pattern']} (confidence: {pattern_result['confidence']:.3f})", file=sys.stderr)
+                    log.info("[tapping_hands] NO TAPPING PATTERN DETECTED: %s (confidence: %.3f)", pattern_result['pattern'], pattern_result['confidence'])
                     # DO NOT fall back to PyTorch model - pattern analysis is authoritative
                     return {
                         "detected": False,
@@ -1601,13 +1664,13 @@ def _predict(behavior: str, data: Any) -> Dict[str, Any]:
 
             # FEET TAPPING - Use STRICT pattern analysis ONLY (same as hands)
             if behavior == "tapping_feet":
-                print(f"[tapping_feet] Using ULTRA-STRICT PATTERN ANALYSIS for actual foot tapping detection", file=sys.stderr)
+                log.info("[tapping_feet] Using ULTRA-STRICT PATTERN ANALYSIS for actual foot tapping detection")
                 
                 # Use the new strict pattern analysis to detect actual foot tapping
-                pattern_result = _analyze_foot_tapping_patterns(frames)
+                pattern_result = _analyze_foot_tapping_patterns(frames, features=features)
                 
                 if pattern_result["detected"]:
-                    print(f"[tapping_feet] FOOT TAPPING DETECTED with confidence {pattern_result['confidence']:.3f}", file=sys.stderr)
+                    log.info("[tapping_feet] FOOT TAPPING DETECTED with confidence %.3f", pattern_result['confidence'])
                     return {
                         "detected": True,
                         "confidence": round(pattern_result["confidence"], 4),
@@ -1617,7 +1680,7 @@ def _predict(behavior: str, data: Any) -> Dict[str, Any]:
                         "analysis_type": pattern_result["analysis_type"]
                     }
                 else:
-                    print(f"[tapping_feet] NO FOOT TAPPING PATTERN DETECTED (confidence: {pattern_result['confidence']:.3f})", file=sys.stderr)
+                    log.info("[tapping_feet] NO FOOT TAPPING PATTERN DETECTED (confidence: %.3f)", pattern_result['confidence'])
                     # DO NOT fall back to PyTorch model - pattern analysis is authoritative
                     return {
                         "detected": False,
@@ -1627,19 +1690,23 @@ def _predict(behavior: str, data: Any) -> Dict[str, Any]:
                     }
 
         elif behavior == "sit_stand":
-            print(f"[sit_stand] Using TRANSITION DETECTION for sit-stand analysis (whole body)", file=sys.stderr)
-            
             # Extract frames from data
             if isinstance(data, dict):
                 frames = data.get("frame_sequence") or data.get(behavior) or []
             else:
                 frames = data
-            
+
+            if _sit_stand_uses_model():
+                result = _sit_stand_model_result(model, frames)
+                log.info("[sit_stand] RESULT: detected=%s, confidence=%.4f (pose-sequence model)", result["detected"], result["confidence"])
+                return result
+
+            log.info("[sit_stand] Using TRANSITION DETECTION for sit-stand analysis (whole body)")
             # Use the transition analysis to detect actual sit-stand movements
-            transition_result = _analyze_sit_stand_transitions(frames)
+            transition_result = _analyze_sit_stand_transitions(frames, features=features)
             
             if transition_result["detected"]:
-                print(f"[sit_stand] TRANSITION DETECTED: {transition_result.get('transition_type', 'unknown')} with confidence {transition_result['confidence']:.3f}", file=sys.stderr)
+                log.info("[sit_stand] TRANSITION DETECTED: %s with confidence %.3f", transition_result.get('transition_type', 'unknown'), transition_result['confidence'])
                 return {
                     "detected": True,
                     "confidence": round(transition_result["confidence"], 4),
@@ -1650,7 +1717,7 @@ def _predict(behavior: str, data: Any) -> Dict[str, Any]:
                     "analysis_type": transition_result["analysis_type"]
                 }
             else:
-                print(f"[sit_stand] NO TRANSITION DETECTED: {transition_result['analysis_type']} (confidence: {transition_result['confidence']:.3f})", file=sys.stderr)
+                log.info("[sit_stand] NO TRANSITION DETECTED: %s (confidence: %.3f)", transition_result['analysis_type'], transition_result['confidence'])
                 return {
                     "detected": False,
                     "confidence": round(transition_result["confidence"], 4),
@@ -1664,37 +1731,15 @@ def _predict(behavior: str, data: Any) -> Dict[str, Any]:
             #   • avg WPM < 150  → confidence = 0.1 (not detected)
             #   • 150 ≤ avg WPM < 200 → confidence = 0.5 (moderately detected)
             #   • avg WPM ≥ 200 → confidence = 1.0 (strongly detected)
+            # With a "session_id" the values are appended to that session's
+            # running series (see wpm_series.py); WPMModel scores the recent
+            # window and is reported alongside the rule as model_score.
+            # "audio" PCM is turned into WPM windows by speech_rate.py first.
+            # Batches score all their rapid_talking entries in one forward
+            # (predict_rapid_talking_batch).
             # -----------------------------------------------------------
 
-            seq = data if isinstance(data, list) else data.get(behavior) or []
-
-            # Filter out any non-numeric values so they don't break the math
-            numeric_vals = [float(x) for x in seq if isinstance(x, (int, float))]
-
-            if not numeric_vals:
-                print("[rapid_talking] No numeric WPM values provided – confidence=0.0 (detected=False)", file=sys.stderr)
-                result = {"detected": False, "confidence": 0.0}
-                return result
-
-            avg_wpm = sum(numeric_vals) / len(numeric_vals)
-            print(f"[rapid_talking] Avg WPM across {len(numeric_vals)} samples = {avg_wpm:.2f}", file=sys.stderr)
-
-            if avg_wpm < 150:
-                prob = 0.1
-                detected = False
-            elif avg_wpm < 200:
-                prob = 0.5
-                detected = True  # Only detect in 150–200 WPM range
-            else:
-                prob = 1.0
-                detected = False  # ≥200 WPM -> very rapid, but NOT flagged per new requirement
-
-            print(
-                f"[rapid_talking] Confidence={prob:.2f}, detected={detected} (150–200 only rule)",
-                file=sys.stderr,
-            )
-
-            return {"detected": detected, "confidence": round(prob, 4)}
+            return _rapid_talking_results([data], model)[0]
 
         else:
             prob = 0.0
@@ -1703,13 +1748,13 @@ def _predict(behavior: str, data: Any) -> Dict[str, Any]:
         detected = bool(prob > 0.3)  # Convert to Python bool
         result = {"detected": detected, "confidence": round(prob, 4)}
         source = "avg_wpm_rule" if behavior == "rapid_talking" else "PyTorch model"
-        print(f"[{behavior}] RESULT: detected={detected}, confidence={prob:.4f} ({source})", file=sys.stderr)
+        log.info("[%s] RESULT: detected=%s, confidence=%.4f (%s)", behavior, detected, prob, source)
         return result
 
     except Exception as exc:
         # Fall back gracefully
         result = {"detected": False, "confidence": 0.0, "error": str(exc)}
-        print(f"[{behavior}] ERROR: {str(exc)} - returning fallback result", file=sys.stderr)
+        log.error("[%s] ERROR: %s - returning fallback result", behavior, exc)
         return result
 
 
@@ -1721,13 +1766,18 @@ def _predict(behavior: str, data: Any) -> Dict[str, Any]:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run ML analysis on behaviour data")
     parser.add_argument("--data", required=True, help="Path to JSON file containing input data")
-    parser.add_argument("--behavior", required=True, help="Behavior type (e.g. eye_gaze)")
+    parser.add_argument("--behavior", required=True,
+                        help="Behavior type (e.g. eye_gaze), a comma-separated list, or 'all'")
+    parser.add_argument("--timings", action="store_true", help="Include per-stage timings in the result")
+    parser.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                        help="Profile the request (cProfile); add a summary to the result, .prof dump in DIR")
+    parser.add_argument("--trace", metavar="FILE", help="Write a Chrome trace-event file of the request")
 
     args = parser.parse_args()
 
     if not os.path.exists(args.data):
         error_msg = f"Data file not found: {args.data}"
-        print(error_msg, file=sys.stderr)
+        log.error(error_msg)
         fallback_result = {"detected": False, "confidence": 0.0, "error": error_msg, "fallback": True}
         sys.stdout.write(json.dumps(fallback_result))
         return
@@ -1737,23 +1787,40 @@ def main() -> None:
             payload = json.load(fp)
     except Exception as exc:
         error_msg = f"Failed to read input file: {exc}"
-        print(error_msg, file=sys.stderr)
+        log.error(error_msg)
         fallback_result = {"detected": False, "confidence": 0.0, "error": error_msg, "fallback": True}
         sys.stdout.write(json.dumps(fallback_result))
         return
 
-    # Extract behaviour-specific data from payload; the controller wrapped it
-    data = payload.get(args.behavior, payload)
+    fused = args.behavior == "all" or "," in args.behavior
+    if fused:
+        behaviors = None if args.behavior == "all" else [b.strip() for b in args.behavior.split(",") if b.strip()]
+        extra = payload if isinstance(payload, dict) else {}
+    else:
+        # Extract behaviour-specific data from payload; the controller wrapped it
+        data = payload.get(args.behavior, payload)
 
     try:
-        result = _predict(args.behavior, data)
+        with recording(bool(args.trace), args.trace), \
+                profiled(args.profile is not None, label=args.behavior, output_dir=args.profile or None) as prof:
+            with span(args.behavior):
+                if fused:
+                    if is_video_payload(payload):
+                        frames = _video_frames(payload)
+                    else:
+                        frames = payload if isinstance(payload, list) else payload.get("frame_sequence") or []
+                    result = analyze_all(frames, behaviors, extra, timings=args.timings or None)
+                else:
+                    result = _predict(args.behavior, data, timings=args.timings or None)
+        if prof is not None and isinstance(result, dict):
+            result["profile"] = prof.summary()
         
         # Ensure result is valid JSON serializable
         if not isinstance(result, dict):
             result = {"detected": False, "confidence": 0.0, "error": "Invalid result format", "fallback": True}
             
     except Exception as exc:
-        print(f"Prediction error: {str(exc)}", file=sys.stderr)
+        log.error("Prediction error: %s", exc)
         result = {"detected": False, "confidence": 0.0, "error": str(exc), "fallback": True}
 
     # Output **only** JSON on stdout so Node.js can parse it directly
@@ -1767,7 +1834,7 @@ def main() -> None:
         sys.stdout.write(json.dumps(result))
         sys.stdout.flush()
     except Exception as exc:
-        print(f"JSON output error: {str(exc)}", file=sys.stderr)
+        log.error("JSON output error: %s", exc)
         # Final fallback - simple JSON that should always work
         simple_result = '{"detected": false, "confidence": 0.0, "error": "JSON serialization failed", "fallback": true}'
         sys.stdout.write(simple_result)
@@ -1781,7 +1848,7 @@ if __name__ == "__main__":
         sys.exit(0)
     except Exception as e:
         # Ensure any unexpected errors are surfaced correctly to Node (stderr)
-        print(f"Fatal error: {str(e)}", file=sys.stderr)
+        log.error("Fatal error: %s", e)
         # Output a fallback JSON result even on fatal error
         fallback_result = {"detected": False, "confidence": 0.0, "error": str(e), "fallback": True}
         sys.stdout.write(json.dumps(fallback_result))
@@ -1,6 +1,12 @@
 import torch
 import os
 import sys
+import time
+
+import model_registry
+from analyzer_log import get_logger
+
+log = get_logger("model_loader")
 
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,52 +17,109 @@ try:
     ml_models_path = os.path.join(os.path.dirname(__file__), "..", "ml-models")
     sys.path.insert(0, ml_models_path)
     from architectures import WPMModel, EyeGazeLSTM, SitStandLSTM, TappingCNN
-    print("Successfully imported model architectures", file=sys.stderr)
+    log.info("Successfully imported model architectures")
 except ImportError as e:
-    print(f"Failed to import architectures: {e}", file=sys.stderr)
-    print(f"Current working directory: {os.getcwd()}")
-    print(f"Project root: {project_root}")
-    print(f"ML models path: {ml_models_path}")
-    print(f"Python path: {sys.path}")
+    log.error("Failed to import architectures: %s", e)
+    log.error("Current working directory: %s", os.getcwd())
+    log.error("Project root: %s", project_root)
+    log.error("ML models path: %s", ml_models_path)
+    log.error("Python path: %s", sys.path)
     raise
 
+# Seconds spent loading each model by the last load_all_models() call
+LOAD_SECONDS = {}
+
+# Registry entry (version, path, sha256, format) of each model last loaded
+MODEL_INFO = {}
+
+# Backend behavior_type -> model class and legacy weight file (see model_registry)
+MODELS_DIR = model_registry.MODELS_DIR
+MODEL_CLASSES = {
+    "rapid_talking": WPMModel,
+    "eye_gaze": EyeGazeLSTM,
+    "sit_stand": SitStandLSTM,
+    "tapping_feet": TappingCNN,
+    "tapping_hands": TappingCNN,
+}
+MODEL_FILES = {key: os.path.join(MODELS_DIR, name) for key, name in model_registry.LEGACY_FILES.items()}
+
+# Shape of one warm-up input per model: frame sequences are (B, T, C, H, W) at
+# ml_analyzer.IMAGE_SIZE, sit_stand 33 pose (x, y) pairs, rapid_talking WPM.
+WARM_SHAPES = {
+    "eye_gaze": (1, 4, 3, 64, 64),
+    "tapping_hands": (1, 4, 3, 64, 64),
+    "tapping_feet": (1, 4, 3, 64, 64),
+    "sit_stand": (1, 10, 66),
+    "rapid_talking": (1, 8, 1),
+}
+
+
+def _build(key, artifact, device):
+    fmt = artifact["format"]
+    mdl = MODEL_CLASSES[key]()
+    if fmt == "quantized":
+        # Dynamic int8 kernels are CPU-only.
+        mdl = torch.ao.quantization.quantize_dynamic(mdl, {torch.nn.LSTM, torch.nn.Linear}, dtype=torch.qint8)
+        device = torch.device("cpu")
+    mdl = mdl.to(device)
+    mdl.load_state_dict(torch.load(artifact["path"], map_location=device))
+    mdl.eval()
+    if fmt == "compiled":
+        if hasattr(torch, "compile"):
+            mdl = torch.compile(mdl)
+        else:
+            log.warning("torch.compile unavailable; serving %s v%s eager", key, artifact["version"])
+    return mdl
+
+
+def load_artifact(key, device, version=None):
+    """Build model *key* on *device* from its registered artifact.
+
+    Uses the active registry version unless *version* is given and returns
+    ``(model, artifact)``. Raises FileNotFoundError when the weight file is
+    missing, ValueError on a checksum mismatch and whatever torch raises when
+    it does not load.
+    """
+    artifact = model_registry.resolve(key, version)
+    if not os.path.exists(artifact["path"]):
+        raise FileNotFoundError(artifact["path"])
+    if artifact["sha256"] and model_registry.sha256(artifact["path"]) != artifact["sha256"]:
+        raise ValueError(f"Checksum mismatch for {key} v{artifact['version']}: {artifact['path']}")
+    return _build(key, artifact, device), artifact
+
+
+def load_model(key, device, version=None):
+    return load_artifact(key, device, version)[0]
+
+
+def warm_model(key, mdl, artifact, device, runs=2):
+    """Run *mdl* on a zero input so first-request setup happens before it serves."""
+    if artifact["format"] == "quantized":
+        device = torch.device("cpu")
+    x = torch.zeros(WARM_SHAPES[key], device=device)
+    with torch.no_grad():
+        for _ in range(runs):
+            mdl(x)
+
+
 def load_all_models():
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    print(f"Using device: {device}", file=sys.stderr)
-
-    # Map backend behavior_type -> model instance
-    models = {
-        "rapid_talking": WPMModel(),
-        "eye_gaze": EyeGazeLSTM(),
-        "sit_stand": SitStandLSTM(),
-        "tapping_feet": TappingCNN(),
-        "tapping_hands": TappingCNN(),
-    }
-
-    # Corresponding weight files (relative to ml-models directory)
-    models_dir = os.path.join(os.path.dirname(__file__), "..", "ml-models")
-    model_files = {
-        "rapid_talking": os.path.join(models_dir, "rapid_talking.pth"),
-        "eye_gaze": os.path.join(models_dir, "eye_gaze.pth"),
-        "sit_stand": os.path.join(models_dir, "sit-stand.pth"),
-        "tapping_feet": os.path.join(models_dir, "tapping_feet.pth"),
-        "tapping_hands": os.path.join(models_dir, "tapping_hands.pth"),
-    }
-
-    # Load weights and move to device
-    for key, model_path in model_files.items():
+    log.info("Using device: %s", device)
+
+    models = {}
+    for key in MODEL_CLASSES:
+        start = time.perf_counter()
         try:
-            mdl = models[key].to(device)
-            if os.path.exists(model_path):
-                mdl.load_state_dict(torch.load(model_path, map_location=device))
-                print(f"Loaded {key} model from {model_path}", file=sys.stderr)
-            else:
-                print(f"Warning: Model file not found: {model_path}", file=sys.stderr)
+            models[key], MODEL_INFO[key] = load_artifact(key, device)
+            log.info("Loaded %s model v%s from %s", key, MODEL_INFO[key]["version"], MODEL_INFO[key]["path"])
+        except FileNotFoundError as e:
+            log.warning("Warning: Model file not found: %s", e)
         except Exception as e:
-            print(f"Error loading {key} model: {e}", file=sys.stderr)
-
-    # Set all models to evaluation mode
-    for model in models.values():
-        model.eval()
+            log.error("Error loading %s model: %s", key, e)
+        if key not in models:
+            # Keep the (untrained) architecture so callers can still run it
+            models[key] = MODEL_CLASSES[key]().to(device).eval()
+            MODEL_INFO[key] = {"behavior": key, "version": None, "path": None, "sha256": None, "format": "untrained"}
+        LOAD_SECONDS[key] = time.perf_counter() - start
 
-    return models
\ No newline at end of file
+    return models
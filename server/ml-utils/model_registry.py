@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Versioned model registry
+
+``ml-models/registry.json`` records, per behaviour, every registered weight
+artifact and which one is active::
+
+{
+  "eye_gaze": {
+    "active": "2",
+    "versions": {
+      "1": {"file": "eye_gaze.pth", "sha256": "…", "format": "eager", "registered_at": "2025-01-01T12:00:00"},
+      "2": {"file": "eye_gaze-2.pth", "sha256": "…", "format": "quantized", "registered_at": "…"}
+    }
+  }
+}
+
+``file`` is relative to ``ml-models/``. ``format`` says how `model_loader`
+turns the file into a module:
+
+  eager      state_dict for the architecture in `architectures.py`
+  quantized  state_dict of the dynamically int8-quantized architecture
+             (``torch.ao.quantization.quantize_dynamic`` on LSTM/Linear; CPU)
+  compiled   eager state_dict, wrapped with ``torch.compile`` after loading
+
+Behaviours without an entry resolve to their historical file name
+(`model_loader.MODEL_FILES`) as version ``legacy``/``eager``, so a tree
+without a registry behaves as before.
+
+python model_registry.py list
+python model_registry.py register <behavior> <file.pth> [--version 3] [--format eager] [--no-activate]
+python model_registry.py activate <behavior> <version>
+
+Running workers pick up the new active version through their ``reload``
+command or ``--watch-models`` (see `worker.py`). Checksums are verified on
+every load, so a half-copied file is refused instead of served.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, Optional
+
+MODELS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ml-models"))
+REGISTRY_FILE = os.environ.get("MODEL_REGISTRY_FILE") or os.path.join(MODELS_DIR, "registry.json")
+
+FORMATS = ("eager", "quantized", "compiled")
+
+# Weight files used before the registry existed
+LEGACY_FILES = {
+    "rapid_talking": "rapid_talking.pth",
+    "eye_gaze": "eye_gaze.pth",
+    "sit_stand": "sit-stand.pth",
+    "tapping_feet": "tapping_feet.pth",
+    "tapping_hands": "tapping_hands.pth",
+}
+
+
+def sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest() -> Dict[str, Any]:
+    try:
+        with open(REGISTRY_FILE, "r", encoding="utf-8") as fp:
+            return json.load(fp)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(manifest: Dict[str, Any]) -> None:
+    # Write-then-rename so a watching worker never reads half a file.
+    tmp = f"{REGISTRY_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fp:
+        json.dump(manifest, fp, indent=2)
+        fp.write("\n")
+    os.replace(tmp, REGISTRY_FILE)
+
+
+def resolve(behavior: str, version: Optional[str] = None, manifest: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Artifact entry for *behavior* (active version unless *version* is given).
+
+    Returns ``{"behavior", "version", "path", "sha256", "format"}``; ``sha256``
+    is None for legacy files, which are not checksummed. Raises KeyError for
+    an unknown version.
+    """
+
+    manifest = load_manifest() if manifest is None else manifest
+    entry = manifest.get(behavior) or {}
+    version = str(version or entry.get("active") or "legacy")
+    if version == "legacy":
+        return {
+            "behavior": behavior,
+            "version": "legacy",
+            "path": os.path.join(MODELS_DIR, LEGACY_FILES[behavior]),
+            "sha256": None,
+            "format": "eager",
+        }
+    if version not in entry.get("versions", {}):
+        raise KeyError(f"{behavior} has no registered version {version}")
+    artifact = entry["versions"][version]
+    return {
+        "behavior": behavior,
+        "version": version,
+        "path": os.path.join(MODELS_DIR, artifact["file"]),
+        "sha256": artifact.get("sha256"),
+        "format": artifact.get("format", "eager"),
+    }
+
+
+def fingerprint(behavior: str, manifest: Optional[Dict[str, Any]] = None) -> Any:
+    """Cheap change marker for the active artifact: version, path, mtime and size."""
+
+    entry = resolve(behavior, manifest=manifest)
+    try:
+        st = os.stat(entry["path"])
+        return entry["version"], entry["path"], st.st_mtime_ns, st.st_size
+    except OSError:
+        return entry["version"], entry["path"], None, None
+
+
+def register(behavior: str, path: str, version: Optional[str] = None, fmt: str = "eager", activate: bool = True) -> Dict[str, Any]:
+    if behavior not in LEGACY_FILES:
+        raise ValueError(f"Unknown behavior: {behavior}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    full = os.path.abspath(path)
+    if os.path.commonpath([full, MODELS_DIR]) != MODELS_DIR:
+        raise ValueError(f"Artifacts must live in {MODELS_DIR}")
+
+    manifest = load_manifest()
+    entry = manifest.setdefault(behavior, {"active": None, "versions": {}})
+    if version is None:
+        numeric = [int(v) for v in entry["versions"] if v.isdigit()]
+        version = str(max(numeric, default=0) + 1)
+    if version in entry["versions"]:
+        raise ValueError(f"{behavior} version {version} is already registered")
+    entry["versions"][version] = {
+        "file": os.path.relpath(full, MODELS_DIR),
+        "sha256": sha256(full),
+        "format": fmt,
+        "registered_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    if activate:
+        entry["active"] = version
+    save_manifest(manifest)
+    return resolve(behavior, version, manifest)
+
+
+def activate(behavior: str, version: str) -> Dict[str, Any]:
+    manifest = load_manifest()
+    resolved = resolve(behavior, version, manifest)
+    manifest.setdefault(behavior, {"active": None, "versions": {}})["active"] = resolved["version"]
+    save_manifest(manifest)
+    return resolved
+
+
+# ---------------------------------------------------------------------------
+# Main entry
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage versioned model artifacts")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    reg = sub.add_parser("register")
+    reg.add_argument("behavior", choices=sorted(LEGACY_FILES))
+    reg.add_argument("path")
+    reg.add_argument("--version")
+    reg.add_argument("--format", choices=FORMATS, default="eager")
+    reg.add_argument("--no-activate", action="store_true")
+    act = sub.add_parser("activate")
+    act.add_argument("behavior", choices=sorted(LEGACY_FILES))
+    act.add_argument("version")
+    args = parser.parse_args()
+
+    if args.cmd == "list":
+        manifest = load_manifest()
+        out = {b: {"active": resolve(b, manifest=manifest), "versions": manifest.get(b, {}).get("versions", {})}
+               for b in LEGACY_FILES}
+    elif args.cmd == "register":
+        out = register(args.behavior, args.path, args.version, args.format, not args.no_activate)
+    else:
+        out = activate(args.behavior, args.version)
+    print(json.dumps({"success": True, "result": out}, indent=2))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
@@ -1,25 +1,285 @@
 #!/usr/bin/env python3
 """Model Status script
 
-Reports the readiness of ML models to the Node.js backend. Currently acts as
-as stub always returning that the required models are *available*. This can be
-expanded later to run actual weight loading checks.
+Reports to the Node.js backend which behaviours this host can actually
+serve, and how fast. For every behaviour the probe checks:
+
+* whether its weight file exists and loads (and how long the cold load took),
+* whether the MediaPipe graphs it relies on initialise (and how long),
+* the warm single-request latency of `ml_analyzer._predict` on a synthetic
+  input (one warm-up call, then the median of ``--warm-runs``).
+
+python model_status.py [--ttl 60] [--refresh] [--no-warm] [--warm-runs 3]
+
+Probing loads torch, every model and MediaPipe, so results are cached in
+``model_status_cache.json`` (system temp dir) and reused for ``--ttl``
+seconds (``MODEL_STATUS_TTL``); health checks inside the TTL only read the
+cache. Output (stdout) is JSON::
+
+{
+  "models": {
+    "eye_gaze": {
+      "available": false, "status": "unavailable",
+      "weights": {"path": ".../eye_gaze.pth", "exists": false, "version": "legacy", "format": "eager",
+                  "loaded": false, "cold_load_ms": null, "error": "..."},
+      "mediapipe": {"face_mesh": {"ok": true, "init_ms": 41.2}, ...},
+      "warm_latency_ms": null
+    },
+    ...
+  },
+  "system_ready": true, "degraded": ["eye_gaze"],
+  "checked_at": "2025-01-01T12:00:00", "age_seconds": 3.1, "ttl_seconds": 60, "cached": true
+}
+
+``status`` is ``ready`` (everything loads), ``degraded`` (serves results but
+its weights are missing) or ``unavailable`` (the analyzer cannot answer for
+it). Readiness follows what the analyzer actually needs to answer: its
+MediaPipe graphs and, except for the rule-based rapid_talking, torch and the
+model loader. A missing weight file only degrades a behaviour, since
+`model_loader.load_all_models` serves the untrained architecture in its
+place and the tapping and sit/stand behaviours answer from the pattern
+heuristics anyway; for `eye_gaze` that means its answers are not meaningful
+until its weights are deployed. ``available`` is true unless the status is
+``unavailable``, ``system_ready`` is true when every behaviour is available
+and ``degraded`` lists the behaviours that answer without their weights.
 """
 
+import argparse
+import contextlib
+import datetime
+import io
 import json
+import os
+import statistics
 import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 
+from analyzer_log import get_logger
 
-def main() -> None:
-    status = {
-        "eye_gaze": "ready",
-        "sit_stand": "ready",
-        "tapping_hands": "ready",
-        "tapping_feet": "ready",
-        "rapid_talking": "ready",
+log = get_logger("model_status")
+
+BEHAVIORS = ("eye_gaze", "sit_stand", "tapping_hands", "tapping_feet", "rapid_talking")
+
+# Behaviours the analyzer serves without torch (rule-based)
+RULE_ONLY = {"rapid_talking"}
+
+_NO_LOADER = "model loader unavailable"
+
+# MediaPipe graphs each behaviour depends on, with the analyzer's settings
+GRAPHS: Dict[str, Callable[[Any], Any]] = {
+    "face_mesh": lambda mp: mp.solutions.face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1),
+    "face_detection": lambda mp: mp.solutions.face_detection.FaceDetection(model_selection=0),
+    "hands": lambda mp: mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=2),
+    "pose": lambda mp: mp.solutions.pose.Pose(static_image_mode=True, model_complexity=1),
+}
+BEHAVIOR_GRAPHS = {
+    "eye_gaze": ("face_mesh", "face_detection"),
+    "sit_stand": ("pose",),
+    "tapping_hands": ("hands",),
+    "tapping_feet": ("pose",),
+    "rapid_talking": (),
+}
+
+DEFAULT_TTL = float(os.environ.get("MODEL_STATUS_TTL", "60"))
+CACHE_FILE = Path(tempfile.gettempdir()) / "model_status_cache.json"
+
+
+# ---------------------------------------------------------------------------
+# Probes
+# ---------------------------------------------------------------------------
+
+
+def _probe_weights() -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import torch  # type: ignore
+            import model_registry  # type: ignore
+            from model_loader import load_artifact  # type: ignore
+    except Exception as exc:
+        return {b: {"path": None, "exists": False, "loaded": False, "cold_load_ms": None,
+                    "error": f"{_NO_LOADER}: {exc}"} for b in BEHAVIORS}
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    for behavior in BEHAVIORS:
+        entry: Dict[str, Any] = {
+            "path": None, "exists": False, "version": None, "format": None,
+            "loaded": False, "cold_load_ms": None, "error": None,
+        }
+        start = time.perf_counter()
+        try:
+            artifact = model_registry.resolve(behavior)
+            entry.update(path=os.path.normpath(artifact["path"]), exists=os.path.exists(artifact["path"]),
+                         version=artifact["version"], format=artifact["format"])
+            load_artifact(behavior, device)
+            entry["loaded"] = True
+            entry["cold_load_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        except FileNotFoundError:
+            entry["error"] = "weight file missing"
+        except Exception as exc:
+            entry["error"] = f"{type(exc).__name__}: {exc}"
+        out[behavior] = entry
+    return out
+
+
+def _probe_graphs() -> Dict[str, Dict[str, Any]]:
+    try:
+        import mediapipe as mp  # type: ignore
+    except Exception as exc:
+        return {name: {"ok": False, "init_ms": None, "error": f"mediapipe unavailable: {exc}"} for name in GRAPHS}
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, factory in GRAPHS.items():
+        start = time.perf_counter()
+        try:
+            factory(mp).close()
+            out[name] = {"ok": True, "init_ms": round((time.perf_counter() - start) * 1000, 2)}
+        except Exception as exc:
+            out[name] = {"ok": False, "init_ms": None, "error": f"{type(exc).__name__}: {exc}"}
+    return out
+
+
+def _probe_warm(behaviors: List[str], runs: int) -> Dict[str, Any]:
+    """Median warm `_predict` latency per behaviour on synthetic input."""
+
+    out: Dict[str, Any] = {b: None for b in BEHAVIORS}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import ml_analyzer as ma  # type: ignore
+            from benchmark import PROFILES, make_frames  # type: ignore
+    except Exception as exc:
+        log.warning("Warm probe skipped: %s", exc)
+        return out
+
+    n, scale, quality = PROFILES["quick"]
+    frames = make_frames(n, scale, quality)
+    # Keep the service's sit/stand posture state untouched, and leave no
+    # directory behind: the probe reruns on every TTL refresh.
+    live_state = ma.SIT_STAND_STATE_FILE
+    with tempfile.TemporaryDirectory(prefix="status-sit-stand-") as state_dir:
+        ma.SIT_STAND_STATE_FILE = Path(state_dir) / "sit_stand_state.json"
+        try:
+            for behavior in behaviors:
+                data: Any = [150.0] * 8 if behavior == "rapid_talking" else frames
+                try:
+                    ma._predict(behavior, data)  # warm-up
+                    samples = []
+                    for _ in range(max(1, runs)):
+                        start = time.perf_counter()
+                        ma._predict(behavior, data)
+                        samples.append((time.perf_counter() - start) * 1000)
+                    out[behavior] = round(statistics.median(samples), 2)
+                except Exception as exc:
+                    log.warning("Warm probe failed for %s: %s", behavior, exc)
+        finally:
+            ma.SIT_STAND_STATE_FILE = live_state
+    return out
+
+
+def probe(warm: bool = True, warm_runs: int = 3) -> Dict[str, Any]:
+    started = time.perf_counter()
+    weights = _probe_weights()
+    graphs = _probe_graphs()
+
+    models: Dict[str, Dict[str, Any]] = {}
+    for behavior in BEHAVIORS:
+        needed = {g: graphs[g] for g in BEHAVIOR_GRAPHS[behavior]}
+        graphs_ok = all(g["ok"] for g in needed.values())
+        loaded = weights[behavior]["loaded"]
+        loader_ok = not str(weights[behavior].get("error") or "").startswith(_NO_LOADER)
+        if not graphs_ok or (behavior not in RULE_ONLY and not loader_ok):
+            status = "unavailable"
+        elif not loaded:
+            status = "degraded"
+        else:
+            status = "ready"
+        models[behavior] = {
+            "available": status != "unavailable",
+            "status": status,
+            "weights": weights[behavior],
+            "mediapipe": needed,
+            "warm_latency_ms": None,
+        }
+
+    if warm:
+        runnable = [b for b, m in models.items() if m["available"]]
+        for behavior, ms in _probe_warm(runnable, warm_runs).items():
+            models[behavior]["warm_latency_ms"] = ms
+
+    return {
+        "models": models,
+        "system_ready": all(m["available"] for m in models.values()),
+        "degraded": [b for b, m in models.items() if m["status"] == "degraded"],
+        "checked_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "checked_at_epoch": time.time(),
+        "probe_ms": round((time.perf_counter() - started) * 1000, 1),
     }
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+def _read_cache(ttl: float) -> Optional[Dict[str, Any]]:
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as fp:
+            cached = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    age = time.time() - float(cached.get("checked_at_epoch", 0))
+    if age < 0 or age > ttl:
+        return None
+    cached["age_seconds"] = round(age, 1)
+    return cached
+
+
+def _write_cache(status: Dict[str, Any]) -> None:
+    # Write-then-rename so a concurrent health check never reads half a file.
+    tmp = CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump(status, fp)
+        os.replace(tmp, CACHE_FILE)
+    except OSError as exc:
+        log.warning("Could not write status cache: %s", exc)
+
+
+def get_status(ttl: float = DEFAULT_TTL, refresh: bool = False, warm: bool = True, warm_runs: int = 3) -> Dict[str, Any]:
+    """Cached status when younger than *ttl* seconds, otherwise a fresh probe."""
+
+    if not refresh:
+        cached = _read_cache(ttl)
+        if cached is not None:
+            return {**cached, "ttl_seconds": ttl, "cached": True}
+    status = probe(warm=warm, warm_runs=warm_runs)
+    _write_cache(status)
+    return {**status, "age_seconds": 0.0, "ttl_seconds": ttl, "cached": False}
+
+
+# ---------------------------------------------------------------------------
+# Main entry
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Probe model readiness and latency")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL, help="Seconds a cached probe stays valid")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cache and probe now")
+    parser.add_argument("--no-warm", action="store_true", help="Skip the warm-latency probe")
+    parser.add_argument("--warm-runs", type=int, default=3, help="Timed warm requests per behaviour")
+    args = parser.parse_args()
+
+    status = get_status(args.ttl, args.refresh, warm=not args.no_warm, warm_runs=args.warm_runs)
     sys.stdout.write(json.dumps(status))
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    try:
+        main()
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
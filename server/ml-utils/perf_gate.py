@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Performance regression gate for the analyzer
+
+Runs `ml_analyzer._predict` for all five behaviours with stage timings on
+(see `timings.py`) plus a bare forward pass of every loaded model, on the
+synthetic frames from `benchmark.py`, and compares the per-stage median and
+p95 against a stored baseline. Exits 1 when anything regressed, so CI or a
+pre-deploy step fails before a slower analyzer reaches production.
+
+python perf_gate.py [--baseline perf_baseline.json] [--profile behavior] [--repeats 15]
+                    [--tolerance 0.25] [--p95-tolerance 0.5] [--abs-ms 2.0]
+python perf_gate.py --update-baseline      # record the current numbers
+
+A stage regresses when its median exceeds ``baseline * (1 + tolerance) +
+abs_ms`` (p95 likewise with ``p95_tolerance``), when it is called more often
+per request than in the baseline (an extra per-frame MediaPipe pass or
+decode shows up here even if the machine is fast), or when a stage absent
+from the baseline now costs more than ``abs_ms``. Call counts are exact, so
+they do not need a tolerance.
+
+The baseline may carry its own tolerances, overriding the command-line
+defaults per group (``predict/eye_gaze``) or per stage
+(``predict/eye_gaze/mediapipe``)::
+
+{
+  "environment": {...}, "profile": "behavior", "repeats": 15,
+  "tolerances": {"predict/sit_stand/state_io": {"median": 1.0, "p95": 2.0}},
+  "groups": {
+    "predict/eye_gaze": {
+      "total": {"median_ms": 412.3, "p95_ms": 430.1},
+      "decode": {"median_ms": 21.4, "p95_ms": 23.0, "calls": 12},
+      ...
+    },
+    "forward/eye_gaze": {"total": {"median_ms": 88.0, "p95_ms": 91.2}},
+    ...
+  }
+}
+
+A per-stage diff table goes to stderr; the JSON report (``{"success",
+"passed", "regressions", "rows", "current"}``) to stdout or ``--output``.
+Baselines are only comparable on the machine (and torch/thread settings)
+they were recorded on; the report lists both environments.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmark import PROFILES, _environment, build_stages, make_frames
+from evaluate import _percentiles
+
+BEHAVIORS = ("eye_gaze", "sit_stand", "tapping_hands", "tapping_feet", "rapid_talking")
+
+DEFAULT_BASELINE = Path(__file__).with_name("perf_baseline.json")
+
+# Words-per-minute window used for rapid_talking (the frame list is ignored).
+WPM_INPUT = [150.0, 162.0, 171.0, 158.0, 180.0, 175.0, 169.0, 190.0]
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+def _summary(samples_ms: List[float]) -> Dict[str, float]:
+    pct = _percentiles([ms / 1000 for ms in samples_ms])
+    return {"median_ms": pct["p50"], "p95_ms": pct["p95"]}
+
+
+def measure_predict(ma: Any, behavior: str, data: Any, repeats: int, warmup: int = 2) -> Dict[str, Any]:
+    """Per-stage median/p95 and call counts of *repeats* timed requests."""
+
+    for _ in range(warmup):
+        ma._predict(behavior, data, timings=False)
+
+    totals: List[float] = []
+    stage_ms: Dict[str, List[float]] = {}
+    calls: Dict[str, int] = {}
+    for i in range(repeats):
+        t = ma._predict(behavior, data, timings=True)["timings"]
+        totals.append(t["total_ms"])
+        # A stage can be skipped on some requests; count those as 0 ms.
+        for name in set(stage_ms) | set(t["stages"]) | {"other"}:
+            ms = t["other_ms"] if name == "other" else t["stages"].get(name, 0.0)
+            stage_ms.setdefault(name, [0.0] * i).append(ms)
+        for name, n in t["calls"].items():
+            calls[name] = max(calls.get(name, 0), n)
+
+    out: Dict[str, Any] = {"total": _summary(totals)}
+    for name, samples in sorted(stage_ms.items()):
+        out[name] = _summary(samples)
+        if name in calls:
+            out[name]["calls"] = calls[name]
+    return out
+
+
+def measure_forward(fn: Any, repeats: int, warmup: int = 2) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {"total": _summary(samples)}
+
+
+def _measure(ma: Any, sink: Any, profile: str, repeats: int, seed: int) -> Dict[str, Any]:
+    n, scale, quality = PROFILES[profile]
+    frames = make_frames(n, scale, quality, seed=seed)
+    groups: Dict[str, Any] = {}
+    for behavior in BEHAVIORS:
+        data = WPM_INPUT if behavior == "rapid_talking" else frames
+        with contextlib.redirect_stderr(sink):
+            groups[f"predict/{behavior}"] = measure_predict(ma, behavior, data, repeats)
+        print(f"[perf_gate] predict/{behavior}: {groups[f'predict/{behavior}']['total']['median_ms']} ms",
+              file=sys.stderr)
+
+    with contextlib.redirect_stderr(sink):
+        stages = build_stages(ma, frames)
+    for behavior in BEHAVIORS:
+        fn = stages.get(f"forward_{behavior}")
+        if fn is None:
+            continue
+        with contextlib.redirect_stderr(sink):
+            groups[f"forward/{behavior}"] = measure_forward(fn, repeats)
+    return groups
+
+
+def run_suite(profile: str, repeats: int, seed: int = 0, verbose: bool = False) -> Dict[str, Any]:
+    with contextlib.ExitStack() as stack:
+        sink = sys.stderr if verbose else stack.enter_context(open(os.devnull, "w"))
+        with contextlib.redirect_stderr(sink):
+            import ml_analyzer as ma  # type: ignore
+
+        # Keep the sit/stand state of the real service untouched.
+        live_state = ma.SIT_STAND_STATE_FILE
+        state_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="perf-gate-"))
+        stack.callback(setattr, ma, "SIT_STAND_STATE_FILE", live_state)
+        ma.SIT_STAND_STATE_FILE = Path(state_dir) / "sit_stand_state.json"
+        groups = _measure(ma, sink, profile, repeats, seed)
+
+    return {
+        "environment": _environment(ma),
+        "profile": profile,
+        "repeats": repeats,
+        "groups": groups,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+
+def _tolerance(overrides: Dict[str, Any], group: str, stage: str, default: Dict[str, float]) -> Dict[str, float]:
+    tol = dict(default)
+    tol.update(overrides.get(group, {}))
+    tol.update(overrides.get(f"{group}/{stage}", {}))
+    return tol
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], default: Dict[str, float]) -> List[Dict[str, Any]]:
+    """One row per (group, stage) present in either run, flagged ``ok``/``regression``/..."""
+
+    overrides = baseline.get("tolerances", {})
+    base_groups = baseline.get("groups", {})
+    cur_groups = current["groups"]
+    rows: List[Dict[str, Any]] = []
+    for group in sorted(set(base_groups) | set(cur_groups)):
+        base_stages = base_groups.get(group, {})
+        cur_stages = cur_groups.get(group, {})
+        for stage in sorted(set(base_stages) | set(cur_stages), key=lambda s: (s != "total", s)):
+            base, cur = base_stages.get(stage), cur_stages.get(stage)
+            tol = _tolerance(overrides, group, stage, default)
+            row: Dict[str, Any] = {"group": group, "stage": stage, "baseline": base, "current": cur, "reasons": []}
+            if cur is None:
+                row["status"] = "missing"
+            elif base is None:
+                new = cur["median_ms"] > tol["abs_ms"]
+                row["status"] = "regression" if new else "new"
+                if new:
+                    row["reasons"].append(f"new stage costing {cur['median_ms']} ms")
+            else:
+                for key, rel in (("median_ms", tol["median"]), ("p95_ms", tol["p95"])):
+                    limit = base[key] * (1 + rel) + tol["abs_ms"]
+                    if cur[key] > limit:
+                        row["reasons"].append(f"{key} {cur[key]} > {round(limit, 3)}")
+                if "calls" in base and cur.get("calls", 0) > base["calls"]:
+                    row["reasons"].append(f"calls {cur['calls']} > {base['calls']}")
+                row["status"] = "regression" if row["reasons"] else "ok"
+            rows.append(row)
+    return rows
+
+
+def _fmt(entry: Optional[Dict[str, Any]], key: str) -> str:
+    if entry is None or key not in entry:
+        return "-"
+    return f"{entry[key]:.1f}" if isinstance(entry[key], float) else str(entry[key])
+
+
+def _delta(row: Dict[str, Any]) -> str:
+    base, cur = row["baseline"], row["current"]
+    if not base or not cur or not base["median_ms"]:
+        return "-"
+    return f"{(cur['median_ms'] / base['median_ms'] - 1) * 100:+.0f}%"
+
+
+def print_table(rows: List[Dict[str, Any]], out: Any = sys.stderr) -> None:
+    header = ("group", "stage", "base p50", "cur p50", "base p95", "cur p95", "calls", "Δ p50", "status")
+    lines = [header]
+    for r in rows:
+        base_calls, cur_calls = _fmt(r["baseline"], "calls"), _fmt(r["current"], "calls")
+        lines.append((
+            r["group"], r["stage"],
+            _fmt(r["baseline"], "median_ms"), _fmt(r["current"], "median_ms"),
+            _fmt(r["baseline"], "p95_ms"), _fmt(r["current"], "p95_ms"),
+            cur_calls if base_calls == cur_calls else f"{base_calls}→{cur_calls}",
+            _delta(r),
+            r["status"].upper() if r["status"] == "regression" else r["status"],
+        ))
+    widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+    for n, line in enumerate(lines):
+        # Print each group name once, on the first row of the group.
+        if n > 1 and line[0] == lines[n - 1][0]:
+            line = ("",) + line[1:]
+        elif n > 1:
+            print("", file=out)
+        print("  ".join(c.ljust(w) if i < 2 else c.rjust(w) for i, (c, w) in enumerate(zip(line, widths))), file=out)
+
+
+# ---------------------------------------------------------------------------
+# Main entry
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail when analyzer stage latency regresses against a baseline")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--update-baseline", action="store_true", help="Write the current run as the baseline")
+    parser.add_argument("--profile", choices=sorted(PROFILES),
+                        help="Frame profile (default: the baseline's, else behavior)")
+    parser.add_argument("--repeats", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative median growth")
+    parser.add_argument("--p95-tolerance", type=float, default=0.5, help="Allowed relative p95 growth")
+    parser.add_argument("--abs-ms", type=float, default=2.0, help="Absolute slack in ms (noise floor for tiny stages)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the analyzer's stderr logging")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    baseline: Optional[Dict[str, Any]] = None
+    if not args.update_baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as fp:
+                baseline = json.load(fp)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No baseline at {args.baseline}; record one with --update-baseline") from None
+    # Compare like with like unless the caller asked otherwise.
+    if args.profile is None:
+        args.profile = (baseline or {}).get("profile", "behavior")
+
+    current = run_suite(args.profile, args.repeats, seed=args.seed, verbose=args.verbose)
+
+    if args.update_baseline:
+        previous: Dict[str, Any] = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as fp:
+                previous = json.load(fp)
+        # Hand-tuned tolerances survive re-recording.
+        record = {**current, "tolerances": previous.get("tolerances", {})}
+        with open(args.baseline, "w", encoding="utf-8") as fp:
+            json.dump(record, fp, indent=2)
+            fp.write("\n")
+        print(json.dumps({"success": True, "baseline": args.baseline, "groups": sorted(current["groups"])}))
+        return
+
+    default = {"median": args.tolerance, "p95": args.p95_tolerance, "abs_ms": args.abs_ms}
+    rows = compare(baseline, current, default)
+    print_table(rows)
+    regressions = [r for r in rows if r["status"] == "regression"]
+    for r in regressions:
+        print(f"REGRESSION {r['group']}/{r['stage']}: {'; '.join(r['reasons'])}", file=sys.stderr)
+
+    report = {
+        "success": True,
+        "passed": not regressions,
+        "regressions": [{"group": r["group"], "stage": r["stage"], "reasons": r["reasons"]} for r in regressions],
+        "rows": rows,
+        "baseline_environment": baseline.get("environment"),
+        "current": current,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text)
+    else:
+        print(text)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
@@ -0,0 +1,131 @@
+"""On-demand profiling of single analyzer requests
+
+`profiled()` runs the enclosed block under `cProfile` and yields a
+`RequestProfile`; everything outside the block runs unprofiled, so only the
+request that asked for it pays the overhead (typically 1.5–3× on the
+Python-heavy stages, much less on MediaPipe and torch, whose time is spent in
+native code and shows up as a single call)::
+
+    with profiled(label="eye_gaze") as prof:
+        result = _predict(behavior, data)
+    result["profile"] = prof.summary()
+
+`summary()` returns the top functions by cumulative time plus, separately,
+the hottest functions defined in ``ml_analyzer.py`` with their line numbers,
+so a slow input can be traced to the analyzer code that handles it. With an
+output directory the raw stats are also dumped as ``<label>-<pid>-<n>.prof``
+for ``python -m pstats`` or snakeviz.
+
+Only one profiler can be active per interpreter; a request that arrives
+while another is being profiled runs normally and its summary carries an
+``error`` instead.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+SORT_KEYS = ("cumulative", "tottime", "ncalls")
+
+_ANALYZER_FILE = "ml_analyzer.py"
+_dumps = itertools.count(1)
+_active = False
+
+
+def _rows(stats: pstats.Stats, keys: List[Any], limit: int) -> List[Dict[str, Any]]:
+    rows = []
+    for key in keys[:limit]:
+        filename, line, func = key
+        cc, nc, tt, ct, _ = stats.stats[key]  # type: ignore[attr-defined]
+        rows.append({
+            "function": func,
+            "file": os.path.basename(filename) if filename != "~" else "<built-in>",
+            "line": line,
+            "ncalls": nc,
+            "primitive_calls": cc,
+            "tottime_ms": round(tt * 1000, 3),
+            "cumtime_ms": round(ct * 1000, 3),
+        })
+    return rows
+
+
+class RequestProfile:
+    def __init__(self, label: str, sort: str, top: int, output_dir: Optional[str]) -> None:
+        self.label = label
+        self.sort = sort if sort in SORT_KEYS else "cumulative"
+        self.top = top
+        self.output_dir = output_dir
+        self.profiler: Optional[cProfile.Profile] = None
+        self.wall_ms = 0.0
+        self.error: Optional[str] = None
+        self.path: Optional[str] = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Top functions overall and within ml_analyzer.py, by ``sort``."""
+
+        if self.profiler is None:
+            return {"label": self.label, "error": self.error or "not profiled"}
+        stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        stats.sort_stats(self.sort)
+        ordered = list(stats.fcn_list)  # type: ignore[attr-defined]
+        analyzer = [k for k in ordered if os.path.basename(k[0]) == _ANALYZER_FILE]
+        return {
+            "label": self.label,
+            "sort": self.sort,
+            "wall_ms": round(self.wall_ms, 3),
+            "total_calls": stats.total_calls,  # type: ignore[attr-defined]
+            "profiled_ms": round(stats.total_tt * 1000, 3),  # type: ignore[attr-defined]
+            "top": _rows(stats, ordered, self.top),
+            "analyzer": _rows(stats, analyzer, self.top),
+            "file": self.path,
+        }
+
+
+@contextmanager
+def profiled(
+    enabled: bool = True,
+    label: str = "request",
+    sort: str = "cumulative",
+    top: int = 25,
+    output_dir: Optional[str] = None,
+) -> Iterator[Optional[RequestProfile]]:
+    """Profile the enclosed block with cProfile (yields None if disabled)."""
+
+    global _active
+    if not enabled:
+        yield None
+        return
+    prof = RequestProfile(label, sort, top, output_dir)
+    if _active:
+        # Python < 3.12 silently lets a second profiler steal the hook.
+        prof.error = "another request is already being profiled"
+        yield prof
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as exc:  # a profiler outside this module is active
+        prof.error = str(exc)
+        yield prof
+        return
+    _active = True
+    start = time.perf_counter()
+    try:
+        yield prof
+    finally:
+        profiler.disable()
+        _active = False
+        prof.wall_ms = (time.perf_counter() - start) * 1000
+        prof.profiler = profiler
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in label)
+            prof.path = os.path.join(output_dir, f"{safe}-{os.getpid()}-{next(_dumps)}.prof")
+            profiler.dump_stats(prof.path)
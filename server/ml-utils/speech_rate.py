@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""Streaming speech-rate estimator
+
+Estimates speaking rate directly from 16 kHz mono PCM instead of relying on
+the browser's speech-recognition word counts. Syllable nuclei are detected as
+peaks of the 300–3000 Hz energy envelope; their count over a sliding window
+gives syllables/second, converted to WPM with a syllables-per-word factor
+(calibrated against `rapid_talking_data.csv`, where WPM was computed offline
+from ``word_count`` and ``duration_sec``).
+
+Every chunk costs the same regardless of session length: the band energies of
+the new 10 ms frames are computed in one vectorized FFT, the envelope and
+peak picker keep a few floats of state, and nucleus times live in a ring
+buffer that only ever holds one window.
+
+python speech_rate.py stream [--window 10] [--emit-every 2] < audio.s16le
+python speech_rate.py analyze <clip.wav> [--predict]
+python speech_rate.py calibrate --audio-dir <speech_wpm> [--csv rapid_talking_data.csv]
+
+`stream` prints one JSON line per emitted window::
+
+{ "time": 12.0, "syllables": 41, "syllables_per_sec": 4.1, "wpm": 153.8 }
+
+`analyze` prints ``{"rapid_talking": [<wpm per window>]}`` – the payload the
+``rapid_talking`` behaviour of `ml_analyzer.py` accepts; ``--predict`` also
+runs it through `_predict`.
+
+The server feeds the estimator too: a ``rapid_talking`` payload may carry
+``"audio"`` (base64 little-endian int16 mono PCM, optionally as a ``data:``
+URL, with ``"sample_rate"`` when it is not 16 kHz; see `decode_pcm`). With a
+``session_id`` the chunk is pushed into that session's estimator, kept with
+its WPM series, and every window it completes is appended to the series;
+without one the chunk is analysed on its own like `analyze` does.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+HOP = 160          # 10 ms
+WIN = 320          # 20 ms
+N_FFT = 512
+BAND_HZ = (300.0, 3000.0)
+
+# Average syllables per word; `calibrate` fits this for a given corpus.
+SYLLABLES_PER_WORD = 1.6
+
+ROOT = Path(__file__).resolve().parents[2]
+CSV_PATH = ROOT / "machine-learning" / "models" / "speech" / "rapid_talking_data.csv"
+
+_WINDOW = np.hanning(WIN).astype(np.float32)
+_FREQS = np.fft.rfftfreq(N_FFT, 1.0 / SAMPLE_RATE)
+_BAND = (_FREQS >= BAND_HZ[0]) & (_FREQS <= BAND_HZ[1])
+
+
+class _TimeRing:
+    """Fixed-capacity ring of event times (frame indices), oldest dropped first."""
+
+    def __init__(self, capacity: int) -> None:
+        self._times = np.zeros(capacity)
+        self._start = 0
+        self._count = 0
+
+    def append(self, t: float) -> None:
+        cap = len(self._times)
+        if self._count == cap:
+            self._start = (self._start + 1) % cap
+            self._count -= 1
+        self._times[(self._start + self._count) % cap] = t
+        self._count += 1
+
+    def drop_before(self, t: float) -> None:
+        cap = len(self._times)
+        while self._count and self._times[self._start] < t:
+            self._start = (self._start + 1) % cap
+            self._count -= 1
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class SpeechRateEstimator:
+    """Per-stream syllable-nucleus counter over a sliding window.
+
+    `push` takes PCM (int16 or float in [-1, 1]) and returns the windows
+    emitted while consuming it (one every ``emit_every`` seconds once the
+    first full window has been seen).
+    """
+
+    def __init__(
+        self,
+        window_s: float = 10.0,
+        emit_every_s: float = 2.0,
+        syllables_per_word: float = SYLLABLES_PER_WORD,
+        smooth_hz: float = 8.0,
+        min_gap_s: float = 0.1,
+        dip_db: float = 2.0,
+        margin_db: float = 10.0,
+    ) -> None:
+        self.window_frames = int(round(window_s * SAMPLE_RATE / HOP))
+        self.emit_frames = max(1, int(round(emit_every_s * SAMPLE_RATE / HOP)))
+        self.syllables_per_word = syllables_per_word
+        self.min_gap = int(round(min_gap_s * SAMPLE_RATE / HOP))
+        self.dip_db = dip_db
+        self.margin_db = margin_db
+        # One-pole low-pass on the dB envelope (10 ms frames).
+        self._alpha = float(1.0 - np.exp(-2 * np.pi * smooth_hz * HOP / SAMPLE_RATE))
+        self._pending = np.zeros(WIN - HOP, dtype=np.float32)
+        self._frame = 0
+        self._env: Optional[float] = None
+        self._floor = 0.0
+        self._rising = True
+        self._peak_val = -np.inf
+        self._peak_frame = -1
+        self._valley = np.inf
+        self._last_nucleus = -10 ** 9
+        # At most one nucleus per min_gap frames fits in a window.
+        self._nuclei = _TimeRing(self.window_frames // max(1, self.min_gap) + 2)
+
+    def _band_energy_db(self, pcm: np.ndarray) -> np.ndarray:
+        samples = pcm.astype(np.float32) / 32768.0 if pcm.dtype == np.int16 else pcm.astype(np.float32, copy=False)
+        buf = np.concatenate([self._pending, samples])
+        n = (len(buf) - WIN) // HOP + 1 if len(buf) >= WIN else 0
+        if n <= 0:
+            self._pending = buf
+            return np.empty(0, dtype=np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(buf, WIN)[::HOP][:n] * _WINDOW
+        power = np.abs(np.fft.rfft(frames, n=N_FFT)[:, _BAND]) ** 2
+        self._pending = buf[n * HOP:]
+        return 10.0 * np.log10(power.sum(axis=1) + 1e-10)
+
+    def push(self, pcm: np.ndarray) -> List[Dict[str, Any]]:
+        emitted: List[Dict[str, Any]] = []
+        for e in self._band_energy_db(np.asarray(pcm)):
+            e = float(e)
+            if self._env is None:
+                self._env = self._floor = e
+            self._env += self._alpha * (e - self._env)
+            env = self._env
+            # Noise floor: follows dips quickly, rises slowly.
+            self._floor = env if env < self._floor else self._floor + 0.002 * (env - self._floor)
+
+            # Hysteresis peak picker: a peak is confirmed once the envelope
+            # falls dip_db below it, and the next one can only start after it
+            # rises dip_db above the valley in between.
+            if self._rising:
+                if env > self._peak_val:
+                    self._peak_val, self._peak_frame = env, self._frame
+                elif self._peak_val - env >= self.dip_db:
+                    if (self._peak_val >= self._floor + self.margin_db
+                            and self._peak_frame - self._last_nucleus >= self.min_gap):
+                        self._nuclei.append(self._peak_frame)
+                        self._last_nucleus = self._peak_frame
+                    self._rising = False
+                    self._valley = env
+            elif env < self._valley:
+                self._valley = env
+            elif env - self._valley >= self.dip_db:
+                self._rising = True
+                self._peak_val, self._peak_frame = env, self._frame
+
+            self._frame += 1
+            if self._frame >= self.window_frames and self._frame % self.emit_frames == 0:
+                emitted.append(self._emit())
+        return emitted
+
+    @property
+    def nuclei(self) -> int:
+        """Syllable nuclei currently held (at most one window's worth)."""
+
+        return len(self._nuclei)
+
+    def _emit(self) -> Dict[str, Any]:
+        self._nuclei.drop_before(self._frame - self.window_frames)
+        count = len(self._nuclei)
+        seconds = self.window_frames * HOP / SAMPLE_RATE
+        rate = count / seconds
+        return {
+            "time": round(self._frame * HOP / SAMPLE_RATE, 3),
+            "syllables": count,
+            "syllables_per_sec": round(rate, 3),
+            "wpm": round(rate * 60.0 / self.syllables_per_word, 2),
+        }
+
+
+def count_nuclei(audio: np.ndarray, **kwargs: Any) -> int:
+    """Total syllable nuclei in a whole clip (window = clip length)."""
+
+    seconds = max(len(audio) / SAMPLE_RATE, HOP / SAMPLE_RATE)
+    est = SpeechRateEstimator(window_s=seconds + 1.0, emit_every_s=seconds + 1.0, **kwargs)
+    est.push(audio)
+    # Trailing silence flushes the last peak.
+    est.push(np.zeros(SAMPLE_RATE // 2, dtype=np.float32))
+    return est.nuclei
+
+
+def decode_pcm(audio: str, sample_rate: Optional[float] = None) -> np.ndarray:
+    """16 kHz float samples from base64 little-endian int16 mono PCM.
+
+    A ``data:...;base64,`` prefix is ignored; other rates are resampled
+    linearly, as `wake_word.read_wav` does.
+    """
+
+    if audio.startswith("data:"):
+        audio = audio.split(",", 1)[1]
+    raw = base64.b64decode(audio)
+    pcm = np.frombuffer(raw[: len(raw) // 2 * 2], dtype="<i2").astype(np.float32) / 32768.0
+    if sample_rate and float(sample_rate) != SAMPLE_RATE:
+        if float(sample_rate) <= 0:
+            raise ValueError(f"Invalid sample_rate: {sample_rate}")
+        if not len(pcm):
+            return pcm
+        n_out = int(len(pcm) * SAMPLE_RATE / float(sample_rate))
+        pcm = np.interp(np.linspace(0, len(pcm) - 1, n_out), np.arange(len(pcm)), pcm).astype(np.float32)
+    return pcm
+
+
+def clip_wpm_series(audio: np.ndarray, window_s: float = 10.0, emit_every_s: float = 2.0, **kwargs: Any) -> List[float]:
+    """Per-window WPM values for a clip; clips shorter than a window give one value."""
+
+    est = SpeechRateEstimator(window_s=window_s, emit_every_s=emit_every_s, **kwargs)
+    rates = [w["wpm"] for w in est.push(audio)]
+    if not rates:
+        seconds = len(audio) / SAMPLE_RATE
+        if seconds > 0:
+            spw = kwargs.get("syllables_per_word", SYLLABLES_PER_WORD)
+            rates = [round(count_nuclei(audio) / seconds * 60.0 / spw, 2)]
+    return rates
+
+
+# ---------------------------------------------------------------------------
+# Main entry
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    from wake_word import read_wav  # type: ignore  # same 16 kHz mono loader
+
+    parser = argparse.ArgumentParser(description="Estimate speaking rate from PCM audio")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("stream", help="Raw 16 kHz mono int16 PCM on stdin -> JSON lines")
+    s.add_argument("--window", type=float, default=10.0, help="Window length in seconds")
+    s.add_argument("--emit-every", type=float, default=2.0, help="Seconds between emitted windows")
+    s.add_argument("--syllables-per-word", type=float, default=SYLLABLES_PER_WORD)
+    s.add_argument("--chunk-ms", type=int, default=100)
+
+    a = sub.add_parser("analyze", help="Per-window WPM of a WAV clip")
+    a.add_argument("wav")
+    a.add_argument("--window", type=float, default=10.0)
+    a.add_argument("--emit-every", type=float, default=2.0)
+    a.add_argument("--syllables-per-word", type=float, default=SYLLABLES_PER_WORD)
+    a.add_argument("--predict", action="store_true", help="Also run the rapid_talking behaviour")
+
+    c = sub.add_parser("calibrate", help="Fit syllables-per-word against transcribed clips")
+    c.add_argument("--audio-dir", required=True)
+    c.add_argument("--csv", default=str(CSV_PATH))
+    args = parser.parse_args()
+
+    if args.command == "stream":
+        est = SpeechRateEstimator(args.window, args.emit_every, args.syllables_per_word)
+        chunk_bytes = SAMPLE_RATE * args.chunk_ms // 1000 * 2
+        while True:
+            data = sys.stdin.buffer.read(chunk_bytes)
+            if not data:
+                break
+            for window in est.push(np.frombuffer(data[: len(data) // 2 * 2], dtype=np.int16)):
+                sys.stdout.write(json.dumps(window) + "\n")
+                sys.stdout.flush()
+    elif args.command == "analyze":
+        rates = clip_wpm_series(read_wav(args.wav), args.window, args.emit_every,
+                                syllables_per_word=args.syllables_per_word)
+        out: Dict[str, Any] = {"rapid_talking": rates}
+        if args.predict:
+            from ml_analyzer import _predict  # type: ignore
+
+            out["result"] = _predict("rapid_talking", rates)
+        print(json.dumps(out))
+    else:
+        import csv
+
+        nuclei = words = 0
+        per_clip = []
+        with open(args.csv, "r", encoding="utf-8") as fp:
+            for row in csv.DictReader(fp):
+                path = Path(args.audio_dir) / row["filename"]
+                if not path.exists() or not row.get("word_count"):
+                    continue
+                n = count_nuclei(read_wav(path))
+                w = int(float(row["word_count"]))
+                nuclei += n
+                words += w
+                per_clip.append((n, w))
+        if not words:
+            raise ValueError("No transcribed clips found for calibration")
+        spw = nuclei / words
+        est = np.array([n / spw for n, _ in per_clip])
+        ref = np.array([w for _, w in per_clip], dtype=float)
+        print(json.dumps({
+            "success": True,
+            "clips": len(per_clip),
+            "syllables_per_word": round(spw, 4),
+            "word_count_mae": round(float(np.mean(np.abs(est - ref))), 3),
+        }))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
@@ -0,0 +1,121 @@
+"""Dependency-ordered, memoised stage execution
+
+A `StageGraph` declares named stages, each a function of the outputs of the
+stages it depends on. `run()` evaluates every stage the requested targets
+need exactly once and hands each one to the thread pool as soon as its
+dependencies are done, so stages that do not depend on each other (Hands,
+Pose and FaceMesh over the same decoded frames) overlap::
+
+    graph = StageGraph()
+    graph.add("decode", lambda: decode(frames))
+    graph.add("hands", lambda decode: hands(decode), deps=("decode",))
+    graph.add("pose", lambda decode: pose(decode), deps=("decode",))
+    outputs, errors = graph.run(["hands", "pose"], executor=pool)
+
+Stage functions receive their dependencies' outputs as keyword arguments
+named after the dependencies. A stage that raises is reported in ``errors``
+and every stage depending on it is skipped with the same exception, so one
+failing graph does not take down behaviours that never needed it. Each
+stage also becomes a ``graph`` span when a trace recorder is installed (see
+`tracing.py`). Without an executor the stages run in order on the calling
+thread.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tracing import span
+
+
+class StageGraph:
+    def __init__(self) -> None:
+        self.stages: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Sequence[str] = ()) -> None:
+        for dep in deps:
+            if dep not in self.stages:
+                raise KeyError(f"Stage {name!r} depends on undeclared stage {dep!r}")
+        self.stages[name] = (fn, tuple(deps))
+
+    def required(self, targets: Iterable[str]) -> List[str]:
+        """*targets* and everything they depend on, dependencies first."""
+
+        order: List[str] = []
+        seen = set()
+
+        def visit(name: str) -> None:
+            if name in seen:
+                return
+            seen.add(name)
+            for dep in self.stages[name][1]:
+                visit(dep)
+            order.append(name)
+
+        for target in targets:
+            visit(target)
+        return order
+
+    def _call(self, name: str, outputs: Dict[str, Any]) -> Any:
+        fn, deps = self.stages[name]
+        with span(name, cat="graph"):
+            return fn(**{dep: outputs[dep] for dep in deps})
+
+    def run(self, targets: Iterable[str], executor: Optional[Executor] = None) -> Tuple[Dict[str, Any], Dict[str, BaseException]]:
+        """Evaluate *targets*; returns ``(outputs, errors)`` keyed by stage name."""
+
+        order = self.required(targets)
+        outputs: Dict[str, Any] = {}
+        errors: Dict[str, BaseException] = {}
+
+        def failed_dep(name: str) -> Optional[BaseException]:
+            for dep in self.stages[name][1]:
+                if dep in errors:
+                    return errors[dep]
+            return None
+
+        if executor is None:
+            for name in order:
+                error = failed_dep(name)
+                if error is not None:
+                    errors[name] = error
+                    continue
+                try:
+                    outputs[name] = self._call(name, outputs)
+                except Exception as exc:
+                    errors[name] = exc
+            return outputs, errors
+
+        waiting = {name: set(self.stages[name][1]) for name in order}
+        running: Dict[Future, str] = {}
+
+        def submit_ready() -> None:
+            for name in [n for n, deps in waiting.items() if not deps]:
+                del waiting[name]
+                running[executor.submit(self._call, name, outputs)] = name
+
+        def finish(name: str) -> None:
+            for other, deps in list(waiting.items()):
+                if name not in deps:
+                    continue
+                deps.discard(name)
+                if name in errors:
+                    # Skip dependents of a failed stage (and theirs, transitively).
+                    del waiting[other]
+                    errors[other] = errors[name]
+                    finish(other)
+
+        submit_ready()
+        while running:
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                exc = future.exception()
+                if exc is not None:
+                    errors[name] = exc
+                else:
+                    outputs[name] = future.result()
+                finish(name)
+            submit_ready()
+        return outputs, errors
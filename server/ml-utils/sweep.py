@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""Threshold sweep for the heuristic analyzers
+
+Tuning the tapping and sit/stand thresholds used to mean re-running MediaPipe
+on every clip for every candidate value. The analyzers are now split into a
+feature-extraction stage (`ml_analyzer._extract_*_features`) and a pure
+decision stage (`heuristics`), so detection runs once and thousands of
+threshold combinations are re-scored against the stored features.
+
+python sweep.py extract <dataset.json|dataset.jsonl> --out features.npz
+python sweep.py extract --cache <cache_dir> [--behavior sit_stand] [--split val] --out features.npz
+python sweep.py run features.npz grid.json [--top 20] [--max-configs 50000] [--output report.json]
+
+The dataset format is the one `evaluate.py` reads. Entries whose ``data`` is
+a landmark payload (see `landmark_input.py`; ``--cache`` builds them from a
+cache's landmark columns) go through the analyzer's landmark path, so
+neither decoding nor MediaPipe runs again. Entries may
+also carry ``session`` and ``timestamp`` (seconds); sit_stand clips that have both are
+replayed per session through the transition state machine and ``label``
+means "an action should be counted on this tick". Otherwise sit_stand is
+scored per clip as a posture classifier with ``label`` 1 = standing.
+
+The grid file maps behaviour -> threshold -> candidate values, either a
+list or an inclusive ``"start:stop:step"`` range::
+
+{
+  "tapping_hands": {"hand_tap_px": [10, 15, 20], "pattern_threshold": "0.3:0.6:0.05"},
+  "sit_stand": {"consensus_threshold": "0.5:0.8:0.05"}
+}
+
+Unnamed thresholds keep their defaults (see `heuristics.*_PARAMS`). Output
+(stdout, or ``--output``)::
+
+{
+  "success": true,
+  "behaviors": {
+    "tapping_hands": {
+      "clips": 120, "configs_evaluated": 567, "mode": "clip",
+      "default": {"f1": .., "precision": .., "recall": .., "accuracy": .., "confusion": {...}},
+      "top": [{"params": {...}, "f1": .., ...}, ...]
+    }
+  }
+}
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from heuristics import (
+    FOOT_TAPPING_PARAMS,
+    HAND_TAPPING_PARAMS,
+    POSTURES,
+    SIT_STAND_PARAMS,
+    classify_postures,
+    decide_foot_tapping,
+    decide_hand_tapping,
+    decide_sit_stand_transition,
+)
+from landmark_input import is_landmark_payload
+
+# behaviour -> (default thresholds, names of per-clip feature arrays)
+BEHAVIORS: Dict[str, Tuple[Dict[str, float], Tuple[str, ...]]] = {
+    "tapping_hands": (HAND_TAPPING_PARAMS, ("hand_xy", "hand_confidence", "frame_h", "change_ratio", "avg_intensity")),
+    "tapping_feet": (FOOT_TAPPING_PARAMS, ("ankle", "shoulder", "hip", "frame_wh", "change_ratio", "avg_intensity")),
+    "sit_stand": (SIT_STAND_PARAMS, ("landmarks",)),
+}
+
+# Sweeps are evaluated this many configurations at a time.
+CHUNK_CONFIGS = 4096
+
+_STANDING = POSTURES.index("standing")
+
+# ---------------------------------------------------------------------------
+# Feature extraction
+# ---------------------------------------------------------------------------
+
+
+def _extractors() -> Dict[str, Any]:
+    """Import the analyzer lazily – it loads models and MediaPipe on import."""
+
+    import ml_analyzer  # type: ignore
+
+    return {
+        "tapping_hands": ml_analyzer._extract_hand_tapping_features,
+        "tapping_feet": ml_analyzer._extract_foot_tapping_features,
+        "sit_stand": ml_analyzer._extract_sit_stand_features,
+        # (behaviour, landmark payload) -> features, without detection
+        "landmarks": ml_analyzer._landmark_features,
+    }
+
+
+def extract(samples: List[Dict[str, Any]], out_path: str) -> Dict[str, int]:
+    """Run feature extraction over *samples* and save them to one ``.npz``.
+
+    Per-clip arrays of one behaviour are concatenated along the frame axis
+    with an ``offsets`` array, so the file holds plain numeric arrays only
+    (keys are ``<behavior>.<name>``).
+    """
+
+    from evaluate import _parse_label  # type: ignore
+
+    extractors = _extractors()
+    collected: Dict[str, Dict[str, List[Any]]] = {}
+    for idx, sample in enumerate(samples):
+        b_type = sample.get("type")
+        if b_type not in BEHAVIORS:
+            continue
+        data = sample.get("data") or []
+        if isinstance(data, str):
+            data = [data]
+        try:
+            if is_landmark_payload(data):
+                feats = extractors["landmarks"](b_type, data)
+            else:
+                feats = extractors[b_type](data)
+        except Exception as e:
+            print(f"Sample {idx} ({b_type}) extraction failed: {e}", file=sys.stderr)
+            continue
+        label = _parse_label(sample.get("label"))
+        cols = collected.setdefault(b_type, {})
+        for name in BEHAVIORS[b_type][1]:
+            cols.setdefault(name, []).append(np.asarray(feats[name], dtype=np.float32))
+        cols.setdefault("mediapipe_ok", []).append(bool(feats.get("mediapipe_ok", True)))
+        cols.setdefault("label", []).append(-1 if label is None else label)
+        cols.setdefault("session", []).append(str(sample.get("session") or ""))
+        timestamp = sample.get("timestamp")
+        cols.setdefault("timestamp", []).append(np.nan if timestamp is None else float(timestamp))
+        cols.setdefault("id", []).append(str(sample.get("id", idx)))
+        print(f"Extracted sample {idx + 1}/{len(samples)} ({b_type})", file=sys.stderr)
+
+    arrays: Dict[str, np.ndarray] = {}
+    counts: Dict[str, int] = {}
+    for b_type, cols in collected.items():
+        per_clip = cols[BEHAVIORS[b_type][1][0]]
+        lengths = [len(a) for a in per_clip]
+        arrays[f"{b_type}.offsets"] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        for name in BEHAVIORS[b_type][1]:
+            arrays[f"{b_type}.{name}"] = np.concatenate(cols[name], axis=0)
+        arrays[f"{b_type}.mediapipe_ok"] = np.asarray(cols["mediapipe_ok"], dtype=bool)
+        arrays[f"{b_type}.label"] = np.asarray(cols["label"], dtype=np.int8)
+        arrays[f"{b_type}.session"] = np.asarray(cols["session"], dtype=str)
+        arrays[f"{b_type}.timestamp"] = np.asarray(cols["timestamp"], dtype=np.float64)
+        arrays[f"{b_type}.id"] = np.asarray(cols["id"], dtype=str)
+        counts[b_type] = len(lengths)
+    np.savez_compressed(out_path, **arrays)
+    return counts
+
+
+def load_features(path: str) -> Dict[str, Dict[str, Any]]:
+    """Load an extracted ``.npz`` as ``{behavior: {"clips": [...], ...}}``."""
+
+    data = np.load(path, allow_pickle=False)
+    out: Dict[str, Dict[str, Any]] = {}
+    for b_type, (_, names) in BEHAVIORS.items():
+        if f"{b_type}.offsets" not in data:
+            continue
+        offsets = data[f"{b_type}.offsets"]
+        columns = {name: data[f"{b_type}.{name}"].astype(np.float64) for name in names}
+        mp_ok = data[f"{b_type}.mediapipe_ok"]
+        clips = []
+        for i in range(len(offsets) - 1):
+            lo, hi = int(offsets[i]), int(offsets[i + 1])
+            feats: Dict[str, Any] = {name: col[lo:hi] for name, col in columns.items()}
+            feats["mediapipe_ok"] = bool(mp_ok[i])
+            clips.append(feats)
+        out[b_type] = {
+            "clips": clips,
+            "label": data[f"{b_type}.label"].astype(int),
+            "session": data[f"{b_type}.session"],
+            "timestamp": data[f"{b_type}.timestamp"],
+        }
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Grid
+# ---------------------------------------------------------------------------
+
+
+def _parse_values(spec: Any) -> List[float]:
+    """A list of candidates, a scalar, or an inclusive ``"start:stop:step"``."""
+
+    if isinstance(spec, str):
+        parts = [float(x) for x in spec.split(":")]
+        if len(parts) != 3 or parts[2] <= 0:
+            raise ValueError(f"Range must be 'start:stop:step' with step > 0, got {spec!r}")
+        start, stop, step = parts
+        return [round(v, 10) for v in np.arange(start, stop + step / 2, step)]
+    if isinstance(spec, (list, tuple)):
+        return [float(v) for v in spec]
+    return [float(spec)]
+
+
+def grid_configs(
+    grid: Dict[str, Any],
+    defaults: Dict[str, float],
+    max_configs: Optional[int] = None,
+    seed: int = 0,
+) -> Dict[str, np.ndarray]:
+    """Cartesian product of *grid* as ``{param: (N,) array}``.
+
+    Row 0 is always the default configuration, so the report can compare
+    against it. Products larger than *max_configs* are randomly subsampled.
+    """
+
+    unknown = set(grid) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown threshold(s): {sorted(unknown)}")
+    names = sorted(grid)
+    values = [_parse_values(grid[name]) for name in names]
+    total = int(np.prod([len(v) for v in values])) if values else 1
+    if max_configs is not None and total > max_configs:
+        rng = np.random.default_rng(seed)
+        picks = rng.choice(total, size=max_configs, replace=False)
+        rows = [np.unravel_index(int(i), [len(v) for v in values]) for i in np.sort(picks)]
+        combos = [tuple(values[j][r[j]] for j in range(len(names))) for r in rows]
+        print(f"Sampled {max_configs} of {total} configurations", file=sys.stderr)
+    else:
+        combos = list(itertools.product(*values))
+    configs = {name: np.array([defaults[name]] + [c[j] for c in combos], dtype=np.float64) for j, name in enumerate(names)}
+    return configs
+
+
+def _chunks(configs: Dict[str, np.ndarray], size: int) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+    if not configs:
+        yield 0, {}
+        return
+    n = len(next(iter(configs.values())))
+    for lo in range(0, n, size):
+        yield lo, {name: col[lo:lo + size] for name, col in configs.items()}
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+
+def _confusion(pred: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """(K, 4) tp/fp/tn/fn from (K, N) predictions and (N,) 0/1 labels."""
+
+    pos = labels[None, :] == 1
+    return np.stack([
+        (pred & pos).sum(axis=1),
+        (pred & ~pos).sum(axis=1),
+        (~pred & ~pos).sum(axis=1),
+        (~pred & pos).sum(axis=1),
+    ], axis=1)
+
+
+def _score_clips(b_type: str, clips: List[Dict[str, Any]], labels: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    decide = {"tapping_hands": decide_hand_tapping, "tapping_feet": decide_foot_tapping}.get(b_type)
+    preds = []
+    for feats in clips:
+        if decide is not None:
+            preds.append(decide(feats, params)["detected"])
+        else:
+            preds.append(classify_postures(feats, params)["posture"] == _STANDING)
+    return _confusion(np.stack(preds, axis=1), labels)
+
+
+def _score_sessions(
+    clips: List[Dict[str, Any]],
+    labels: np.ndarray,
+    sessions: np.ndarray,
+    timestamps: np.ndarray,
+    params: Dict[str, np.ndarray],
+) -> np.ndarray:
+    """Replay each session's ticks through the sit/stand state machine."""
+
+    k = len(next(iter(params.values()))) if params else 1
+    preds = np.zeros((k, len(clips)), dtype=bool)
+    for session in np.unique(sessions):
+        order = [int(i) for i in np.argsort(timestamps) if sessions[i] == session]
+        posture = np.zeros(k, dtype=int)
+        baseline = np.zeros(k, dtype=int)
+        last_time = np.zeros(k)
+        for i in order:
+            c = classify_postures(clips[i], params)
+            step = decide_sit_stand_transition(
+                c["posture"], c["posture_confidence"], c["enough_frames"],
+                posture, baseline, last_time, float(timestamps[i]), params,
+            )
+            preds[:, i] = step["detected"]
+            posture, baseline, last_time = step["posture"], step["baseline_count"], step["last_transition_time"]
+    return _confusion(preds, labels)
+
+
+def _metrics(conf: np.ndarray) -> Dict[str, Any]:
+    tp, fp, tn, fn = (int(v) for v in conf)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    total = tp + fp + tn + fn
+    return {
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "precision": precision,
+        "recall": recall,
+        "accuracy": (tp + tn) / total if total else 0.0,
+        "confusion": {"tp": tp, "fp": fp, "tn": tn, "fn": fn},
+    }
+
+
+def sweep(
+    b_type: str,
+    features: Dict[str, Any],
+    grid: Dict[str, Any],
+    top: int = 20,
+    max_configs: Optional[int] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Score every configuration of *grid* against one behaviour's features."""
+
+    labels = features["label"]
+    keep = np.flatnonzero(labels >= 0)
+    clips = [features["clips"][i] for i in keep]
+    labels = labels[keep]
+    sessions = features["session"][keep]
+    timestamps = features["timestamp"][keep]
+    session_mode = b_type == "sit_stand" and bool(np.all(sessions != "")) and not np.isnan(timestamps).any()
+
+    configs = grid_configs(grid, BEHAVIORS[b_type][0], max_configs=max_configs, seed=seed)
+    n = len(next(iter(configs.values()))) if configs else 1
+    confusion = np.zeros((n, 4), dtype=np.int64)
+    for lo, chunk in _chunks(configs, CHUNK_CONFIGS):
+        if session_mode:
+            part = _score_sessions(clips, labels, sessions, timestamps, chunk)
+        else:
+            part = _score_clips(b_type, clips, labels, chunk)
+        confusion[lo:lo + len(part)] = part
+        print(f"{b_type}: scored {min(lo + CHUNK_CONFIGS, n)}/{n} configurations", file=sys.stderr)
+
+    results = []
+    for i in range(n):
+        row = _metrics(confusion[i])
+        row["params"] = {name: float(col[i]) for name, col in configs.items()}
+        results.append(row)
+    default = results[0]
+    results.sort(key=lambda r: (r["f1"], r["accuracy"]), reverse=True)
+    return {
+        "clips": len(clips),
+        "configs_evaluated": n,
+        "mode": "session" if session_mode else "clip",
+        "default": {k: v for k, v in default.items() if k != "params"},
+        "top": results[:top],
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-score stored heuristic features over threshold grids")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ext = sub.add_parser("extract", help="Run detection once and store features")
+    p_ext.add_argument("dataset", nargs="?", help="JSON array or JSON-lines dataset")
+    p_ext.add_argument("--cache", help="Read clips from a dataset_cache.py cache instead")
+    p_ext.add_argument("--behavior", help="Only this behaviour (with --cache)")
+    p_ext.add_argument("--split", help="Only this split (with --cache)")
+    p_ext.add_argument("--out", required=True, help="Output .npz path")
+
+    p_run = sub.add_parser("run", help="Sweep threshold grids over stored features")
+    p_run.add_argument("features", help=".npz written by 'extract'")
+    p_run.add_argument("grid", help="Grid JSON: behaviour -> threshold -> values")
+    p_run.add_argument("--top", type=int, default=20, help="Configurations to report per behaviour")
+    p_run.add_argument("--max-configs", type=int, help="Randomly subsample larger grids")
+    p_run.add_argument("--seed", type=int, default=0)
+    p_run.add_argument("--output", help="Write the report here instead of stdout")
+    args = parser.parse_args()
+
+    if args.command == "extract":
+        from evaluate import _load_dataset, _samples_from_cache  # type: ignore
+
+        if args.cache:
+            samples = _samples_from_cache(args.cache, args.behavior, args.split)
+        elif args.dataset:
+            samples = _load_dataset(args.dataset)
+        else:
+            parser.error("extract needs a dataset file or --cache")
+        counts = extract(samples, args.out)
+        print(json.dumps({"success": True, "output": args.out, "clips": counts}))
+        return
+
+    features = load_features(args.features)
+    with open(args.grid, "r", encoding="utf-8") as fp:
+        grids = json.load(fp)
+    report: Dict[str, Any] = {"success": True, "behaviors": {}}
+    for b_type, grid in grids.items():
+        if b_type not in features:
+            print(f"No stored features for {b_type}, skipping", file=sys.stderr)
+            continue
+        report["behaviors"][b_type] = sweep(
+            b_type, features[b_type], grid or {}, top=args.top, max_configs=args.max_configs, seed=args.seed
+        )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
@@ -0,0 +1,210 @@
+"""Per-stage timing for analyzer requests
+
+`stage(name)` marks a region of the analyzer as one named stage; `collect()`
+turns timing on for the duration of one request and yields the `StageTimer`
+that accumulates it::
+
+    with collect() as timer:
+        result = _predict(behavior, data)
+    result["timings"] = timer.as_dict()
+
+Stage times are exclusive: when stages nest (MediaPipe inside a crop, a
+decode inside frame-movement analysis) the inner time is charged to the
+inner stage only, so the stages of a request add up to at most its total
+and the remainder is reported as ``other``. Clocks are `time.perf_counter_ns`
+(monotonic, highest available resolution).
+
+With no `collect()` active `stage()` returns a shared no-op context manager,
+so instrumented code pays two global lookups per region and nothing else.
+The active timer is a module global shared by every thread, with one stage
+stack per thread: the concurrent stages of `ml_analyzer.analyze_all` are
+each charged their own time, so there the stages can add up to more than
+the wall-clock total (and ``other`` is then 0).
+
+The same regions feed trace recorders (see `tracing.py`): while one is
+installed every stage is also recorded as a span with its thread id.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Stage names used by the analyzer, in pipeline order.
+STAGES = (
+    "decode",
+    "mediapipe_init",
+    "mediapipe",
+    "crop",
+    "frame_diff",
+    "tensor",
+    "forward",
+    "decision",
+    "state_io",
+)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+
+_NULL = _NullStage()
+
+
+class StageTimer:
+    """Exclusive per-stage nanosecond totals and call counts for one request."""
+
+    def __init__(self) -> None:
+        self.totals: Dict[str, int] = {}
+        self.calls: Dict[str, int] = {}
+        self._stacks: Dict[int, List[str]] = {}
+        self._marks: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._start = 0
+        self._end: Optional[int] = None
+
+    def _charge(self, tid: int, stack: List[str], now: int) -> None:
+        if stack:
+            name = stack[-1]
+            self.totals[name] = self.totals.get(name, 0) + now - self._marks[tid]
+        self._marks[tid] = now
+
+    def push(self, name: str) -> None:
+        now = time.perf_counter_ns()
+        tid = threading.get_ident()
+        with self._lock:
+            stack = self._stacks.setdefault(tid, [])
+            self._charge(tid, stack, now)
+            stack.append(name)
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def pop(self) -> None:
+        now = time.perf_counter_ns()
+        tid = threading.get_ident()
+        with self._lock:
+            stack = self._stacks[tid]
+            self._charge(tid, stack, now)
+            stack.pop()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """``{"total_ms", "stages": {name: ms}, "calls": {name: n}, "other_ms"}``."""
+
+        end = self._end if self._end is not None else time.perf_counter_ns()
+        total = end - self._start
+        staged = sum(self.totals.values())
+        return {
+            "total_ms": round(total / 1e6, 3),
+            "stages": {k: round(v / 1e6, 3) for k, v in self.totals.items()},
+            "calls": dict(self.calls),
+            "other_ms": round(max(0, total - staged) / 1e6, 3),
+        }
+
+
+class _Stage:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer: Optional[StageTimer], name: str) -> None:
+        self.timer = timer
+        self.name = name
+        self.start = 0
+
+    def __enter__(self) -> None:
+        if self.timer is not None:
+            self.timer.push(self.name)
+        if _TRACERS:
+            self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc: Any) -> bool:
+        if self.timer is not None:
+            self.timer.pop()
+        tracers = _TRACERS
+        if tracers and self.start:
+            end = time.perf_counter_ns()
+            for tracer in tracers:
+                tracer.complete(self.name, "stage", self.start, end)
+        return False
+
+
+_ACTIVE: Optional[StageTimer] = None
+_TRACERS: Tuple[Any, ...] = ()
+
+
+def stage(name: str) -> Any:
+    """Context manager timing *name* when a `collect()` or tracer is active."""
+
+    timer = _ACTIVE
+    if timer is None and not _TRACERS:
+        return _NULL
+    return _Stage(timer, name)
+
+
+def add_tracer(tracer: Any) -> None:
+    """Record every stage as a span on *tracer* (``tracer.complete(...)``)."""
+
+    global _TRACERS
+    _TRACERS = _TRACERS + (tracer,)
+
+
+def remove_tracer(tracer: Any) -> None:
+    global _TRACERS
+    _TRACERS = tuple(t for t in _TRACERS if t is not tracer)
+
+
+@contextmanager
+def collect(enabled: bool = True) -> Iterator[Optional[StageTimer]]:
+    """Activate a fresh `StageTimer` for the enclosed block (None if disabled)."""
+
+    global _ACTIVE
+    if not enabled:
+        yield None
+        return
+    previous = _ACTIVE
+    timer = StageTimer()
+    timer._start = time.perf_counter_ns()
+    _ACTIVE = timer
+    try:
+        yield timer
+    finally:
+        timer._end = time.perf_counter_ns()
+        _ACTIVE = previous
+
+
+class TimingAggregate:
+    """Running per-stage totals across requests (used by the persistent worker)."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.total_ms = 0.0
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def add(self, timings: Dict[str, Any]) -> None:
+        self.requests += 1
+        self.total_ms += timings.get("total_ms", 0.0)
+        for name, ms in timings.get("stages", {}).items():
+            entry = self.stages.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        n = max(1, self.requests)
+        return {
+            "requests": self.requests,
+            "mean_total_ms": round(self.total_ms / n, 3),
+            "stages": {
+                name: {
+                    "mean_ms": round(e["total_ms"] / n, 3),
+                    "max_ms": round(e["max_ms"], 3),
+                    "share": round(e["total_ms"] / self.total_ms, 4) if self.total_ms else 0.0,
+                }
+                for name, e in self.stages.items()
+            },
+        }
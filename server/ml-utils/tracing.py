@@ -0,0 +1,120 @@
+"""Chrome trace-event export of the analysis pipeline
+
+A `TraceRecorder` collects complete ("X") events in the Trace Event Format
+that chrome://tracing and https://ui.perfetto.dev load directly. While one
+is installed, every `timings.stage()` region (frame decode, each MediaPipe
+``process`` call, crops, frame diffs, tensor stacking, model forward,
+heuristic decisions, state I/O) becomes a span on the thread that ran it,
+and `span()` adds enclosing request spans with arguments::
+
+    with recording(path="/tmp/eye_gaze.trace.json"):
+        with span("request", behavior="eye_gaze", id="r1"):
+            result = _predict(behavior, data)
+
+Timestamps are `time.perf_counter_ns` (CLOCK_MONOTONIC on Linux, shared by
+every process on the host) in microseconds, so traces written by several
+workers can be concatenated and still line up. Recorders are thread-safe;
+several may be installed at once (a per-request trace inside a longer
+window) and each gets every span.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import timings
+
+
+class TraceRecorder:
+    def __init__(self, max_events: int = 1_000_000) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self.max_events = max_events
+        self.dropped = 0
+        self.pid = os.getpid()
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def complete(self, name: str, cat: str, start_ns: int, end_ns: int,
+                 args: Optional[Dict[str, Any]] = None) -> None:
+        tid = threading.get_native_id()
+        event: Dict[str, Any] = {
+            "name": name, "cat": cat, "ph": "X", "pid": self.pid, "tid": tid,
+            "ts": start_ns / 1000, "dur": (end_ns - start_ns) / 1000,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(event)
+
+    def to_json(self) -> Dict[str, Any]:
+        with self._lock:
+            meta = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+                     "args": {"name": f"analyzer {self.pid}"}}]
+            meta += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                     for tid, name in self._threads.items()]
+            return {
+                "traceEvents": meta + list(self.events),
+                "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": self.dropped},
+            }
+
+    def write(self, path: str) -> str:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(self.to_json(), fp)
+        return path
+
+
+def install(recorder: TraceRecorder) -> None:
+    """Start feeding every stage span to *recorder*."""
+
+    timings.add_tracer(recorder)
+
+
+def uninstall(recorder: TraceRecorder) -> None:
+    timings.remove_tracer(recorder)
+
+
+@contextmanager
+def recording(enabled: bool = True, path: Optional[str] = None) -> Iterator[Optional[TraceRecorder]]:
+    """Install a fresh recorder for the block; write it to *path* on exit."""
+
+    if not enabled:
+        yield None
+        return
+    recorder = TraceRecorder()
+    install(recorder)
+    try:
+        yield recorder
+    finally:
+        uninstall(recorder)
+        if path:
+            recorder.write(path)
+
+
+@contextmanager
+def span(name: str, cat: str = "request", **args: Any) -> Iterator[None]:
+    """Record the block as one span on every installed recorder (no-op otherwise)."""
+
+    if not timings._TRACERS:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        for tracer in timings._TRACERS:
+            tracer.complete(name, cat, start, end, args or None)
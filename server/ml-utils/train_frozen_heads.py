@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Train the LSTM/classifier heads of TappingCNN and EyeGazeLSTM from cached features.
+
+Both models freeze their MobileNetV2 `feature_extractor`, so its pooled
+1280-d output for a frame never changes during training. Instead of pushing
+every frame through the backbone on every epoch (what the notebooks do), this
+script computes those features once into a `dataset_cache.py` cache and
+trains only `lstm` + `classifier` on them.
+
+Usage
+-----
+python dataset_cache.py build data/tapping_hands cache/tapping_hands --max-frames 10
+python train_frozen_heads.py cache/tapping_hands --model tapping_hands [--epochs 30] [--out tapping_hands.pth]
+
+If the cache was built without ``--embeddings`` the features are computed
+once and added to it (``embeddings.npy`` per shard); later runs reuse them.
+Frames are resized to 64×64 and scaled to [0, 1] first, exactly like
+`ml_analyzer._IMAGE_TF`, so cached features match inference.
+
+The saved file is the full model `state_dict` (pretrained backbone + trained
+heads), loadable as-is by `model_loader.load_all_models`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+
+from dataset_cache import DatasetCache, EmbeddingExtractor, add_field
+
+ROOT = Path(__file__).resolve().parents[2]
+OUT_DIR = ROOT / "machine-learning" / "models"
+ML_MODELS_DIR = Path(__file__).resolve().parent.parent / "ml-models"
+
+# model key -> (architecture name, number of classes)
+MODEL_SPECS = {
+    "tapping_hands": ("TappingCNN", 2),
+    "tapping_feet": ("TappingCNN", 2),
+    "eye_gaze": ("EyeGazeLSTM", 5),
+}
+
+# Input size the models see at inference (`ml_analyzer.IMAGE_SIZE`).
+IMAGE_SIZE = 64
+
+
+def _build_model(key: str) -> nn.Module:
+    sys.path.insert(0, str(ML_MODELS_DIR))
+    import architectures  # type: ignore
+
+    return getattr(architectures, MODEL_SPECS[key][0])()
+
+
+def ensure_embeddings(cache_dir: str, batch_size: int = 64) -> None:
+    """Add the pooled backbone features to the cache if they are missing."""
+
+    cache = DatasetCache(cache_dir)
+    if "embeddings" in cache.fields:
+        return
+    # The extractor resizes frames of any cached size to IMAGE_SIZE.
+    extractor = EmbeddingExtractor(batch_size=batch_size, input_size=IMAGE_SIZE)
+    print(f"Computing backbone features for {len(cache)} clips (one-off)...", file=sys.stderr)
+    add_field(cache_dir, "embeddings", extractor.extract, chunk_frames=max(batch_size, 512))
+
+
+def load_features(cache_dir: str, behavior: str | None, split: str | None, seq_len: int) -> Tuple[torch.Tensor, torch.Tensor]:
+    """All labelled clips as (N, seq_len, 1280) float32 features and (N,) labels."""
+
+    cache = DatasetCache(cache_dir)
+    xs, ys = [], []
+    for idx in cache.select(behavior=behavior, split=split):
+        label = cache.clips[idx].get("label")
+        if label is None:
+            continue
+        emb = cache.get(idx, "embeddings")
+        if len(emb) != seq_len:
+            # Evenly spaced resampling, as the tapping notebooks do.
+            emb = emb[np.linspace(0, len(emb) - 1, seq_len).astype(int)]
+        xs.append(np.asarray(emb, dtype=np.float32))
+        ys.append(int(label))
+    if not xs:
+        raise ValueError(f"No labelled clips in cache {cache_dir}")
+    return torch.from_numpy(np.stack(xs)), torch.tensor(ys, dtype=torch.long)
+
+
+def _head_forward(model: Any, feats: torch.Tensor) -> torch.Tensor:
+    """The part of `forward` after the frozen backbone."""
+
+    lstm_out, _ = model.lstm(feats)
+    return model.classifier(lstm_out[:, -1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train frozen-backbone model heads from cached features")
+    parser.add_argument("cache", help="dataset_cache.py cache directory")
+    parser.add_argument("--model", required=True, choices=sorted(MODEL_SPECS))
+    parser.add_argument("--behavior", help="Only clips recorded with this behaviour")
+    parser.add_argument("--split", help="Only clips recorded with this split")
+    parser.add_argument("--seq-len", type=int, default=10, help="Frames per training sequence")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--val-split", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="Output .pth (default: machine-learning/models/<model>.pth)")
+    args = parser.parse_args()
+
+    torch.manual_seed(args.seed)
+    ensure_embeddings(args.cache)
+    x, y = load_features(args.cache, args.behavior, args.split, args.seq_len)
+    num_classes = MODEL_SPECS[args.model][1]
+    if int(y.max()) >= num_classes or int(y.min()) < 0:
+        raise ValueError(f"Labels must be in [0, {num_classes - 1}] for {args.model}")
+
+    # Train/val split
+    perm = torch.randperm(len(y), generator=torch.Generator().manual_seed(args.seed))
+    n_val = int(len(y) * args.val_split)
+    val_idx, train_idx = perm[:n_val], perm[n_val:]
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = _build_model(args.model).to(device)
+    x, y = x.to(device), y.to(device)
+    heads = list(model.lstm.parameters()) + list(model.classifier.parameters())
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.Adam(heads, lr=args.lr)
+
+    best_acc, best_state = -1.0, None
+    for epoch in range(1, args.epochs + 1):
+        model.train()
+        total = 0.0
+        order = train_idx[torch.randperm(len(train_idx))]
+        for s in range(0, len(order), args.batch_size):
+            batch = order[s: s + args.batch_size]
+            optimizer.zero_grad()
+            loss = criterion(_head_forward(model, x[batch]), y[batch])
+            loss.backward()
+            optimizer.step()
+            total += loss.item() * len(batch)
+
+        model.eval()
+        with torch.no_grad():
+            if n_val:
+                acc = (_head_forward(model, x[val_idx]).argmax(1) == y[val_idx]).float().mean().item()
+            else:
+                acc = (_head_forward(model, x[train_idx]).argmax(1) == y[train_idx]).float().mean().item()
+        print(f"Epoch {epoch:02d}: loss {total / max(1, len(train_idx)):.4f}  {'val' if n_val else 'train'}_acc {acc:.3f}")
+        if acc > best_acc:
+            best_acc = acc
+            best_state = {k: v.detach().cpu().clone() for k, v in model.state_dict().items()}
+
+    out_path = Path(args.out) if args.out else OUT_DIR / f"{args.model}.pth"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    torch.save(best_state, out_path)
+    print(f"Model saved to {out_path} (best accuracy {best_acc:.3f})")
+
+
+if __name__ == "__main__":
+    main()
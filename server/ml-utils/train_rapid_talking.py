@@ -4,43 +4,50 @@
 Usage
 -----
 python train_rapid_talking.py  # saves rapid_talking.pth next to the other models
+python train_rapid_talking.py --window 8 --seeds 8 --workers 4 --patience 20
 
 The script expects a CSV at
 machine-learning/models/speech/rapid_talking_data.csv
 with at least two columns:
     wpm   – numeric words-per-minute value per utterance chunk
-    label – 1 if "rapid talking", 0 otherwise
+    label – 1 if "rapid talking", 0 otherwise (rows without a label are
+            labelled ``wpm > --wpm-threshold``, as in rapid_talking.ipynb)
+
+Optional columns:
+    session / speaker – utterances are grouped by this column (``--group-col``)
+    filename          – natural sort order of utterances within a group
+
+Each utterance becomes a sequence of the last ``--window`` WPM values of its
+group (shorter histories are left-padded with the first value), labelled with
+the utterance's own label, so the LSTM sees temporal context. ``--window 1``
+reproduces the old single-value training.
+
+Windows are built with strided views and trained full-batch (or in
+``--batch-size`` chunks). ``--seeds N`` trains N independently initialised
+models in parallel processes, each with early stopping on the validation
+split; the best checkpoint overall is saved in the usual state_dict format.
 """
 
 from __future__ import annotations
 
+import argparse
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from sklearn.model_selection import train_test_split
-from torch.utils.data import DataLoader, Dataset, Subset
 
 ROOT = Path(__file__).resolve().parents[2]
 CSV_PATH = ROOT / "machine-learning" / "models" / "speech" / "rapid_talking_data.csv"
 OUT_PATH = ROOT / "machine-learning" / "models" / "rapid_talking.pth"
 
 
-class WPMSpeechDataset(Dataset):
-    def __init__(self, df: pd.DataFrame):
-        self.x = torch.tensor(df["wpm"].values, dtype=torch.float32).view(-1, 1, 1)
-        self.y = torch.tensor(df["label"].values, dtype=torch.float32).view(-1, 1)
-
-    def __len__(self):
-        return len(self.x)
-
-    def __getitem__(self, idx):
-        return self.x[idx], self.y[idx]
-
-
 class WPMModel(nn.Module):
     def __init__(self):
         super().__init__()
@@ -52,47 +59,173 @@ class WPMModel(nn.Module):
         return torch.sigmoid(self.fc(out[:, -1, :]))
 
 
-def main() -> None:
-    if not CSV_PATH.exists():
-        raise FileNotFoundError(f"Training CSV not found: {CSV_PATH}")
-
-    df = pd.read_csv(CSV_PATH)
-    if not {"wpm", "label"}.issubset(df.columns):
-        raise ValueError("CSV must contain 'wpm' and 'label' columns")
-
-    # Train/val split
-    train_idx, _ = train_test_split(
-        range(len(df)), test_size=0.2, random_state=42, shuffle=True
-    )
-
-    dataset = WPMSpeechDataset(df)
-    train_loader = DataLoader(
-        Subset(dataset, train_idx), batch_size=16, shuffle=True, drop_last=False
-    )
-
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model = WPMModel().to(device)
+# ---------------------------------------------------------------------------
+# Windowed dataset
+# ---------------------------------------------------------------------------
+
+
+def _natural_key(value: Any) -> List[Any]:
+    return [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", str(value))]
+
+
+def build_windows(
+    df: pd.DataFrame,
+    window: int,
+    group_col: Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sliding WPM windows per group.
+
+    Returns ``x`` (N, window, 1) float32, ``y`` (N, 1) float32 and the group
+    id of every window, where N is the number of rows in *df*.
+    """
+
+    groups = df[group_col].astype(str) if group_col else pd.Series("all", index=df.index)
+    xs, ys, gs = [], [], []
+    for gid, (_, part) in enumerate(df.groupby(groups, sort=True)):
+        if "filename" in part.columns:
+            part = part.iloc[sorted(range(len(part)), key=lambda i: _natural_key(part["filename"].iloc[i]))]
+        wpm = part["wpm"].to_numpy(dtype=np.float32)
+        padded = np.concatenate([np.full(window - 1, wpm[0], dtype=np.float32), wpm])
+        # (len(part), window) strided view – no per-row copies
+        xs.append(np.lib.stride_tricks.sliding_window_view(padded, window))
+        ys.append(part["label"].to_numpy(dtype=np.float32))
+        gs.append(np.full(len(part), gid))
+    x = np.concatenate(xs)[..., None]
+    return x, np.concatenate(ys)[:, None], np.concatenate(gs)
+
+
+def split_windows(groups: np.ndarray, test_size: float, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Train/val indices that never put overlapping windows on both sides.
+
+    With several groups whole groups are held out; with a single series the
+    last ``test_size`` fraction (in time order) is the validation split.
+    """
+
+    unique = np.unique(groups)
+    idx = np.arange(len(groups))
+    if len(unique) > 1:
+        rng = np.random.default_rng(seed)
+        held = rng.permutation(unique)[: max(1, int(round(len(unique) * test_size)))]
+        val_mask = np.isin(groups, held)
+        return idx[~val_mask], idx[val_mask]
+    n_val = max(1, int(len(idx) * test_size))
+    return idx[:-n_val], idx[-n_val:]
+
+
+# ---------------------------------------------------------------------------
+# Training
+# ---------------------------------------------------------------------------
+
+
+def train_one(
+    seed: int,
+    x_train: np.ndarray,
+    y_train: np.ndarray,
+    x_val: np.ndarray,
+    y_val: np.ndarray,
+    epochs: int,
+    lr: float,
+    batch_size: int,
+    patience: int,
+) -> Dict[str, Any]:
+    """Train one seed; returns its best validation loss and state_dict."""
+
+    torch.set_num_threads(1)  # seeds run side by side in separate processes
+    torch.manual_seed(seed)
+    xt, yt = torch.from_numpy(x_train), torch.from_numpy(y_train)
+    xv, yv = torch.from_numpy(x_val), torch.from_numpy(y_val)
+    model = WPMModel()
     criterion = nn.BCELoss()
-    optimizer = optim.Adam(model.parameters(), lr=1e-2)
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+    full_batch = batch_size <= 0 or batch_size >= len(xt)
 
-    epochs = 20
+    best: Dict[str, Any] = {"seed": seed, "val_loss": float("inf"), "val_acc": 0.0, "epoch": 0, "state": None}
+    stale = 0
     for epoch in range(1, epochs + 1):
         model.train()
-        total = 0.0
-        for X, y in train_loader:
-            X, y = X.to(device), y.to(device)
+        if full_batch:
+            batches = [torch.arange(len(xt))]
+        else:
+            batches = list(torch.randperm(len(xt)).split(batch_size))
+        for b in batches:
             optimizer.zero_grad()
-            pred = model(X)
-            loss = criterion(pred, y)
+            loss = criterion(model(xt[b]), yt[b])
             loss.backward()
             optimizer.step()
-            total += loss.item()
-        print(f"Epoch {epoch:02d}: loss {total/len(train_loader):.4f}")
 
-    OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    torch.save(model.state_dict(), OUT_PATH)
-    print("Model saved to", OUT_PATH)
+        model.eval()
+        with torch.no_grad():
+            pred = model(xv)
+            val_loss = criterion(pred, yv).item()
+            val_acc = ((pred > 0.5).float() == yv).float().mean().item()
+        if val_loss < best["val_loss"] - 1e-6:
+            best.update(val_loss=val_loss, val_acc=val_acc, epoch=epoch,
+                        state={k: v.detach().clone() for k, v in model.state_dict().items()})
+            stale = 0
+        else:
+            stale += 1
+            if patience and stale >= patience:
+                break
+    best["epochs_run"] = epoch
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the rapid-talking WPM classifier")
+    parser.add_argument("--csv", default=str(CSV_PATH), help="Training CSV")
+    parser.add_argument("--out", default=str(OUT_PATH), help="Output .pth")
+    parser.add_argument("--window", type=int, default=8, help="WPM values per sequence")
+    parser.add_argument("--group-col", help="Column to window within (default: session/speaker if present)")
+    parser.add_argument("--wpm-threshold", type=float, default=100.0, help="Label rule for rows without a label")
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument("--lr", type=float, default=1e-2)
+    parser.add_argument("--batch-size", type=int, default=0, help="0 = full batch")
+    parser.add_argument("--patience", type=int, default=30, help="Early-stopping patience in epochs (0 = off)")
+    parser.add_argument("--seeds", type=int, default=4, help="Independent initialisations to train")
+    parser.add_argument("--workers", type=int, help="Parallel processes (default: min(seeds, cores))")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    args = parser.parse_args()
+
+    csv_path = Path(args.csv)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Training CSV not found: {csv_path}")
+
+    df = pd.read_csv(csv_path)
+    if "wpm" not in df.columns:
+        raise ValueError("CSV must contain a 'wpm' column")
+    df = df.dropna(subset=["wpm"]).reset_index(drop=True)
+    if "label" not in df.columns:
+        df["label"] = np.nan
+    missing = df["label"].isna()
+    df.loc[missing, "label"] = (df.loc[missing, "wpm"] > args.wpm_threshold).astype(int)
+    if missing.any():
+        print(f"Labelled {int(missing.sum())} rows with wpm > {args.wpm_threshold:g}")
+
+    group_col = args.group_col or next((c for c in ("session", "speaker") if c in df.columns), None)
+    x, y, groups = build_windows(df, args.window, group_col)
+    train_idx, val_idx = split_windows(groups, args.test_size, seed=42)
+    print(f"{len(x)} windows of length {args.window} ({len(train_idx)} train / {len(val_idx)} val, "
+          f"{len(np.unique(groups))} group(s))")
+
+    job = (x[train_idx], y[train_idx], x[val_idx], y[val_idx], args.epochs, args.lr, args.batch_size, args.patience)
+    seeds = list(range(args.seeds))
+    workers = args.workers or min(len(seeds), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(train_one, seeds, *[[a] * len(seeds) for a in job]))
+    else:
+        results = [train_one(s, *job) for s in seeds]
+
+    for r in results:
+        print(f"Seed {r['seed']}: best val loss {r['val_loss']:.4f}, val acc {r['val_acc']:.4f} "
+              f"at epoch {r['epoch']} ({r['epochs_run']} run)")
+    best = min(results, key=lambda r: r["val_loss"])
+
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    torch.save(best["state"], out_path)
+    print("Model saved to", out_path, f"(seed {best['seed']})")
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""Train the sit/stand (SitStandLSTM) classifier from pose key-point sequences.
+
+Usage
+-----
+python train_sit_stand.py <dataset_dir> [--workers 8] [--epochs 30] [--lr 1e-4]
+
+`dataset_dir` follows the `sit-stand.ipynb` layout: one sub-directory per
+action (``Sit down/``, ``Standing up/``) containing `.avi` clips, possibly in
+nested folders. For every clip the first ``--max-frames`` frames with a
+detected pose become a (max_frames, 66) sequence of MediaPipe (x, y) pairs,
+zero-padded when the clip is short – the same features as the notebook.
+
+Key-point extraction runs in a process pool (one MediaPipe Pose graph per
+worker) and each clip's sequence is cached under ``--cache-dir`` keyed by
+path, size and mtime. Re-running with different hyperparameters only loads
+the cache, so training starts immediately.
+
+The weights are saved to machine-learning/models/sit-stand.pth (or
+``--out``) in the `architectures.SitStandLSTM` layout.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+OUT_PATH = ROOT / "machine-learning" / "models" / "sit-stand.pth"
+ML_MODELS_DIR = Path(__file__).resolve().parent.parent / "ml-models"
+
+# Same constants as sit-stand.ipynb
+MAX_FRAMES = 10
+POSE_FEATURES = 33 * 2
+ACTION_MAP = {"Sit down": 0, "Standing up": 1}
+VIDEO_EXTS = (".avi",)
+
+# ---------------------------------------------------------------------------
+# Key-point extraction (runs in worker processes)
+# ---------------------------------------------------------------------------
+
+_pose = None
+
+
+def _init_worker() -> None:
+    global _pose
+    import mediapipe as mp
+
+    # Video mode, as in the notebook: landmarks are tracked across frames.
+    _pose = mp.solutions.pose.Pose(static_image_mode=False)
+
+
+def _extract_keypoints(video_path: str, max_frames: int) -> np.ndarray:
+    """(n, 66) (x, y) key-points of the first *max_frames* frames with a pose."""
+
+    import cv2
+
+    # Don't let tracking state from the previous clip leak into this one.
+    if hasattr(_pose, "reset"):
+        _pose.reset()  # type: ignore[union-attr]
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video file: {video_path}")
+    keypoints: List[List[float]] = []
+    try:
+        while len(keypoints) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            results = _pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))  # type: ignore[union-attr]
+            if results.pose_landmarks:
+                frame_keypoints: List[float] = []
+                for lm in results.pose_landmarks.landmark:
+                    frame_keypoints.extend([lm.x, lm.y])
+                keypoints.append(frame_keypoints)
+    finally:
+        cap.release()
+    return np.asarray(keypoints, dtype=np.float32).reshape(-1, POSE_FEATURES)
+
+
+def _extract_to_cache(video_path: str, cache_file: str, max_frames: int) -> Tuple[str, int]:
+    keypoints = _extract_keypoints(video_path, max_frames)
+    tmp = cache_file + ".tmp.npy"
+    np.save(tmp, keypoints)
+    os.replace(tmp, cache_file)
+    return video_path, len(keypoints)
+
+
+# ---------------------------------------------------------------------------
+# Dataset
+# ---------------------------------------------------------------------------
+
+
+def discover_videos(data_dir: Path, action_map: Dict[str, int]) -> List[Tuple[Path, int]]:
+    """(video path, label) for every clip under the action folders."""
+
+    videos: List[Tuple[Path, int]] = []
+    for action, label in action_map.items():
+        action_dir = data_dir / action
+        if not action_dir.is_dir():
+            print(f"[Warning] Missing action folder: {action_dir}", file=sys.stderr)
+            continue
+        for path in sorted(action_dir.rglob("*")):
+            if path.is_file() and path.suffix.lower() in VIDEO_EXTS:
+                videos.append((path, label))
+    return videos
+
+
+def _cache_file(cache_dir: Path, video: Path, max_frames: int) -> Path:
+    st = video.stat()
+    key = f"{video.resolve()}|{st.st_size}|{st.st_mtime_ns}|{max_frames}"
+    return cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.npy"
+
+
+def extract_all(
+    videos: List[Tuple[Path, int]],
+    cache_dir: Path,
+    max_frames: int = MAX_FRAMES,
+    workers: Optional[int] = None,
+) -> List[Tuple[Path, int, Path]]:
+    """Extract key-points for every uncached video in parallel.
+
+    Returns (video, label, cache file) for every video whose cache exists.
+    """
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    entries = [(video, label, _cache_file(cache_dir, video, max_frames)) for video, label in videos]
+    todo = [(video, cache) for video, _, cache in entries if not cache.exists()]
+    print(f"{len(entries) - len(todo)} of {len(entries)} videos already cached", file=sys.stderr)
+
+    if todo:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_extract_to_cache, str(v), str(c), max_frames) for v, c in todo]
+            for done, fut in enumerate(as_completed(futures), start=1):
+                try:
+                    path, n = fut.result()
+                    print(f"[{done}/{len(todo)}] {path}: {n} frames with pose", file=sys.stderr)
+                except Exception as e:
+                    print(f"[Warning] Extraction failed: {e}", file=sys.stderr)
+    return [e for e in entries if e[2].exists()]
+
+
+def load_sequences(entries: List[Tuple[Path, int, Path]], max_frames: int = MAX_FRAMES) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack cached key-points into (N, max_frames, 66), zero-padding short clips."""
+
+    xs, ys = [], []
+    for video, label, cache in entries:
+        keypoints = np.load(cache)[:max_frames]
+        if len(keypoints) == 0:
+            print(f"[Info] Skipping video (no pose detected): {video}", file=sys.stderr)
+            continue
+        seq = np.zeros((max_frames, POSE_FEATURES), dtype=np.float32)
+        seq[: len(keypoints)] = keypoints
+        xs.append(seq)
+        ys.append(label)
+    if not xs:
+        raise ValueError("No usable pose sequences")
+    return np.stack(xs), np.asarray(ys, dtype=np.int64)
+
+
+# ---------------------------------------------------------------------------
+# Training
+# ---------------------------------------------------------------------------
+
+
+def train(
+    x: np.ndarray,
+    y: np.ndarray,
+    epochs: int = 30,
+    batch_size: int = 8,
+    lr: float = 1e-4,
+    clip_norm: float = 1.0,
+    val_split: float = 0.2,
+    seed: int = 42,
+):
+    """Train `SitStandLSTM` on in-memory sequences; returns the best model."""
+
+    import torch
+    import torch.nn as nn
+    import torch.optim as optim
+
+    sys.path.insert(0, str(ML_MODELS_DIR))
+    from architectures import SitStandLSTM  # type: ignore
+
+    torch.manual_seed(seed)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    xt = torch.from_numpy(x).to(device)
+    yt = torch.from_numpy(y).to(device)
+
+    # Train/val split
+    perm = torch.randperm(len(yt), generator=torch.Generator().manual_seed(seed)).to(device)
+    n_val = int(len(yt) * val_split)
+    val_idx, train_idx = perm[:n_val], perm[n_val:]
+
+    model = SitStandLSTM().to(device)
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+
+    best_acc, best_state = -1.0, None
+    for epoch in range(1, epochs + 1):
+        model.train()
+        running_loss = 0.0
+        correct = 0
+        order = train_idx[torch.randperm(len(train_idx), device=device)]
+        for s in range(0, len(order), batch_size):
+            batch = order[s: s + batch_size]
+            optimizer.zero_grad()
+            outputs = model(xt[batch])
+            loss = criterion(outputs, yt[batch])
+            loss.backward()
+            nn.utils.clip_grad_norm_(model.parameters(), clip_norm)
+            optimizer.step()
+            running_loss += loss.item() * len(batch)
+            correct += (outputs.argmax(1) == yt[batch]).sum().item()
+
+        model.eval()
+        with torch.no_grad():
+            eval_idx = val_idx if n_val else train_idx
+            val_outputs = model(xt[eval_idx])
+            val_loss = criterion(val_outputs, yt[eval_idx]).item()
+            val_acc = (val_outputs.argmax(1) == yt[eval_idx]).float().mean().item()
+        print(f"Epoch {epoch}/{epochs}, "
+              f"Train Loss: {running_loss / max(1, len(train_idx)):.4f}, Train Acc: {correct / max(1, len(train_idx)):.4f}, "
+              f"Val Loss: {val_loss:.4f}, Val Acc: {val_acc:.4f}")
+        if val_acc > best_acc:
+            best_acc = val_acc
+            best_state = {k: v.detach().cpu().clone() for k, v in model.state_dict().items()}
+
+    model.load_state_dict(best_state)
+    return model, best_acc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract pose key-points in parallel and train SitStandLSTM")
+    parser.add_argument("data_dir", help="Dataset root with 'Sit down' / 'Standing up' folders")
+    parser.add_argument("--cache-dir", help="Key-point cache (default: <data_dir>/.keypoints)")
+    parser.add_argument("--workers", type=int, help="Extraction processes (default: all cores)")
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    parser.add_argument("--extract-only", action="store_true", help="Fill the cache and exit")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--lr", type=float, default=1e-4)
+    parser.add_argument("--clip-norm", type=float, default=1.0)
+    parser.add_argument("--val-split", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help=f"Output .pth (default: {OUT_PATH})")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    cache_dir = Path(args.cache_dir) if args.cache_dir else data_dir / ".keypoints"
+    videos = discover_videos(data_dir, ACTION_MAP)
+    if not videos:
+        raise FileNotFoundError(f"No {'/'.join(VIDEO_EXTS)} videos under {data_dir}")
+    entries = extract_all(videos, cache_dir, args.max_frames, args.workers)
+    if args.extract_only:
+        print(json.dumps({"success": True, "cached": len(entries), "cache_dir": str(cache_dir)}))
+        return
+
+    x, y = load_sequences(entries, args.max_frames)
+    print(f"Training on {len(y)} sequences ({int((y == 0).sum())} sit down, {int((y == 1).sum())} standing up)", file=sys.stderr)
+    model, best_acc = train(
+        x, y,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        lr=args.lr,
+        clip_norm=args.clip_norm,
+        val_split=args.val_split,
+        seed=args.seed,
+    )
+
+    import torch
+
+    out_path = Path(args.out) if args.out else OUT_PATH
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    torch.save(model.state_dict(), out_path)
+    print(f"Model saved to {out_path} (best val accuracy {best_acc:.4f})")
+
+
+if __name__ == "__main__":
+    main()
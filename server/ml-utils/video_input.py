@@ -0,0 +1,148 @@
+"""Encoded video chunks as analyzer input
+
+Instead of a list of JPEG data-URLs a frame payload may carry one short
+encoded clip, as the browser's MediaRecorder produces::
+
+{"video": "data:video/webm;base64,...", "max_frames": 12}
+
+Consecutive frames compress against each other, so a one-second chunk
+costs far less bandwidth than a dozen independent JPEGs and the client can
+record at its full frame rate. `decode` turns the chunk into BGR arrays
+(what `ml_analyzer._decode_bgr` returns for a JPEG frame) sampled evenly
+down to ``max_frames`` (default `DEFAULT_FRAMES`, capped by
+``ML_VIDEO_MAX_FRAMES``), which the analyzers then consume like decoded
+frames.
+
+MJPEG (concatenated JPEGs, ``video/x-motion-jpeg``) is split and decoded
+in memory. Container formats (WebM/VP8/VP9, MP4/H.264) go through OpenCV's
+FFmpeg reader: straight from memory where the OpenCV build can read Python
+streams (4.10+), otherwise via a temporary file in ``/dev/shm`` (RAM-backed
+on Linux) that is removed as soon as it is read.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_FRAMES = 12
+MAX_FRAMES = int(os.environ.get("ML_VIDEO_MAX_FRAMES", "30"))
+
+_SOI = b"\xff\xd8"
+_EOI = b"\xff\xd9"
+_SUFFIXES = {"webm": ".webm", "mp4": ".mp4", "quicktime": ".mov", "x-matroska": ".mkv", "avi": ".avi"}
+
+
+def is_video_payload(data: Any) -> bool:
+    return isinstance(data, dict) and isinstance(data.get("video"), str)
+
+
+def _bytes(data_url: str) -> Tuple[bytes, str]:
+    """(raw bytes, container subtype) of a data-URL or bare base64 string."""
+
+    subtype = ""
+    if "," in data_url:
+        header, b64 = data_url.split(",", 1)
+        if header.startswith("data:video/"):
+            subtype = header[len("data:video/"):].split(";", 1)[0]
+    else:
+        b64 = data_url
+    return base64.b64decode(b64), subtype
+
+
+def _sample(count: int, wanted: int) -> List[int]:
+    """Indices of *wanted* frames spread evenly over *count*, last frame included."""
+
+    if count <= wanted:
+        return list(range(count))
+    return [int(round(i * (count - 1) / (wanted - 1))) if wanted > 1 else count - 1 for i in range(wanted)]
+
+
+def _mjpeg_frames(raw: bytes, wanted: int) -> List[Any]:
+    """Split concatenated JPEGs; only the sampled ones are decoded."""
+    import cv2
+
+    spans = []
+    start = raw.find(_SOI)
+    while start != -1:
+        end = raw.find(_EOI, start + 2)
+        if end == -1:
+            break
+        spans.append((start, end + 2))
+        start = raw.find(_SOI, end + 2)
+    frames = []
+    for i in _sample(len(spans), wanted):
+        start, end = spans[i]
+        frame = cv2.imdecode(np.frombuffer(raw, dtype=np.uint8, count=end - start, offset=start), cv2.IMREAD_COLOR)
+        if frame is not None:
+            frames.append(frame)
+    return frames
+
+
+def _open_capture(raw: bytes, subtype: str) -> Tuple[Any, Optional[str]]:
+    """(VideoCapture, temp path or None) reading *raw*."""
+    import cv2
+
+    try:
+        cap = cv2.VideoCapture(io.BytesIO(raw), cv2.CAP_FFMPEG, [])
+        if cap.isOpened():
+            return cap, None
+    except Exception:
+        pass  # this OpenCV cannot read Python streams
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    fd, path = tempfile.mkstemp(prefix="chunk-", suffix=_SUFFIXES.get(subtype, ".webm"), dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(raw)
+        return cv2.VideoCapture(path, cv2.CAP_FFMPEG), path
+    except Exception:
+        os.unlink(path)
+        raise
+
+
+def _container_frames(raw: bytes, subtype: str, wanted: int) -> List[Any]:
+    cap, path = _open_capture(raw, subtype)
+    try:
+        if not cap.isOpened():
+            return []
+        # MediaRecorder's WebM carries no frame count, so keep every
+        # ``stride``-th frame and double the stride whenever more than twice
+        # the wanted number have piled up: memory stays bounded and the kept
+        # frames stay evenly spaced. Skipped frames are only grabbed, not
+        # converted to BGR arrays.
+        frames: List[Any] = []
+        stride = 1
+        idx = 0
+        while cap.grab():
+            if idx % stride == 0:
+                ok, frame = cap.retrieve()
+                if ok and frame is not None:
+                    frames.append(frame)
+                if len(frames) > 2 * wanted:
+                    frames = frames[::2]
+                    stride *= 2
+            idx += 1
+        return frames
+    finally:
+        cap.release()
+        if path:
+            os.unlink(path)
+
+
+def decode(payload: Dict[str, Any]) -> List[Any]:
+    """BGR frames sampled from ``payload["video"]``; ValueError if none decode."""
+
+    wanted = max(1, min(int(payload.get("max_frames") or DEFAULT_FRAMES), MAX_FRAMES))
+    try:
+        raw, subtype = _bytes(payload["video"])
+    except Exception as exc:
+        raise ValueError(f"Invalid base64 video: {exc}") from exc
+    frames = _mjpeg_frames(raw, wanted) if raw.startswith(_SOI) else _container_frames(raw, subtype, wanted)
+    if not frames:
+        raise ValueError("Could not decode any frame from the video chunk")
+    return [frames[i] for i in _sample(len(frames), wanted)]
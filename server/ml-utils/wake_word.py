@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""Streaming "Hi Bea" wake-word detector
+
+A CPU-only hotword engine for the "Hi Bea" / "Hello Bea" call listed in
+`machine-learning/wake_call.csv` (which previously only pointed at an
+external Mycroft Precise setup). Audio is 16 kHz mono PCM fed in small chunks;
+log-mel frames are computed incrementally (10 ms hop, 25 ms window) into a
+ring buffer holding the last second, and a small NumPy MLP scores that second
+every 50 ms. Worst-case detection latency is therefore one evaluation step
+plus one chunk (≤ 150 ms with the default 100 ms chunks), and the per-stream
+cost is a 512-point FFT per hop plus a ~440×32 matrix product per step.
+
+python wake_word.py train --audio-dir <wake_wavs> --negatives <other_wavs> [--csv wake_call.csv] [--out wake_word.npz]
+python wake_word.py listen [--model wake_word.npz] < audio.s16le     # raw 16 kHz mono int16 on stdin
+python wake_word.py bench [--model wake_word.npz] [--seconds 60]
+
+`listen` prints one JSON line per detection::
+
+{ "detected": true, "score": 0.93, "time": 12.34 }
+
+where ``time`` is seconds of audio consumed when the detection fired.
+`bench` reports the real-time CPU share and per-step latency of one stream.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import wave
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+HOP = 160              # 10 ms
+WIN = 400              # 25 ms
+N_FFT = 512
+N_MELS = 40
+CONTEXT_FRAMES = 100   # 1 s of features seen by the classifier
+SEGMENTS = 10          # context is average-pooled into this many segments
+EVAL_EVERY = 5         # frames between classifier runs (50 ms)
+
+ROOT = Path(__file__).resolve().parents[2]
+CSV_PATH = ROOT / "machine-learning" / "wake_call.csv"
+MODEL_PATH = ROOT / "machine-learning" / "models" / "wake_word.npz"
+
+# ---------------------------------------------------------------------------
+# Features
+# ---------------------------------------------------------------------------
+
+
+def _mel_filterbank(n_mels: int = N_MELS, n_fft: int = N_FFT, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """(n_fft // 2 + 1, n_mels) triangular HTK mel filters."""
+
+    def hz_to_mel(f: np.ndarray) -> np.ndarray:
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    def mel_to_hz(m: np.ndarray) -> np.ndarray:
+        return 700.0 * (10 ** (m / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(np.array(20.0)), hz_to_mel(np.array(sr / 2)), n_mels + 2)
+    hz = mel_to_hz(mels)
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sr)
+    fb = np.zeros((len(bins), n_mels), dtype=np.float32)
+    for m in range(n_mels):
+        lo, centre, hi = hz[m], hz[m + 1], hz[m + 2]
+        up = (bins - lo) / (centre - lo)
+        down = (hi - bins) / (hi - centre)
+        fb[:, m] = np.maximum(0.0, np.minimum(up, down))
+    return fb
+
+
+_WINDOW = np.hanning(WIN).astype(np.float32)
+_MEL_FB = _mel_filterbank()
+
+
+class LogMelStream:
+    """Incremental log-mel frames over a PCM stream.
+
+    `push` accepts any number of samples and returns the (n, N_MELS) frames
+    completed by them; leftover samples are kept for the next call, so the
+    output is identical however the audio is chunked.
+    """
+
+    def __init__(self) -> None:
+        self._pending = np.zeros(WIN - HOP, dtype=np.float32)
+
+    def push(self, pcm: np.ndarray) -> np.ndarray:
+        samples = _as_float(pcm)
+        buf = np.concatenate([self._pending, samples])
+        n = (len(buf) - WIN) // HOP + 1 if len(buf) >= WIN else 0
+        if n <= 0:
+            self._pending = buf
+            return np.empty((0, N_MELS), dtype=np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(buf, WIN)[::HOP][:n] * _WINDOW
+        power = np.abs(np.fft.rfft(frames, n=N_FFT)) ** 2
+        self._pending = buf[n * HOP:]
+        return np.log(power @ _MEL_FB + 1e-6).astype(np.float32)
+
+
+def _as_float(pcm: np.ndarray) -> np.ndarray:
+    pcm = np.asarray(pcm)
+    if pcm.dtype == np.int16:
+        return pcm.astype(np.float32) / 32768.0
+    return pcm.astype(np.float32, copy=False)
+
+
+def window_features(context: np.ndarray) -> np.ndarray:
+    """Classifier input for one (CONTEXT_FRAMES, N_MELS) window.
+
+    Per-mel mean normalisation (robust to gain and channel) followed by
+    average pooling into `SEGMENTS` segments, plus the per-mel spread.
+    """
+
+    mean = context.mean(axis=0, keepdims=True)
+    cmn = context - mean
+    pooled = cmn.reshape(SEGMENTS, CONTEXT_FRAMES // SEGMENTS, N_MELS).mean(axis=1)
+    return np.concatenate([pooled.ravel(), cmn.std(axis=0)]).astype(np.float32)
+
+
+# ---------------------------------------------------------------------------
+# Classifier
+# ---------------------------------------------------------------------------
+
+
+class WakeWordModel:
+    """One-hidden-layer MLP with input standardisation, stored as ``.npz``."""
+
+    def __init__(self, params: Dict[str, np.ndarray]) -> None:
+        self.mu = params["mu"]
+        self.sigma = params["sigma"]
+        self.w1, self.b1 = params["w1"], params["b1"]
+        self.w2, self.b2 = params["w2"], params["b2"]
+        self.threshold = float(params.get("threshold", np.array(0.5)))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "WakeWordModel":
+        with np.load(path) as data:
+            return cls({k: data[k] for k in data.files})
+
+    def save(self, path: str | Path) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, mu=self.mu, sigma=self.sigma, w1=self.w1, b1=self.b1,
+                 w2=self.w2, b2=self.b2, threshold=np.array(self.threshold))
+
+    def score(self, feats: np.ndarray) -> np.ndarray:
+        """Wake-word probability for (n, D) or (D,) feature rows."""
+
+        h = np.maximum(0.0, ((feats - self.mu) / self.sigma) @ self.w1 + self.b1)
+        z = h @ self.w2 + self.b2
+        return 1.0 / (1.0 + np.exp(-z.squeeze(-1)))
+
+
+def train_model(
+    x: np.ndarray,
+    y: np.ndarray,
+    hidden: int = 32,
+    epochs: int = 400,
+    lr: float = 1e-2,
+    weight_decay: float = 1e-4,
+    seed: int = 0,
+) -> WakeWordModel:
+    """Full-batch Adam on a class-balanced logistic loss."""
+
+    rng = np.random.default_rng(seed)
+    mu = x.mean(axis=0)
+    sigma = x.std(axis=0) + 1e-5
+    xs = (x - mu) / sigma
+    pos_w = (len(y) - y.sum()) / max(1.0, y.sum())
+    sample_w = np.where(y == 1, pos_w, 1.0) / len(y)
+
+    params = {
+        "w1": rng.normal(0, np.sqrt(2.0 / xs.shape[1]), (xs.shape[1], hidden)).astype(np.float32),
+        "b1": np.zeros(hidden, dtype=np.float32),
+        "w2": rng.normal(0, np.sqrt(1.0 / hidden), (hidden, 1)).astype(np.float32),
+        "b2": np.zeros(1, dtype=np.float32),
+    }
+    m = {k: np.zeros_like(v) for k, v in params.items()}
+    v = {k: np.zeros_like(p) for k, p in params.items()}
+    for step in range(1, epochs + 1):
+        pre = xs @ params["w1"] + params["b1"]
+        h = np.maximum(0.0, pre)
+        p = 1.0 / (1.0 + np.exp(-(h @ params["w2"] + params["b2"]).squeeze(-1)))
+        dz = ((p - y) * sample_w)[:, None]
+        grads = {"w2": h.T @ dz, "b2": dz.sum(axis=0)}
+        dh = (dz @ params["w2"].T) * (pre > 0)
+        grads["w1"] = xs.T @ dh
+        grads["b1"] = dh.sum(axis=0)
+        for k in params:
+            g = grads[k] + weight_decay * params[k]
+            m[k] = 0.9 * m[k] + 0.1 * g
+            v[k] = 0.999 * v[k] + 0.001 * g * g
+            m_hat = m[k] / (1 - 0.9 ** step)
+            v_hat = v[k] / (1 - 0.999 ** step)
+            params[k] = params[k] - lr * m_hat / (np.sqrt(v_hat) + 1e-8)
+    return WakeWordModel({"mu": mu, "sigma": sigma, **params, "threshold": np.array(0.5)})
+
+
+# ---------------------------------------------------------------------------
+# Streaming detector
+# ---------------------------------------------------------------------------
+
+
+class WakeWordDetector:
+    """Per-stream state: feature stream, 1 s ring buffer and refractory timer.
+
+    `process` takes a chunk of 16 kHz mono PCM (int16 or float in [-1, 1])
+    and returns the detections it triggered.
+    """
+
+    def __init__(
+        self,
+        model: WakeWordModel,
+        threshold: Optional[float] = None,
+        refractory_s: float = 1.0,
+        eval_every: int = EVAL_EVERY,
+        min_log_energy: float = -9.0,
+    ) -> None:
+        self.model = model
+        self.threshold = model.threshold if threshold is None else threshold
+        self.refractory_frames = int(refractory_s * SAMPLE_RATE / HOP)
+        self.eval_every = eval_every
+        self.min_log_energy = min_log_energy
+        self._features = LogMelStream()
+        self._ring = np.full((CONTEXT_FRAMES, N_MELS), np.log(1e-6), dtype=np.float32)
+        self._pos = 0          # next ring slot to write
+        self._frames = 0       # frames seen so far
+        self._last_fire = -self.refractory_frames
+
+    def _context(self) -> np.ndarray:
+        """Ring buffer in time order (oldest first)."""
+
+        return np.concatenate([self._ring[self._pos:], self._ring[:self._pos]])
+
+    def process(self, pcm: np.ndarray) -> List[Dict[str, Any]]:
+        detections: List[Dict[str, Any]] = []
+        for frame in self._features.push(pcm):
+            self._ring[self._pos] = frame
+            self._pos = (self._pos + 1) % CONTEXT_FRAMES
+            self._frames += 1
+            if self._frames < CONTEXT_FRAMES or self._frames % self.eval_every:
+                continue
+            if self._frames - self._last_fire < self.refractory_frames:
+                continue
+            context = self._context()
+            # Skip the classifier on silence – most of a stream is quiet.
+            if context.max() < self.min_log_energy:
+                continue
+            score = float(self.model.score(window_features(context)))
+            if score >= self.threshold:
+                self._last_fire = self._frames
+                detections.append({
+                    "detected": True,
+                    "score": round(score, 4),
+                    "time": round(self._frames * HOP / SAMPLE_RATE, 3),
+                })
+        return detections
+
+
+# ---------------------------------------------------------------------------
+# Training data
+# ---------------------------------------------------------------------------
+
+
+def read_wav(path: str | Path) -> np.ndarray:
+    """Mono float32 samples at 16 kHz (linear resampling if needed)."""
+
+    with wave.open(str(path), "rb") as wf:
+        sr, channels, width = wf.getframerate(), wf.getnchannels(), wf.getsampwidth()
+        raw = wf.readframes(wf.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+    audio = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if sr != SAMPLE_RATE:
+        n_out = int(len(audio) * SAMPLE_RATE / sr)
+        audio = np.interp(np.linspace(0, len(audio) - 1, n_out), np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+def _clip_frames(audio: np.ndarray) -> np.ndarray:
+    """All log-mel frames of a clip, padded with a second of silence on both sides."""
+
+    pad = np.zeros(CONTEXT_FRAMES * HOP, dtype=np.float32)
+    return LogMelStream().push(np.concatenate([pad, audio, pad]))
+
+
+def _windows(frames: np.ndarray, ends: Iterable[int]) -> List[np.ndarray]:
+    return [window_features(frames[e - CONTEXT_FRAMES:e]) for e in ends if CONTEXT_FRAMES <= e <= len(frames)]
+
+
+def positive_windows(audio: np.ndarray) -> List[np.ndarray]:
+    """Windows ending just after the spoken call (where the stream would fire)."""
+
+    frames = _clip_frames(audio)
+    energy = frames.max(axis=1)
+    voiced = np.flatnonzero(energy > energy.max() - 6.0)
+    if len(voiced) == 0:
+        return []
+    end = int(voiced[-1]) + 1
+    return _windows(frames, range(end - 5, end + 16, EVAL_EVERY))
+
+
+def negative_windows(audio: np.ndarray, rng: np.random.Generator, per_clip: int = 20) -> List[np.ndarray]:
+    frames = _clip_frames(audio)
+    if len(frames) <= CONTEXT_FRAMES:
+        return []
+    ends = rng.integers(CONTEXT_FRAMES, len(frames) + 1, size=per_clip)
+    return _windows(frames, ends)
+
+
+def build_training_set(
+    audio_dir: str | Path,
+    negatives_dir: Optional[str | Path],
+    csv_path: str | Path = CSV_PATH,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Positive windows from the `wake_call.csv` clips, negatives from other audio.
+
+    Besides ``negatives_dir`` the negatives include the first half-second
+    prefixes of each call ("Hi" / "Hello" alone) and synthetic noise, so the
+    model learns that "Bea" is required.
+    """
+
+    import csv
+
+    rng = np.random.default_rng(seed)
+    audio_dir = Path(audio_dir)
+    with open(csv_path, "r", encoding="utf-8") as fp:
+        names = [row["filename"] for row in csv.DictReader(fp) if row.get("filename")]
+
+    pos: List[np.ndarray] = []
+    neg: List[np.ndarray] = []
+    for name in names:
+        path = audio_dir / name
+        if not path.exists():
+            print(f"[wake_word] Missing clip: {path}", file=sys.stderr)
+            continue
+        audio = read_wav(path)
+        for gain in (1.0, 0.5, 2.0):
+            noisy = np.clip(audio * gain + rng.normal(0, 0.003, len(audio)).astype(np.float32), -1, 1)
+            pos += positive_windows(noisy)
+        neg += positive_windows(audio[: len(audio) // 3])  # truncated call
+    if negatives_dir:
+        for path in sorted(Path(negatives_dir).rglob("*.wav")):
+            try:
+                neg += negative_windows(read_wav(path), rng)
+            except Exception as e:
+                print(f"[wake_word] Skipping {path}: {e}", file=sys.stderr)
+    for _ in range(max(20, len(pos) // 4)):
+        neg += negative_windows(rng.normal(0, rng.uniform(0.001, 0.05), SAMPLE_RATE * 2).astype(np.float32), rng, 1)
+
+    if not pos:
+        raise ValueError(f"No wake-word clips found under {audio_dir}")
+    x = np.stack(pos + neg)
+    y = np.concatenate([np.ones(len(pos)), np.zeros(len(neg))]).astype(np.float32)
+    return x, y
+
+
+# ---------------------------------------------------------------------------
+# Main entry
+# ---------------------------------------------------------------------------
+
+
+def _bench(model: WakeWordModel, seconds: float, chunk_ms: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(0)
+    audio = (rng.normal(0, 0.05, int(seconds * SAMPLE_RATE)) * 32767).astype(np.int16)
+    det = WakeWordDetector(model, threshold=1.1, min_log_energy=-np.inf)  # always run the classifier
+    chunk = SAMPLE_RATE * chunk_ms // 1000
+    step_times: List[float] = []
+    cpu0 = time.process_time()
+    for s in range(0, len(audio), chunk):
+        t0 = time.perf_counter()
+        det.process(audio[s: s + chunk])
+        step_times.append(time.perf_counter() - t0)
+    cpu = time.process_time() - cpu0
+    step_ms = np.array(step_times) * 1000
+    return {
+        "success": True,
+        "audio_seconds": seconds,
+        "chunk_ms": chunk_ms,
+        "cpu_seconds": round(cpu, 4),
+        "cpu_percent_of_one_core": round(100 * cpu / seconds, 3),
+        "chunk_latency_ms": {"p50": round(float(np.percentile(step_ms, 50)), 3),
+                             "p99": round(float(np.percentile(step_ms, 99)), 3),
+                             "max": round(float(step_ms.max()), 3)},
+        "worst_case_detection_latency_ms": chunk_ms + EVAL_EVERY * HOP * 1000 // SAMPLE_RATE + round(float(step_ms.max())),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Streaming 'Hi Bea' wake-word detector")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    t = sub.add_parser("train", help="Train the classifier from wake_call.csv clips")
+    t.add_argument("--audio-dir", required=True, help="Folder holding the clips named in the CSV")
+    t.add_argument("--negatives", help="Folder of non-wake-word speech/noise WAVs")
+    t.add_argument("--csv", default=str(CSV_PATH))
+    t.add_argument("--out", default=str(MODEL_PATH))
+    t.add_argument("--hidden", type=int, default=32)
+    t.add_argument("--epochs", type=int, default=400)
+
+    l = sub.add_parser("listen", help="Detect in raw 16 kHz mono int16 PCM from stdin")
+    l.add_argument("--model", default=str(MODEL_PATH))
+    l.add_argument("--threshold", type=float)
+    l.add_argument("--chunk-ms", type=int, default=100)
+
+    b = sub.add_parser("bench", help="Measure per-stream CPU cost and latency")
+    b.add_argument("--model", default=str(MODEL_PATH))
+    b.add_argument("--seconds", type=float, default=60.0)
+    b.add_argument("--chunk-ms", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.command == "train":
+        x, y = build_training_set(args.audio_dir, args.negatives, args.csv)
+        print(f"[wake_word] Training on {int(y.sum())} positive / {int((1 - y).sum())} negative windows", file=sys.stderr)
+        model = train_model(x, y, hidden=args.hidden, epochs=args.epochs)
+        pred = model.score(x) >= model.threshold
+        model.save(args.out)
+        print(json.dumps({
+            "success": True,
+            "output": args.out,
+            "train_accuracy": round(float((pred == (y == 1)).mean()), 4),
+            "train_recall": round(float(pred[y == 1].mean()), 4),
+        }))
+    elif args.command == "listen":
+        det = WakeWordDetector(WakeWordModel.load(args.model), threshold=args.threshold)
+        chunk_bytes = SAMPLE_RATE * args.chunk_ms // 1000 * 2
+        stream = sys.stdin.buffer
+        while True:
+            data = stream.read(chunk_bytes)
+            if not data:
+                break
+            for hit in det.process(np.frombuffer(data[: len(data) // 2 * 2], dtype=np.int16)):
+                sys.stdout.write(json.dumps(hit) + "\n")
+                sys.stdout.flush()
+    else:
+        if Path(args.model).exists():
+            model = WakeWordModel.load(args.model)
+        else:
+            # Random weights of the right shape are enough to measure cost.
+            dim = SEGMENTS * N_MELS + N_MELS
+            model = train_model(np.random.default_rng(0).normal(size=(64, dim)).astype(np.float32),
+                                np.arange(64) % 2, epochs=1)
+        print(json.dumps(_bench(model, args.seconds, args.chunk_ms)))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+"""Persistent analyzer worker
+
+Spawning `ml_analyzer.py` per request pays the interpreter start, the model
+loads and the MediaPipe graph construction every time. This worker pays them
+once and then serves requests over JSON-lines on stdin/stdout:
+
+python worker.py [--timings] [--metrics-port 9464] [--max-rss-mb 1500] [--max-requests 500]
+                 [--trace-memory] [--leak-report N] [--profile-dir DIR] [--trace-dir DIR]
+                 [--watch-models SECONDS]
+
+Requests, one JSON object per line::
+
+{"id": "r1", "behavior": "eye_gaze", "data": {"eye_gaze": [<frames>]}}
+{"id": "r2", "batch": [{"type": "tapping_hands", "data": [<frames>]}, ...]}
+{"id": "r3", "command": "ping" | "stats" | "metrics" | "memory" | "profile" | "trace"
+                    | "models" | "reload" | "shutdown"}
+
+Responses, one line per request, in order::
+
+{"id": "r1", "result": {"detected": true, "confidence": 0.8, ...}}
+{"id": "r2", "results": [...], "total_analyzed": 2}
+{"id": "r3", "ok": true, ...}
+
+``data`` is the same payload `ml_analyzer.py --data` reads (the behaviour key
+is unwrapped the same way) and batch entries are the `batch_analyzer.py`
+entries; entries sharing one frame sequence are analysed in a single fused
+pass there too, and all rapid_talking entries share one `WPMModel` forward
+(``ML_ANALYZER_FUSED=0`` turns both off). A ``{"ready":
+true}`` line is written once models are loaded. Only protocol lines go to
+stdout; all logging goes to stderr.
+
+``"timings": true`` on a request (or ``--timings`` for every request) adds
+per-stage timings to its results; the worker also sums them per behaviour
+and ``stats`` reports mean/max milliseconds and share of time per stage.
+
+``metrics`` returns the `metrics.py` snapshot (per-behaviour latency
+histograms, in-flight and queued requests, MediaPipe detection-failure rates,
+decode errors, cache hit ratios, model load times); with ``"format":
+"prometheus"`` it returns the Prometheus text instead. ``--metrics-port``
+also serves them on ``http://127.0.0.1:<port>/metrics`` (Prometheus text) and
+``/metrics.json``. Requests are read on a separate thread, so ``queued``
+counts lines received while another request is being analysed.
+
+``"profile": true`` on a request runs it under cProfile and adds a top-level
+``profile`` object to its response: the top functions by cumulative time and
+the hottest `ml_analyzer.py` functions with line numbers (see
+`profiling.py`). An object instead of ``true`` may set ``sort``
+(cumulative/tottime/ncalls) and ``top``. ``{"command": "profile", "count":
+3, "behavior": "sit_stand"}`` arms profiling for the next 3 requests (of that
+behaviour, if given) without changing the callers; ``count: 0`` disarms.
+With ``--profile-dir`` the raw stats are also written there as ``.prof``
+files. Requests that do not ask for a profile run unprofiled.
+
+``"trace": true`` on a request writes a Chrome trace-event file of it (open
+in chrome://tracing or Perfetto; see `tracing.py`) to ``--trace-dir``
+(``ML_TRACE_DIR``, default ``<tmp>/analyzer-traces``) and adds ``{"trace":
+{"file", "events"}}`` to the response. ``{"command": "trace", "action":
+"start"}`` … ``"stop"`` records every request in between into one file,
+which ``stop`` (or end of input) writes and returns.
+
+``memory`` reports RSS and, per request type, RSS growth; ``--trace-memory``
+adds `tracemalloc` top allocators and ``--leak-report N`` a snapshot diff
+every N requests (see `memory.py`). Once RSS exceeds ``--max-rss-mb`` or
+``--max-requests`` have been served the worker asks to be recycled by
+writing one unsolicited line::
+
+{"recycle": true, "pid": 1234, "reason": "rss", "rss_mb": 1530.2, "requests": 412}
+
+It keeps answering every request it receives; the supervisor stops sending
+new work, starts a replacement and closes this worker's stdin, and the
+worker drains what is left, releases its MediaPipe graphs and exits.
+
+``{"command": "reload", "behavior": "eye_gaze", "version": "3"}`` loads that
+registry version (default: the active one; no ``behavior``: every model; see
+`model_registry.py`) on a background thread, checks its checksum, warms it
+with a dummy forward pass and only then swaps it into `ml_analyzer.MODELS`.
+Requests keep being served meanwhile; one already running finishes on the
+model it started with. The outcome is written as an unsolicited line::
+
+{"reloaded": true, "behavior": "eye_gaze", "version": "3", "format": "quantized", "load_ms": 812.4, "warm_ms": 95.1}
+
+``--watch-models N`` polls the registry and weight files every N seconds and
+reloads any behaviour whose active artifact changed. ``models`` reports the
+version, format and checksum currently served per behaviour.
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# Everything the analyzer (or a library) prints must stay off the protocol.
+_PROTOCOL_OUT = sys.stdout
+sys.stdout = sys.stderr
+
+import metrics  # type: ignore  # noqa: E402
+from analyzer_log import get_logger  # type: ignore  # noqa: E402
+from batch_analyzer import analyze_unit, work_units  # type: ignore  # noqa: E402
+from memory import MemoryTracker  # type: ignore  # noqa: E402
+from ml_analyzer import _predict, close_graphs  # type: ignore  # noqa: E402
+from profiling import profiled  # type: ignore  # noqa: E402
+from tracing import TraceRecorder, install, recording, span, uninstall  # type: ignore  # noqa: E402
+from timings import TimingAggregate  # type: ignore  # noqa: E402
+
+log = get_logger("worker")
+
+
+class WorkerStats:
+    """Request counters kept for the lifetime of the worker."""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.per_behavior: Dict[str, Dict[str, float]] = {}
+        self.timings: Dict[str, TimingAggregate] = {}
+
+    def record(self, behavior: str, seconds: float, error: bool = False) -> None:
+        # Keyed like the metrics labels so clients cannot grow these maps.
+        behavior = metrics.label_value("behavior", behavior)
+        metrics.inc("requests_total", behavior=behavior, status="error" if error else "ok")
+        metrics.observe("request_duration_seconds", seconds, behavior=behavior)
+        self.requests += 1
+        self.errors += int(error)
+        self.busy_seconds += seconds
+        entry = self.per_behavior.setdefault(behavior, {"count": 0, "seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] += seconds
+
+    def record_timings(self, behavior: str, timings: Optional[Dict[str, Any]]) -> None:
+        if timings:
+            self.timings.setdefault(metrics.label_value("behavior", behavior), TimingAggregate()).add(timings)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 4),
+            "per_behavior": {
+                k: {"count": int(v["count"]), "mean_ms": round(1000 * v["seconds"] / max(1, v["count"]), 3)}
+                for k, v in self.per_behavior.items()
+            },
+            "timings": {k: agg.snapshot() for k, agg in self.timings.items()},
+        }
+
+
+_EMIT_LOCK = threading.Lock()
+
+
+def _emit(record: Dict[str, Any]) -> None:
+    line = json.dumps(record) + "\n"
+    # Reload threads emit too; keep lines whole.
+    with _EMIT_LOCK:
+        _PROTOCOL_OUT.write(line)
+        _PROTOCOL_OUT.flush()
+
+
+def _json_safe(result: Dict[str, Any]) -> Dict[str, Any]:
+    # Same coercion ml_analyzer.main applies before writing its result.
+    import numpy as np
+
+    for key, value in list(result.items()):
+        if isinstance(value, np.bool_):
+            result[key] = bool(value)
+        elif isinstance(value, np.floating):
+            result[key] = float(value)
+        elif isinstance(value, np.integer):
+            result[key] = int(value)
+    return result
+
+
+# Profiling armed by the "profile" command: remaining count, behaviour filter, options.
+_PROFILE_ARM: Dict[str, Any] = {"remaining": 0, "behavior": None, "options": {}}
+PROFILE_DIR: Optional[str] = os.environ.get("ML_PROFILE_DIR") or None
+
+TRACE_DIR = os.environ.get("ML_TRACE_DIR") or os.path.join(tempfile.gettempdir(), "analyzer-traces")
+# Recorder of the running "trace start" window, if any.
+_TRACE_WINDOW: Dict[str, Any] = {"recorder": None, "started": 0.0}
+
+
+def _profile_options(request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Profiler options for this work request, or None to run it unprofiled."""
+
+    asked = request.get("profile")
+    if asked:
+        return asked if isinstance(asked, dict) else {}
+    arm = _PROFILE_ARM
+    if arm["remaining"] > 0 and arm["behavior"] in (None, request.get("behavior")):
+        arm["remaining"] -= 1
+        return arm["options"]
+    return None
+
+
+def handle(
+    request: Dict[str, Any],
+    stats: WorkerStats,
+    timings: Optional[bool] = None,
+    memory: Optional[MemoryTracker] = None,
+) -> Optional[Dict[str, Any]]:
+    """Serve one request; returns the response (None means shut down)."""
+
+    req_id = request.get("id")
+    timings = request.get("timings", timings)
+    command = request.get("command")
+    behavior = request.get("behavior")
+    if behavior is not None and not isinstance(behavior, str):
+        stats.record("invalid", 0.0, True)
+        return {"id": req_id, "success": False, "error": f"behavior must be a string, got {type(behavior).__name__}"}
+    if command == "shutdown":
+        return None
+    if command == "ping":
+        return {"id": req_id, "ok": True}
+    if command == "stats":
+        return {"id": req_id, "ok": True, "stats": stats.snapshot()}
+    if command == "metrics":
+        if request.get("format") == "prometheus":
+            return {"id": req_id, "ok": True, "text": metrics.prometheus()}
+        return {"id": req_id, "ok": True, "metrics": metrics.snapshot()}
+    if command == "memory":
+        return {"id": req_id, "ok": True, "memory": memory.snapshot() if memory else None}
+    if command == "profile":
+        count = request.get("count", 1)
+        if isinstance(count, bool) or not isinstance(count, (int, float)):
+            return {"id": req_id, "ok": False, "error": f"count must be a number, got {count!r}"}
+        _PROFILE_ARM.update(
+            remaining=max(0, int(count)),
+            behavior=behavior,
+            options={k: request[k] for k in ("sort", "top") if k in request},
+        )
+        return {"id": req_id, "ok": True, "armed": dict(_PROFILE_ARM)}
+    if command == "trace":
+        return {"id": req_id, **_trace_window(request.get("action", "start"))}
+    if command == "models":
+        return {"id": req_id, "ok": True, **_served_models()}
+    if command == "reload":
+        behaviors = [behavior] if behavior else list(_served_models()["models"])
+        started = {b: start_reload(b, request.get("version")) for b in behaviors}
+        return {"id": req_id, "ok": all(r.get("ok") for r in started.values()), "reloads": started}
+    if command:
+        return {"id": req_id, "ok": False, "error": f"Unknown command: {command}"}
+
+    label = "batch" if "batch" in request else str(request.get("behavior"))
+    trace_path = None
+    if request.get("trace"):
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in f"{label}-{req_id}")
+        trace_path = os.path.join(TRACE_DIR, f"{safe}-{os.getpid()}-{time.time_ns()}.trace.json")
+    options = _profile_options(request)
+    profile_kwargs = {k: options[k] for k in ("sort", "top") if k in options} if options else {}
+    with recording(trace_path is not None) as trace, \
+            profiled(options is not None, label=label, output_dir=PROFILE_DIR, **profile_kwargs) as prof:
+        with span(label, id=req_id):
+            response = _serve(request, stats, timings)
+    if prof is not None:
+        response["profile"] = prof.summary()
+    if trace is not None:
+        # Written here rather than by recording() so a failed write costs
+        # the trace, not the result.
+        try:
+            response["trace"] = {"file": trace.write(trace_path), "events": len(trace.events)}
+        except Exception as exc:
+            log.error("Could not write trace %s: %s", trace_path, exc)
+            response["trace"] = {"error": f"{type(exc).__name__}: {exc}"}
+    return response
+
+
+def _trace_window(action: str) -> Dict[str, Any]:
+    recorder = _TRACE_WINDOW["recorder"]
+    if action == "start":
+        if recorder is not None:
+            return {"ok": False, "error": "trace window already running"}
+        recorder = TraceRecorder()
+        _TRACE_WINDOW.update(recorder=recorder, started=time.time())
+        install(recorder)
+        return {"ok": True, "tracing": True}
+    if action == "stop":
+        if recorder is None:
+            return {"ok": False, "error": "no trace window running"}
+        uninstall(recorder)
+        started = _TRACE_WINDOW["started"]
+        _TRACE_WINDOW.update(recorder=None, started=0.0)
+        try:
+            path = recorder.write(os.path.join(TRACE_DIR, f"window-{os.getpid()}-{int(started)}.trace.json"))
+        except Exception as exc:
+            log.error("Could not write trace window: %s", exc)
+            return {"ok": False, "error": f"{type(exc).__name__}: {exc}", "events": len(recorder.events)}
+        return {"ok": True, "file": path, "events": len(recorder.events),
+                "seconds": round(time.time() - started, 3)}
+    return {"ok": False, "error": f"Unknown trace action: {action}"}
+
+
+def _serve(request: Dict[str, Any], stats: WorkerStats, timings: Optional[bool]) -> Dict[str, Any]:
+    req_id = request.get("id")
+    start = time.perf_counter()
+    if "batch" in request:
+        batch = request.get("batch") or []
+        if not isinstance(batch, list):
+            stats.record("batch", time.perf_counter() - start, True)
+            return {"id": req_id, "success": False, "error": f"batch must be a list, got {type(batch).__name__}"}
+        entries = [e if isinstance(e, dict) else {} for e in batch]
+        done: List[Any] = []
+        error = False
+        for idxs in work_units(entries):
+            unit_start = time.perf_counter()
+            label = "+".join(str(entries[i].get("type") or "entry") for i in idxs)
+            try:
+                with span(label, cat="entry"):
+                    unit = analyze_unit(entries, idxs, timings)
+            except Exception as exc:
+                error = True
+                log.error("Batch entry error: %s", exc)
+                continue
+            # A fused unit's entries share one pass; split its time evenly.
+            elapsed = (time.perf_counter() - unit_start) / max(1, len(unit))
+            for idx, single in unit:
+                metrics.observe("request_duration_seconds", elapsed, behavior=single["behavior_type"])
+                stats.record_timings(single["behavior_type"], single.get("timings"))
+                done.append((idx, _json_safe(single)))
+        results = [single for _, single in sorted(done, key=lambda r: r[0])]
+        stats.record("batch", time.perf_counter() - start, error)
+        return {"id": req_id, "success": True, "results": results, "total_analyzed": len(results)}
+
+    behavior = request.get("behavior")
+    payload = request.get("data")
+    if not behavior:
+        stats.record("invalid", time.perf_counter() - start, True)
+        return {"id": req_id, "result": {"detected": False, "confidence": 0.0, "error": "Missing behavior", "fallback": True}}
+    # Unwrap the controller's {behavior: data} wrapper, like ml_analyzer.main.
+    data = payload.get(behavior, payload) if isinstance(payload, dict) else payload
+    try:
+        result = _predict(behavior, data, timings=timings)
+        if not isinstance(result, dict):
+            result = {"detected": False, "confidence": 0.0, "error": "Invalid result format", "fallback": True}
+        error = "error" in result
+    except Exception as exc:
+        log.error("Prediction error: %s", exc)
+        result = {"detected": False, "confidence": 0.0, "error": str(exc), "fallback": True}
+        error = True
+    stats.record(behavior, time.perf_counter() - start, error)
+    stats.record_timings(behavior, result.get("timings"))
+    return {"id": req_id, "result": _json_safe(result)}
+
+
+# ---------------------------------------------------------------------------
+# Model hot reload
+# ---------------------------------------------------------------------------
+
+_RELOAD_LOCK = threading.Lock()
+_RELOADING: Dict[str, Optional[str]] = {}
+
+
+def _served_models() -> Dict[str, Any]:
+    try:
+        from model_loader import MODEL_INFO  # type: ignore
+    except Exception:  # torch unavailable: rule-based only
+        MODEL_INFO = {}
+    with _RELOAD_LOCK:
+        reloading = dict(_RELOADING)
+    return {"models": {k: dict(v) for k, v in MODEL_INFO.items()}, "reloading": reloading}
+
+
+def _reload_model(behavior: str, version: Optional[str]) -> None:
+    notice: Dict[str, Any] = {"reloaded": False, "behavior": behavior, "version": version}
+    try:
+        import ml_analyzer  # type: ignore
+        import model_loader  # type: ignore
+
+        start = time.perf_counter()
+        model, artifact = model_loader.load_artifact(behavior, ml_analyzer.DEVICE, version)
+        loaded = time.perf_counter()
+        model_loader.warm_model(behavior, model, artifact, ml_analyzer.DEVICE)
+        warmed = time.perf_counter()
+        # A request already in _predict holds the old model; the next one gets this.
+        ml_analyzer.MODELS[behavior] = model
+        model_loader.MODEL_INFO[behavior] = artifact
+        metrics.set_gauge("model_load_seconds", loaded - start, model=behavior)
+        metrics.inc("model_reloads_total", model=behavior, result="ok")
+        notice.update(
+            reloaded=True, version=artifact["version"], format=artifact["format"], sha256=artifact["sha256"],
+            load_ms=round((loaded - start) * 1000, 1), warm_ms=round((warmed - loaded) * 1000, 1),
+        )
+        log.warning("Swapped in %s v%s (%s)", behavior, artifact["version"], artifact["format"])
+    except Exception as exc:
+        metrics.inc("model_reloads_total", model=behavior, result="error")
+        notice["error"] = f"{type(exc).__name__}: {exc}"
+        log.error("Reload of %s failed, keeping the current model: %s", behavior, exc)
+    finally:
+        with _RELOAD_LOCK:
+            _RELOADING.pop(behavior, None)
+    _emit(notice)
+
+
+def start_reload(behavior: str, version: Optional[str] = None) -> Dict[str, Any]:
+    """Load, warm and swap *behavior*'s model on a background thread."""
+
+    with _RELOAD_LOCK:
+        if behavior in _RELOADING:
+            return {"ok": False, "error": "reload already in progress"}
+        _RELOADING[behavior] = version
+    threading.Thread(target=_reload_model, args=(behavior, version), name=f"reload-{behavior}", daemon=True).start()
+    return {"ok": True, "reloading": True}
+
+
+def _watch_models(interval: float) -> None:
+    import model_registry  # type: ignore
+
+    behaviors = list(model_registry.LEGACY_FILES)
+    # Fingerprints are taken inside the guarded loop so a malformed manifest
+    # (at startup or later) is logged and retried instead of ending the
+    # watcher; the first good reading of a behaviour is its baseline.
+    seen: Dict[str, Any] = {}
+    while True:
+        try:
+            manifest = model_registry.load_manifest()
+            for b in behaviors:
+                current = model_registry.fingerprint(b, manifest)
+                if b not in seen:
+                    seen[b] = current
+                elif current != seen[b]:
+                    log.warning("Model artifact for %s changed, reloading", b)
+                    seen[b] = current
+                    start_reload(b)
+        except Exception as exc:
+            log.error("Model watch failed: %s", exc)
+        time.sleep(interval)
+
+
+# ---------------------------------------------------------------------------
+# Request loop and metrics endpoint
+# ---------------------------------------------------------------------------
+
+_INBOX: "queue.Queue[Optional[str]]" = queue.Queue()
+
+
+def _read_stdin() -> None:
+    for line in sys.stdin:
+        line = line.strip()
+        if line:
+            _INBOX.put(line)
+    _INBOX.put(None)
+
+
+def _update_queue_gauges(in_flight: int) -> None:
+    metrics.set_gauge("in_flight", in_flight)
+    metrics.set_gauge("queued", _INBOX.qsize())
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path == "/metrics":
+            body = metrics.prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body = json.dumps(metrics.snapshot()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        log.debug("metrics endpoint: " + format, *args)
+
+
+def _serve_metrics(port: int) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    log.warning("Serving metrics on http://127.0.0.1:%d/metrics", port)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve analyzer requests over JSON lines")
+    parser.add_argument("--timings", action="store_true", help="Per-stage timings on every request")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this local port")
+    parser.add_argument("--max-rss-mb", type=float, help="Ask to be recycled once RSS exceeds this")
+    parser.add_argument("--max-requests", type=int, help="Ask to be recycled after this many requests")
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc top allocators per request type")
+    parser.add_argument("--leak-report", type=int, default=0, metavar="N",
+                        help="Diff tracemalloc snapshots every N requests")
+    parser.add_argument("--profile-dir", help="Write .prof files for profiled requests here")
+    parser.add_argument("--trace-dir", help="Write Chrome trace files here")
+    parser.add_argument("--watch-models", type=float, metavar="SECONDS",
+                        help="Reload models whose registry artifact changes, polling this often")
+    args = parser.parse_args()
+
+    global PROFILE_DIR, TRACE_DIR
+    if args.profile_dir:
+        PROFILE_DIR = args.profile_dir
+    if args.trace_dir:
+        TRACE_DIR = args.trace_dir
+
+    stats = WorkerStats()
+    memory = MemoryTracker(trace=args.trace_memory, leak_every=args.leak_report)
+    recycling = False
+    reported = None
+    if args.metrics_port:
+        _serve_metrics(args.metrics_port)
+    if args.watch_models:
+        threading.Thread(target=_watch_models, args=(args.watch_models,), name="model-watch", daemon=True).start()
+    threading.Thread(target=_read_stdin, name="stdin-reader", daemon=True).start()
+    _emit({"ready": True, "pid": os.getpid()})
+    while True:
+        _update_queue_gauges(0)
+        line = _INBOX.get()
+        if line is None:
+            break
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as exc:
+            _emit({"id": None, "success": False, "error": f"Invalid JSON: {exc}"})
+            continue
+        if not isinstance(request, dict):
+            _emit({"id": None, "success": False, "error": f"Request must be a JSON object, got {type(request).__name__}"})
+            continue
+        _update_queue_gauges(1)
+        is_work = not request.get("command")
+        if is_work:
+            memory.before()
+        started = time.perf_counter()
+        try:
+            response = handle(request, stats, args.timings or None, memory)
+        except Exception as exc:
+            # One bad request must not take the worker (and its warm models) down.
+            log.error("Request %r failed: %s", request.get("id"), exc)
+            stats.record("invalid", time.perf_counter() - started, True)
+            response = {"id": request.get("id"), "success": False, "error": f"{type(exc).__name__}: {exc}"}
+        if response is None:
+            _emit({"id": request.get("id"), "ok": True, "stats": stats.snapshot()})
+            break
+        _emit(response)
+        if not is_work:
+            continue
+
+        rss = memory.after(metrics.label_value("behavior", "batch" if "batch" in request else request.get("behavior")))
+        metrics.set_gauge("rss_bytes", rss)
+        if memory.leak_report is not reported:
+            reported = memory.leak_report
+            log.warning("Leak report: %s", json.dumps(reported))
+        reason = None
+        if args.max_rss_mb and rss > args.max_rss_mb * 2 ** 20:
+            reason = "rss"
+        elif args.max_requests and memory.requests >= args.max_requests:
+            reason = "requests"
+        if reason and not recycling:
+            recycling = True
+            metrics.inc("recycle_requests_total", reason=reason)
+            log.warning("Requesting recycle (%s): rss=%.1f MB after %d requests", reason, rss / 2 ** 20, memory.requests)
+            _emit({"recycle": True, "pid": os.getpid(), "reason": reason,
+                   "rss_mb": round(rss / 2 ** 20, 1), "requests": memory.requests})
+    if _TRACE_WINDOW["recorder"] is not None:
+        stopped = _trace_window("stop")
+        if stopped["ok"]:
+            log.warning("Trace window written to %s", stopped["file"])
+    close_graphs()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as exc:
+        log.error("Fatal worker error: %s", exc)
+        sys.exit(1)
@@ -0,0 +1,209 @@
+"""Incremental WPM time series for the rapid_talking behaviour
+
+`WPMSeries` keeps one session's words-per-minute samples with O(1) updates
+of the statistics the analyzer reports:
+
+* running mean over every sample (what the 150–200 WPM rule uses),
+* an exponentially weighted moving average,
+* the maximum over the last ``window`` samples (monotonic deque),
+* the last ``window`` values themselves, ready for `WPMModel`.
+
+`WPMSeriesStore` maps session ids to series and scores many sessions with a
+single batched `WPMModel` forward (`score_series`). Only the most recent
+``window`` values per session are kept, so memory is bounded however long a
+session runs; the store itself keeps at most ``max_sessions`` series and
+forgets any session idle for ``idle_ttl`` seconds, least recently used first,
+so a long-lived worker does not accumulate every session it has ever seen.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Model input length; matches the default `train_rapid_talking.py --window`.
+MODEL_WINDOW = 8
+
+# The existing rapid_talking rule: only 150–200 WPM is flagged.
+RULE_LOW_WPM = 150.0
+RULE_HIGH_WPM = 200.0
+
+# Store bounds: sessions kept at once, and seconds without samples before a
+# session is forgotten.
+MAX_SESSIONS = 1024
+SESSION_TTL_S = 1800.0
+
+
+def wpm_rule(avg_wpm: float) -> Tuple[bool, float]:
+    """(detected, confidence) for an average WPM.
+
+    • avg WPM < 150  → confidence = 0.1 (not detected)
+    • 150 ≤ avg WPM < 200 → confidence = 0.5 (moderately detected)
+    • avg WPM ≥ 200 → confidence = 1.0 (very rapid, but NOT flagged)
+    """
+
+    if avg_wpm < RULE_LOW_WPM:
+        return False, 0.1
+    if avg_wpm < RULE_HIGH_WPM:
+        return True, 0.5
+    return False, 1.0
+
+
+def numeric_values(seq: Iterable[Any]) -> List[float]:
+    """Drop anything that is not a number from *seq* (bools count, as 0/1)."""
+
+    return [float(x) for x in seq if isinstance(x, (int, float))]
+
+
+class WPMSeries:
+    """O(1)-per-sample running statistics over one session's WPM values."""
+
+    def __init__(self, window: int = MODEL_WINDOW, ewma_alpha: float = 0.3) -> None:
+        self.window = window
+        self.ewma_alpha = ewma_alpha
+        self.count = 0
+        self.total = 0.0
+        self.ewma: Optional[float] = None
+        self._recent: deque = deque(maxlen=window)
+        # (index, value) pairs with decreasing values: front is the window max.
+        self._max: deque = deque()
+        # Speech-rate estimator of a session fed raw audio (speech_rate.py);
+        # kept here so it is evicted with the series.
+        self.estimator: Any = None
+
+    def append(self, value: float) -> None:
+        value = float(value)
+        idx = self.count
+        self.count += 1
+        self.total += value
+        self.ewma = value if self.ewma is None else self.ewma + self.ewma_alpha * (value - self.ewma)
+        self._recent.append(value)
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((idx, value))
+        if self._max[0][0] <= idx - self.window:
+            self._max.popleft()
+
+    def extend(self, values: Iterable[float]) -> None:
+        for v in values:
+            self.append(v)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def window_max(self) -> float:
+        return self._max[0][1] if self._max else 0.0
+
+    def model_input(self) -> np.ndarray:
+        """Last ``window`` values, left-padded with the oldest kept value."""
+
+        recent = np.fromiter(self._recent, dtype=np.float32, count=len(self._recent))
+        if len(recent) < self.window:
+            recent = np.concatenate([np.full(self.window - len(recent), recent[0], dtype=np.float32), recent])
+        return recent
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "samples": self.count,
+            "avg_wpm": round(self.mean, 2),
+            "ewma_wpm": round(self.ewma or 0.0, 2),
+            "window_max_wpm": round(self.window_max, 2),
+        }
+
+
+def score_series(model: Any, series: Sequence[WPMSeries], device: Any = "cpu") -> List[float]:
+    """`WPMModel` probability for each series, in one forward pass."""
+
+    if not series:
+        return []
+    import torch
+
+    batch = np.stack([s.model_input() for s in series])[..., None]  # (B, T, 1)
+    with torch.no_grad():
+        probs = model(torch.from_numpy(batch).to(device)).view(-1).cpu().numpy()
+    return [float(p) for p in probs]
+
+
+def series_result(series: WPMSeries, model_score: Optional[float] = None) -> Dict[str, Any]:
+    """Rule result for a series plus its statistics and model score."""
+
+    detected, confidence = wpm_rule(series.mean)
+    return {
+        "detected": detected,
+        "confidence": confidence,
+        **series.stats(),
+        "model_score": None if model_score is None else round(model_score, 4),
+    }
+
+
+class WPMSeriesStore:
+    """Per-session `WPMSeries` with batched model scoring.
+
+    Sessions are kept in least-recently-appended order; appending evicts
+    sessions idle for more than ``idle_ttl`` seconds and then the oldest
+    ones beyond ``max_sessions``.
+    """
+
+    def __init__(
+        self,
+        window: int = MODEL_WINDOW,
+        max_sessions: int = MAX_SESSIONS,
+        idle_ttl: Optional[float] = SESSION_TTL_S,
+    ) -> None:
+        self.window = window
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.sessions: "OrderedDict[str, WPMSeries]" = OrderedDict()
+        self._last_seen: Dict[str, float] = {}
+        self.evicted = 0
+
+    def get(self, session_id: str) -> WPMSeries:
+        """The series of *session_id*, created (and marked used) on demand."""
+
+        now = time.monotonic()
+        series = self.sessions.get(session_id)
+        if series is None:
+            series = self.sessions[session_id] = WPMSeries(self.window)
+        else:
+            self.sessions.move_to_end(session_id)
+        self._last_seen[session_id] = now
+        self._evict(now, keep=session_id)
+        return series
+
+    def append(self, session_id: str, values: Iterable[float]) -> WPMSeries:
+        series = self.get(session_id)
+        series.extend(values)
+        return series
+
+    def drop(self, session_id: str) -> None:
+        self.sessions.pop(session_id, None)
+        self._last_seen.pop(session_id, None)
+
+    def _evict(self, now: float, keep: str) -> None:
+        for session_id in list(self.sessions):
+            if session_id == keep:
+                break
+            idle = self.idle_ttl is not None and now - self._last_seen[session_id] > self.idle_ttl
+            if not idle and len(self.sessions) <= self.max_sessions:
+                break
+            self.drop(session_id)
+            self.evicted += 1
+
+    def score(self, model: Any, session_ids: Optional[Sequence[str]] = None, device: Any = "cpu") -> Dict[str, float]:
+        """`WPMModel` probability for each session, in one forward pass."""
+
+        ids = [s for s in (session_ids if session_ids is not None else list(self.sessions))
+               if s in self.sessions and self.sessions[s].count]
+        if not ids or model is None:
+            return {}
+        return dict(zip(ids, score_series(model, [self.sessions[s] for s in ids], device)))
+
+    def result(self, session_id: str, model_score: Optional[float] = None) -> Dict[str, Any]:
+        """Rule result for a session plus its statistics and model score."""
+
+        return series_result(self.sessions[session_id], model_score)